@@ -0,0 +1,24 @@
+"""add document content hash
+
+Revision ID: 3c6531f32351
+Revises: 91a0a4d62b14
+Create Date: 2026-10-18 09:30:12.518263
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "3c6531f32351"
+down_revision = "91a0a4d62b14"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("document", sa.Column("content_hash", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("document", "content_hash")
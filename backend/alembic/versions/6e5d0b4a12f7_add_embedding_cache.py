@@ -0,0 +1,45 @@
+"""add embedding cache
+
+Revision ID: 6e5d0b4a12f7
+Revises: 3c6531f32351
+Create Date: 2026-10-18 10:12:44.120391
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "6e5d0b4a12f7"
+down_revision = "3c6531f32351"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "embedding_cache",
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("embedding", sa.LargeBinary(), nullable=False),
+        sa.Column("size_bytes", sa.Integer(), nullable=False),
+        sa.Column(
+            "last_accessed",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("key"),
+    )
+    op.create_index(
+        op.f("ix_embedding_cache_last_accessed"),
+        "embedding_cache",
+        ["last_accessed"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f("ix_embedding_cache_last_accessed"), table_name="embedding_cache"
+    )
+    op.drop_table("embedding_cache")
@@ -0,0 +1,34 @@
+"""add document index chunk count
+
+Revision ID: b7e2f0c9a4d1
+Revises: 6e5d0b4a12f7
+Create Date: 2026-10-18 14:05:41.203117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b7e2f0c9a4d1"
+down_revision = "6e5d0b4a12f7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "document_index_chunk_count",
+        sa.Column("document_id", sa.String(), nullable=False),
+        sa.Column("index_name", sa.String(), nullable=False),
+        sa.Column("chunk_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["document_id"],
+            ["document.id"],
+        ),
+        sa.PrimaryKeyConstraint("document_id", "index_name"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("document_index_chunk_count")
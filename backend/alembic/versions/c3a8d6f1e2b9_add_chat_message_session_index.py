@@ -0,0 +1,30 @@
+"""add chat message session index
+
+Revision ID: c3a8d6f1e2b9
+Revises: b7e2f0c9a4d1
+Create Date: 2026-10-18 16:12:08.517264
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "c3a8d6f1e2b9"
+down_revision = "b7e2f0c9a4d1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_chat_message_chat_session_id_parent_message",
+        "chat_message",
+        ["chat_session_id", "parent_message"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_chat_message_chat_session_id_parent_message", table_name="chat_message"
+    )
@@ -4,6 +4,7 @@ from onyx.chat.models import LLMRelevanceFilterResponse
 from onyx.chat.models import OnyxAnswerPiece
 from onyx.chat.models import OnyxContexts
 from onyx.chat.models import QADocsResponse
+from onyx.chat.models import SearchDocsReorderResponse
 from onyx.chat.models import StreamingError
 from onyx.chat.process_message import ChatPacketStream
 from onyx.server.query_and_chat.models import ChatMessageDetail
@@ -24,6 +25,8 @@ def gather_stream_for_answer_api(
             response.docs = packet
             # Extraneous, provided for backwards compatibility
             response.rephrase = packet.rephrased_query
+        elif isinstance(packet, SearchDocsReorderResponse) and response.docs:
+            response.docs = response.docs.reordered(packet)
         elif isinstance(packet, StreamingError):
             response.error_msg = packet.error
         elif isinstance(packet, ChatMessageDetail):
@@ -20,6 +20,7 @@ from onyx.chat.models import LlmDoc
 from onyx.chat.models import LLMRelevanceFilterResponse
 from onyx.chat.models import OnyxAnswerPiece
 from onyx.chat.models import QADocsResponse
+from onyx.chat.models import SearchDocsReorderResponse
 from onyx.chat.models import StreamingError
 from onyx.chat.process_message import ChatPacketStream
 from onyx.chat.process_message import stream_chat_message_objects
@@ -87,16 +88,16 @@ def _convert_packet_stream_to_response(
 ) -> ChatBasicResponse:
     response = ChatBasicResponse()
     final_context_docs: list[LlmDoc] = []
+    qa_docs_response: QADocsResponse | None = None
 
     answer = ""
     for packet in packets:
         if isinstance(packet, OnyxAnswerPiece) and packet.answer_piece:
             answer += packet.answer_piece
         elif isinstance(packet, QADocsResponse):
-            response.top_documents = packet.top_documents
-
-            # TODO: deprecate `simple_search_docs`
-            response.simple_search_docs = _translate_doc_response_to_simple_doc(packet)
+            qa_docs_response = packet
+        elif isinstance(packet, SearchDocsReorderResponse) and qa_docs_response:
+            qa_docs_response = qa_docs_response.reordered(packet)
         elif isinstance(packet, StreamingError):
             response.error_msg = packet.error
         elif isinstance(packet, ChatMessageDetail):
@@ -114,6 +115,14 @@ def _convert_packet_stream_to_response(
                 for citation in packet.citations
             }
 
+    if qa_docs_response:
+        response.top_documents = qa_docs_response.top_documents
+
+        # TODO: deprecate `simple_search_docs`
+        response.simple_search_docs = _translate_doc_response_to_simple_doc(
+            qa_docs_response
+        )
+
     response.final_context_doc_indices = _get_final_context_doc_indices(
         final_context_docs, response.top_documents
     )
@@ -0,0 +1,214 @@
+"""Dynamic micro-batching for the local models.
+
+Concurrent requests for the same model are queued and coalesced into a single forward
+pass: once a request arrives, the scheduler waits a short window for more requests,
+then takes as many queued requests as fit into the max batch size / token budget and
+scatters the outputs back to each caller. Query traffic (search, reranking) is always
+scheduled before bulk indexing traffic.
+"""
+import asyncio
+import time
+from collections import deque
+from collections.abc import Callable
+from collections.abc import Sequence
+from dataclasses import dataclass
+from dataclasses import field
+from enum import Enum
+from typing import Any
+from typing import Generic
+from typing import TypeVar
+
+from prometheus_client import Gauge
+from prometheus_client import Histogram
+
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_BATCH_QUEUE_DEPTH = Gauge(
+    "onyx_model_server_batch_queue_depth",
+    "Number of requests waiting to be batched",
+    ["model", "priority"],
+)
+_BATCH_SIZE = Histogram(
+    "onyx_model_server_batch_size",
+    "Number of inputs per forward pass",
+    ["model"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512),
+)
+_BATCH_NUM_REQUESTS = Histogram(
+    "onyx_model_server_batch_num_requests",
+    "Number of requests coalesced into a forward pass",
+    ["model"],
+    buckets=(1, 2, 3, 4, 6, 8, 12, 16, 32, 64),
+)
+_BATCH_QUEUE_WAIT_SECONDS = Histogram(
+    "onyx_model_server_batch_queue_wait_seconds",
+    "Time requests spend queued before their forward pass starts",
+    ["model", "priority"],
+)
+
+
+class BatchPriority(str, Enum):
+    # interactive traffic, e.g. query embeddings and reranking
+    HIGH = "high"
+    # bulk traffic, e.g. embedding documents for indexing
+    LOW = "low"
+
+
+@dataclass
+class _PendingRequest(Generic[T]):
+    inputs: list[T]
+    num_tokens: int
+    priority: BatchPriority
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class MicroBatcher(Generic[T, R]):
+    """Coalesces concurrent calls to `submit` into calls to `process_batch`, which runs in
+    the default executor. `process_batch` must return one output per input, in order."""
+
+    def __init__(
+        self,
+        name: str,
+        process_batch: Callable[[list[T]], Sequence[R]],
+        count_tokens: Callable[[T], int],
+        max_batch_size: int,
+        max_batch_tokens: int,
+        batch_window_seconds: float,
+    ) -> None:
+        self.name = name
+        self.process_batch = process_batch
+        self.count_tokens = count_tokens
+        self.max_batch_size = max_batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.batch_window_seconds = batch_window_seconds
+
+        self._queues: dict[BatchPriority, deque[_PendingRequest[T]]] = {
+            priority: deque() for priority in BatchPriority
+        }
+        self._has_pending: asyncio.Event | None = None
+        self._worker: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def submit(
+        self, inputs: list[T], priority: BatchPriority = BatchPriority.HIGH
+    ) -> Sequence[R]:
+        if not inputs:
+            return []
+
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            # requests queued on a previous (now closed) event loop can't be served
+            self._queues = {priority: deque() for priority in BatchPriority}
+            self._loop = loop
+            self._has_pending = asyncio.Event()
+            self._worker = loop.create_task(self._run())
+        assert self._has_pending is not None
+
+        request: _PendingRequest[T] = _PendingRequest(
+            inputs=inputs,
+            num_tokens=sum(self.count_tokens(item) for item in inputs),
+            priority=priority,
+            future=loop.create_future(),
+        )
+        self._queues[priority].append(request)
+        _BATCH_QUEUE_DEPTH.labels(self.name, priority.value).inc()
+        self._has_pending.set()
+
+        return await request.future
+
+    def _take_batch(self) -> list[_PendingRequest[T]]:
+        """Takes whole requests in priority order until the next one doesn't fit. The
+        first request is always taken, even if it alone exceeds the limits."""
+        batch: list[_PendingRequest[T]] = []
+        num_inputs = 0
+        num_tokens = 0
+        for priority in BatchPriority:
+            queue = self._queues[priority]
+            while queue:
+                request = queue[0]
+                if batch and (
+                    num_inputs + len(request.inputs) > self.max_batch_size
+                    or num_tokens + request.num_tokens > self.max_batch_tokens
+                ):
+                    return batch
+
+                queue.popleft()
+                _BATCH_QUEUE_DEPTH.labels(self.name, priority.value).dec()
+                if request.future.done():
+                    # the caller went away (e.g. cancelled request)
+                    continue
+
+                batch.append(request)
+                num_inputs += len(request.inputs)
+                num_tokens += request.num_tokens
+        return batch
+
+    async def _run(self) -> None:
+        assert self._has_pending is not None
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._has_pending.wait()
+            if self.batch_window_seconds > 0:
+                # give concurrent requests a chance to join this forward pass
+                await asyncio.sleep(self.batch_window_seconds)
+
+            batch = self._take_batch()
+            if not any(self._queues.values()):
+                self._has_pending.clear()
+            if not batch:
+                continue
+
+            now = time.monotonic()
+            for request in batch:
+                _BATCH_QUEUE_WAIT_SECONDS.labels(
+                    self.name, request.priority.value
+                ).observe(now - request.enqueued_at)
+
+            inputs = [item for request in batch for item in request.inputs]
+            _BATCH_SIZE.labels(self.name).observe(len(inputs))
+            _BATCH_NUM_REQUESTS.labels(self.name).observe(len(batch))
+
+            try:
+                outputs = await loop.run_in_executor(None, self.process_batch, inputs)
+                if len(outputs) != len(inputs):
+                    raise RuntimeError(
+                        f"Expected {len(inputs)} outputs from batch, got {len(outputs)}"
+                    )
+            except Exception as e:
+                logger.exception(f"Batched forward pass failed for {self.name}")
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+                continue
+
+            offset = 0
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_result(
+                        outputs[offset : offset + len(request.inputs)]
+                    )
+                offset += len(request.inputs)
+
+
+def estimate_num_tokens(text: str, max_tokens: int | None = None) -> int:
+    """Cheap token count estimate used for the batch token budget (~4 chars per token),
+    running the actual tokenizer would cost as much as part of the forward pass"""
+    num_tokens = len(text) // 4 + 1
+    return min(num_tokens, max_tokens) if max_tokens else num_tokens
+
+
+_BATCHERS: dict[tuple[Any, ...], MicroBatcher] = {}
+
+
+def get_batcher(
+    key: tuple[Any, ...], create: Callable[[], MicroBatcher[T, R]]
+) -> MicroBatcher[T, R]:
+    if key not in _BATCHERS:
+        _BATCHERS[key] = create()
+    return _BATCHERS[key]
@@ -1,16 +1,21 @@
 import asyncio
 import json
 from types import TracebackType
+from typing import Annotated
+from typing import Any
 from typing import cast
 from typing import Optional
 
 import httpx
+import numpy as np
 import openai
 import vertexai  # type: ignore
 import voyageai  # type: ignore
 from cohere import AsyncClient as CohereAsyncClient
 from fastapi import APIRouter
+from fastapi import Header
 from fastapi import HTTPException
+from fastapi import Response
 from google.oauth2 import service_account  # type: ignore
 from litellm import aembedding
 from litellm.exceptions import RateLimitError
@@ -20,6 +25,10 @@ from sentence_transformers import SentenceTransformer  # type: ignore
 from vertexai.language_models import TextEmbeddingInput  # type: ignore
 from vertexai.language_models import TextEmbeddingModel  # type: ignore
 
+from model_server.batching import BatchPriority
+from model_server.batching import estimate_num_tokens
+from model_server.batching import get_batcher
+from model_server.batching import MicroBatcher
 from model_server.constants import DEFAULT_COHERE_MODEL
 from model_server.constants import DEFAULT_OPENAI_MODEL
 from model_server.constants import DEFAULT_VERTEX_MODEL
@@ -29,8 +38,15 @@ from model_server.constants import EmbeddingProvider
 from model_server.utils import simple_log_function_time
 from onyx.utils.logger import setup_logger
 from shared_configs.configs import API_BASED_EMBEDDING_TIMEOUT
+from shared_configs.configs import ENABLE_MODEL_SERVER_BATCHING
 from shared_configs.configs import INDEXING_ONLY
+from shared_configs.configs import MODEL_SERVER_BATCH_WINDOW_MS
+from shared_configs.configs import MODEL_SERVER_MAX_BATCH_SIZE
+from shared_configs.configs import MODEL_SERVER_MAX_BATCH_TOKENS
 from shared_configs.configs import OPENAI_EMBEDDING_TIMEOUT
+from shared_configs.embedding_transport import EMBEDDING_BINARY_MEDIA_TYPE
+from shared_configs.embedding_transport import encode_embeddings
+from shared_configs.embedding_transport import parse_accepted_embedding_format
 from shared_configs.enums import EmbedTextType
 from shared_configs.enums import RerankerProvider
 from shared_configs.model_server_models import Embedding
@@ -320,6 +336,40 @@ async def embed_text(
     api_url: str | None,
     api_version: str | None,
 ) -> list[Embedding]:
+    embeddings = await embed_text_vectors(
+        texts=texts,
+        text_type=text_type,
+        model_name=model_name,
+        deployment_name=deployment_name,
+        max_context_length=max_context_length,
+        normalize_embeddings=normalize_embeddings,
+        api_key=api_key,
+        provider_type=provider_type,
+        prefix=prefix,
+        api_url=api_url,
+        api_version=api_version,
+    )
+    return [
+        embedding if isinstance(embedding, list) else embedding.tolist()
+        for embedding in embeddings
+    ]
+
+
+async def embed_text_vectors(
+    texts: list[str],
+    text_type: EmbedTextType,
+    model_name: str | None,
+    deployment_name: str | None,
+    max_context_length: int,
+    normalize_embeddings: bool,
+    api_key: str | None,
+    provider_type: EmbeddingProvider | None,
+    prefix: str | None,
+    api_url: str | None,
+    api_version: str | None,
+) -> list[Embedding] | np.ndarray:
+    """Same as `embed_text`, but local models return the embeddings as the numpy array
+    produced by the model so that they can be serialized without going through lists"""
     logger.info(f"Embedding {len(texts)} texts with provider: {provider_type}")
 
     if not all(texts):
@@ -330,6 +380,7 @@ async def embed_text(
         logger.error("No texts provided for embedding")
         raise ValueError("No texts provided for embedding.")
 
+    embeddings: list[Embedding] | np.ndarray
     if provider_type is not None:
         logger.debug(f"Using cloud provider {provider_type} for embedding")
         if api_key is None:
@@ -370,17 +421,32 @@ async def embed_text(
         local_model = get_embedding_model(
             model_name=model_name, max_context_length=max_context_length
         )
-        # Run CPU-bound embedding in a thread pool
-        embeddings_vectors = await asyncio.get_event_loop().run_in_executor(
-            None,
-            lambda: local_model.encode(
-                prefixed_texts, normalize_embeddings=normalize_embeddings
-            ),
-        )
-        embeddings = [
-            embedding if isinstance(embedding, list) else embedding.tolist()
-            for embedding in embeddings_vectors
-        ]
+        if ENABLE_MODEL_SERVER_BATCHING:
+            batcher = _get_embedding_batcher(
+                model_name=model_name,
+                local_model=local_model,
+                max_context_length=max_context_length,
+                normalize_embeddings=normalize_embeddings,
+            )
+            batch_embeddings = await batcher.submit(
+                prefixed_texts,
+                priority=BatchPriority.LOW
+                if text_type == EmbedTextType.PASSAGE
+                else BatchPriority.HIGH,
+            )
+            embeddings = (
+                batch_embeddings
+                if isinstance(batch_embeddings, np.ndarray)
+                else list(batch_embeddings)
+            )
+        else:
+            # Run CPU-bound embedding in a thread pool
+            embeddings = await asyncio.get_event_loop().run_in_executor(
+                None,
+                lambda: local_model.encode(
+                    prefixed_texts, normalize_embeddings=normalize_embeddings
+                ),
+            )
 
     else:
         logger.error("Neither model name nor provider specified for embedding")
@@ -392,9 +458,55 @@ async def embed_text(
     return embeddings
 
 
+def _get_embedding_batcher(
+    model_name: str,
+    local_model: "SentenceTransformer",
+    max_context_length: int,
+    normalize_embeddings: bool,
+) -> MicroBatcher[str, Any]:
+    # only requests with the same encode settings can share a forward pass
+    return get_batcher(
+        ("embed", model_name, max_context_length, normalize_embeddings),
+        lambda: MicroBatcher(
+            name=model_name,
+            process_batch=lambda texts: local_model.encode(
+                texts, normalize_embeddings=normalize_embeddings
+            ),
+            count_tokens=lambda text: estimate_num_tokens(text, max_context_length),
+            max_batch_size=MODEL_SERVER_MAX_BATCH_SIZE,
+            max_batch_tokens=MODEL_SERVER_MAX_BATCH_TOKENS,
+            batch_window_seconds=MODEL_SERVER_BATCH_WINDOW_MS / 1000,
+        ),
+    )
+
+
+def _get_rerank_batcher(
+    model_name: str, cross_encoder: CrossEncoder
+) -> MicroBatcher[tuple[str, str], Any]:
+    return get_batcher(
+        ("rerank", model_name),
+        lambda: MicroBatcher(
+            name=model_name,
+            process_batch=lambda pairs: cross_encoder.predict(pairs),
+            count_tokens=lambda pair: estimate_num_tokens(
+                pair[0] + pair[1], cross_encoder.max_length
+            ),
+            max_batch_size=MODEL_SERVER_MAX_BATCH_SIZE,
+            max_batch_tokens=MODEL_SERVER_MAX_BATCH_TOKENS,
+            batch_window_seconds=MODEL_SERVER_BATCH_WINDOW_MS / 1000,
+        ),
+    )
+
+
 @simple_log_function_time()
 async def local_rerank(query: str, docs: list[str], model_name: str) -> list[float]:
     cross_encoder = get_local_reranking_model(model_name)
+    if ENABLE_MODEL_SERVER_BATCHING:
+        scores = await _get_rerank_batcher(model_name, cross_encoder).submit(
+            [(query, doc) for doc in docs], priority=BatchPriority.HIGH
+        )
+        return [float(score) for score in scores]
+
     # Run CPU-bound reranking in a thread pool
     return await asyncio.get_event_loop().run_in_executor(
         None,
@@ -434,10 +546,13 @@ async def litellm_rerank(
         ]
 
 
-@router.post("/bi-encoder-embed")
+@router.post("/bi-encoder-embed", response_model=EmbedResponse)
 async def process_embed_request(
     embed_request: EmbedRequest,
-) -> EmbedResponse:
+    accept: Annotated[str | None, Header()] = None,
+) -> EmbedResponse | Response:
+    """Returns the embeddings as JSON, or in the compact binary format of
+    `shared_configs.embedding_transport` if the client accepts it"""
     if not embed_request.texts:
         raise HTTPException(status_code=400, detail="No texts to be embedded")
     elif not all(embed_request.texts):
@@ -451,7 +566,7 @@ async def process_embed_request(
         else:
             prefix = None
 
-        embeddings = await embed_text(
+        embeddings = await embed_text_vectors(
             texts=embed_request.texts,
             model_name=embed_request.model_name,
             deployment_name=embed_request.deployment_name,
@@ -464,7 +579,20 @@ async def process_embed_request(
             api_version=embed_request.api_version,
             prefix=prefix,
         )
-        return EmbedResponse(embeddings=embeddings)
+
+        binary_format = parse_accepted_embedding_format(accept)
+        if binary_format is not None:
+            return Response(
+                content=encode_embeddings(embeddings, binary_format),
+                media_type=EMBEDDING_BINARY_MEDIA_TYPE,
+            )
+
+        return EmbedResponse(
+            embeddings=[
+                embedding if isinstance(embedding, list) else embedding.tolist()
+                for embedding in embeddings
+            ]
+        )
     except RateLimitError as e:
         raise HTTPException(
             status_code=429,
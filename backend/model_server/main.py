@@ -8,6 +8,7 @@ import sentry_sdk
 import torch
 import uvicorn
 from fastapi import FastAPI
+from prometheus_client import make_asgi_app
 from sentry_sdk.integrations.fastapi import FastApiIntegration
 from sentry_sdk.integrations.starlette import StarletteIntegration
 from transformers import logging as transformer_logging  # type:ignore
@@ -98,6 +99,8 @@ def get_model_app() -> FastAPI:
     application.include_router(management_router)
     application.include_router(encoders_router)
     application.include_router(custom_models_router)
+    # queue depth / batch size metrics of the local model batching, among others
+    application.mount("/metrics", make_asgi_app())
 
     return application
 
@@ -8,8 +8,10 @@ from sqlalchemy.orm import Session
 
 from onyx.background.indexing.checkpointing import get_time_windows_for_index_attempt
 from onyx.background.indexing.tracer import OnyxTracer
+from onyx.configs.app_configs import ENABLE_PIPELINED_INDEXING
 from onyx.configs.app_configs import INDEXING_SIZE_WARNING_THRESHOLD
 from onyx.configs.app_configs import INDEXING_TRACER_INTERVAL
+from onyx.configs.app_configs import PIPELINED_INDEXING_QUEUE_SIZE
 from onyx.configs.app_configs import POLL_CONNECTOR_OFFSET
 from onyx.configs.constants import MilestoneRecordType
 from onyx.connectors.connector_runner import ConnectorRunner
@@ -33,6 +35,9 @@ from onyx.document_index.factory import get_default_document_index
 from onyx.indexing.embedder import DefaultIndexingEmbedder
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
 from onyx.indexing.indexing_pipeline import build_indexing_pipeline
+from onyx.indexing.indexing_pipeline import IndexingPipelineProtocol
+from onyx.indexing.pipelined_indexing import build_pipelined_indexing_pipeline
+from onyx.indexing.pipelined_indexing import PipelinedIndexingPipeline
 from onyx.utils.logger import setup_logger
 from onyx.utils.logger import TaskAttemptSingleton
 from onyx.utils.telemetry import create_milestone_and_report
@@ -133,19 +138,6 @@ def _run_indexing(
         callback=callback,
     )
 
-    indexing_pipeline = build_indexing_pipeline(
-        attempt_id=index_attempt.id,
-        embedder=embedding_model,
-        document_index=document_index,
-        ignore_time_skip=(
-            index_attempt.from_beginning
-            or (search_settings.status == IndexModelStatus.FUTURE)
-        ),
-        db_session=db_session,
-        tenant_id=tenant_id,
-        callback=callback,
-    )
-
     db_cc_pair = index_attempt.connector_credential_pair
     db_connector = index_attempt.connector_credential_pair.connector
     db_credential = index_attempt.connector_credential_pair.credential
@@ -176,6 +168,40 @@ def _run_indexing(
         credential_id=db_credential.id,
     )
 
+    ignore_time_skip = index_attempt.from_beginning or (
+        search_settings.status == IndexModelStatus.FUTURE
+    )
+    # the stored content hashes describe what is in the primary index, a secondary
+    # index being built from scratch needs every document
+    ignore_content_hash_skip = search_settings.status == IndexModelStatus.FUTURE
+    indexing_pipeline: IndexingPipelineProtocol
+    pipelined_indexing_pipeline: PipelinedIndexingPipeline | None = None
+    if ENABLE_PIPELINED_INDEXING:
+        pipelined_indexing_pipeline = build_pipelined_indexing_pipeline(
+            embedder=embedding_model,
+            document_index=document_index,
+            db_session=db_session,
+            index_attempt_metadata=index_attempt_md,
+            queue_size=PIPELINED_INDEXING_QUEUE_SIZE,
+            ignore_time_skip=ignore_time_skip,
+            ignore_content_hash_skip=ignore_content_hash_skip,
+            attempt_id=index_attempt.id,
+            tenant_id=tenant_id,
+            callback=callback,
+        )
+        indexing_pipeline = pipelined_indexing_pipeline
+    else:
+        indexing_pipeline = build_indexing_pipeline(
+            attempt_id=index_attempt.id,
+            embedder=embedding_model,
+            document_index=document_index,
+            ignore_time_skip=ignore_time_skip,
+            ignore_content_hash_skip=ignore_content_hash_skip,
+            db_session=db_session,
+            tenant_id=tenant_id,
+            callback=callback,
+        )
+
     batch_num = 0
     net_doc_change = 0
     document_count = 0
@@ -205,10 +231,18 @@ def _run_indexing(
 
             all_connector_doc_ids: set[str] = set()
 
+            # in pipelined mode, batches are fetched, chunked and embedded in the
+            # background and only come out of here once they are ready to be written
+            doc_batch_generator = connector_runner.run()
+            if pipelined_indexing_pipeline:
+                doc_batch_generator = pipelined_indexing_pipeline.run(
+                    doc_batch_generator
+                )
+
             tracer_counter = 0
             if INDEXING_TRACER_INTERVAL > 0:
                 tracer.snap()
-            for doc_batch in connector_runner.run():
+            for doc_batch in doc_batch_generator:
                 # Check if connector is disabled mid run and stop if so unless it's the secondary
                 # index being built. We want to populate it even for paused connectors
                 # Often paused connectors are sources that aren't updated frequently but the
@@ -312,6 +346,10 @@ def _run_indexing(
                 f"Connector run exceptioned after elapsed time: {time.time() - start_time} seconds"
             )
 
+            if pipelined_indexing_pipeline:
+                # don't keep pulling from the connector in the background
+                pipelined_indexing_pipeline.stop()
+
             if isinstance(e, ConnectorStopSignal):
                 mark_attempt_canceled(
                     index_attempt.id,
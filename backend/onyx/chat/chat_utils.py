@@ -17,7 +17,7 @@ from onyx.context.search.models import InferenceSection
 from onyx.context.search.models import RerankingDetails
 from onyx.context.search.models import RetrievalDetails
 from onyx.db.chat import create_chat_session
-from onyx.db.chat import get_chat_messages_by_session
+from onyx.db.chat import get_chat_message_mainline
 from onyx.db.llm import fetch_existing_doc_sets
 from onyx.db.llm import fetch_existing_tools
 from onyx.db.models import ChatMessage
@@ -28,6 +28,7 @@ from onyx.db.models import User
 from onyx.db.persona import get_prompts_by_ids
 from onyx.llm.models import PreviousMessage
 from onyx.natural_language_processing.utils import BaseTokenizer
+from onyx.natural_language_processing.utils import count_tokens
 from onyx.server.query_and_chat.models import CreateChatMessageRequest
 from onyx.tools.tool_implementations.custom.custom_tool import (
     build_custom_tools_from_openapi_schema_and_headers,
@@ -119,7 +120,7 @@ def combine_message_thread(
             role_str = message.role.value.upper()
 
         msg_str = f"{role_str}:\n{message.message}"
-        message_token_count = len(llm_tokenizer.encode(msg_str))
+        message_token_count = count_tokens(msg_str, llm_tokenizer)
 
         if (
             max_tokens is not None
@@ -141,46 +142,37 @@ def create_chat_chain(
     stop_at_message_id: int | None = None,
 ) -> tuple[ChatMessage, list[ChatMessage]]:
     """Build the linear chain of messages without including the root message"""
-    mainline_messages: list[ChatMessage] = []
-
-    all_chat_messages = get_chat_messages_by_session(
+    chain = get_chat_message_mainline(
         chat_session_id=chat_session_id,
-        user_id=None,
         db_session=db_session,
-        skip_permission_check=True,
         prefetch_tool_calls=prefetch_tool_calls,
+        stop_at_message_id=stop_at_message_id,
     )
-    id_to_msg = {msg.id: msg for msg in all_chat_messages}
 
-    if not all_chat_messages:
+    if not chain:
         raise RuntimeError("No messages in Chat Session")
 
-    root_message = all_chat_messages[0]
+    root_message = chain[0]
     if root_message.parent_message is not None:
         raise RuntimeError(
             "Invalid root message, unable to fetch valid chat message sequence"
         )
 
-    current_message: ChatMessage | None = root_message
-    while current_message is not None:
-        child_msg = current_message.latest_child_message
-
-        # Break if at the end of the chain
-        # or have reached the `final_id` of the submitted message
-        if not child_msg or (
-            stop_at_message_id and current_message.id == stop_at_message_id
-        ):
-            break
-        current_message = id_to_msg.get(child_msg)
-
-        if current_message is None:
+    for parent_msg, child_msg in zip(chain, chain[1:]):
+        if parent_msg.latest_child_message != child_msg.id:
             raise RuntimeError(
-                "Invalid message chain,"
-                "could not find next message in the same session"
+                "Invalid message chain, more than one root message in the session"
             )
 
-        mainline_messages.append(current_message)
+    last_message = chain[-1]
+    if last_message.latest_child_message is not None and not (
+        stop_at_message_id and last_message.id == stop_at_message_id
+    ):
+        raise RuntimeError(
+            "Invalid message chain," "could not find next message in the same session"
+        )
 
+    mainline_messages = chain[1:]
     if not mainline_messages:
         raise RuntimeError("Could not trace chat message history")
 
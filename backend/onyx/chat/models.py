@@ -49,6 +49,9 @@ class QADocsResponse(RetrievalDocs):
     applied_source_filters: list[DocumentSource] | None
     applied_time_cutoff: datetime | None
     recency_bias_multiplier: float
+    # retrieval ordered documents that are not saved yet, a SearchDocsReorderResponse
+    # with the reranked order and the saved ids follows
+    provisional: bool = False
 
     def model_dump(self, *args: list, **kwargs: dict[str, Any]) -> dict[str, Any]:  # type: ignore
         initial_dict = super().model_dump(mode="json", *args, **kwargs)  # type: ignore
@@ -58,6 +61,29 @@ class QADocsResponse(RetrievalDocs):
 
         return initial_dict
 
+    def reordered(self, reorder: "SearchDocsReorderResponse") -> "QADocsResponse":
+        """Applies the reranked order to the documents of a provisional response"""
+        docs_by_id = {doc.document_id: doc for doc in self.top_documents}
+        return self.model_copy(
+            update={
+                "top_documents": [
+                    docs_by_id[document_id].model_copy(update={"db_doc_id": db_doc_id})
+                    for document_id, db_doc_id in zip(
+                        reorder.reordered_document_ids, reorder.db_doc_ids
+                    )
+                    if document_id in docs_by_id
+                ],
+                "provisional": False,
+            }
+        )
+
+
+# Follows a provisional QADocsResponse once reranking is done, only the final order of
+# the documents (and the ids they were saved with) is sent instead of the documents again
+class SearchDocsReorderResponse(BaseModel):
+    reordered_document_ids: list[str]
+    db_doc_ids: list[int]
+
 
 class StreamStopReason(Enum):
     CONTEXT_LENGTH = "context_length"
@@ -25,8 +25,10 @@ from onyx.chat.models import OnyxAnswerPiece
 from onyx.chat.models import OnyxContexts
 from onyx.chat.models import PromptConfig
 from onyx.chat.models import QADocsResponse
+from onyx.chat.models import SearchDocsReorderResponse
 from onyx.chat.models import StreamingError
 from onyx.chat.models import StreamStopInfo
+from onyx.chat.prompt_builder.citations_prompt import compute_max_llm_input_tokens
 from onyx.configs.chat_configs import CHAT_TARGET_CHUNK_PERCENTAGE
 from onyx.configs.chat_configs import DISABLE_LLM_CHOOSE_SEARCH
 from onyx.configs.chat_configs import MAX_CHUNKS_FED_TO_CHAT
@@ -38,7 +40,9 @@ from onyx.context.search.enums import QueryFlow
 from onyx.context.search.enums import SearchType
 from onyx.context.search.models import InferenceSection
 from onyx.context.search.models import RetrievalDetails
+from onyx.context.search.models import SavedSearchDoc
 from onyx.context.search.retrieval.search_runner import inference_sections_from_ids
+from onyx.context.search.search_config import get_search_config
 from onyx.context.search.utils import chunks_or_sections_to_search_docs
 from onyx.context.search.utils import dedupe_documents
 from onyx.context.search.utils import drop_llm_indices
@@ -62,8 +66,6 @@ from onyx.db.models import SearchDoc as DbSearchDoc
 from onyx.db.models import ToolCall
 from onyx.db.models import User
 from onyx.db.persona import get_persona_by_id
-from onyx.db.search_settings import get_current_search_settings
-from onyx.document_index.factory import get_default_document_index
 from onyx.file_store.models import ChatFileType
 from onyx.file_store.models import FileDescriptor
 from onyx.file_store.utils import load_all_chat_files
@@ -193,6 +195,31 @@ def _handle_search_tool_response_summary(
     )
 
 
+def _build_provisional_qa_docs_response(
+    packet: ToolResponse,
+    dedupe_docs: bool = False,
+) -> QADocsResponse:
+    """Nothing is saved for the provisional summary, the documents are saved once in the
+    reranked order of the final summary, so a stream that ends before it leaves no rows
+    """
+    response_sumary = cast(SearchResponseSummary, packet.response)
+
+    top_docs = chunks_or_sections_to_search_docs(response_sumary.top_sections)
+    if dedupe_docs:
+        top_docs, _ = dedupe_documents(top_docs)
+
+    return QADocsResponse(
+        rephrased_query=response_sumary.rephrased_query,
+        top_documents=[SavedSearchDoc.from_search_doc(doc) for doc in top_docs],
+        predicted_flow=response_sumary.predicted_flow,
+        predicted_search=response_sumary.predicted_search,
+        applied_source_filters=response_sumary.final_filters.source_type,
+        applied_time_cutoff=response_sumary.final_filters.time_cutoff,
+        recency_bias_multiplier=response_sumary.recency_bias_multiplier,
+        provisional=True,
+    )
+
+
 def _handle_internet_search_tool_response_summary(
     packet: ToolResponse,
     db_session: Session,
@@ -269,6 +296,7 @@ def _get_force_search_settings(
 ChatPacket = (
     StreamingError
     | QADocsResponse
+    | SearchDocsReorderResponse
     | OnyxContexts
     | LLMRelevanceFilterResponse
     | FinalUsedContextDocsResponse
@@ -419,10 +447,7 @@ def stream_chat_message_objects(
             Callable[[str], list[int]], llm_tokenizer.encode
         )
 
-        search_settings = get_current_search_settings(db_session)
-        document_index = get_default_document_index(
-            primary_index_name=search_settings.index_name, secondary_index_name=None
-        )
+        document_index = get_search_config(db_session).document_index
 
         # Every chat Session begins with an empty root message
         root_message = get_or_create_root_message(
@@ -502,9 +527,13 @@ def stream_chat_message_objects(
                 new_msg_req.query_override or new_msg_req.message
             )
 
-        # load all files needed for this chat chain in memory
+        # load all files needed for this chat chain in memory, the files of history
+        # messages that can't fit in the prompt are skipped
         files = load_all_chat_files(
-            history_msgs, new_msg_req.file_descriptors, db_session
+            history_msgs,
+            new_msg_req.file_descriptors,
+            db_session,
+            max_history_tokens=compute_max_llm_input_tokens(llm.config),
         )
         latest_query_files = [
             file
@@ -665,6 +694,7 @@ def stream_chat_message_objects(
                 full_doc=new_msg_req.full_doc,
                 latest_query_files=latest_query_files,
                 bypass_acl=bypass_acl,
+                wait_for_rerank=new_msg_req.wait_for_rerank,
             ),
             internet_search_tool_config=InternetSearchToolConfig(
                 answer_style_config=answer_style_config,
@@ -711,6 +741,8 @@ def stream_chat_message_objects(
 
         reference_db_search_docs = None
         qa_docs_response = None
+        # whether the retrieval ordered docs were sent ahead of the reranked summary
+        sent_provisional_docs = False
         # any files to associate with the AI message e.g. dall-e generated images
         ai_message_files = []
         dropped_indices = None
@@ -719,6 +751,17 @@ def stream_chat_message_objects(
         for packet in answer.processed_streamed_output:
             if isinstance(packet, ToolResponse):
                 if packet.id == SEARCH_RESPONSE_SUMMARY_ID:
+                    # Deduping happens at the last step to avoid harming quality by dropping content early on
+                    dedupe_docs = (
+                        retrieval_options.dedupe_docs if retrieval_options else False
+                    )
+                    if cast(SearchResponseSummary, packet.response).provisional:
+                        yield _build_provisional_qa_docs_response(
+                            packet=packet, dedupe_docs=dedupe_docs
+                        )
+                        sent_provisional_docs = True
+                        continue
+
                     (
                         qa_docs_response,
                         reference_db_search_docs,
@@ -727,14 +770,18 @@ def stream_chat_message_objects(
                         packet=packet,
                         db_session=db_session,
                         selected_search_docs=selected_db_search_docs,
-                        # Deduping happens at the last step to avoid harming quality by dropping content early on
-                        dedupe_docs=(
-                            retrieval_options.dedupe_docs
-                            if retrieval_options
-                            else False
-                        ),
+                        dedupe_docs=dedupe_docs,
                     )
-                    yield qa_docs_response
+                    if sent_provisional_docs:
+                        # the same documents were already sent, only their new order
+                        yield SearchDocsReorderResponse(
+                            reordered_document_ids=[
+                                doc.document_id for doc in reference_db_search_docs
+                            ],
+                            db_doc_ids=[doc.id for doc in reference_db_search_docs],
+                        )
+                    else:
+                        yield qa_docs_response
                 elif packet.id == SECTION_RELEVANCE_LIST_ID:
                     relevance_sections = packet.response
 
@@ -946,6 +993,8 @@ def gather_stream_for_slack(
             answer += packet.answer_piece
         elif isinstance(packet, QADocsResponse):
             response.docs = packet
+        elif isinstance(packet, SearchDocsReorderResponse) and response.docs:
+            response.docs = response.docs.reordered(packet)
         elif isinstance(packet, StreamingError):
             response.error_msg = packet.error
         elif isinstance(packet, ChatMessageDetail):
@@ -1,6 +1,5 @@
 import json
 from collections import defaultdict
-from copy import deepcopy
 from typing import TypeVar
 
 from pydantic import BaseModel
@@ -16,8 +15,9 @@ from onyx.configs.model_configs import DOC_EMBEDDING_CONTEXT_SIZE
 from onyx.context.search.models import InferenceChunk
 from onyx.context.search.models import InferenceSection
 from onyx.llm.interfaces import LLMConfig
+from onyx.natural_language_processing.utils import BaseTokenizer
+from onyx.natural_language_processing.utils import count_tokens
 from onyx.natural_language_processing.utils import get_tokenizer
-from onyx.natural_language_processing.utils import tokenizer_trim_content
 from onyx.prompts.prompt_utils import build_doc_context_str
 from onyx.tools.tool_implementations.search.search_utils import section_to_dict
 from onyx.utils.logger import setup_logger
@@ -131,6 +131,23 @@ def _remove_sections_to_ignore(
     ]
 
 
+def _trim_section(
+    section: InferenceSection,
+    desired_length: int,
+    tokenizer: BaseTokenizer,
+    content_tokens: list[int] | None = None,
+) -> InferenceSection:
+    """Trims the content to desired_length tokens. The sections are shared with the
+    caller, so a trimmed section is a copy and the original is left as is."""
+    if content_tokens is None:
+        content_tokens = tokenizer.encode(section.combined_content)
+    if len(content_tokens) <= desired_length:
+        return section
+    return section.model_copy(
+        update={"combined_content": tokenizer.decode(content_tokens[:desired_length])}
+    )
+
+
 def _apply_pruning(
     sections: list[InferenceSection],
     section_relevance_list: list[bool] | None,
@@ -144,7 +161,7 @@ def _apply_pruning(
         provider_type=llm_config.model_provider,
         model_name=llm_config.model_name,
     )
-    sections = deepcopy(sections)  # don't modify in place
+    # sections are not modified in place, trimmed sections are replaced by trimmed copies
 
     # re-order docs with all the "relevant" docs at the front
     sections = reorder_sections(
@@ -172,7 +189,7 @@ def _apply_pruning(
             )
         )
 
-        section_token_count = len(llm_tokenizer.encode(section_str))
+        section_token_count = count_tokens(section_str, llm_tokenizer)
         # if not using sections (specifically, using Sections where each section maps exactly to the one center chunk),
         # truncate chunks that are way too long. This can happen if the embedding model tokenizer is different
         # than the LLM tokenizer
@@ -194,10 +211,8 @@ def _apply_pruning(
                     "Found more tokens in Section than expected, "
                     "likely mismatch between embedding and LLM tokenizers. Trimming content..."
                 )
-            section.combined_content = tokenizer_trim_content(
-                content=section.combined_content,
-                desired_length=DOC_EMBEDDING_CONTEXT_SIZE,
-                tokenizer=llm_tokenizer,
+            sections[ind] = _trim_section(
+                section, DOC_EMBEDDING_CONTEXT_SIZE, llm_tokenizer
             )
             section_token_count = DOC_EMBEDDING_CONTEXT_SIZE
 
@@ -223,10 +238,11 @@ def _apply_pruning(
 
             amount_to_truncate = total_tokens - token_limit
             # NOTE: need to recalculate the length here, since the previous calculation included
-            # overhead from JSON-fying the doc / the metadata
-            final_doc_content_length = len(
-                llm_tokenizer.encode(sections[final_section_ind].combined_content)
-            ) - (amount_to_truncate)
+            # overhead from JSON-fying the doc / the metadata. The tokens are reused to trim
+            final_content_tokens = llm_tokenizer.encode(
+                sections[final_section_ind].combined_content
+            )
+            final_doc_content_length = len(final_content_tokens) - (amount_to_truncate)
             # this could occur if we only have space for the title / metadata
             # not ideal, but it's the most reasonable thing to do
             # NOTE: the frontend prevents documents from being selected if
@@ -239,10 +255,11 @@ def _apply_pruning(
                 )
                 sections.pop()
             else:
-                sections[final_section_ind].combined_content = tokenizer_trim_content(
-                    content=sections[final_section_ind].combined_content,
-                    desired_length=final_doc_content_length,
-                    tokenizer=llm_tokenizer,
+                sections[final_section_ind] = _trim_section(
+                    sections[final_section_ind],
+                    final_doc_content_length,
+                    llm_tokenizer,
+                    content_tokens=final_content_tokens,
                 )
         else:
             # For search on chunk level (Section is just a chunk), don't truncate the final Chunk/Section unless it's the only one
@@ -250,12 +267,13 @@ def _apply_pruning(
             if final_section_ind != 0:
                 sections = sections[:final_section_ind]
             else:
-                sections[0].combined_content = tokenizer_trim_content(
-                    content=sections[0].combined_content,
-                    desired_length=token_limit - _METADATA_TOKEN_ESTIMATE,
-                    tokenizer=llm_tokenizer,
-                )
-                sections = [sections[0]]
+                sections = [
+                    _trim_section(
+                        sections[0],
+                        token_limit - _METADATA_TOKEN_ESTIMATE,
+                        llm_tokenizer,
+                    )
+                ]
 
     return sections
 
@@ -12,11 +12,46 @@ from onyx.utils.logger import setup_logger
 logger = setup_logger()
 
 
+_CITATION_PATTERN = re.compile(r"\[(\d+)\]|\[\[(\d+)\]\]")  # [1], [[1]], etc.
+_POSSIBLE_CITATION_PATTERN = re.compile(r"(\[+\d*$)")  # [1, [, [[, [[2, etc.
+
+
 def in_code_block(llm_text: str) -> bool:
     count = llm_text.count(TRIPLE_BACKTICK)
     return count % 2 != 0
 
 
+class CodeFenceTracker:
+    """Incremental version of in_code_block for streamed text, only looks at the new
+    text. str.count finds len(run) // 3 fences in every run of backticks, so only the
+    run of backticks at the end of the text so far can still change."""
+
+    def __init__(self) -> None:
+        self._fences_before_trailing_run = 0
+        self._trailing_backticks = 0
+
+    def update(self, text: str) -> None:
+        body = text.lstrip("`")
+        if not body:
+            self._trailing_backticks += len(text)
+            return
+
+        # the leading backticks of the text extend the run at the end of the text so far
+        self._fences_before_trailing_run += (
+            self._trailing_backticks + len(text) - len(body)
+        ) // len(TRIPLE_BACKTICK)
+        inner = body.rstrip("`")
+        self._fences_before_trailing_run += inner.count(TRIPLE_BACKTICK)
+        self._trailing_backticks = len(body) - len(inner)
+
+    @property
+    def in_code_block(self) -> bool:
+        count = self._fences_before_trailing_run + self._trailing_backticks // len(
+            TRIPLE_BACKTICK
+        )
+        return count % 2 != 0
+
+
 class CitationProcessor:
     def __init__(
         self,
@@ -32,9 +67,13 @@ class CitationProcessor:
         self.display_doc_order_dict = (
             display_doc_order_dict  # original order of docs to displayed to user
         )
-        self.llm_out = ""
+        # length of the LLM output so far and whether it ends in a code block, kept
+        # incrementally as rescanning the full output per token is quadratic
+        self.llm_out_len = 0
+        self.code_fences = CodeFenceTracker()
         self.max_citation_num = len(context_docs)
-        self.citation_order: list[int] = []
+        # real citation number -> citation number in the order the LLM cited them
+        self.citation_order: dict[int, int] = {}
         self.curr_segment = ""
         self.cited_inds: set[int] = set()
         self.hold = ""
@@ -60,7 +99,8 @@ class CitationProcessor:
             self.hold = ""
 
         self.curr_segment += token
-        self.llm_out += token
+        self.llm_out_len += len(token)
+        self.code_fences.update(token)
 
         # Handle code blocks without language tags
         if "`" in self.curr_segment:
@@ -68,21 +108,17 @@ class CitationProcessor:
                 return
             elif "```" in self.curr_segment:
                 piece_that_comes_after = self.curr_segment.split("```")[1][0]
-                if piece_that_comes_after == "\n" and in_code_block(self.llm_out):
+                if piece_that_comes_after == "\n" and self.code_fences.in_code_block:
                     self.curr_segment = self.curr_segment.replace("```", "```plaintext")
 
-        citation_pattern = r"\[(\d+)\]|\[\[(\d+)\]\]"  # [1], [[1]], etc.
-        citations_found = list(re.finditer(citation_pattern, self.curr_segment))
-        possible_citation_pattern = r"(\[+\d*$)"  # [1, [, [[, [[2, etc.
-        possible_citation_found = re.search(
-            possible_citation_pattern, self.curr_segment
-        )
+        citations_found = list(_CITATION_PATTERN.finditer(self.curr_segment))
+        possible_citation_found = _POSSIBLE_CITATION_PATTERN.search(self.curr_segment)
 
-        if len(citations_found) == 0 and len(self.llm_out) - self.past_cite_count > 5:
+        if len(citations_found) == 0 and self.llm_out_len - self.past_cite_count > 5:
             self.current_citations = []
 
         result = ""
-        if citations_found and not in_code_block(self.llm_out):
+        if citations_found and not self.code_fences.in_code_block:
             last_citation_end = 0
             length_to_add = 0
             while len(citations_found) > 0:
@@ -95,11 +131,8 @@ class CitationProcessor:
                     context_llm_doc = self.context_docs[numerical_value - 1]
                     real_citation_num = self.order_mapping[context_llm_doc.document_id]
 
-                    if real_citation_num not in self.citation_order:
-                        self.citation_order.append(real_citation_num)
-
-                    target_citation_num = (
-                        self.citation_order.index(real_citation_num) + 1
+                    target_citation_num = self.citation_order.setdefault(
+                        real_citation_num, len(self.citation_order) + 1
                     )
 
                     # get the value that was displayed to user, should always
@@ -150,7 +183,7 @@ class CitationProcessor:
 
                     link = context_llm_doc.link
 
-                    self.past_cite_count = len(self.llm_out)
+                    self.past_cite_count = self.llm_out_len
                     self.current_citations.append(target_citation_num)
 
                     if target_citation_num not in self.cited_inds:
@@ -428,6 +428,23 @@ INDEXING_TRACER_INTERVAL = int(os.environ.get("INDEXING_TRACER_INTERVAL") or 0)
 # exception without aborting the attempt.
 INDEXING_EXCEPTION_LIMIT = int(os.environ.get("INDEXING_EXCEPTION_LIMIT") or 0)
 
+# Documents whose content hash matches the one recorded at their last successful indexing
+# are not re-chunked / re-embedded, only their permissions, document sets and boost are
+# refreshed in the index. Set this to force a full reindex of every updated document.
+DISABLE_DOCUMENT_CONTENT_HASH_SKIP = (
+    os.environ.get("DISABLE_DOCUMENT_CONTENT_HASH_SKIP", "").lower() == "true"
+)
+# Overlaps connector fetching, chunking, embedding and index writes of consecutive batches
+# instead of processing one batch end to end before pulling the next one.
+ENABLE_PIPELINED_INDEXING = (
+    os.environ.get("ENABLE_PIPELINED_INDEXING", "").lower() == "true"
+)
+# Max number of batches buffered between each stage of the pipelined indexing flow.
+# Higher values smooth out bursty sources at the cost of memory.
+PIPELINED_INDEXING_QUEUE_SIZE = int(
+    os.environ.get("PIPELINED_INDEXING_QUEUE_SIZE") or 2
+)
+
 # Maximum file size in a document to be indexed
 MAX_DOCUMENT_CHARS = int(os.environ.get("MAX_DOCUMENT_CHARS") or 5_000_000)
 MAX_FILE_SIZE_BYTES = int(
@@ -479,6 +496,34 @@ CUSTOM_ANSWER_VALIDITY_CONDITIONS = json.loads(
 
 VESPA_REQUEST_TIMEOUT = int(os.environ.get("VESPA_REQUEST_TIMEOUT") or "15")
 
+# Streams index / update / delete operations to Vespa over a few long-lived HTTP/2
+# connections with adaptive concurrency instead of one thread pool task per chunk
+ENABLE_VESPA_BULK_FEED = os.environ.get("ENABLE_VESPA_BULK_FEED", "").lower() == "true"
+# Upper bound on the number of in-flight feed operations, backs off on 429/503/507
+VESPA_FEED_MAX_CONCURRENCY = int(os.environ.get("VESPA_FEED_MAX_CONCURRENCY") or 64)
+VESPA_FEED_NUM_CONNECTIONS = int(os.environ.get("VESPA_FEED_NUM_CONNECTIONS") or 4)
+VESPA_FEED_MAX_RETRIES = int(os.environ.get("VESPA_FEED_MAX_RETRIES") or 5)
+
+# Process wide, long-lived HTTP/2 client for Vespa queries and visits, so that a chat
+# turn's searches and chunk fetches reuse warm connections instead of each paying
+# connection (and TLS) setup
+VESPA_READ_POOL_MAX_CONNECTIONS = int(
+    os.environ.get("VESPA_READ_POOL_MAX_CONNECTIONS") or 20
+)
+VESPA_READ_POOL_KEEPALIVE_EXPIRY_SECONDS = float(
+    os.environ.get("VESPA_READ_POOL_KEEPALIVE_EXPIRY_SECONDS") or 60
+)
+
+# How query embeddings are serialized into Vespa queries:
+# - "float32": shortest decimal form of the float32 values, i.e. exactly what Vespa
+#   stores, about half the size of the Python float repr (default)
+# - "hex": Vespa's hex form of dense tensors (8 hex chars per float32 cell), smallest
+#   and cheapest to parse, requires a Vespa version that accepts hex tensor literals
+# - "list": Python list repr of the floats (legacy)
+VESPA_QUERY_TENSOR_FORMAT = (
+    os.environ.get("VESPA_QUERY_TENSOR_FORMAT") or "float32"
+).lower()
+
 SYSTEM_RECURSION_LIMIT = int(os.environ.get("SYSTEM_RECURSION_LIMIT") or "1000")
 
 PARSE_WITH_TRAFILATURA = os.environ.get("PARSE_WITH_TRAFILATURA", "").lower() == "true"
@@ -35,6 +35,23 @@ DISABLE_LLM_CHOOSE_SEARCH = (
 DISABLE_LLM_QUERY_REPHRASE = (
     os.environ.get("DISABLE_LLM_QUERY_REPHRASE", "").lower() == "true"
 )
+# Caches the results of the LLM time / source filter extraction and of the query
+# analysis model per normalized query, so repeated questions (e.g. the same question
+# asked in Slack by many users) skip those calls. Kept short since the extracted time
+# cutoffs are relative to when the query was first asked
+ENABLE_QUERY_PREPROCESSING_CACHE = (
+    os.environ.get("ENABLE_QUERY_PREPROCESSING_CACHE", "").lower() == "true"
+)
+# Shares the cached results between API servers through Redis
+QUERY_PREPROCESSING_CACHE_USE_REDIS = (
+    os.environ.get("QUERY_PREPROCESSING_CACHE_USE_REDIS", "").lower() == "true"
+)
+QUERY_PREPROCESSING_CACHE_TTL_SECONDS = int(
+    os.environ.get("QUERY_PREPROCESSING_CACHE_TTL_SECONDS") or 10 * 60
+)
+QUERY_PREPROCESSING_CACHE_MAX_ENTRIES = int(
+    os.environ.get("QUERY_PREPROCESSING_CACHE_MAX_ENTRIES") or 4096
+)
 # 1 edit per 20 characters, currently unused due to fuzzy match being too slow
 QUOTE_ALLOWED_ERROR_PERCENT = 0.05
 QA_TIMEOUT = int(os.environ.get("QA_TIMEOUT") or "60")  # 60 seconds
@@ -73,6 +90,27 @@ LANGUAGE_CHAT_NAMING_HINT = (
 DISABLE_LLM_DOC_RELEVANCE = (
     os.environ.get("DISABLE_LLM_DOC_RELEVANCE", "").lower() == "true"
 )
+# Evaluates multiple sections per LLM call instead of one call per section, to stay
+# under provider rate limits. Batches are capped by sections and by tokens of content
+ENABLE_BATCHED_SECTION_EVALUATION = (
+    os.environ.get("ENABLE_BATCHED_SECTION_EVALUATION", "").lower() == "true"
+)
+SECTION_EVALUATION_BATCH_MAX_SECTIONS = int(
+    os.environ.get("SECTION_EVALUATION_BATCH_MAX_SECTIONS") or 10
+)
+SECTION_EVALUATION_BATCH_MAX_TOKENS = int(
+    os.environ.get("SECTION_EVALUATION_BATCH_MAX_TOKENS") or 8000
+)
+# Reuses the LLM relevance verdict for the same query and section content
+ENABLE_SECTION_EVALUATION_CACHE = (
+    os.environ.get("ENABLE_SECTION_EVALUATION_CACHE", "").lower() == "true"
+)
+SECTION_EVALUATION_CACHE_MAX_ENTRIES = int(
+    os.environ.get("SECTION_EVALUATION_CACHE_MAX_ENTRIES") or 10_000
+)
+SECTION_EVALUATION_CACHE_TTL_SECONDS = int(
+    os.environ.get("SECTION_EVALUATION_CACHE_TTL_SECONDS") or 60 * 60
+)
 
 # Stops streaming answers back to the UI if this pattern is seen:
 STOP_STREAM_PAT = os.environ.get("STOP_STREAM_PAT") or None
@@ -89,3 +127,23 @@ BING_API_KEY = os.environ.get("BING_API_KEY") or None
 ENABLE_CONNECTOR_CLASSIFIER = os.environ.get("ENABLE_CONNECTOR_CLASSIFIER", False)
 
 VESPA_SEARCHER_THREADS = int(os.environ.get("VESPA_SEARCHER_THREADS") or 2)
+
+# Shows the retrieval ordered results as soon as retrieval is done instead of only after
+# reranking, followed by the reranked order once the reranker is done
+ENABLE_PROGRESSIVE_SEARCH_RESULTS = (
+    os.environ.get("ENABLE_PROGRESSIVE_SEARCH_RESULTS", "").lower() == "true"
+)
+
+# Caches the contents of chat files (uploads and generated images) so the files attached
+# to the chat history aren't read from the file store again on every message. Text
+# (plain text, CSV and the text extracted from documents) and image bytes have separate
+# size budgets. Entries evicted from memory spill to CHAT_FILE_CACHE_SPILL_DIR if set
+ENABLE_CHAT_FILE_CACHE = os.environ.get("ENABLE_CHAT_FILE_CACHE", "").lower() == "true"
+CHAT_FILE_CACHE_MAX_TEXT_MB = int(os.environ.get("CHAT_FILE_CACHE_MAX_TEXT_MB") or 64)
+CHAT_FILE_CACHE_MAX_IMAGE_MB = int(
+    os.environ.get("CHAT_FILE_CACHE_MAX_IMAGE_MB") or 256
+)
+CHAT_FILE_CACHE_SPILL_DIR = os.environ.get("CHAT_FILE_CACHE_SPILL_DIR") or None
+CHAT_FILE_CACHE_MAX_SPILL_MB = int(
+    os.environ.get("CHAT_FILE_CACHE_MAX_SPILL_MB") or 2048
+)
@@ -46,6 +46,84 @@ EMBEDDING_BATCH_SIZE = int(os.environ.get("EMBEDDING_BATCH_SIZE") or 0) or None
 BATCH_SIZE_ENCODE_CHUNKS = EMBEDDING_BATCH_SIZE or 8
 # don't send over too many chunks at once, as sending too many could cause timeouts
 BATCH_SIZE_ENCODE_CHUNKS_FOR_API_EMBEDDING_SERVICES = EMBEDDING_BATCH_SIZE or 512
+# Max number of embedding batches in flight per encode call. Cloud providers are mostly
+# network bound so batches are sent concurrently, the local model server is compute
+# bound so batches go one at a time by default. Per provider overrides as JSON, keyed by
+# provider type ("local" for the model server's own models), e.g. '{"openai": 8, "local": 2}'
+CLOUD_EMBEDDING_REQUEST_CONCURRENCY = int(
+    os.environ.get("CLOUD_EMBEDDING_REQUEST_CONCURRENCY") or 4
+)
+EMBEDDING_REQUEST_CONCURRENCY_OVERRIDES: dict[str, int] = json.loads(
+    os.environ.get("EMBEDDING_REQUEST_CONCURRENCY_OVERRIDES") or "{}"
+)
+# Process wide cap on embedding requests per minute by provider type (same keys as above),
+# e.g. '{"openai": 3000}'. Providers without an entry are not limited
+EMBEDDING_REQUESTS_PER_MINUTE: dict[str, int] = json.loads(
+    os.environ.get("EMBEDDING_REQUESTS_PER_MINUTE") or "{}"
+)
+# Connection pool shared by all model server calls of a process (embedding, reranking,
+# query analysis), connections are kept alive between requests. POOL_MAXSIZE bounds the
+# number of connections kept per model server host
+MODEL_SERVER_CLIENT_POOL_CONNECTIONS = int(
+    os.environ.get("MODEL_SERVER_CLIENT_POOL_CONNECTIONS") or 4
+)
+MODEL_SERVER_CLIENT_POOL_MAXSIZE = int(
+    os.environ.get("MODEL_SERVER_CLIENT_POOL_MAXSIZE") or 32
+)
+MODEL_SERVER_CLIENT_KEEPALIVE_EXPIRY_SECONDS = float(
+    os.environ.get("MODEL_SERVER_CLIENT_KEEPALIVE_EXPIRY_SECONDS") or 30
+)
+# For local models, group texts of similar token length into the same batch and size the
+# batches by padded token count rather than by number of texts, so that short texts
+# (titles, mini-chunks) are not padded up to the length of the longest text in the batch
+ENABLE_LENGTH_BUCKETED_EMBEDDING_BATCHES = (
+    os.environ.get("ENABLE_LENGTH_BUCKETED_EMBEDDING_BATCHES", "").lower() == "true"
+)
+# Max padded tokens (num texts * longest text) per length bucketed batch, defaults to the
+# size of a regular batch of full length chunks
+EMBEDDING_BATCH_TOKEN_BUDGET = int(os.environ.get("EMBEDDING_BATCH_TOKEN_BUDGET") or 0)
+# Persistent cache of embeddings computed during indexing, keyed by the model settings and
+# the exact text, so identical chunks / titles are not re-embedded across index attempts,
+# connectors or secondary index builds with the same model.
+# Options: "disk" (local SQLite file) or "postgres", unset disables the cache
+EMBEDDING_CACHE_BACKEND = os.environ.get("EMBEDDING_CACHE_BACKEND", "").lower()
+EMBEDDING_CACHE_DIR = (
+    os.environ.get("EMBEDDING_CACHE_DIR") or "/tmp/onyx_embedding_cache"
+)
+EMBEDDING_CACHE_MAX_SIZE_MB = int(os.environ.get("EMBEDDING_CACHE_MAX_SIZE_MB") or 2048)
+# Cache of query embeddings on the search path, so repeated queries (bot retries,
+# regenerations, common questions) skip the model server. Entries are scoped to the
+# current index, so they are dropped when the search settings swap to a new index.
+# The in-process LRU can be backed by Redis to share entries between API servers
+ENABLE_QUERY_EMBEDDING_CACHE = (
+    os.environ.get("ENABLE_QUERY_EMBEDDING_CACHE", "").lower() == "true"
+)
+QUERY_EMBEDDING_CACHE_USE_REDIS = (
+    os.environ.get("QUERY_EMBEDDING_CACHE_USE_REDIS", "").lower() == "true"
+)
+QUERY_EMBEDDING_CACHE_MAX_ENTRIES = int(
+    os.environ.get("QUERY_EMBEDDING_CACHE_MAX_ENTRIES") or 4096
+)
+QUERY_EMBEDDING_CACHE_TTL_SECONDS = int(
+    os.environ.get("QUERY_EMBEDDING_CACHE_TTL_SECONDS") or 60 * 60 * 24
+)
+# Caches the reranker score per (model, query, chunk) in process so the same query over
+# the same chunks (regenerations, rephrases that end up the same) isn't scored again.
+# Entries are keyed on the chunk content, so reindexed chunks are scored fresh
+ENABLE_RERANK_SCORE_CACHE = (
+    os.environ.get("ENABLE_RERANK_SCORE_CACHE", "").lower() == "true"
+)
+RERANK_SCORE_CACHE_MAX_ENTRIES = int(
+    os.environ.get("RERANK_SCORE_CACHE_MAX_ENTRIES") or 50_000
+)
+RERANK_SCORE_CACHE_TTL_SECONDS = int(
+    os.environ.get("RERANK_SCORE_CACHE_TTL_SECONDS") or 60 * 60
+)
+# If set, the chunks are reranked in tiers of this many chunks in retrieval order and
+# reranking stops early once a tier brings no new chunk into the top
+# RERANK_ADAPTIVE_TOP_K. Unset (0) reranks all chunks in one call
+RERANK_ADAPTIVE_TIER_SIZE = int(os.environ.get("RERANK_ADAPTIVE_TIER_SIZE") or 0)
+RERANK_ADAPTIVE_TOP_K = int(os.environ.get("RERANK_ADAPTIVE_TOP_K") or 10)
 # For score display purposes, only way is to know the expected ranges
 CROSS_ENCODER_RANGE_MAX = 1
 CROSS_ENCODER_RANGE_MIN = 0
@@ -85,6 +163,11 @@ GEN_AI_HISTORY_CUTOFF = 3000
 # error if the total # of tokens exceeds the max input tokens.
 GEN_AI_SINGLE_USER_MESSAGE_EXPECTED_MAX_TOKENS = 512
 GEN_AI_TEMPERATURE = float(os.environ.get("GEN_AI_TEMPERATURE") or 0)
+# Token counts of texts that are counted over and over (context sections, prompts) are
+# kept per tokenizer in an in process LRU of this many entries, 0 disables it
+TOKEN_COUNT_CACHE_MAX_ENTRIES = int(
+    os.environ.get("TOKEN_COUNT_CACHE_MAX_ENTRIES") or 50_000
+)
 
 # should be used if you are using a custom LLM inference provider that doesn't support
 # streaming format AND you are still using the langchain/litellm LLM class
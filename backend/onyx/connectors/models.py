@@ -1,3 +1,5 @@
+import hashlib
+import json
 from datetime import datetime
 from enum import Enum
 from typing import Any
@@ -151,6 +153,30 @@ class Document(DocumentBase):
         """Used when logging the identity of a document"""
         return f"ID: '{self.id}'; Semantic ID: '{self.semantic_identifier}'"
 
+    def get_content_hash(self) -> str:
+        """Stable hash of everything that ends up in the indexed chunks. Used to skip
+        re-chunking / re-embedding documents whose content has not changed.
+
+        NOTE: doc_updated_at is intentionally left out, many connectors don't report it
+        reliably and it does not affect the chunk contents or embeddings. It is pushed to
+        the index of unchanged documents along with the other non-content fields."""
+        content = {
+            "source": self.source.value,
+            "semantic_identifier": self.semantic_identifier,
+            "title": self.title,
+            "sections": [[section.text, section.link] for section in self.sections],
+            "metadata": self.metadata,
+            "primary_owners": [
+                owner.model_dump() for owner in self.primary_owners or []
+            ],
+            "secondary_owners": [
+                owner.model_dump() for owner in self.secondary_owners or []
+            ],
+        }
+        return hashlib.sha256(
+            json.dumps(content, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+
     @classmethod
     def from_base(cls, base: DocumentBase) -> "Document":
         return cls(
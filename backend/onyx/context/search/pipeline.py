@@ -23,19 +23,18 @@ from onyx.context.search.models import SearchQuery
 from onyx.context.search.models import SearchRequest
 from onyx.context.search.postprocessing.postprocessing import cleanup_chunks
 from onyx.context.search.postprocessing.postprocessing import search_postprocessing
+from onyx.context.search.postprocessing.postprocessing import should_rerank
 from onyx.context.search.preprocessing.preprocessing import retrieval_preprocessing
+from onyx.context.search.retrieval.search_runner import ContextChunks
 from onyx.context.search.retrieval.search_runner import retrieve_chunks
+from onyx.context.search.search_config import get_search_config
 from onyx.context.search.utils import inference_section_from_chunks
 from onyx.context.search.utils import relevant_sections_to_indices
 from onyx.db.models import User
-from onyx.db.search_settings import get_current_search_settings
-from onyx.document_index.factory import get_default_document_index
 from onyx.document_index.interfaces import VespaChunkRequest
 from onyx.llm.interfaces import LLM
-from onyx.secondary_llm_flows.agentic_evaluation import evaluate_inference_section
+from onyx.secondary_llm_flows.agentic_evaluation import evaluate_inference_sections
 from onyx.utils.logger import setup_logger
-from onyx.utils.threadpool_concurrency import FunctionCall
-from onyx.utils.threadpool_concurrency import run_functions_in_parallel
 from onyx.utils.timing import log_function_time
 
 logger = setup_logger()
@@ -65,11 +64,9 @@ class SearchPipeline:
         self.retrieval_metrics_callback = retrieval_metrics_callback
         self.rerank_metrics_callback = rerank_metrics_callback
 
-        self.search_settings = get_current_search_settings(db_session)
-        self.document_index = get_default_document_index(
-            primary_index_name=self.search_settings.index_name,
-            secondary_index_name=None,
-        )
+        search_config = get_search_config(db_session)
+        self.search_settings = search_config.search_settings
+        self.document_index = search_config.document_index
         self.prompt_config: PromptConfig | None = prompt_config
 
         # Preprocessing steps generate this
@@ -78,6 +75,8 @@ class SearchPipeline:
 
         # Initial document index retrieval chunks
         self._retrieved_chunks: list[InferenceChunk] | None = None
+        # Surrounding chunks fetched along with the initial retrieval
+        self._context_chunks = ContextChunks()
         # Another call made to the document index to get surrounding sections
         self._retrieved_sections: list[InferenceSection] | None = None
         # Reranking and LLM section selection can be run together
@@ -145,6 +144,7 @@ class SearchPipeline:
             document_index=self.document_index,
             db_session=self.db_session,
             retrieval_metrics_callback=self.retrieval_metrics_callback,
+            context_chunks=self._context_chunks,
         )
 
         return cast(list[InferenceChunk], self._retrieved_chunks)
@@ -248,6 +248,18 @@ class SearchPipeline:
             if above == below == 0:
                 inference_chunks.extend(chunk_range.chunks)
 
+            elif self._context_chunks.covers(
+                chunk_range.chunks[0].document_id, chunk_range.start, chunk_range.end
+            ):
+                # already fetched during retrieval, no need for another round trip
+                inference_chunks.extend(
+                    self._context_chunks.get_chunks(
+                        chunk_range.chunks[0].document_id,
+                        chunk_range.start,
+                        chunk_range.end,
+                    )
+                )
+
             else:
                 chunk_requests.append(
                     VespaChunkRequest(
@@ -330,6 +342,18 @@ class SearchPipeline:
 
         return self._reranked_sections
 
+    @property
+    def will_rerank(self) -> bool:
+        return should_rerank(self.search_query)
+
+    @property
+    def provisional_context_sections(self) -> list[InferenceSection]:
+        """The merged sections in retrieval order, available before reranking is done.
+        Same as final_context_sections if there is no reranking."""
+        if not self.will_rerank:
+            return self.final_context_sections
+        return _merge_sections(sections=self._get_sections())
+
     @property
     def final_context_sections(self) -> list[InferenceSection]:
         if self._final_context_sections is not None:
@@ -356,17 +380,12 @@ class SearchPipeline:
             )
 
         if self.search_query.evaluation_type == LLMEvaluationType.AGENTIC:
-            sections = self.final_context_sections
-            functions = [
-                FunctionCall(
-                    evaluate_inference_section,
-                    (section, self.search_query.query, self.llm),
-                )
-                for section in sections
-            ]
             try:
-                results = run_functions_in_parallel(function_calls=functions)
-                self._section_relevance = list(results.values())
+                self._section_relevance = evaluate_inference_sections(
+                    sections=self.final_context_sections,
+                    query=self.search_query.query,
+                    llm=self.llm,
+                )
             except Exception as e:
                 raise ValueError(
                     "An issue occured during the agentic evaluation process."
@@ -9,6 +9,8 @@ from onyx.configs.app_configs import BLURB_SIZE
 from onyx.configs.constants import RETURN_SEPARATOR
 from onyx.configs.model_configs import CROSS_ENCODER_RANGE_MAX
 from onyx.configs.model_configs import CROSS_ENCODER_RANGE_MIN
+from onyx.configs.model_configs import RERANK_ADAPTIVE_TIER_SIZE
+from onyx.configs.model_configs import RERANK_ADAPTIVE_TOP_K
 from onyx.context.search.enums import LLMEvaluationType
 from onyx.context.search.models import ChunkMetric
 from onyx.context.search.models import InferenceChunk
@@ -17,6 +19,15 @@ from onyx.context.search.models import InferenceSection
 from onyx.context.search.models import MAX_METRICS_CONTENT
 from onyx.context.search.models import RerankMetricsContainer
 from onyx.context.search.models import SearchQuery
+from onyx.context.search.postprocessing.rerank_score_cache import (
+    build_rerank_chunk_key,
+)
+from onyx.context.search.postprocessing.rerank_score_cache import (
+    build_rerank_query_key,
+)
+from onyx.context.search.postprocessing.rerank_score_cache import (
+    get_rerank_score_cache,
+)
 from onyx.document_index.document_index_utils import (
     translate_boost_count_to_multiplier,
 )
@@ -75,6 +86,49 @@ def cleanup_chunks(chunks: list[InferenceChunkUncleaned]) -> list[InferenceChunk
     return [chunk.to_inference_chunk() for chunk in chunks]
 
 
+def _predict_rerank_scores(
+    cross_encoder: RerankingModel,
+    query: str,
+    query_key: str,
+    chunks: list[InferenceChunk],
+    passages: list[str],
+) -> list[float]:
+    score_cache = get_rerank_score_cache()
+    if score_cache is None:
+        return cross_encoder.predict(query=query, passages=passages)
+
+    keys = [
+        build_rerank_chunk_key(query_key, chunk.unique_id, passage)
+        for chunk, passage in zip(chunks, passages)
+    ]
+    scores = score_cache.get_many(keys)
+    missing_inds = [ind for ind, key in enumerate(keys) if key not in scores]
+    if missing_inds:
+        new_scores = cross_encoder.predict(
+            query=query, passages=[passages[ind] for ind in missing_inds]
+        )
+        new_entries = {
+            keys[ind]: float(score) for ind, score in zip(missing_inds, new_scores)
+        }
+        score_cache.set_many(new_entries)
+        scores.update(new_entries)
+
+    return [scores[key] for key in keys]
+
+
+def _boosted_rerank_scores(
+    raw_scores: numpy.ndarray,
+    boosts: list[float],
+    recency_multiplier: list[float],
+    model_min: int,
+    model_max: int,
+) -> numpy.ndarray:
+    cross_models_min = numpy.min(raw_scores)
+    shifted_sim_scores = raw_scores - cross_models_min
+    boosted_sim_scores = shifted_sim_scores * boosts * recency_multiplier
+    return (boosted_sim_scores + cross_models_min - model_min) / (model_max - model_min)
+
+
 @log_function_time(print_only=True)
 def semantic_reranking(
     query: SearchQuery,
@@ -82,10 +136,16 @@ def semantic_reranking(
     model_min: int = CROSS_ENCODER_RANGE_MIN,
     model_max: int = CROSS_ENCODER_RANGE_MAX,
     rerank_metrics_callback: Callable[[RerankMetricsContainer], None] | None = None,
+    adaptive_tier_size: int = RERANK_ADAPTIVE_TIER_SIZE,
+    adaptive_top_k: int = RERANK_ADAPTIVE_TOP_K,
 ) -> tuple[list[InferenceChunk], list[int]]:
     """Reranks chunks based on cross-encoder models. Additionally provides the original indices
     of the chunks in their new sorted order.
 
+    With an adaptive tier size, the chunks are scored a tier at a time in retrieval order
+    and the rest is not scored once a tier doesn't change the top k. Only the scored chunks
+    are returned, they are always a prefix of the chunks.
+
     Note: this updates the chunks in place, it updates the chunk scores which came from retrieval
     """
     rerank_settings = query.rerank_settings
@@ -107,26 +167,56 @@ def semantic_reranking(
         f"{chunk.semantic_identifier or chunk.title or ''}\n{chunk.content}"
         for chunk in chunks_to_rerank
     ]
-    sim_scores_floats = cross_encoder.predict(query=query.query, passages=passages)
-
-    # Old logic to handle multiple cross-encoders preserved but not used
-    sim_scores = [numpy.array(sim_scores_floats)]
-
-    raw_sim_scores = cast(numpy.ndarray, sum(sim_scores) / len(sim_scores))
-
-    cross_models_min = numpy.min(sim_scores)
-
-    shifted_sim_scores = sum(
-        [enc_n_scores - cross_models_min for enc_n_scores in sim_scores]
-    ) / len(sim_scores)
-
     boosts = [
         translate_boost_count_to_multiplier(chunk.boost) for chunk in chunks_to_rerank
     ]
     recency_multiplier = [chunk.recency_bias for chunk in chunks_to_rerank]
-    boosted_sim_scores = shifted_sim_scores * boosts * recency_multiplier
-    normalized_b_s_scores = (boosted_sim_scores + cross_models_min - model_min) / (
-        model_max - model_min
+    query_key = build_rerank_query_key(rerank_settings, query.query)
+
+    tier_size = adaptive_tier_size or max(len(chunks_to_rerank), 1)
+    sim_scores_floats: list[float] = []
+    top_k_inds: set[int] = set()
+    for tier_start in range(0, len(chunks_to_rerank), tier_size):
+        tier_end = tier_start + tier_size
+        sim_scores_floats.extend(
+            _predict_rerank_scores(
+                cross_encoder=cross_encoder,
+                query=query.query,
+                query_key=query_key,
+                chunks=chunks_to_rerank[tier_start:tier_end],
+                passages=passages[tier_start:tier_end],
+            )
+        )
+        if not adaptive_tier_size:
+            continue
+
+        num_scored = len(sim_scores_floats)
+        boosted_scores = _boosted_rerank_scores(
+            numpy.array(sim_scores_floats),
+            boosts[:num_scored],
+            recency_multiplier[:num_scored],
+            model_min,
+            model_max,
+        )
+        new_top_k_inds = set(
+            numpy.argsort(-boosted_scores, kind="stable")[:adaptive_top_k].tolist()
+        )
+        if new_top_k_inds == top_k_inds:
+            logger.debug(
+                f"Reranking top {adaptive_top_k} stable after {num_scored} of "
+                f"{len(chunks_to_rerank)} chunks"
+            )
+            break
+        top_k_inds = new_top_k_inds
+
+    chunks_to_rerank = chunks_to_rerank[: len(sim_scores_floats)]
+    raw_sim_scores = numpy.array(sim_scores_floats)
+    normalized_b_s_scores = _boosted_rerank_scores(
+        raw_sim_scores,
+        boosts[: len(chunks_to_rerank)],
+        recency_multiplier[: len(chunks_to_rerank)],
+        model_min,
+        model_max,
     )
     orig_indices = [i for i in range(len(normalized_b_s_scores))]
     scored_results = list(
@@ -190,7 +280,8 @@ def rerank_sections(
         chunks=chunks_to_rerank,
         rerank_metrics_callback=rerank_metrics_callback,
     )
-    lower_chunks = chunks_to_rerank[query.rerank_settings.num_rerank :]
+    # includes the chunks left out by an early exit of adaptive reranking
+    lower_chunks = chunks_to_rerank[len(ranked_chunks) :]
 
     # Scores from rerank cannot be meaningfully combined with scores without rerank
     # However the ordering is still important
@@ -244,6 +335,14 @@ def filter_sections(
     ]
 
 
+def should_rerank(search_query: SearchQuery) -> bool:
+    return bool(
+        search_query.rerank_settings
+        and search_query.rerank_settings.rerank_model_name
+        and search_query.rerank_settings.num_rerank > 0
+    )
+
+
 def search_postprocessing(
     search_query: SearchQuery,
     retrieved_sections: list[InferenceSection],
@@ -260,11 +359,7 @@ def search_postprocessing(
 
     rerank_task_id = None
     sections_yielded = False
-    if (
-        search_query.rerank_settings
-        and search_query.rerank_settings.rerank_model_name
-        and search_query.rerank_settings.num_rerank > 0
-    ):
+    if should_rerank(search_query):
         post_processing_tasks.append(
             FunctionCall(
                 rerank_sections,
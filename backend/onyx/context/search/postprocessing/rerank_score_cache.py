@@ -0,0 +1,41 @@
+import hashlib
+
+from onyx.configs.model_configs import ENABLE_RERANK_SCORE_CACHE
+from onyx.configs.model_configs import RERANK_SCORE_CACHE_MAX_ENTRIES
+from onyx.configs.model_configs import RERANK_SCORE_CACHE_TTL_SECONDS
+from onyx.context.search.models import RerankingDetails
+from onyx.utils.ttl_lru_cache import TTLLRUCache
+
+
+def _hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def build_rerank_query_key(rerank_settings: RerankingDetails, query: str) -> str:
+    """The part of the key shared by all chunks scored for one query"""
+    return (
+        f"{rerank_settings.rerank_provider_type}:{rerank_settings.rerank_api_url}:"
+        f"{rerank_settings.rerank_model_name}:{_hash_text(query)}"
+    )
+
+
+def build_rerank_chunk_key(query_key: str, chunk_id: str, passage: str) -> str:
+    return f"{query_key}:{chunk_id}:{_hash_text(passage)}"
+
+
+# process local, chunk key -> raw reranker score
+_RERANK_SCORE_CACHE: TTLLRUCache[str, float] | None = None
+
+
+def get_rerank_score_cache() -> TTLLRUCache[str, float] | None:
+    global _RERANK_SCORE_CACHE
+
+    if not ENABLE_RERANK_SCORE_CACHE:
+        return None
+
+    if _RERANK_SCORE_CACHE is None:
+        _RERANK_SCORE_CACHE = TTLLRUCache(
+            max_entries=RERANK_SCORE_CACHE_MAX_ENTRIES,
+            ttl_seconds=RERANK_SCORE_CACHE_TTL_SECONDS,
+        )
+    return _RERANK_SCORE_CACHE
@@ -1,14 +1,19 @@
+from datetime import datetime
+from datetime import timezone
+
 from sqlalchemy.orm import Session
 
 from onyx.configs.chat_configs import BASE_RECENCY_DECAY
 from onyx.configs.chat_configs import CONTEXT_CHUNKS_ABOVE
 from onyx.configs.chat_configs import CONTEXT_CHUNKS_BELOW
 from onyx.configs.chat_configs import DISABLE_LLM_DOC_RELEVANCE
+from onyx.configs.chat_configs import ENABLE_CONNECTOR_CLASSIFIER
 from onyx.configs.chat_configs import FAVOR_RECENT_DECAY_MULTIPLIER
 from onyx.configs.chat_configs import HYBRID_ALPHA
 from onyx.configs.chat_configs import HYBRID_ALPHA_KEYWORD
 from onyx.configs.chat_configs import NUM_POSTPROCESSED_RESULTS
 from onyx.configs.chat_configs import NUM_RETURNED_HITS
+from onyx.configs.constants import DocumentSource
 from onyx.context.search.enums import LLMEvaluationType
 from onyx.context.search.enums import RecencyBiasSetting
 from onyx.context.search.enums import SearchType
@@ -20,12 +25,24 @@ from onyx.context.search.models import SearchRequest
 from onyx.context.search.preprocessing.access_filters import (
     build_access_filters_for_user,
 )
+from onyx.context.search.preprocessing.preprocessing_cache import (
+    build_preprocessing_cache_key,
+)
+from onyx.context.search.preprocessing.preprocessing_cache import (
+    QUERY_ANALYSIS_FLOW,
+)
+from onyx.context.search.preprocessing.preprocessing_cache import (
+    run_with_preprocessing_cache,
+)
+from onyx.context.search.preprocessing.preprocessing_cache import SOURCE_FILTER_FLOW
+from onyx.context.search.preprocessing.preprocessing_cache import TIME_FILTER_FLOW
 from onyx.context.search.retrieval.search_runner import (
     remove_stop_words_and_punctuation,
 )
+from onyx.context.search.search_config import get_search_config
+from onyx.db.connector import fetch_unique_document_sources
 from onyx.db.engine import CURRENT_TENANT_ID_CONTEXTVAR
 from onyx.db.models import User
-from onyx.db.search_settings import get_current_search_settings
 from onyx.llm.interfaces import LLM
 from onyx.natural_language_processing.search_nlp_models import QueryAnalysisModel
 from onyx.secondary_llm_flows.source_filter import extract_source_filter
@@ -34,15 +51,83 @@ from onyx.utils.logger import setup_logger
 from onyx.utils.threadpool_concurrency import FunctionCall
 from onyx.utils.threadpool_concurrency import run_functions_in_parallel
 from onyx.utils.timing import log_function_time
+from shared_configs.configs import INTENT_MODEL_VERSION
 from shared_configs.configs import MULTI_TENANT
 
 
 logger = setup_logger()
 
 
-def query_analysis(query: str) -> tuple[bool, list[str]]:
-    analysis_model = QueryAnalysisModel()
-    return analysis_model.predict(query)
+def query_analysis(query: str, tenant_id: str | None) -> tuple[bool, list[str]]:
+    def _run_query_analysis() -> tuple[bool, list[str]]:
+        analysis_model = QueryAnalysisModel()
+        return analysis_model.predict(query)
+
+    return run_with_preprocessing_cache(
+        flow=QUERY_ANALYSIS_FLOW,
+        key=build_preprocessing_cache_key(
+            QUERY_ANALYSIS_FLOW, tenant_id, query, INTENT_MODEL_VERSION
+        ),
+        tenant_id=tenant_id,
+        compute=_run_query_analysis,
+        serialize=list,
+        deserialize=lambda value: (value[0], value[1]),
+    )
+
+
+def cached_extract_time_filter(
+    query: str, llm: LLM, tenant_id: str | None
+) -> tuple[datetime | None, bool]:
+    return run_with_preprocessing_cache(
+        flow=TIME_FILTER_FLOW,
+        key=build_preprocessing_cache_key(
+            TIME_FILTER_FLOW,
+            tenant_id,
+            query,
+            llm.config.model_provider,
+            llm.config.model_name,
+            # the LLM is told the current day, "this year" etc. change with it
+            datetime.now(timezone.utc).date(),
+        ),
+        tenant_id=tenant_id,
+        compute=lambda: extract_time_filter(query, llm),
+        serialize=lambda result: [
+            result[0].isoformat() if result[0] else None,
+            result[1],
+        ],
+        deserialize=lambda value: (
+            datetime.fromisoformat(value[0]) if value[0] else None,
+            value[1],
+        ),
+    )
+
+
+def cached_extract_source_filter(
+    query: str, llm: LLM, db_session: Session, tenant_id: str | None
+) -> list[DocumentSource] | None:
+    valid_sources = fetch_unique_document_sources(db_session)
+    return run_with_preprocessing_cache(
+        flow=SOURCE_FILTER_FLOW,
+        key=build_preprocessing_cache_key(
+            SOURCE_FILTER_FLOW,
+            tenant_id,
+            query,
+            llm.config.model_provider,
+            llm.config.model_name,
+            sorted(source.value for source in valid_sources),
+            ENABLE_CONNECTOR_CLASSIFIER,
+        ),
+        tenant_id=tenant_id,
+        compute=lambda: extract_source_filter(
+            query, llm, db_session, valid_sources=valid_sources
+        ),
+        serialize=lambda result: (
+            [source.value for source in result] if result is not None else None
+        ),
+        deserialize=lambda value: (
+            [DocumentSource(source) for source in value] if value is not None else None
+        ),
+    )
 
 
 @log_function_time(print_only=True)
@@ -102,23 +187,30 @@ def retrieval_preprocessing(
         logger.debug("Not extract source filter - already provided")
         auto_detect_source_filter = False
 
+    # the filter flows run in worker threads, which don't inherit the tenant contextvar
+    tenant_id = CURRENT_TENANT_ID_CONTEXTVAR.get()
+
     # Based on the query figure out if we should apply any hard time filters /
     # if we should bias more recent docs even more strongly
     run_time_filters = (
-        FunctionCall(extract_time_filter, (query, llm), {})
+        FunctionCall(cached_extract_time_filter, (query, llm, tenant_id), {})
         if auto_detect_time_filter
         else None
     )
 
     # Based on the query, figure out if we should apply any source filters
     run_source_filters = (
-        FunctionCall(extract_source_filter, (query, llm, db_session), {})
+        FunctionCall(
+            cached_extract_source_filter, (query, llm, db_session, tenant_id), {}
+        )
         if auto_detect_source_filter
         else None
     )
 
     run_query_analysis = (
-        None if skip_query_analysis else FunctionCall(query_analysis, (query,), {})
+        None
+        if skip_query_analysis
+        else FunctionCall(query_analysis, (query, tenant_id), {})
     )
 
     functions_to_run = [
@@ -166,7 +258,7 @@ def retrieval_preprocessing(
         time_cutoff=time_filter or predicted_time_cutoff,
         tags=preset_filters.tags,  # Tags are never auto-extracted
         access_control_list=user_acl_filters,
-        tenant_id=CURRENT_TENANT_ID_CONTEXTVAR.get() if MULTI_TENANT else None,
+        tenant_id=tenant_id if MULTI_TENANT else None,
     )
 
     llm_evaluation_type = LLMEvaluationType.BASIC
@@ -190,7 +282,7 @@ def retrieval_preprocessing(
     rerank_settings = search_request.rerank_settings
     # If not explicitly specified by the query, use the current settings
     if rerank_settings is None:
-        search_settings = get_current_search_settings(db_session)
+        search_settings = get_search_config(db_session).search_settings
 
         # For non-streaming flows, the rerank settings are applied at the search_request level
         if not search_settings.disable_rerank_for_streaming:
@@ -0,0 +1,166 @@
+"""Cache of the per-query preprocessing results (LLM time / source filter extraction and
+the query analysis model). Results are kept in process and optionally in Redis to
+share them between API servers. Every entry remembers how long it took to compute, so
+the time saved by hits can be reported.
+
+The flows run in worker threads that don't see the request's contextvars, so the tenant
+is passed in explicitly. It is part of every key, results are never shared across
+tenants."""
+import hashlib
+import json
+import time
+from collections.abc import Callable
+from typing import Any
+from typing import TypeVar
+
+from prometheus_client import Counter
+
+from onyx.configs.chat_configs import ENABLE_QUERY_PREPROCESSING_CACHE
+from onyx.configs.chat_configs import QUERY_PREPROCESSING_CACHE_MAX_ENTRIES
+from onyx.configs.chat_configs import QUERY_PREPROCESSING_CACHE_TTL_SECONDS
+from onyx.configs.chat_configs import QUERY_PREPROCESSING_CACHE_USE_REDIS
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.logger import setup_logger
+from onyx.utils.ttl_lru_cache import TTLLRUCache
+
+logger = setup_logger()
+
+T = TypeVar("T")
+
+TIME_FILTER_FLOW = "time_filter"
+SOURCE_FILTER_FLOW = "source_filter"
+QUERY_ANALYSIS_FLOW = "query_analysis"
+
+_REDIS_KEY_PREFIX = "query_preprocessing"
+
+_CACHE_REQUESTS = Counter(
+    "onyx_query_preprocessing_cache_requests_total",
+    "Lookups of the query preprocessing cache",
+    ["flow", "result"],
+)
+_CACHE_SECONDS_SAVED = Counter(
+    "onyx_query_preprocessing_cache_seconds_saved_total",
+    "Time the cached query preprocessing results originally took to compute",
+    ["flow"],
+)
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def build_preprocessing_cache_key(
+    flow: str, tenant_id: str | None, query: str, *config: Any
+) -> str:
+    """Everything other than the query that affects the result of the flow must be
+    passed as config"""
+    key_material = json.dumps([normalize_query(query), *config], default=str)
+    return (
+        f"{tenant_id}:{flow}:{hashlib.sha256(key_material.encode('utf-8')).hexdigest()}"
+    )
+
+
+class QueryPreprocessingCache:
+    """In process LRU with a TTL per entry, optionally backed by Redis. Values are JSON
+    strings. Redis failures are treated as misses, they must never fail a search."""
+
+    def __init__(self, max_entries: int, ttl_seconds: int, use_redis: bool) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.use_redis = use_redis
+        self._local: TTLLRUCache[str, str] = TTLLRUCache(
+            max_entries=max_entries, ttl_seconds=ttl_seconds
+        )
+
+    def get(self, key: str, tenant_id: str | None) -> str | None:
+        value = self._local.get(key)
+        if value is not None or not self.use_redis:
+            return value
+
+        try:
+            redis_client = get_redis_client(tenant_id=tenant_id)
+            raw_value = redis_client.get(f"{_REDIS_KEY_PREFIX}:{key}")
+        except Exception:
+            logger.exception("Failed to read from the query preprocessing cache")
+            return None
+
+        if raw_value is None:
+            return None
+
+        value = (
+            raw_value.decode("utf-8")
+            if isinstance(raw_value, bytes)
+            else str(raw_value)
+        )
+        self._local.set(key, value)
+        return value
+
+    def set(self, key: str, value: str, tenant_id: str | None) -> None:
+        self._local.set(key, value)
+        if not self.use_redis:
+            return
+
+        try:
+            redis_client = get_redis_client(tenant_id=tenant_id)
+            redis_client.set(f"{_REDIS_KEY_PREFIX}:{key}", value, ex=self.ttl_seconds)
+        except Exception:
+            logger.exception("Failed to write to the query preprocessing cache")
+
+    def clear(self) -> None:
+        self._local.clear()
+
+
+_PREPROCESSING_CACHE: QueryPreprocessingCache | None = None
+
+
+def get_query_preprocessing_cache() -> QueryPreprocessingCache | None:
+    global _PREPROCESSING_CACHE
+
+    if not ENABLE_QUERY_PREPROCESSING_CACHE:
+        return None
+
+    if _PREPROCESSING_CACHE is None:
+        _PREPROCESSING_CACHE = QueryPreprocessingCache(
+            max_entries=QUERY_PREPROCESSING_CACHE_MAX_ENTRIES,
+            ttl_seconds=QUERY_PREPROCESSING_CACHE_TTL_SECONDS,
+            use_redis=QUERY_PREPROCESSING_CACHE_USE_REDIS,
+        )
+    return _PREPROCESSING_CACHE
+
+
+def run_with_preprocessing_cache(
+    flow: str,
+    key: str,
+    tenant_id: str | None,
+    compute: Callable[[], T],
+    serialize: Callable[[T], Any],
+    deserialize: Callable[[Any], T],
+) -> T:
+    """Returns the cached result of the flow or computes and caches it. serialize must
+    return something JSON serializable."""
+    preprocessing_cache = get_query_preprocessing_cache()
+    if preprocessing_cache is None:
+        return compute()
+
+    cached = preprocessing_cache.get(key, tenant_id)
+    if cached is not None:
+        try:
+            entry = json.loads(cached)
+            result = deserialize(entry["value"])
+        except Exception:
+            logger.warning(
+                f"Dropping unreadable {flow} entry of the preprocessing cache"
+            )
+        else:
+            _CACHE_REQUESTS.labels(flow, "hit").inc()
+            _CACHE_SECONDS_SAVED.labels(flow).inc(entry["seconds"])
+            return result
+
+    _CACHE_REQUESTS.labels(flow, "miss").inc()
+    start = time.monotonic()
+    result = compute()
+    preprocessing_cache.set(
+        key,
+        json.dumps({"value": serialize(result), "seconds": time.monotonic() - start}),
+        tenant_id,
+    )
+    return result
@@ -1,4 +1,5 @@
 import string
+import threading
 from collections.abc import Callable
 
 import nltk  # type:ignore
@@ -15,22 +16,20 @@ from onyx.context.search.models import MAX_METRICS_CONTENT
 from onyx.context.search.models import RetrievalMetricsContainer
 from onyx.context.search.models import SearchQuery
 from onyx.context.search.postprocessing.postprocessing import cleanup_chunks
+from onyx.context.search.search_config import get_search_config
 from onyx.context.search.utils import inference_section_from_chunks
-from onyx.db.search_settings import get_current_search_settings
 from onyx.db.search_settings import get_multilingual_expansion
 from onyx.document_index.interfaces import DocumentIndex
 from onyx.document_index.interfaces import VespaChunkRequest
 from onyx.document_index.vespa.shared_utils.utils import (
     replace_invalid_doc_id_characters,
 )
-from onyx.natural_language_processing.search_nlp_models import EmbeddingModel
 from onyx.secondary_llm_flows.query_expansion import multilingual_query_expansion
 from onyx.utils.logger import setup_logger
 from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
 from onyx.utils.timing import log_function_time
-from shared_configs.configs import MODEL_SERVER_HOST
-from shared_configs.configs import MODEL_SERVER_PORT
 from shared_configs.enums import EmbedTextType
+from shared_configs.model_server_models import Embedding
 
 
 logger = setup_logger()
@@ -109,28 +108,86 @@ def combine_retrieval_results(
     return sorted_chunks
 
 
+class ContextChunks:
+    """Chunks fetched during retrieval only to build the surrounding context of the
+    chunks referenced by large chunks, along with the chunk ranges that were fetched per
+    document. Lets the section expansion skip fetching these ranges again."""
+
+    def __init__(self) -> None:
+        self._chunks: dict[tuple[str, int], InferenceChunk] = {}
+        self._doc_id_to_ranges: dict[str, list[tuple[int, int]]] = {}
+        # filled from the parallel retrievals of the query rephrases
+        self._lock = threading.Lock()
+
+    def add(
+        self,
+        chunks: list[InferenceChunk],
+        doc_id_to_ranges: dict[str, list[tuple[int, int]]],
+    ) -> None:
+        with self._lock:
+            for chunk in chunks:
+                self._chunks.setdefault((chunk.document_id, chunk.chunk_id), chunk)
+            for document_id, ranges in doc_id_to_ranges.items():
+                self._doc_id_to_ranges.setdefault(document_id, []).extend(ranges)
+
+    def covers(self, document_id: str, start: int, end: int) -> bool:
+        """Whether all chunks from start to end (inclusive) were already fetched. Chunk
+        ids past the end of the document count as fetched."""
+        ranges = _merge_ranges(self._doc_id_to_ranges.get(document_id, []))
+        return any(
+            range_start <= start and end <= range_end
+            for range_start, range_end in ranges
+        )
+
+    def get_chunks(
+        self, document_id: str, start: int, end: int
+    ) -> list[InferenceChunk]:
+        return [
+            self._chunks[(document_id, chunk_id)]
+            for chunk_id in range(start, end + 1)
+            if (document_id, chunk_id) in self._chunks
+        ]
+
+
+def _merge_ranges(ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Merges overlapping and adjacent (inclusive) ranges"""
+    merged: list[tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def embed_queries(queries: list[str], db_session: Session) -> list[Embedding]:
+    """Embeds all queries with the current search settings in a single batched call to
+    the model server."""
+    model = get_search_config(db_session).embedding_model
+    return model.encode(queries, text_type=EmbedTextType.QUERY)
+
+
 @log_function_time(print_only=True)
 def doc_index_retrieval(
     query: SearchQuery,
     document_index: DocumentIndex,
     db_session: Session,
+    query_embedding: Embedding | None = None,
+    context_chunks: ContextChunks | None = None,
 ) -> list[InferenceChunk]:
     """
     This function performs the search to retrieve the chunks,
     extracts chunks from the large chunks, persists the scores
     from the large chunks to the referenced chunks,
     dedupes the chunks, and cleans the chunks.
-    """
-    search_settings = get_current_search_settings(db_session)
-
-    model = EmbeddingModel.from_db_model(
-        search_settings=search_settings,
-        # The below are globally set, this flow always uses the indexing one
-        server_host=MODEL_SERVER_HOST,
-        server_port=MODEL_SERVER_PORT,
-    )
 
-    query_embedding = model.encode([query.query], text_type=EmbedTextType.QUERY)[0]
+    If the query embedding is already known, the db_session is not used.
+    If context_chunks is given, the chunks above / below the chunks referenced by large
+    chunks are fetched along with them and collected into it. The context of the other
+    chunks is left to the section expansion, which fetches it once for all rephrases.
+    """
+    if query_embedding is None:
+        query_embedding = embed_queries([query.query], db_session)[0]
 
     top_chunks = document_index.hybrid_retrieval(
         query=query.query,
@@ -143,16 +200,25 @@ def doc_index_retrieval(
         offset=query.offset,
     )
 
-    retrieval_requests: list[VespaChunkRequest] = []
+    # The surrounding chunks of the referenced chunks are needed later on to build their
+    # sections, so they are fetched in the same request as the references themselves
+    expand_context = (
+        context_chunks is not None
+        and not query.full_doc
+        and bool(query.chunks_above or query.chunks_below)
+    )
+    above = query.chunks_above if expand_context else 0
+    below = query.chunks_below if expand_context else 0
+
+    doc_id_to_ranges: dict[str, list[tuple[int, int]]] = {}
     normal_chunks: list[InferenceChunkUncleaned] = []
     referenced_chunk_scores: dict[tuple[str, int], float] = {}
     for chunk in top_chunks:
         if chunk.large_chunk_reference_ids:
-            retrieval_requests.append(
-                VespaChunkRequest(
-                    document_id=replace_invalid_doc_id_characters(chunk.document_id),
-                    min_chunk_ind=chunk.large_chunk_reference_ids[0],
-                    max_chunk_ind=chunk.large_chunk_reference_ids[-1],
+            doc_id_to_ranges.setdefault(chunk.document_id, []).append(
+                (
+                    max(0, chunk.large_chunk_reference_ids[0] - above),
+                    chunk.large_chunk_reference_ids[-1] + below,
                 )
             )
             # for each referenced chunk, persist the
@@ -166,23 +232,46 @@ def doc_index_retrieval(
             normal_chunks.append(chunk)
 
     # If there are no large chunks, just return the normal chunks
-    if not retrieval_requests:
+    if not doc_id_to_ranges:
         return cleanup_chunks(normal_chunks)
 
-    # Retrieve and return the referenced normal chunks from the large chunks
+    doc_id_to_merged_ranges = {
+        document_id: _merge_ranges(ranges)
+        for document_id, ranges in doc_id_to_ranges.items()
+    }
+    retrieval_requests = [
+        VespaChunkRequest(
+            document_id=replace_invalid_doc_id_characters(document_id),
+            min_chunk_ind=start,
+            max_chunk_ind=end,
+        )
+        for document_id, ranges in doc_id_to_merged_ranges.items()
+        for start, end in ranges
+    ]
+
+    # Retrieve the referenced normal chunks from the large chunks (and their context)
     retrieved_inference_chunks = document_index.id_based_retrieval(
         chunk_requests=retrieval_requests,
         filters=query.filters,
         batch_retrieval=True,
     )
 
+    if context_chunks is not None and expand_context:
+        context_chunks.add(
+            chunks=cleanup_chunks(retrieved_inference_chunks),
+            doc_id_to_ranges=doc_id_to_merged_ranges,
+        )
+
     # Apply the scores from the large chunks to the chunks referenced
-    # by each large chunk
+    # by each large chunk, the other chunks are only there for context
+    referenced_chunks: list[InferenceChunkUncleaned] = []
     for chunk in retrieved_inference_chunks:
         if (chunk.document_id, chunk.chunk_id) in referenced_chunk_scores:
-            chunk.score = referenced_chunk_scores[(chunk.document_id, chunk.chunk_id)]
-            referenced_chunk_scores.pop((chunk.document_id, chunk.chunk_id))
-        else:
+            chunk.score = referenced_chunk_scores.pop(
+                (chunk.document_id, chunk.chunk_id)
+            )
+            referenced_chunks.append(chunk)
+        elif not expand_context:
             logger.error(
                 f"Chunk {chunk.document_id} {chunk.chunk_id} not found in referenced chunk scores"
             )
@@ -196,7 +285,7 @@ def doc_index_retrieval(
     }
 
     # persist the highest score of each deduped chunk
-    for chunk in retrieved_inference_chunks:
+    for chunk in referenced_chunks:
         key = (chunk.document_id, chunk.chunk_id)
         # For duplicates, keep the highest score
         if key not in unique_chunks or (chunk.score or 0) > (
@@ -222,18 +311,23 @@ def retrieve_chunks(
     db_session: Session,
     retrieval_metrics_callback: Callable[[RetrievalMetricsContainer], None]
     | None = None,
+    context_chunks: ContextChunks | None = None,
 ) -> list[InferenceChunk]:
-    """Returns a list of the best chunks from an initial keyword/semantic/ hybrid search."""
+    """Returns a list of the best chunks from an initial keyword/semantic/ hybrid search.
+    See doc_index_retrieval for context_chunks."""
 
     multilingual_expansion = get_multilingual_expansion(db_session)
     # Don't do query expansion on complex queries, rephrasings likely would not work well
     if not multilingual_expansion or "\n" in query.query or "\r" in query.query:
         top_chunks = doc_index_retrieval(
-            query=query, document_index=document_index, db_session=db_session
+            query=query,
+            document_index=document_index,
+            db_session=db_session,
+            context_chunks=context_chunks,
         )
     else:
         simplified_queries = set()
-        run_queries: list[tuple[Callable, tuple]] = []
+        rephrased_queries: list[SearchQuery] = []
 
         # Currently only uses query expansion on multilingual use cases
         query_rephrases = multilingual_query_expansion(
@@ -249,13 +343,19 @@ def retrieve_chunks(
                 continue
             simplified_queries.add(simplified_rephrase)
 
-            q_copy = query.copy(update={"query": rephrase}, deep=True)
-            run_queries.append(
-                (
-                    doc_index_retrieval,
-                    (q_copy, document_index, db_session),
-                )
+            rephrased_queries.append(query.copy(update={"query": rephrase}, deep=True))
+
+        # embed all rephrases in one request, only the index is queried per rephrase
+        query_embeddings = embed_queries(
+            [q_copy.query for q_copy in rephrased_queries], db_session
+        )
+        run_queries: list[tuple[Callable, tuple]] = [
+            (
+                doc_index_retrieval,
+                (q_copy, document_index, db_session, query_embedding, context_chunks),
             )
+            for q_copy, query_embedding in zip(rephrased_queries, query_embeddings)
+        ]
         parallel_search_results = run_functions_tuples_in_parallel(run_queries)
         top_chunks = combine_retrieval_results(parallel_search_results)
 
@@ -0,0 +1,57 @@
+from dataclasses import dataclass
+
+from sqlalchemy.orm import Session
+
+from onyx.db.models import SearchSettings
+from onyx.db.search_settings import get_current_search_settings
+from onyx.document_index.factory import get_default_document_index
+from onyx.document_index.interfaces import DocumentIndex
+from onyx.embedding_cache.factory import get_query_embedding_cache
+from onyx.natural_language_processing.search_nlp_models import EmbeddingModel
+from shared_configs.configs import MODEL_SERVER_HOST
+from shared_configs.configs import MODEL_SERVER_PORT
+
+_SEARCH_CONFIG_KEY = "search_config_snapshot"
+
+
+@dataclass
+class SearchConfigSnapshot:
+    """The current search settings and the clients built from them. Resolving these
+    takes a Postgres read and loading the embedding model tokenizer, so a request
+    resolves them once and every search / chat step of the request shares them."""
+
+    search_settings: SearchSettings
+    embedding_model: EmbeddingModel
+    document_index: DocumentIndex
+
+    @property
+    def index_name(self) -> str:
+        return self.search_settings.index_name
+
+
+def get_search_config(db_session: Session) -> SearchConfigSnapshot:
+    """Returns the search config snapshot of the request the session belongs to. The
+    snapshot lives as long as the session, so a search settings swap is picked up by the
+    next request."""
+    snapshot = db_session.info.get(_SEARCH_CONFIG_KEY)
+    if isinstance(snapshot, SearchConfigSnapshot):
+        return snapshot
+
+    search_settings = get_current_search_settings(db_session)
+    snapshot = SearchConfigSnapshot(
+        search_settings=search_settings,
+        embedding_model=EmbeddingModel.from_db_model(
+            search_settings=search_settings,
+            # The below are globally set, this flow always uses the indexing one
+            server_host=MODEL_SERVER_HOST,
+            server_port=MODEL_SERVER_PORT,
+            # attached once here, the model is shared by the threads of the request
+            embedding_cache=get_query_embedding_cache(search_settings.index_name),
+        ),
+        document_index=get_default_document_index(
+            primary_index_name=search_settings.index_name,
+            secondary_index_name=None,
+        ),
+    )
+    db_session.info[_SEARCH_CONFIG_KEY] = snapshot
+    return snapshot
@@ -7,6 +7,7 @@ from fastapi import HTTPException
 from sqlalchemy import delete
 from sqlalchemy import desc
 from sqlalchemy import func
+from sqlalchemy import literal
 from sqlalchemy import nullsfirst
 from sqlalchemy import or_
 from sqlalchemy import select
@@ -498,6 +499,57 @@ def get_chat_messages_by_session(
     return list(result)
 
 
+def get_chat_message_mainline(
+    chat_session_id: UUID,
+    db_session: Session,
+    prefetch_tool_calls: bool = False,
+    stop_at_message_id: int | None = None,
+) -> list[ChatMessage]:
+    """Returns the root message of the session followed by the messages reached by
+    following the latest_child_message pointers, optionally ending at
+    stop_at_message_id. The path is resolved with a recursive CTE, so only the messages
+    on it are read, regardless of how many branches were abandoned by regenerations
+    and edits or how long the session is."""
+    mainline = (
+        select(
+            ChatMessage.id,
+            ChatMessage.latest_child_message,
+            literal(0).label("depth"),
+        )
+        .where(
+            ChatMessage.chat_session_id == chat_session_id,
+            ChatMessage.parent_message.is_(None),
+        )
+        .cte("mainline", recursive=True)
+    )
+    next_message = (
+        select(
+            ChatMessage.id,
+            ChatMessage.latest_child_message,
+            (mainline.c.depth + 1).label("depth"),
+        )
+        .join(mainline, ChatMessage.id == mainline.c.latest_child_message)
+        .where(ChatMessage.chat_session_id == chat_session_id)
+    )
+    if stop_at_message_id:
+        next_message = next_message.where(mainline.c.id != stop_at_message_id)
+    mainline = mainline.union_all(next_message)
+
+    stmt = (
+        select(ChatMessage)
+        .join(mainline, ChatMessage.id == mainline.c.id)
+        .order_by(mainline.c.depth)
+    )
+
+    if prefetch_tool_calls:
+        stmt = stmt.options(joinedload(ChatMessage.tool_call))
+        result = db_session.scalars(stmt).unique().all()
+    else:
+        result = db_session.scalars(stmt).all()
+
+    return list(result)
+
+
 def get_or_create_root_message(
     chat_session_id: UUID,
     db_session: Session,
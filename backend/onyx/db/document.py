@@ -28,6 +28,7 @@ from onyx.db.models import ConnectorCredentialPair
 from onyx.db.models import Credential
 from onyx.db.models import Document as DbDocument
 from onyx.db.models import DocumentByConnectorCredentialPair
+from onyx.db.models import DocumentIndexChunkCount
 from onyx.db.models import User
 from onyx.db.tag import delete_document_tags_for_documents__no_commit
 from onyx.db.utils import model_to_dict
@@ -403,6 +404,74 @@ def update_docs_updated_at__no_commit(
         document.doc_updated_at = ids_to_new_updated_at[document.id]
 
 
+def update_docs_content_hash__no_commit(
+    ids_to_content_hash: dict[str, str | None],
+    db_session: Session,
+) -> None:
+    doc_ids = list(ids_to_content_hash.keys())
+    documents_to_update = (
+        db_session.query(DbDocument).filter(DbDocument.id.in_(doc_ids)).all()
+    )
+
+    for document in documents_to_update:
+        document.content_hash = ids_to_content_hash[document.id]
+
+
+def fetch_chunk_counts_for_documents(
+    document_ids: list[str],
+    index_name: str,
+    db_session: Session,
+) -> dict[str, int]:
+    """Returns the number of chunks each document had when it was last written to the
+    given index. Documents without a recorded count are not included."""
+    stmt = select(
+        DocumentIndexChunkCount.document_id, DocumentIndexChunkCount.chunk_count
+    ).where(
+        DocumentIndexChunkCount.document_id.in_(document_ids),
+        DocumentIndexChunkCount.index_name == index_name,
+    )
+    return {
+        document_id: chunk_count
+        for document_id, chunk_count in db_session.execute(stmt).all()
+    }
+
+
+def upsert_document_chunk_counts__no_commit(
+    ids_to_chunk_count: dict[str, int],
+    index_name: str,
+    db_session: Session,
+) -> None:
+    if not ids_to_chunk_count:
+        return
+
+    insert_stmt = insert(DocumentIndexChunkCount).values(
+        [
+            {
+                "document_id": document_id,
+                "index_name": index_name,
+                "chunk_count": chunk_count,
+            }
+            for document_id, chunk_count in ids_to_chunk_count.items()
+        ]
+    )
+    db_session.execute(
+        insert_stmt.on_conflict_do_update(
+            index_elements=["document_id", "index_name"],
+            set_={"chunk_count": insert_stmt.excluded.chunk_count},
+        )
+    )
+
+
+def delete_document_chunk_counts_for_documents__no_commit(
+    document_ids: list[str], db_session: Session
+) -> None:
+    db_session.execute(
+        delete(DocumentIndexChunkCount).where(
+            DocumentIndexChunkCount.document_id.in_(document_ids)
+        )
+    )
+
+
 def update_docs_last_modified__no_commit(
     document_ids: list[str],
     db_session: Session,
@@ -500,6 +569,9 @@ def delete_documents_complete__no_commit(
     delete_document_tags_for_documents__no_commit(
         document_ids=document_ids, db_session=db_session
     )
+    delete_document_chunk_counts_for_documents__no_commit(
+        document_ids=document_ids, db_session=db_session
+    )
     delete_documents__no_commit(db_session, document_ids)
 
 
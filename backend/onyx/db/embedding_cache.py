@@ -0,0 +1,78 @@
+from sqlalchemy import delete
+from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from onyx.db.models import EmbeddingCacheEntry
+
+
+def fetch_embedding_cache_entries(
+    keys: list[str], db_session: Session
+) -> dict[str, bytes]:
+    """Returns the cached embeddings for the given keys and marks them as recently used"""
+    rows = db_session.execute(
+        select(EmbeddingCacheEntry.key, EmbeddingCacheEntry.embedding).where(
+            EmbeddingCacheEntry.key.in_(keys)
+        )
+    ).all()
+    found = {key: embedding for key, embedding in rows}
+
+    if found:
+        db_session.execute(
+            update(EmbeddingCacheEntry)
+            .where(EmbeddingCacheEntry.key.in_(list(found.keys())))
+            .values(last_accessed=func.now())
+        )
+        db_session.commit()
+
+    return found
+
+
+def upsert_embedding_cache_entries(
+    entries: dict[str, bytes], db_session: Session
+) -> None:
+    # rows are locked in insertion order, a consistent order keeps concurrent indexing
+    # workers upserting overlapping keys from deadlocking each other
+    rows = [
+        {"key": key, "embedding": entries[key], "size_bytes": len(entries[key])}
+        for key in sorted(entries)
+    ]
+    insert_stmt = insert(EmbeddingCacheEntry).values(rows)
+    on_conflict_stmt = insert_stmt.on_conflict_do_update(
+        index_elements=["key"],
+        set_={
+            "embedding": insert_stmt.excluded.embedding,
+            "size_bytes": insert_stmt.excluded.size_bytes,
+            "last_accessed": func.now(),
+        },
+    )
+    db_session.execute(on_conflict_stmt)
+    db_session.commit()
+
+
+def get_embedding_cache_count_and_size_bytes(db_session: Session) -> tuple[int, int]:
+    count, size = db_session.execute(
+        select(
+            func.count(EmbeddingCacheEntry.key),
+            func.coalesce(func.sum(EmbeddingCacheEntry.size_bytes), 0),
+        )
+    ).one()
+    return int(count), int(size)
+
+
+def delete_least_recently_used_embedding_cache_entries(
+    num_entries: int, db_session: Session
+) -> int:
+    lru_keys = (
+        select(EmbeddingCacheEntry.key)
+        .order_by(EmbeddingCacheEntry.last_accessed)
+        .limit(num_entries)
+        .scalar_subquery()
+    )
+    result = db_session.execute(
+        delete(EmbeddingCacheEntry).where(EmbeddingCacheEntry.key.in_(lru_keys))
+    )
+    db_session.commit()
+    return result.rowcount  # type: ignore
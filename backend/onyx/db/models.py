@@ -470,6 +470,12 @@ class Document(Base):
         DateTime(timezone=True), nullable=True
     )
 
+    # Hash of the document contents (sections, title, metadata, etc.) as of the last
+    # successful write to the primary index. Used to skip re-chunking / re-embedding
+    # documents that have not changed, even if the source does not report reliable
+    # update times.
+    content_hash: Mapped[str | None] = mapped_column(String, nullable=True)
+
     # last time any vespa relevant row metadata or the doc changed.
     # does not include last_synced
     last_modified: Mapped[datetime.datetime | None] = mapped_column(
@@ -875,6 +881,20 @@ class DocumentByConnectorCredentialPair(Base):
     )
 
 
+class DocumentIndexChunkCount(Base):
+    """Number of regular (non large) chunks a document had when it was last written to a
+    given document index. Lets re-indexing overwrite the chunks in place and only delete
+    the ones past the new count instead of deleting every chunk first."""
+
+    __tablename__ = "document_index_chunk_count"
+
+    document_id: Mapped[str] = mapped_column(
+        ForeignKey("document.id"), primary_key=True
+    )
+    index_name: Mapped[str] = mapped_column(String, primary_key=True)
+    chunk_count: Mapped[int] = mapped_column(Integer)
+
+
 """
 Messages Tables
 """
@@ -1090,6 +1110,16 @@ class ChatMessage(Base):
         back_populates="chat_messages",
     )
 
+    __table_args__ = (
+        # Finding the root of a session and walking its mainline must not scan the
+        # messages of every session
+        Index(
+            "ix_chat_message_chat_session_id_parent_message",
+            "chat_session_id",
+            "parent_message",
+        ),
+    )
+
 
 class ChatFolder(Base):
     """For organizing chat sessions"""
@@ -1598,6 +1628,20 @@ class PGFileStore(Base):
     lobj_oid: Mapped[int] = mapped_column(Integer, nullable=False)
 
 
+class EmbeddingCacheEntry(Base):
+    """Content addressed embedding cache, see onyx.embedding_cache"""
+
+    __tablename__ = "embedding_cache"
+
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+    # little endian float32 vector
+    embedding: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    size_bytes: Mapped[int] = mapped_column(Integer, nullable=False)
+    last_accessed: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), index=True
+    )
+
+
 """
 ************************************************************************
 Enterprise Edition Models
@@ -44,17 +44,31 @@ def get_uuid_from_chunk(
         if isinstance(chunk, InferenceChunk)
         else chunk.source_document.id
     )
+    return get_uuid_from_chunk_info(
+        document_id=doc_str,
+        chunk_id=chunk.chunk_id,
+        large_chunk_reference_ids=chunk.large_chunk_reference_ids,
+        mini_chunk_ind=mini_chunk_ind,
+    )
+
+
+def get_uuid_from_chunk_info(
+    *,
+    document_id: str,
+    chunk_id: int,
+    large_chunk_reference_ids: list[int] | None = None,
+    mini_chunk_ind: int = 0,
+) -> uuid.UUID:
+    doc_str = document_id
     # Web parsing URL duplicate catching
     if doc_str and doc_str[-1] == "/":
         doc_str = doc_str[:-1]
-    unique_identifier_string = "_".join(
-        [doc_str, str(chunk.chunk_id), str(mini_chunk_ind)]
-    )
-    if chunk.large_chunk_reference_ids:
+    unique_identifier_string = "_".join([doc_str, str(chunk_id), str(mini_chunk_ind)])
+    if large_chunk_reference_ids:
         unique_identifier_string += "_large" + "_".join(
             [
                 str(referenced_chunk_id)
-                for referenced_chunk_id in chunk.large_chunk_reference_ids
+                for referenced_chunk_id in large_chunk_reference_ids
             ]
         )
     return uuid.uuid5(uuid.NAMESPACE_X500, unique_identifier_string)
@@ -63,11 +63,12 @@ class VespaDocumentFields:
     understandable like this for now.
     """
 
-    # all other fields except these 4 will always be left alone by the update request
+    # all other fields except these 5 will always be left alone by the update request
     access: DocumentAccess | None = None
     document_sets: set[str] | None = None
     boost: float | None = None
     hidden: bool | None = None
+    doc_updated_at: datetime | None = None
 
 
 @dataclass
@@ -149,14 +150,17 @@ class Indexable(abc.ABC):
         self,
         chunks: list[DocMetadataAwareIndexChunk],
         fresh_index: bool = False,
+        doc_id_to_previous_chunk_cnt: dict[str, int] | None = None,
     ) -> set[DocumentInsertionRecord]:
         """
         Takes a list of document chunks and indexes them in the document index
 
         NOTE: When a document is reindexed/updated here, it must clear all of the existing document
-        chunks before reindexing. This is because the document may have gotten shorter since the
-        last run. Therefore, upserting the first 0 through n chunks may leave some old chunks that
-        have not been written over.
+        chunks that are not overwritten. This is because the document may have gotten shorter since
+        the last run. Therefore, upserting the first 0 through n chunks may leave some old chunks
+        that have not been written over. If the previous number of chunks of a document is known
+        (doc_id_to_previous_chunk_cnt), only the chunks past the new count need to be removed,
+        otherwise all of the existing chunks must be cleared before reindexing.
 
         NOTE: The chunks of a document are never separated into separate index() calls. So there is
         no worry of receiving the first 0 through n chunks in one index call and the next n through
@@ -174,6 +178,8 @@ class Indexable(abc.ABC):
         - chunks: Document chunks with all of the information needed for indexing to the document
                 index.
         - fresh_index: Boolean indicating whether this is a fresh index with no existing documents.
+        - doc_id_to_previous_chunk_cnt: Number of regular chunks each document had when it was
+                last written to this index. Documents that are missing have an unknown size.
 
         Returns:
             List of document ids which map to unique documents and are used for deduping chunks
@@ -237,6 +243,22 @@ class Updatable(abc.ABC):
         """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def update_many(self, doc_id_to_fields: dict[str, VespaDocumentFields]) -> set[str]:
+        """
+        Batched version of update_single for many documents with different fields, used
+        when there are too many documents to update them one at a time.
+
+        Parameters:
+        - doc_id_to_fields: the fields to update per document. Any field set to None will
+                not be changed.
+
+        Return:
+            the ids of the documents that have no chunks in the index, nothing is updated
+            for these
+        """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def update(self, update_requests: list[UpdateRequest]) -> None:
         """
@@ -14,13 +14,18 @@ from onyx.configs.app_configs import LOG_VESPA_TIMING_INFORMATION
 from onyx.context.search.models import IndexFilters
 from onyx.context.search.models import InferenceChunkUncleaned
 from onyx.document_index.interfaces import VespaChunkRequest
-from onyx.document_index.vespa.shared_utils.utils import get_vespa_http_client
+from onyx.document_index.vespa.read_client import vespa_read_request
+from onyx.document_index.vespa.read_client import VESPA_SEARCH_ENDPOINT_LABEL
+from onyx.document_index.vespa.read_client import VESPA_VISIT_ENDPOINT_LABEL
 from onyx.document_index.vespa.shared_utils.vespa_request_builders import (
     build_vespa_filters,
 )
 from onyx.document_index.vespa.shared_utils.vespa_request_builders import (
     build_vespa_id_based_retrieval_yql,
 )
+from onyx.document_index.vespa.shared_utils.vespa_request_builders import (
+    build_vespa_query_params,
+)
 from onyx.document_index.vespa_constants import ACCESS_CONTROL_LIST
 from onyx.document_index.vespa_constants import BLURB
 from onyx.document_index.vespa_constants import BOOST
@@ -195,9 +200,9 @@ def _get_chunks_via_visit_api(
     while True:
         try:
             filtered_params = {k: v for k, v in params.items() if v is not None}
-            with get_vespa_http_client() as http_client:
-                response = http_client.get(url, params=filtered_params)
-                response.raise_for_status()
+            response = vespa_read_request(
+                "GET", url, VESPA_VISIT_ENDPOINT_LABEL, params=filtered_params
+            )
         except httpx.HTTPError as e:
             error_base = "Failed to query Vespa"
             logger.error(
@@ -298,9 +303,9 @@ def query_vespa(
     )
 
     try:
-        with get_vespa_http_client() as http_client:
-            response = http_client.post(SEARCH_ENDPOINT, json=params)
-            response.raise_for_status()
+        response = vespa_read_request(
+            "POST", SEARCH_ENDPOINT, VESPA_SEARCH_ENDPOINT_LABEL, json=params
+        )
     except httpx.HTTPError as e:
         error_base = "Failed to query Vespa"
         logger.error(
@@ -360,10 +365,7 @@ def _get_chunks_via_batch_search(
 
     for request in chunk_requests:
         yql += " or " + build_vespa_id_based_retrieval_yql(request)
-    params: dict[str, str | int | float] = {
-        "yql": yql,
-        "hits": MAX_ID_SEARCH_QUERY_SIZE,
-    }
+    params = build_vespa_query_params(yql=yql, hits=MAX_ID_SEARCH_QUERY_SIZE)
 
     inference_chunks = query_vespa(params)
     if not get_large_chunks:
@@ -380,7 +382,10 @@ def batch_search_api_retrieval(
     filters: IndexFilters,
     get_large_chunks: bool = False,
 ) -> list[InferenceChunkUncleaned]:
-    retrieved_chunks: list[InferenceChunkUncleaned] = []
+    """The capped requests are split into queries of up to MAX_OR_CONDITIONS requests /
+    MAX_ID_SEARCH_QUERY_SIZE chunks. The queries are sent in parallel so the whole batch
+    takes a single round trip."""
+    capped_batches: list[list[VespaChunkRequest]] = []
     capped_requests: list[VespaChunkRequest] = []
     uncapped_requests: list[VespaChunkRequest] = []
     chunk_count = 0
@@ -396,35 +401,37 @@ def batch_search_api_retrieval(
             chunk_count + range > MAX_ID_SEARCH_QUERY_SIZE
             or req_ind % MAX_OR_CONDITIONS == 0
         ):
-            retrieved_chunks.extend(
-                _get_chunks_via_batch_search(
-                    index_name=index_name,
-                    chunk_requests=capped_requests,
-                    filters=filters,
-                    get_large_chunks=get_large_chunks,
-                )
-            )
+            capped_batches.append(capped_requests)
             capped_requests = []
             chunk_count = 0
         capped_requests.append(request)
         chunk_count += range
 
     if capped_requests:
-        retrieved_chunks.extend(
-            _get_chunks_via_batch_search(
-                index_name=index_name,
-                chunk_requests=capped_requests,
-                filters=filters,
-                get_large_chunks=get_large_chunks,
-            )
-        )
+        capped_batches.append(capped_requests)
 
+    functions_with_args: list[tuple[Callable, tuple]] = [
+        (
+            _get_chunks_via_batch_search,
+            (index_name, capped_batch, filters, get_large_chunks),
+        )
+        for capped_batch in capped_batches
+        if capped_batch
+    ]
     if uncapped_requests:
         logger.debug(f"Retrieving {len(uncapped_requests)} uncapped requests")
-        retrieved_chunks.extend(
-            parallel_visit_api_retrieval(
-                index_name, uncapped_requests, filters, get_large_chunks
+        functions_with_args.append(
+            (
+                parallel_visit_api_retrieval,
+                (index_name, uncapped_requests, filters, get_large_chunks),
             )
         )
 
+    if len(functions_with_args) == 1:
+        func, args = functions_with_args[0]
+        return func(*args)
+
+    retrieved_chunks: list[InferenceChunkUncleaned] = []
+    for chunks in run_functions_tuples_in_parallel(functions_with_args):
+        retrieved_chunks.extend(chunks)
     return retrieved_chunks
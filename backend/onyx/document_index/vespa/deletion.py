@@ -6,6 +6,9 @@ from retry import retry
 from onyx.document_index.vespa.chunk_retrieval import (
     get_all_vespa_ids_for_document_id,
 )
+from onyx.document_index.vespa.feed import raise_on_feed_failures
+from onyx.document_index.vespa.feed import VespaFeedClient
+from onyx.document_index.vespa.feed import VespaFeedOperation
 from onyx.document_index.vespa_constants import DOCUMENT_ID_ENDPOINT
 from onyx.document_index.vespa_constants import NUM_THREADS
 from onyx.utils.logger import setup_logger
@@ -25,8 +28,13 @@ def _delete_vespa_doc_chunks(
         index_name=index_name,
         get_large_chunks=True,
     )
+    _delete_vespa_chunks(doc_chunk_ids, index_name, http_client)
 
-    for chunk_id in doc_chunk_ids:
+
+def _delete_vespa_chunks(
+    chunk_ids: list[str], index_name: str, http_client: httpx.Client
+) -> None:
+    for chunk_id in chunk_ids:
         try:
             res = http_client.delete(
                 f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{chunk_id}"
@@ -63,3 +71,82 @@ def delete_vespa_docs(
     finally:
         if not external_executor:
             executor.shutdown(wait=True)
+
+
+@retry(tries=3, delay=1, backoff=2)
+def _delete_vespa_chunks_with_retries(
+    chunk_ids: list[str], index_name: str, http_client: httpx.Client
+) -> None:
+    _delete_vespa_chunks(chunk_ids, index_name, http_client)
+
+
+def delete_vespa_chunks(
+    doc_chunk_ids: dict[str, list[str]],
+    index_name: str,
+    http_client: httpx.Client,
+    executor: concurrent.futures.ThreadPoolExecutor | None = None,
+) -> None:
+    """Deletes specific chunks (by Vespa id) of the given documents, unlike
+    `delete_vespa_docs` this does not need to look up the chunks of the documents."""
+    external_executor = True
+
+    if not executor:
+        external_executor = False
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS)
+
+    try:
+        chunk_deletion_future = {
+            executor.submit(
+                _delete_vespa_chunks_with_retries, chunk_ids, index_name, http_client
+            ): doc_id
+            for doc_id, chunk_ids in doc_chunk_ids.items()
+        }
+        for future in concurrent.futures.as_completed(chunk_deletion_future):
+            # Will raise exception if the deletion raised an exception
+            future.result()
+
+    finally:
+        if not external_executor:
+            executor.shutdown(wait=True)
+
+
+def feed_delete_vespa_chunks(
+    doc_chunk_ids: dict[str, list[str]],
+    index_name: str,
+    feed_client: VespaFeedClient,
+) -> None:
+    """Bulk feed equivalent of `delete_vespa_chunks`."""
+    results = feed_client.feed(
+        VespaFeedOperation(
+            method="DELETE",
+            url=f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{chunk_id}",
+            document_id=document_id,
+        )
+        for document_id, chunk_ids in doc_chunk_ids.items()
+        for chunk_id in chunk_ids
+    )
+    raise_on_feed_failures(results, action="delete")
+
+
+def feed_delete_vespa_docs(
+    document_ids: list[str],
+    index_name: str,
+    feed_client: VespaFeedClient,
+) -> None:
+    """Bulk feed equivalent of `delete_vespa_docs`. The chunk ids of all documents are
+    looked up first, then all chunk deletes are streamed through the feed client."""
+    doc_chunk_ids: dict[str, list[str]] = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS) as executor:
+        future_to_doc_id = {
+            executor.submit(
+                get_all_vespa_ids_for_document_id,
+                document_id=document_id,
+                index_name=index_name,
+                get_large_chunks=True,
+            ): document_id
+            for document_id in document_ids
+        }
+        for future in concurrent.futures.as_completed(future_to_doc_id):
+            doc_chunk_ids[future_to_doc_id[future]] = future.result()
+
+    feed_delete_vespa_chunks(doc_chunk_ids, index_name, feed_client)
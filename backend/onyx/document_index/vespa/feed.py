@@ -0,0 +1,288 @@
+"""Streaming bulk feed for the Vespa /document/v1 API.
+
+Vespa has no batch endpoint for document operations, so throughput comes from keeping
+many requests in flight over a handful of long-lived HTTP/2 connections. Operations are
+pulled lazily from an iterable, the number of in-flight requests is bounded and adapts
+to backpressure from Vespa (429 / 503 / 507), and every operation gets its own result
+instead of the whole batch failing on the first error.
+"""
+import os
+import threading
+import time
+from collections.abc import Iterable
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from http import HTTPStatus
+from itertools import chain
+from itertools import islice
+from typing import Any
+
+import httpx
+
+from onyx.configs.app_configs import VESPA_FEED_MAX_CONCURRENCY
+from onyx.configs.app_configs import VESPA_FEED_MAX_RETRIES
+from onyx.configs.app_configs import VESPA_FEED_NUM_CONNECTIONS
+from onyx.document_index.vespa.shared_utils.utils import get_vespa_http_client
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+# statuses that signal Vespa is overloaded, the operation is retried with less concurrency
+_THROTTLE_STATUSES = {
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.INSUFFICIENT_STORAGE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+}
+_MIN_CONCURRENCY = 1
+_RETRY_BASE_DELAY_SECONDS = 0.5
+_RETRY_MAX_DELAY_SECONDS = 10.0
+
+
+@dataclass
+class VespaFeedOperation:
+    method: str  # GET / POST / PUT / DELETE
+    url: str
+    document_id: str
+    body: dict[str, Any] | None = None
+
+
+@dataclass
+class VespaFeedResult:
+    operation: VespaFeedOperation
+    status_code: int | None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class AdaptiveConcurrencyLimiter:
+    """Bounds the number of in-flight requests. The limit grows additively while requests
+    succeed and is halved whenever the server signals it is overloaded (AIMD)."""
+
+    def __init__(self, max_concurrency: int, initial_concurrency: int | None = None):
+        self.max_concurrency = max(max_concurrency, _MIN_CONCURRENCY)
+        self.limit = min(
+            initial_concurrency or self.max_concurrency, self.max_concurrency
+        )
+        self._in_flight = 0
+        self._successes_since_change = 0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify()
+
+    def on_success(self) -> None:
+        with self._cond:
+            self._successes_since_change += 1
+            if (
+                self.limit < self.max_concurrency
+                and self._successes_since_change >= self.limit
+            ):
+                self.limit += 1
+                self._successes_since_change = 0
+                self._cond.notify()
+
+    def on_throttle(self) -> None:
+        with self._cond:
+            self.limit = max(_MIN_CONCURRENCY, self.limit // 2)
+            self._successes_since_change = 0
+
+
+class VespaFeedClient:
+    """Feeds document operations to Vespa. The connections and worker threads are kept
+    for the lifetime of the client, use `get_vespa_feed_client` to share one client per
+    process."""
+
+    def __init__(
+        self,
+        max_concurrency: int = VESPA_FEED_MAX_CONCURRENCY,
+        num_connections: int = VESPA_FEED_NUM_CONNECTIONS,
+        max_retries: int = VESPA_FEED_MAX_RETRIES,
+        http_clients: list[httpx.Client] | None = None,
+    ) -> None:
+        self.max_concurrency = max(max_concurrency, _MIN_CONCURRENCY)
+        self.max_retries = max_retries
+        self._owns_clients = http_clients is None
+        # HTTP/2 multiplexes all requests of a client over a single connection, so a few
+        # clients are enough to spread load over the Vespa container threads
+        self._http_clients = http_clients or [
+            get_vespa_http_client() for _ in range(max(num_connections, 1))
+        ]
+        # workers are started on demand and then reused by every call to `feed`
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="vespa_feed"
+        )
+
+    def __enter__(self) -> "VespaFeedClient":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        if self._owns_clients:
+            for http_client in self._http_clients:
+                http_client.close()
+
+    def feed(self, operations: Iterable[VespaFeedOperation]) -> list[VespaFeedResult]:
+        """Executes all operations and returns one result per operation, in input order.
+        Never raises for failed operations, check `VespaFeedResult.ok` instead."""
+        limiter = AdaptiveConcurrencyLimiter(self.max_concurrency)
+        operation_source = iter(operations)
+        # look ahead so that small feeds don't occupy more workers than they have
+        # operations
+        head = list(islice(operation_source, limiter.limit))
+        if not head:
+            return []
+
+        operation_iter: Iterator[tuple[int, VespaFeedOperation]] = enumerate(
+            chain(head, operation_source)
+        )
+        iter_lock = threading.Lock()
+        results: dict[int, VespaFeedResult] = {}
+        source_errors: list[Exception] = []
+
+        def _next_operation() -> tuple[int, VespaFeedOperation] | None:
+            with iter_lock:
+                if source_errors:
+                    return None
+                try:
+                    return next(operation_iter, None)
+                except Exception as e:
+                    source_errors.append(e)
+                    return None
+
+        def _worker(worker_ind: int) -> None:
+            http_client = self._http_clients[worker_ind % len(self._http_clients)]
+            while True:
+                limiter.acquire()
+                try:
+                    item = _next_operation()
+                    if item is None:
+                        return
+                    ind, operation = item
+                    results[ind] = self._execute(operation, http_client, limiter)
+                finally:
+                    limiter.release()
+
+        workers = [
+            self._executor.submit(_worker, worker_ind)
+            for worker_ind in range(min(limiter.limit, len(head)))
+        ]
+        for worker in workers:
+            worker.result()
+
+        if source_errors:
+            raise source_errors[0]
+        return [results[ind] for ind in sorted(results)]
+
+    def _execute(
+        self,
+        operation: VespaFeedOperation,
+        http_client: httpx.Client,
+        limiter: AdaptiveConcurrencyLimiter,
+    ) -> VespaFeedResult:
+        error = ""
+        status_code: int | None = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(
+                    min(
+                        _RETRY_BASE_DELAY_SECONDS * 2 ** (attempt - 1),
+                        _RETRY_MAX_DELAY_SECONDS,
+                    )
+                )
+            try:
+                response = http_client.request(
+                    operation.method,
+                    operation.url,
+                    headers={"Content-Type": "application/json"}
+                    if operation.body is not None
+                    else None,
+                    json=operation.body,
+                )
+            except httpx.TransportError as e:
+                limiter.on_throttle()
+                status_code = None
+                error = f"{type(e).__name__}: {e}"
+                continue
+            except Exception as e:
+                return VespaFeedResult(
+                    operation=operation,
+                    status_code=None,
+                    error=f"{type(e).__name__}: {e}",
+                )
+
+            status_code = response.status_code
+            if status_code in _THROTTLE_STATUSES:
+                limiter.on_throttle()
+                error = response.text
+                if status_code == HTTPStatus.INSUFFICIENT_STORAGE:
+                    logger.warning(
+                        "Vespa returned 507 Insufficient Storage, this usually means "
+                        "you need to allocate more memory or disk space to the "
+                        "Vespa/index container."
+                    )
+                continue
+
+            limiter.on_success()
+            # 404 is a valid answer for existence checks and deletes
+            if response.is_success or status_code == HTTPStatus.NOT_FOUND:
+                return VespaFeedResult(operation=operation, status_code=status_code)
+            return VespaFeedResult(
+                operation=operation, status_code=status_code, error=response.text
+            )
+
+        return VespaFeedResult(
+            operation=operation,
+            status_code=status_code,
+            error=f"Gave up after {self.max_retries + 1} attempts: {error}",
+        )
+
+
+_feed_client: VespaFeedClient | None = None
+_feed_client_pid: int | None = None
+_feed_client_lock = threading.Lock()
+
+
+def get_vespa_feed_client() -> VespaFeedClient:
+    """Returns the shared feed client of this process, forked children build their own."""
+    global _feed_client, _feed_client_pid
+
+    pid = os.getpid()
+    with _feed_client_lock:
+        if _feed_client is None or _feed_client_pid != pid:
+            _feed_client = VespaFeedClient()
+            _feed_client_pid = pid
+        return _feed_client
+
+
+def raise_on_feed_failures(results: list[VespaFeedResult], action: str) -> None:
+    failures = [result for result in results if not result.ok]
+    if not failures:
+        return
+
+    for failure in failures[:10]:
+        logger.error(
+            f"Failed to {action} document '{failure.operation.document_id}' "
+            f"({failure.operation.method} {failure.operation.url}): "
+            f"status={failure.status_code} error={failure.error}"
+        )
+    failed_doc_ids = sorted({failure.operation.document_id for failure in failures})
+    raise RuntimeError(
+        f"Failed to {action} {len(failures)} of {len(results)} Vespa operations "
+        f"for documents: {failed_doc_ids[:20]}"
+    )
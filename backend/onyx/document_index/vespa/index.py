@@ -17,6 +17,7 @@ import httpx  # type: ignore
 import requests  # type: ignore
 
 from onyx.configs.app_configs import DOCUMENT_INDEX_NAME
+from onyx.configs.app_configs import ENABLE_VESPA_BULK_FEED
 from onyx.configs.chat_configs import DOC_TIME_DECAY
 from onyx.configs.chat_configs import NUM_RETURNED_HITS
 from onyx.configs.chat_configs import TITLE_CONTENT_RATIO
@@ -37,12 +38,24 @@ from onyx.document_index.vespa.chunk_retrieval import (
     parallel_visit_api_retrieval,
 )
 from onyx.document_index.vespa.chunk_retrieval import query_vespa
+from onyx.document_index.vespa.deletion import delete_vespa_chunks
 from onyx.document_index.vespa.deletion import delete_vespa_docs
+from onyx.document_index.vespa.deletion import feed_delete_vespa_chunks
+from onyx.document_index.vespa.deletion import feed_delete_vespa_docs
+from onyx.document_index.vespa.feed import get_vespa_feed_client
+from onyx.document_index.vespa.feed import raise_on_feed_failures
+from onyx.document_index.vespa.feed import VespaFeedOperation
 from onyx.document_index.vespa.indexing_utils import batch_index_vespa_chunks
 from onyx.document_index.vespa.indexing_utils import clean_chunk_id_copy
+from onyx.document_index.vespa.indexing_utils import (
+    feed_get_existing_documents_from_chunks,
+)
+from onyx.document_index.vespa.indexing_utils import feed_index_vespa_chunks
 from onyx.document_index.vespa.indexing_utils import (
     get_existing_documents_from_chunks,
 )
+from onyx.document_index.vespa.indexing_utils import get_stale_vespa_chunk_ids
+from onyx.document_index.vespa.indexing_utils import vespa_get_updated_at_attribute
 from onyx.document_index.vespa.shared_utils.utils import get_vespa_http_client
 from onyx.document_index.vespa.shared_utils.utils import (
     replace_invalid_doc_id_characters,
@@ -50,12 +63,16 @@ from onyx.document_index.vespa.shared_utils.utils import (
 from onyx.document_index.vespa.shared_utils.vespa_request_builders import (
     build_vespa_filters,
 )
+from onyx.document_index.vespa.shared_utils.vespa_request_builders import (
+    build_vespa_query_params,
+)
 from onyx.document_index.vespa_constants import ACCESS_CONTROL_LIST
 from onyx.document_index.vespa_constants import BATCH_SIZE
 from onyx.document_index.vespa_constants import BOOST
 from onyx.document_index.vespa_constants import CONTENT_SUMMARY
 from onyx.document_index.vespa_constants import DANSWER_CHUNK_REPLACEMENT_PAT
 from onyx.document_index.vespa_constants import DATE_REPLACEMENT
+from onyx.document_index.vespa_constants import DOC_UPDATED_AT
 from onyx.document_index.vespa_constants import DOCUMENT_ID_ENDPOINT
 from onyx.document_index.vespa_constants import DOCUMENT_REPLACEMENT_PAT
 from onyx.document_index.vespa_constants import DOCUMENT_SETS
@@ -307,6 +324,7 @@ class VespaIndex(DocumentIndex):
         self,
         chunks: list[DocMetadataAwareIndexChunk],
         fresh_index: bool = False,
+        doc_id_to_previous_chunk_cnt: dict[str, int] | None = None,
     ) -> set[DocumentInsertionRecord]:
         """Receive a list of chunks from a batch of documents and index the chunks into Vespa along
         with updating the associated permissions. Assumes that a document will not be split into
@@ -314,49 +332,95 @@ class VespaIndex(DocumentIndex):
         chunks will be kept"""
         # IMPORTANT: This must be done one index at a time, do not use secondary index here
         cleaned_chunks = [clean_chunk_id_copy(chunk) for chunk in chunks]
+        all_doc_ids = {chunk.source_document.id for chunk in cleaned_chunks}
 
-        existing_docs: set[str] = set()
+        # Documents with a known previous chunk count are overwritten in place and only
+        # their chunks past the new count are deleted afterwards. The others need the
+        # existence check and to have all of their chunks deleted prior to indexing as
+        # the document size (num chunks) may have shrunk
+        doc_id_to_previous_chunk_cnt = (
+            {
+                replace_invalid_doc_id_characters(doc_id): chunk_cnt
+                for doc_id, chunk_cnt in doc_id_to_previous_chunk_cnt.items()
+            }
+            if doc_id_to_previous_chunk_cnt and not fresh_index
+            else {}
+        )
+        unknown_size_first_chunks = [
+            chunk
+            for chunk in cleaned_chunks
+            if chunk.chunk_id == 0
+            and chunk.source_document.id not in doc_id_to_previous_chunk_cnt
+        ]
+        stale_chunk_ids = get_stale_vespa_chunk_ids(
+            cleaned_chunks, doc_id_to_previous_chunk_cnt
+        )
 
-        # NOTE: using `httpx` here since `requests` doesn't support HTTP2. This is beneficial for
-        # indexing / updates / deletes since we have to make a large volume of requests.
-        with (
-            concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS) as executor,
-            get_vespa_http_client() as http_client,
-        ):
-            if not fresh_index:
-                # Check for existing documents, existing documents need to have all of their chunks deleted
-                # prior to indexing as the document size (num chunks) may have shrunk
-                first_chunks = [
-                    chunk for chunk in cleaned_chunks if chunk.chunk_id == 0
-                ]
-                for chunk_batch in batch_generator(first_chunks, BATCH_SIZE):
-                    existing_docs.update(
-                        get_existing_documents_from_chunks(
-                            chunks=chunk_batch,
+        existing_docs: set[str] = {
+            doc_id for doc_id in all_doc_ids if doc_id in doc_id_to_previous_chunk_cnt
+        }
+
+        if ENABLE_VESPA_BULK_FEED:
+            existing_docs.update(
+                self._bulk_feed_index(
+                    cleaned_chunks=cleaned_chunks,
+                    unknown_size_first_chunks=(
+                        [] if fresh_index else unknown_size_first_chunks
+                    ),
+                    stale_chunk_ids=stale_chunk_ids,
+                )
+            )
+        else:
+            # NOTE: using `httpx` here since `requests` doesn't support HTTP2. This is beneficial for
+            # indexing / updates / deletes since we have to make a large volume of requests.
+            with (
+                concurrent.futures.ThreadPoolExecutor(
+                    max_workers=NUM_THREADS
+                ) as executor,
+                get_vespa_http_client() as http_client,
+            ):
+                if not fresh_index:
+                    unknown_size_existing_docs: set[str] = set()
+                    for chunk_batch in batch_generator(
+                        unknown_size_first_chunks, BATCH_SIZE
+                    ):
+                        unknown_size_existing_docs.update(
+                            get_existing_documents_from_chunks(
+                                chunks=chunk_batch,
+                                index_name=self.index_name,
+                                executor=executor,
+                            )
+                        )
+
+                    for doc_id_batch in batch_generator(
+                        unknown_size_existing_docs, BATCH_SIZE
+                    ):
+                        delete_vespa_docs(
+                            document_ids=doc_id_batch,
                             index_name=self.index_name,
                             http_client=http_client,
                             executor=executor,
                         )
-                    )
+                    existing_docs.update(unknown_size_existing_docs)
 
-                for doc_id_batch in batch_generator(existing_docs, BATCH_SIZE):
-                    delete_vespa_docs(
-                        document_ids=doc_id_batch,
+                for chunk_batch in batch_generator(cleaned_chunks, BATCH_SIZE):
+                    batch_index_vespa_chunks(
+                        chunks=chunk_batch,
                         index_name=self.index_name,
                         http_client=http_client,
+                        multitenant=self.multitenant,
                         executor=executor,
                     )
 
-            for chunk_batch in batch_generator(cleaned_chunks, BATCH_SIZE):
-                batch_index_vespa_chunks(
-                    chunks=chunk_batch,
-                    index_name=self.index_name,
-                    http_client=http_client,
-                    multitenant=self.multitenant,
-                    executor=executor,
-                )
-
-        all_doc_ids = {chunk.source_document.id for chunk in cleaned_chunks}
+                # only after the new chunks are written so that the document is never
+                # missing from the index
+                if stale_chunk_ids:
+                    delete_vespa_chunks(
+                        doc_chunk_ids=stale_chunk_ids,
+                        index_name=self.index_name,
+                        http_client=http_client,
+                        executor=executor,
+                    )
 
         return {
             DocumentInsertionRecord(
@@ -366,6 +430,45 @@ class VespaIndex(DocumentIndex):
             for doc_id in all_doc_ids
         }
 
+    def _bulk_feed_index(
+        self,
+        cleaned_chunks: list[DocMetadataAwareIndexChunk],
+        unknown_size_first_chunks: list[DocMetadataAwareIndexChunk],
+        stale_chunk_ids: dict[str, list[str]],
+    ) -> set[str]:
+        """Same flow as the thread pool based path of `index`, but all operations are
+        streamed through the bulk feed client. Returns the ids of the documents of unknown
+        size that already existed."""
+        existing_docs: set[str] = set()
+        feed_client = get_vespa_feed_client()
+        if unknown_size_first_chunks:
+            existing_docs = feed_get_existing_documents_from_chunks(
+                chunks=unknown_size_first_chunks,
+                index_name=self.index_name,
+                feed_client=feed_client,
+            )
+            if existing_docs:
+                feed_delete_vespa_docs(
+                    document_ids=list(existing_docs),
+                    index_name=self.index_name,
+                    feed_client=feed_client,
+                )
+
+        feed_index_vespa_chunks(
+            chunks=cleaned_chunks,
+            index_name=self.index_name,
+            feed_client=feed_client,
+            multitenant=self.multitenant,
+        )
+
+        if stale_chunk_ids:
+            feed_delete_vespa_chunks(
+                doc_chunk_ids=stale_chunk_ids,
+                index_name=self.index_name,
+                feed_client=feed_client,
+            )
+        return existing_docs
+
     @staticmethod
     def _apply_updates_batched(
         updates: list[_VespaUpdateRequest],
@@ -385,6 +488,20 @@ class VespaIndex(DocumentIndex):
                 json=update.update_request,
             )
 
+        if ENABLE_VESPA_BULK_FEED:
+            feed_client = get_vespa_feed_client()
+            results = feed_client.feed(
+                VespaFeedOperation(
+                    method="PUT",
+                    url=update.url,
+                    document_id=update.document_id,
+                    body=update.update_request,
+                )
+                for update in updates
+            )
+            raise_on_feed_failures(results, action="update")
+            return
+
         # NOTE: using `httpx` here since `requests` doesn't support HTTP2. This is beneficient for
         # indexing / updates / deletes since we have to make a large volume of requests.
 
@@ -499,19 +616,8 @@ class VespaIndex(DocumentIndex):
             time.monotonic() - update_start,
         )
 
-    def update_single(self, doc_id: str, fields: VespaDocumentFields) -> int:
-        """Note: if the document id does not exist, the update will be a no-op and the
-        function will complete with no errors or exceptions.
-        Handle other exceptions if you wish to implement retry behavior
-        """
-
-        total_chunks_updated = 0
-
-        # Handle Vespa character limitations
-        # Mutating update_request but it's not used later anyway
-        normalized_doc_id = replace_invalid_doc_id_characters(doc_id)
-
-        # Build the _VespaUpdateRequest objects
+    @staticmethod
+    def _build_update_dict(fields: VespaDocumentFields) -> dict[str, dict]:
         update_dict: dict[str, dict] = {"fields": {}}
         if fields.boost is not None:
             update_dict["fields"][BOOST] = {"assign": fields.boost}
@@ -525,7 +631,25 @@ class VespaIndex(DocumentIndex):
             }
         if fields.hidden is not None:
             update_dict["fields"][HIDDEN] = {"assign": fields.hidden}
+        if fields.doc_updated_at is not None:
+            update_dict["fields"][DOC_UPDATED_AT] = {
+                "assign": vespa_get_updated_at_attribute(fields.doc_updated_at)
+            }
+        return update_dict
+
+    def update_single(self, doc_id: str, fields: VespaDocumentFields) -> int:
+        """Note: if the document id does not exist, the update will be a no-op and the
+        function will complete with no errors or exceptions.
+        Handle other exceptions if you wish to implement retry behavior
+        """
+
+        total_chunks_updated = 0
+
+        # Handle Vespa character limitations
+        # Mutating update_request but it's not used later anyway
+        normalized_doc_id = replace_invalid_doc_id_characters(doc_id)
 
+        update_dict = self._build_update_dict(fields)
         if not update_dict["fields"]:
             logger.error("Update request received but nothing to update")
             return 0
@@ -583,18 +707,85 @@ class VespaIndex(DocumentIndex):
 
         return total_chunks_updated
 
+    def update_many(self, doc_id_to_fields: dict[str, VespaDocumentFields]) -> set[str]:
+        if not doc_id_to_fields:
+            return set()
+
+        normalized_id_to_doc_id = {
+            replace_invalid_doc_id_characters(doc_id): doc_id
+            for doc_id in doc_id_to_fields
+        }
+        index_names = [self.index_name]
+        if self.secondary_index_name:
+            index_names.append(self.secondary_index_name)
+
+        # the chunk ids of all documents are looked up concurrently, a failed lookup
+        # fails the whole update since the document would otherwise look missing
+        doc_index_to_chunk_ids: dict[tuple[str, str], list[str]] = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS) as executor:
+            future_to_doc_index = {
+                executor.submit(
+                    get_all_vespa_ids_for_document_id,
+                    document_id=normalized_id,
+                    index_name=index_name,
+                    filters=None,
+                    get_large_chunks=True,
+                ): (normalized_id, index_name)
+                for index_name in index_names
+                for normalized_id in normalized_id_to_doc_id
+            }
+            for future in concurrent.futures.as_completed(future_to_doc_index):
+                doc_index_to_chunk_ids[future_to_doc_index[future]] = future.result()
+
+        missing_doc_ids: set[str] = set()
+        updates: list[_VespaUpdateRequest] = []
+        for normalized_id, doc_id in normalized_id_to_doc_id.items():
+            if not doc_index_to_chunk_ids[(normalized_id, self.index_name)]:
+                missing_doc_ids.add(doc_id)
+                continue
+
+            update_dict = self._build_update_dict(doc_id_to_fields[doc_id])
+            if not update_dict["fields"]:
+                continue
+            for index_name in index_names:
+                for chunk_id in doc_index_to_chunk_ids[(normalized_id, index_name)]:
+                    updates.append(
+                        _VespaUpdateRequest(
+                            document_id=normalized_id,
+                            url=f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{chunk_id}",
+                            update_request=update_dict,
+                        )
+                    )
+
+        self._apply_updates_batched(updates)
+        logger.debug(
+            f"VespaIndex.update_many: docs={len(doc_id_to_fields)} "
+            f"chunks_updated={len(updates)} missing={len(missing_doc_ids)}"
+        )
+        return missing_doc_ids
+
     def delete(self, doc_ids: list[str]) -> None:
         logger.info(f"Deleting {len(doc_ids)} documents from Vespa")
 
         doc_ids = [replace_invalid_doc_id_characters(doc_id) for doc_id in doc_ids]
 
+        index_names = [self.index_name]
+        if self.secondary_index_name:
+            index_names.append(self.secondary_index_name)
+
+        if ENABLE_VESPA_BULK_FEED:
+            feed_client = get_vespa_feed_client()
+            for index_name in index_names:
+                feed_delete_vespa_docs(
+                    document_ids=doc_ids,
+                    index_name=index_name,
+                    feed_client=feed_client,
+                )
+            return
+
         # NOTE: using `httpx` here since `requests` doesn't support HTTP2. This is beneficial for
         # indexing / updates / deletes since we have to make a large volume of requests.
         with get_vespa_http_client() as http_client:
-            index_names = [self.index_name]
-            if self.secondary_index_name:
-                index_names.append(self.secondary_index_name)
-
             for index_name in index_names:
                 delete_vespa_docs(
                     document_ids=doc_ids, index_name=index_name, http_client=http_client
@@ -713,20 +904,22 @@ class VespaIndex(DocumentIndex):
 
         logger.debug(f"Query YQL: {yql}")
 
-        params: dict[str, str | int | float] = {
-            "yql": yql,
-            "query": final_query,
-            "input.query(query_embedding)": str(query_embedding),
-            "input.query(decay_factor)": str(DOC_TIME_DECAY * time_decay_multiplier),
-            "input.query(alpha)": hybrid_alpha,
-            "input.query(title_content_ratio)": title_content_ratio
-            if title_content_ratio is not None
-            else TITLE_CONTENT_RATIO,
-            "hits": num_to_retrieve,
-            "offset": offset,
-            "ranking.profile": f"hybrid_search{len(query_embedding)}",
-            "timeout": VESPA_TIMEOUT,
-        }
+        params = build_vespa_query_params(
+            yql=yql,
+            hits=num_to_retrieve,
+            query=final_query,
+            offset=offset,
+            ranking_profile=f"hybrid_search{len(query_embedding)}",
+            query_embedding=query_embedding,
+            inputs={
+                "decay_factor": str(DOC_TIME_DECAY * time_decay_multiplier),
+                "alpha": hybrid_alpha,
+                "title_content_ratio": title_content_ratio
+                if title_content_ratio is not None
+                else TITLE_CONTENT_RATIO,
+            },
+            timeout=VESPA_TIMEOUT,
+        )
 
         return query_vespa(params)
 
@@ -748,14 +941,14 @@ class VespaIndex(DocumentIndex):
             + f'or ({{defaultIndex: "{CONTENT_SUMMARY}"}}userInput(@query)))'
         )
 
-        params: dict[str, str | int] = {
-            "yql": yql,
-            "query": query,
-            "hits": num_to_retrieve,
-            "offset": 0,
-            "ranking.profile": "admin_search",
-            "timeout": VESPA_TIMEOUT,
-        }
+        params = build_vespa_query_params(
+            yql=yql,
+            hits=num_to_retrieve,
+            query=query,
+            offset=0,
+            ranking_profile="admin_search",
+            timeout=VESPA_TIMEOUT,
+        )
 
         return query_vespa(params)
 
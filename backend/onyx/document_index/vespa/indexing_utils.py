@@ -3,14 +3,22 @@ import json
 from datetime import datetime
 from datetime import timezone
 from http import HTTPStatus
+from typing import Any
 
 import httpx
 from retry import retry
 
+from onyx.configs.app_configs import LARGE_CHUNK_RATIO
 from onyx.connectors.cross_connector_utils.miscellaneous_utils import (
     get_experts_stores_representations,
 )
 from onyx.document_index.document_index_utils import get_uuid_from_chunk
+from onyx.document_index.document_index_utils import get_uuid_from_chunk_info
+from onyx.document_index.vespa.feed import raise_on_feed_failures
+from onyx.document_index.vespa.feed import VespaFeedClient
+from onyx.document_index.vespa.feed import VespaFeedOperation
+from onyx.document_index.vespa.read_client import VESPA_DOCUMENT_ENDPOINT_LABEL
+from onyx.document_index.vespa.read_client import vespa_read_request
 from onyx.document_index.vespa.shared_utils.utils import remove_invalid_unicode_chars
 from onyx.document_index.vespa.shared_utils.utils import (
     replace_invalid_doc_id_characters,
@@ -51,28 +59,28 @@ logger = setup_logger()
 def _does_document_exist(
     doc_chunk_id: str,
     index_name: str,
-    http_client: httpx.Client,
 ) -> bool:
     """Returns whether the document already exists and the users/group whitelists
     Specifically in this case, document refers to a vespa document which is equivalent to a Onyx
     chunk. This checks for whether the chunk exists already in the index"""
     doc_url = f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{doc_chunk_id}"
-    doc_fetch_response = http_client.get(doc_url)
-    if doc_fetch_response.status_code == 404:
-        return False
+    try:
+        vespa_read_request("GET", doc_url, VESPA_DOCUMENT_ENDPOINT_LABEL)
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            return False
 
-    if doc_fetch_response.status_code != 200:
         logger.debug(f"Failed to check for document with URL {doc_url}")
         raise RuntimeError(
             f"Unexpected fetch document by ID value from Vespa "
-            f"with error {doc_fetch_response.status_code}"
+            f"with error {e.response.status_code}"
             f"Index name: {index_name}"
             f"Doc chunk id: {doc_chunk_id}"
         )
     return True
 
 
-def _vespa_get_updated_at_attribute(t: datetime | None) -> int | None:
+def vespa_get_updated_at_attribute(t: datetime | None) -> int | None:
     if not t:
         return None
 
@@ -85,7 +93,6 @@ def _vespa_get_updated_at_attribute(t: datetime | None) -> int | None:
 def get_existing_documents_from_chunks(
     chunks: list[DocMetadataAwareIndexChunk],
     index_name: str,
-    http_client: httpx.Client,
     executor: concurrent.futures.ThreadPoolExecutor | None = None,
 ) -> set[str]:
     external_executor = True
@@ -101,7 +108,6 @@ def get_existing_documents_from_chunks(
                 _does_document_exist,
                 str(get_uuid_from_chunk(chunk)),
                 index_name,
-                http_client,
             ): chunk
             for chunk in chunks
         }
@@ -118,20 +124,12 @@ def get_existing_documents_from_chunks(
     return document_ids
 
 
-@retry(tries=5, delay=1, backoff=2)
-def _index_vespa_chunk(
-    chunk: DocMetadataAwareIndexChunk,
-    index_name: str,
-    http_client: httpx.Client,
-    multitenant: bool,
-) -> None:
-    json_header = {
-        "Content-Type": "application/json",
-    }
+def build_vespa_chunk_fields(
+    chunk: DocMetadataAwareIndexChunk, multitenant: bool
+) -> dict[str, Any]:
     document = chunk.source_document
 
     # No minichunk documents in vespa, minichunk vectors are stored in the chunk itself
-    vespa_chunk_id = str(get_uuid_from_chunk(chunk))
     embeddings = chunk.embeddings
 
     embeddings_name_vector_map = {"full_chunk": embeddings.full_embedding}
@@ -168,7 +166,7 @@ def _index_vespa_chunk(
         METADATA_SUFFIX: chunk.metadata_suffix_keyword,
         EMBEDDINGS: embeddings_name_vector_map,
         TITLE_EMBEDDING: chunk.title_embedding,
-        DOC_UPDATED_AT: _vespa_get_updated_at_attribute(document.doc_updated_at),
+        DOC_UPDATED_AT: vespa_get_updated_at_attribute(document.doc_updated_at),
         PRIMARY_OWNERS: get_experts_stores_representations(document.primary_owners),
         SECONDARY_OWNERS: get_experts_stores_representations(document.secondary_owners),
         # the only `set` vespa has is `weightedset`, so we have to give each
@@ -184,6 +182,23 @@ def _index_vespa_chunk(
         if chunk.tenant_id:
             vespa_document_fields[TENANT_ID] = chunk.tenant_id
 
+    return vespa_document_fields
+
+
+@retry(tries=5, delay=1, backoff=2)
+def _index_vespa_chunk(
+    chunk: DocMetadataAwareIndexChunk,
+    index_name: str,
+    http_client: httpx.Client,
+    multitenant: bool,
+) -> None:
+    json_header = {
+        "Content-Type": "application/json",
+    }
+    document = chunk.source_document
+    vespa_chunk_id = str(get_uuid_from_chunk(chunk))
+    vespa_document_fields = build_vespa_chunk_fields(chunk, multitenant)
+
     vespa_url = f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{vespa_chunk_id}"
     logger.debug(f'Indexing to URL "{vespa_url}"')
     res = http_client.post(
@@ -235,6 +250,97 @@ def batch_index_vespa_chunks(
             executor.shutdown(wait=True)
 
 
+def feed_get_existing_documents_from_chunks(
+    chunks: list[DocMetadataAwareIndexChunk],
+    index_name: str,
+    feed_client: VespaFeedClient,
+) -> set[str]:
+    """Bulk feed equivalent of `get_existing_documents_from_chunks`."""
+    results = feed_client.feed(
+        VespaFeedOperation(
+            method="GET",
+            url=f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{get_uuid_from_chunk(chunk)}",
+            document_id=chunk.source_document.id,
+        )
+        for chunk in chunks
+    )
+    raise_on_feed_failures(results, action="check existence of")
+    return {
+        result.operation.document_id
+        for result in results
+        if result.status_code == HTTPStatus.OK
+    }
+
+
+def feed_index_vespa_chunks(
+    chunks: list[DocMetadataAwareIndexChunk],
+    index_name: str,
+    feed_client: VespaFeedClient,
+    multitenant: bool,
+) -> None:
+    """Bulk feed equivalent of `batch_index_vespa_chunks`. The operations are built
+    lazily so only the in-flight ones are held in memory as JSON bodies."""
+    results = feed_client.feed(
+        VespaFeedOperation(
+            method="POST",
+            url=f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{get_uuid_from_chunk(chunk)}",
+            document_id=chunk.source_document.id,
+            body={"fields": build_vespa_chunk_fields(chunk, multitenant)},
+        )
+        for chunk in chunks
+    )
+    raise_on_feed_failures(results, action="index")
+
+
+def _get_possible_vespa_chunk_ids(document_id: str, chunk_count: int) -> set[str]:
+    """All chunk ids a document with `chunk_count` regular chunks can have in the index,
+    including the large chunks (which may or may not have been generated)."""
+    chunk_ids = {
+        str(get_uuid_from_chunk_info(document_id=document_id, chunk_id=chunk_id))
+        for chunk_id in range(chunk_count)
+    }
+    # mirrors `generate_large_chunks` in the chunker
+    for large_chunk_id, start in enumerate(range(0, chunk_count, LARGE_CHUNK_RATIO)):
+        reference_ids = list(range(start, min(start + LARGE_CHUNK_RATIO, chunk_count)))
+        if len(reference_ids) > 1:
+            chunk_ids.add(
+                str(
+                    get_uuid_from_chunk_info(
+                        document_id=document_id,
+                        chunk_id=large_chunk_id,
+                        large_chunk_reference_ids=reference_ids,
+                    )
+                )
+            )
+    return chunk_ids
+
+
+def get_stale_vespa_chunk_ids(
+    chunks: list[DocMetadataAwareIndexChunk],
+    doc_id_to_previous_chunk_cnt: dict[str, int],
+) -> dict[str, list[str]]:
+    """For documents that are being re-indexed, returns the ids of the chunks from the
+    previous indexing that are not overwritten by the new chunks (i.e. the trailing ones
+    if the document shrunk). Deleting a chunk id that does not exist is a no-op."""
+    doc_id_to_new_chunk_ids: dict[str, set[str]] = {}
+    for chunk in chunks:
+        doc_id_to_new_chunk_ids.setdefault(chunk.source_document.id, set()).add(
+            str(get_uuid_from_chunk(chunk))
+        )
+
+    doc_id_to_stale_chunk_ids: dict[str, list[str]] = {}
+    for doc_id, new_chunk_ids in doc_id_to_new_chunk_ids.items():
+        previous_chunk_cnt = doc_id_to_previous_chunk_cnt.get(doc_id)
+        if not previous_chunk_cnt:
+            continue
+        stale_chunk_ids = (
+            _get_possible_vespa_chunk_ids(doc_id, previous_chunk_cnt) - new_chunk_ids
+        )
+        if stale_chunk_ids:
+            doc_id_to_stale_chunk_ids[doc_id] = sorted(stale_chunk_ids)
+    return doc_id_to_stale_chunk_ids
+
+
 def clean_chunk_id_copy(
     chunk: DocMetadataAwareIndexChunk,
 ) -> DocMetadataAwareIndexChunk:
@@ -0,0 +1,78 @@
+"""Shared HTTP/2 client for reads from Vespa (search queries, visits and document
+fetches).
+
+A single client per process keeps a bounded pool of warm connections that all threads
+share. The client is never closed or swapped out because of a failed request, other
+threads may still have requests in flight on it. A connection that fails (e.g. Vespa
+restarted) is dropped from the pool by httpx itself and replaced on the next request.
+"""
+import os
+import threading
+import time
+from typing import Any
+
+import httpx
+from prometheus_client import Histogram
+
+from onyx.configs.app_configs import VESPA_READ_POOL_KEEPALIVE_EXPIRY_SECONDS
+from onyx.configs.app_configs import VESPA_READ_POOL_MAX_CONNECTIONS
+from onyx.document_index.vespa.shared_utils.utils import get_vespa_http_client
+
+_VESPA_READ_LATENCY = Histogram(
+    "onyx_vespa_read_request_latency_seconds",
+    "Latency of read requests to Vespa",
+    ["endpoint", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 15),
+)
+
+# endpoint labels
+VESPA_SEARCH_ENDPOINT_LABEL = "search"
+VESPA_VISIT_ENDPOINT_LABEL = "visit"
+VESPA_DOCUMENT_ENDPOINT_LABEL = "document"
+
+_client: httpx.Client | None = None
+_client_pid: int | None = None
+_client_lock = threading.Lock()
+
+
+def get_vespa_read_client() -> httpx.Client:
+    """Returns the shared client of this process, forked children build their own."""
+    global _client, _client_pid
+
+    pid = os.getpid()
+    client = _client
+    if client is not None and _client_pid == pid and not client.is_closed:
+        return client
+
+    with _client_lock:
+        if _client is None or _client_pid != pid or _client.is_closed:
+            _client = get_vespa_http_client(
+                limits=httpx.Limits(
+                    max_connections=VESPA_READ_POOL_MAX_CONNECTIONS,
+                    max_keepalive_connections=VESPA_READ_POOL_MAX_CONNECTIONS,
+                    keepalive_expiry=VESPA_READ_POOL_KEEPALIVE_EXPIRY_SECONDS,
+                )
+            )
+            _client_pid = pid
+        return _client
+
+
+def vespa_read_request(
+    method: str, url: str, endpoint_label: str, **kwargs: Any
+) -> httpx.Response:
+    """Sends a request over the shared client and raises for non 2xx responses."""
+    client = get_vespa_read_client()
+    start = time.monotonic()
+    try:
+        response = client.request(method, url, **kwargs)
+    except httpx.TransportError:
+        _VESPA_READ_LATENCY.labels(endpoint_label, "error").observe(
+            time.monotonic() - start
+        )
+        raise
+
+    _VESPA_READ_LATENCY.labels(endpoint_label, str(response.status_code)).observe(
+        time.monotonic() - start
+    )
+    response.raise_for_status()
+    return response
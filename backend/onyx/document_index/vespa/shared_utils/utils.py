@@ -55,7 +55,9 @@ def remove_invalid_unicode_chars(text: str) -> str:
     return _illegal_xml_chars_RE.sub("", text)
 
 
-def get_vespa_http_client(no_timeout: bool = False) -> httpx.Client:
+def get_vespa_http_client(
+    no_timeout: bool = False, limits: httpx.Limits | None = None
+) -> httpx.Client:
     """
     Configure and return an HTTP client for communicating with Vespa,
     including authentication if needed.
@@ -68,4 +70,7 @@ def get_vespa_http_client(no_timeout: bool = False) -> httpx.Client:
         verify=False if not MANAGED_VESPA else True,
         timeout=None if no_timeout else VESPA_REQUEST_TIMEOUT,
         http2=True,
+        # httpx defaults unless specified
+        limits=limits
+        or httpx.Limits(max_connections=100, max_keepalive_connections=20),
     )
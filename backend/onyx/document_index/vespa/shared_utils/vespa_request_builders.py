@@ -2,6 +2,9 @@ from datetime import datetime
 from datetime import timedelta
 from datetime import timezone
 
+import numpy
+
+from onyx.configs.app_configs import VESPA_QUERY_TENSOR_FORMAT
 from onyx.configs.constants import INDEX_SEPARATOR
 from onyx.context.search.models import IndexFilters
 from onyx.document_index.interfaces import VespaChunkRequest
@@ -15,6 +18,7 @@ from onyx.document_index.vespa_constants import METADATA_LIST
 from onyx.document_index.vespa_constants import SOURCE_TYPE
 from onyx.document_index.vespa_constants import TENANT_ID
 from onyx.utils.logger import setup_logger
+from shared_configs.model_server_models import Embedding
 
 logger = setup_logger()
 
@@ -98,3 +102,49 @@ def build_vespa_id_based_retrieval_yql(
 
     id_based_retrieval_yql_section += ")"
     return id_based_retrieval_yql_section
+
+
+def encode_query_tensor(
+    embedding: Embedding, tensor_format: str = VESPA_QUERY_TENSOR_FORMAT
+) -> str:
+    """Serializes a query embedding for a `tensor<float>(x[N])` query input, see
+    VESPA_QUERY_TENSOR_FORMAT for the formats"""
+    if tensor_format == "list":
+        return str(embedding)
+
+    values = numpy.asarray(embedding, dtype=numpy.float32)
+    if tensor_format == "hex":
+        # big endian IEEE 754, which is what Vespa expects for hex tensor values
+        hex_values = values.astype(">f4").tobytes().hex().upper()
+        return f"tensor<float>(x[{len(values)}]):{hex_values}"
+
+    # str of a numpy float32 is the shortest decimal that round trips to that float32
+    return "[" + ",".join(str(value) for value in values) + "]"
+
+
+def build_vespa_query_params(
+    yql: str,
+    hits: int,
+    query: str | None = None,
+    offset: int | None = None,
+    ranking_profile: str | None = None,
+    query_embedding: Embedding | None = None,
+    inputs: dict[str, str | int | float] | None = None,
+    timeout: str | None = None,
+) -> dict[str, str | int | float]:
+    """Builds the body of a Vespa search request. Inputs are the rank profile inputs by
+    name, the query embedding is always passed as `query(query_embedding)`."""
+    params: dict[str, str | int | float] = {"yql": yql, "hits": hits}
+    if query is not None:
+        params["query"] = query
+    if query_embedding is not None:
+        params["input.query(query_embedding)"] = encode_query_tensor(query_embedding)
+    for name, value in (inputs or {}).items():
+        params[f"input.query({name})"] = value
+    if offset is not None:
+        params["offset"] = offset
+    if ranking_profile is not None:
+        params["ranking.profile"] = ranking_profile
+    if timeout is not None:
+        params["timeout"] = timeout
+    return params
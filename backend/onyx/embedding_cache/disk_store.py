@@ -0,0 +1,123 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+
+from onyx.embedding_cache.interface import StoreBackedEmbeddingCache
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+_DB_FILE_NAME = "embedding_cache.sqlite3"
+# when the cache is over its size limit, evict down to this fraction of the limit so
+# that we don't evict on every single write
+_EVICTION_TARGET_RATIO = 0.9
+_EVICTION_BATCH_SIZE = 1000
+# sqlite limits the number of bound parameters per statement
+_MAX_PARAMS_PER_QUERY = 500
+
+
+class DiskEmbeddingCache(StoreBackedEmbeddingCache):
+    """Embedding cache backed by a local SQLite file. Safe to share between threads, and
+    between processes on the same host (e.g. multiple indexing workers)."""
+
+    backend_name = "disk"
+
+    def __init__(self, cache_dir: str, max_size_bytes: int) -> None:
+        super().__init__()
+        os.makedirs(cache_dir, exist_ok=True)
+        self.max_size_bytes = max_size_bytes
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            os.path.join(cache_dir, _DB_FILE_NAME),
+            timeout=30,
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embedding_cache ("
+            "key TEXT PRIMARY KEY, "
+            "embedding BLOB NOT NULL, "
+            "size_bytes INTEGER NOT NULL, "
+            "last_accessed REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_embedding_cache_last_accessed "
+            "ON embedding_cache (last_accessed)"
+        )
+        # Running estimate of the cache size so we don't have to scan the table on every
+        # write. Overestimates on overwrites / writes from other processes are corrected
+        # whenever it crosses the limit and the exact size is computed.
+        self._approx_size_bytes = self._get_size_bytes()
+
+    def _load(self, keys: list[str]) -> dict[str, bytes]:
+        found: dict[str, bytes] = {}
+        now = time.time()
+        with self._lock:
+            for i in range(0, len(keys), _MAX_PARAMS_PER_QUERY):
+                key_batch = keys[i : i + _MAX_PARAMS_PER_QUERY]
+                placeholders = ",".join("?" * len(key_batch))
+                rows = self._conn.execute(
+                    f"SELECT key, embedding FROM embedding_cache WHERE key IN ({placeholders})",
+                    key_batch,
+                ).fetchall()
+                found.update({key: embedding for key, embedding in rows})
+
+                # keep track of usage for LRU eviction
+                self._conn.execute(
+                    f"UPDATE embedding_cache SET last_accessed = ? WHERE key IN ({placeholders})",
+                    [now, *key_batch],
+                )
+        return found
+
+    def _store(self, entries: dict[str, bytes]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embedding_cache (key, embedding, size_bytes, last_accessed) "
+                "VALUES (?, ?, ?, ?)",
+                [(key, data, len(data), now) for key, data in entries.items()],
+            )
+            self._approx_size_bytes += sum(len(data) for data in entries.values())
+            if self._approx_size_bytes > self.max_size_bytes:
+                self._evict_if_needed()
+
+    def _get_size_bytes(self) -> int:
+        return self._get_count_and_size_bytes()[1]
+
+    def _get_count_and_size_bytes(self) -> tuple[int, int]:
+        count, size = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM embedding_cache"
+        ).fetchone()
+        return int(count), int(size)
+
+    def _evict_if_needed(self) -> None:
+        count, size = self._get_count_and_size_bytes()
+        self._approx_size_bytes = size
+        if size <= self.max_size_bytes:
+            return
+
+        target = int(self.max_size_bytes * _EVICTION_TARGET_RATIO)
+        num_evicted = 0
+        while size > target and count > 0:
+            # entries are roughly the same size (same model => same dimension)
+            num_to_evict = min(
+                math.ceil((size - target) / (size / count)), _EVICTION_BATCH_SIZE
+            )
+            cursor = self._conn.execute(
+                "DELETE FROM embedding_cache WHERE key IN ("
+                "SELECT key FROM embedding_cache ORDER BY last_accessed LIMIT ?)",
+                (num_to_evict,),
+            )
+            if cursor.rowcount <= 0:
+                break
+            num_evicted += cursor.rowcount
+            count, size = self._get_count_and_size_bytes()
+        self._approx_size_bytes = size
+
+        logger.debug(
+            f"Evicted {num_evicted} entries from the disk embedding cache, size={size} bytes"
+        )
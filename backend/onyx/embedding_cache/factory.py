@@ -0,0 +1,84 @@
+import threading
+
+from onyx.configs.model_configs import EMBEDDING_CACHE_BACKEND
+from onyx.configs.model_configs import EMBEDDING_CACHE_DIR
+from onyx.configs.model_configs import EMBEDDING_CACHE_MAX_SIZE_MB
+from onyx.configs.model_configs import ENABLE_QUERY_EMBEDDING_CACHE
+from onyx.configs.model_configs import QUERY_EMBEDDING_CACHE_MAX_ENTRIES
+from onyx.configs.model_configs import QUERY_EMBEDDING_CACHE_TTL_SECONDS
+from onyx.configs.model_configs import QUERY_EMBEDDING_CACHE_USE_REDIS
+from onyx.embedding_cache.disk_store import DiskEmbeddingCache
+from onyx.embedding_cache.interface import EmbeddingCache
+from onyx.embedding_cache.memory_store import InMemoryEmbeddingCache
+from onyx.embedding_cache.pg_store import PostgresEmbeddingCache
+from onyx.embedding_cache.redis_store import RedisEmbeddingCache
+from onyx.embedding_cache.tiered_store import TieredEmbeddingCache
+from onyx.utils.logger import setup_logger
+from onyx.utils.ttl_lru_cache import TTLLRUCache
+
+logger = setup_logger()
+
+# a few indices are live at once in multi tenant deployments (tenants on different
+# embedding models) and during a search settings swap
+_MAX_QUERY_EMBEDDING_CACHE_INDICES = 8
+
+_EMBEDDING_CACHE: EmbeddingCache | None = None
+# index name -> query embedding cache, least recently searched indices are dropped
+_QUERY_EMBEDDING_CACHES: TTLLRUCache[str, EmbeddingCache] = TTLLRUCache(
+    max_entries=_MAX_QUERY_EMBEDDING_CACHE_INDICES
+)
+_QUERY_EMBEDDING_CACHES_LOCK = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache | None:
+    """Returns the process wide embedding cache, or None if it is disabled"""
+    global _EMBEDDING_CACHE
+
+    if _EMBEDDING_CACHE is not None or not EMBEDDING_CACHE_BACKEND:
+        return _EMBEDDING_CACHE
+
+    max_size_bytes = EMBEDDING_CACHE_MAX_SIZE_MB * 1024 * 1024
+    if EMBEDDING_CACHE_BACKEND == "disk":
+        _EMBEDDING_CACHE = DiskEmbeddingCache(
+            cache_dir=EMBEDDING_CACHE_DIR, max_size_bytes=max_size_bytes
+        )
+    elif EMBEDDING_CACHE_BACKEND == "postgres":
+        _EMBEDDING_CACHE = PostgresEmbeddingCache(max_size_bytes=max_size_bytes)
+    else:
+        logger.error(
+            f"Unknown embedding cache backend '{EMBEDDING_CACHE_BACKEND}', "
+            "the embedding cache is disabled"
+        )
+
+    return _EMBEDDING_CACHE
+
+
+def get_query_embedding_cache(index_name: str) -> EmbeddingCache | None:
+    """Returns the process wide query embedding cache for the given index, or None if it
+    is disabled. The caches of the least recently searched indices are dropped from
+    memory once there are more than _MAX_QUERY_EMBEDDING_CACHE_INDICES."""
+    if not ENABLE_QUERY_EMBEDDING_CACHE:
+        return None
+
+    with _QUERY_EMBEDDING_CACHES_LOCK:
+        query_cache = _QUERY_EMBEDDING_CACHES.get(index_name)
+        if query_cache is not None:
+            return query_cache
+
+        query_cache = InMemoryEmbeddingCache(
+            max_entries=QUERY_EMBEDDING_CACHE_MAX_ENTRIES,
+            ttl_seconds=QUERY_EMBEDDING_CACHE_TTL_SECONDS,
+        )
+        if QUERY_EMBEDDING_CACHE_USE_REDIS:
+            query_cache = TieredEmbeddingCache(
+                [
+                    query_cache,
+                    RedisEmbeddingCache(
+                        key_prefix=f"query_embedding:{index_name}",
+                        ttl_seconds=QUERY_EMBEDDING_CACHE_TTL_SECONDS,
+                    ),
+                ]
+            )
+
+        _QUERY_EMBEDDING_CACHES.set(index_name, query_cache)
+        return query_cache
@@ -0,0 +1,149 @@
+import abc
+import hashlib
+import json
+from collections.abc import Mapping
+
+import numpy
+import numpy.typing as npt
+from prometheus_client import Counter
+
+from onyx.utils.logger import setup_logger
+from shared_configs.enums import EmbeddingProvider
+from shared_configs.enums import EmbedTextType
+from shared_configs.model_server_models import Embedding
+
+logger = setup_logger()
+
+# embeddings are stored as little endian float32, which is what the model server computes in
+_EMBEDDING_DTYPE = numpy.dtype("<f4")
+
+embedding_cache_hits = Counter(
+    "onyx_embedding_cache_hits_total",
+    "Number of texts whose embedding was served from the embedding cache",
+    ["backend"],
+)
+embedding_cache_misses = Counter(
+    "onyx_embedding_cache_misses_total",
+    "Number of texts that had to be sent to the model server after an embedding cache miss",
+    ["backend"],
+)
+
+
+def build_embedding_cache_key(
+    *,
+    text: str,
+    text_type: EmbedTextType,
+    model_name: str | None,
+    provider_type: EmbeddingProvider | None,
+    normalize: bool,
+    prefix: str | None,
+    max_seq_length: int,
+    api_url: str | None = None,
+    deployment_name: str | None = None,
+    api_version: str | None = None,
+) -> str:
+    """Content addressed key, everything that can affect the resulting vector must be
+    part of it. The text itself is hashed separately to keep the key material small.
+    Queries differing only in whitespace share a key, the embedded text is unchanged."""
+    if text_type == EmbedTextType.QUERY:
+        text = " ".join(text.split())
+
+    key_material = json.dumps(
+        [
+            model_name,
+            provider_type.value if provider_type else None,
+            api_url,
+            deployment_name,
+            api_version,
+            normalize,
+            prefix,
+            text_type.value,
+            max_seq_length,
+            hashlib.sha256(text.encode("utf-8")).hexdigest(),
+        ]
+    )
+    return hashlib.sha256(key_material.encode("utf-8")).hexdigest()
+
+
+def serialize_embedding(embedding: Embedding | npt.NDArray[numpy.float32]) -> bytes:
+    return numpy.asarray(embedding, dtype=_EMBEDDING_DTYPE).tobytes()
+
+
+def deserialize_embedding(data: bytes) -> Embedding:
+    return numpy.frombuffer(data, dtype=_EMBEDDING_DTYPE).tolist()
+
+
+class EmbeddingCache(abc.ABC):
+    """Store of embeddings keyed by `build_embedding_cache_key`.
+
+    Failures of the underlying store are logged and treated as misses, the cache must
+    never be the reason an embedding request fails."""
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    @abc.abstractmethod
+    def get_many(self, keys: list[str]) -> dict[str, Embedding]:
+        """Returns the embeddings found for the given keys, missing keys are left out"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def set_many(
+        self, entries: Mapping[str, Embedding | npt.NDArray[numpy.float32]]
+    ) -> None:
+        raise NotImplementedError
+
+
+class StoreBackedEmbeddingCache(EmbeddingCache):
+    """Embedding cache over a single key-value store of serialized embeddings.
+    Subclasses only load and store the bytes, errors and metrics are handled here."""
+
+    backend_name: str = "unknown"
+
+    @abc.abstractmethod
+    def _load(self, keys: list[str]) -> dict[str, bytes]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def _store(self, entries: dict[str, bytes]) -> None:
+        raise NotImplementedError
+
+    def get_many(self, keys: list[str]) -> dict[str, Embedding]:
+        if not keys:
+            return {}
+
+        try:
+            found = {
+                key: deserialize_embedding(data)
+                for key, data in self._load(keys).items()
+            }
+        except Exception:
+            logger.exception(
+                f"Failed to read from the {self.backend_name} embedding cache"
+            )
+            found = {}
+
+        num_hits = len(found)
+        num_misses = len(keys) - num_hits
+        self.hits += num_hits
+        self.misses += num_misses
+        embedding_cache_hits.labels(backend=self.backend_name).inc(num_hits)
+        embedding_cache_misses.labels(backend=self.backend_name).inc(num_misses)
+
+        return found
+
+    def set_many(
+        self, entries: Mapping[str, Embedding | npt.NDArray[numpy.float32]]
+    ) -> None:
+        if not entries:
+            return
+
+        try:
+            self._store(
+                {key: serialize_embedding(vector) for key, vector in entries.items()}
+            )
+        except Exception:
+            logger.exception(
+                f"Failed to write to the {self.backend_name} embedding cache"
+            )
@@ -0,0 +1,24 @@
+from onyx.embedding_cache.interface import StoreBackedEmbeddingCache
+from onyx.utils.ttl_lru_cache import TTLLRUCache
+
+
+class InMemoryEmbeddingCache(StoreBackedEmbeddingCache):
+    """Process local LRU cache with a TTL per entry, meant for small, hot sets of
+    embeddings such as search queries."""
+
+    backend_name = "memory"
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        super().__init__()
+        self._entries: TTLLRUCache[str, bytes] = TTLLRUCache(
+            max_entries=max_entries, ttl_seconds=ttl_seconds
+        )
+
+    def _load(self, keys: list[str]) -> dict[str, bytes]:
+        return self._entries.get_many(keys)
+
+    def _store(self, entries: dict[str, bytes]) -> None:
+        self._entries.set_many(entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -0,0 +1,82 @@
+import math
+import threading
+
+from onyx.db.embedding_cache import delete_least_recently_used_embedding_cache_entries
+from onyx.db.embedding_cache import fetch_embedding_cache_entries
+from onyx.db.embedding_cache import get_embedding_cache_count_and_size_bytes
+from onyx.db.embedding_cache import upsert_embedding_cache_entries
+from onyx.db.engine import get_session_with_tenant
+from onyx.embedding_cache.interface import StoreBackedEmbeddingCache
+from onyx.utils.logger import setup_logger
+from shared_configs.contextvars import CURRENT_TENANT_ID_CONTEXTVAR
+
+logger = setup_logger()
+
+# when the cache is over its size limit, evict down to this fraction of the limit so
+# that we don't evict on every single write
+_EVICTION_TARGET_RATIO = 0.9
+_EVICTION_BATCH_SIZE = 1000
+
+
+class PostgresEmbeddingCache(StoreBackedEmbeddingCache):
+    """Embedding cache backed by the `embedding_cache` table, shared by every indexing
+    worker of the tenant. The tenant is picked up from the context, same as the KV store.
+    """
+
+    backend_name = "postgres"
+
+    def __init__(self, max_size_bytes: int) -> None:
+        super().__init__()
+        self.max_size_bytes = max_size_bytes
+
+        # Running estimate of the cache size so we don't have to sum the table on every
+        # write. It is re-synced whenever it crosses the limit.
+        self._lock = threading.Lock()
+        self._approx_size_bytes: int | None = None
+
+    def _load(self, keys: list[str]) -> dict[str, bytes]:
+        with get_session_with_tenant(CURRENT_TENANT_ID_CONTEXTVAR.get()) as db_session:
+            return fetch_embedding_cache_entries(keys, db_session)
+
+    def _store(self, entries: dict[str, bytes]) -> None:
+        with get_session_with_tenant(CURRENT_TENANT_ID_CONTEXTVAR.get()) as db_session:
+            upsert_embedding_cache_entries(entries, db_session)
+
+            with self._lock:
+                if self._approx_size_bytes is None:
+                    (
+                        _,
+                        self._approx_size_bytes,
+                    ) = get_embedding_cache_count_and_size_bytes(db_session)
+                self._approx_size_bytes += sum(len(data) for data in entries.values())
+                if self._approx_size_bytes <= self.max_size_bytes:
+                    return
+
+                count, size = get_embedding_cache_count_and_size_bytes(db_session)
+                # other workers may have evicted in the meantime
+                target = (
+                    int(self.max_size_bytes * _EVICTION_TARGET_RATIO)
+                    if size > self.max_size_bytes
+                    else size
+                )
+                num_evicted = 0
+                while size > target and count > 0:
+                    # entries are roughly the same size (same model => same dimension)
+                    num_to_evict = min(
+                        math.ceil((size - target) / (size / count)),
+                        _EVICTION_BATCH_SIZE,
+                    )
+                    num_deleted = delete_least_recently_used_embedding_cache_entries(
+                        num_to_evict, db_session
+                    )
+                    if num_deleted <= 0:
+                        break
+                    num_evicted += num_deleted
+                    count, size = get_embedding_cache_count_and_size_bytes(db_session)
+                self._approx_size_bytes = size
+
+                if num_evicted:
+                    logger.debug(
+                        f"Evicted {num_evicted} entries from the Postgres embedding cache, "
+                        f"size={size} bytes"
+                    )
@@ -0,0 +1,37 @@
+from onyx.embedding_cache.interface import StoreBackedEmbeddingCache
+from onyx.redis.redis_pool import get_redis_client
+from shared_configs.contextvars import CURRENT_TENANT_ID_CONTEXTVAR
+
+
+class RedisEmbeddingCache(StoreBackedEmbeddingCache):
+    """Embedding cache shared by all API server processes. Entries expire after the TTL,
+    Redis' own eviction policy takes care of memory pressure."""
+
+    backend_name = "redis"
+
+    def __init__(self, key_prefix: str, ttl_seconds: int) -> None:
+        super().__init__()
+        self.key_prefix = key_prefix
+        self.ttl_seconds = ttl_seconds
+
+    def _redis_key(self, tenant_id: str, key: str) -> str:
+        # mget / pipelines bypass the tenant prefixing of TenantRedis
+        return f"{tenant_id}:{self.key_prefix}:{key}"
+
+    def _load(self, keys: list[str]) -> dict[str, bytes]:
+        tenant_id = CURRENT_TENANT_ID_CONTEXTVAR.get()
+        redis_client = get_redis_client(tenant_id=tenant_id)
+        values = redis_client.mget([self._redis_key(tenant_id, key) for key in keys])
+        return {
+            key: bytes(value)
+            for key, value in zip(keys, values)  # type: ignore
+            if value is not None
+        }
+
+    def _store(self, entries: dict[str, bytes]) -> None:
+        tenant_id = CURRENT_TENANT_ID_CONTEXTVAR.get()
+        redis_client = get_redis_client(tenant_id=tenant_id)
+        pipeline = redis_client.pipeline(transaction=False)
+        for key, data in entries.items():
+            pipeline.set(self._redis_key(tenant_id, key), data, ex=self.ttl_seconds)
+        pipeline.execute()
@@ -0,0 +1,41 @@
+from collections.abc import Mapping
+
+import numpy
+import numpy.typing as npt
+
+from onyx.embedding_cache.interface import EmbeddingCache
+from shared_configs.model_server_models import Embedding
+
+
+class TieredEmbeddingCache(EmbeddingCache):
+    """Reads through the given caches, fastest first. Embeddings found in a slower tier
+    are copied into the faster tiers, new embeddings are written to all tiers. Hits and
+    misses are tracked by each tier."""
+
+    def __init__(self, tiers: list[EmbeddingCache]) -> None:
+        super().__init__()
+        self.tiers = tiers
+
+    def get_many(self, keys: list[str]) -> dict[str, Embedding]:
+        found: dict[str, Embedding] = {}
+        missing = keys
+        for tier_ind, tier in enumerate(self.tiers):
+            if not missing:
+                break
+
+            tier_found = tier.get_many(missing)
+            if tier_found:
+                for faster_tier in self.tiers[:tier_ind]:
+                    faster_tier.set_many(tier_found)
+                found.update(tier_found)
+                missing = [key for key in missing if key not in tier_found]
+
+        self.hits += len(found)
+        self.misses += len(missing)
+        return found
+
+    def set_many(
+        self, entries: Mapping[str, Embedding | npt.NDArray[numpy.float32]]
+    ) -> None:
+        for tier in self.tiers:
+            tier.set_many(entries)
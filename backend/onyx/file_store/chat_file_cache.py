@@ -0,0 +1,203 @@
+"""Cache of chat file contents keyed by tenant and file id. Chat files are written once
+under a random id and never modified, so entries don't expire, they are only evicted to
+stay within the size budgets."""
+import hashlib
+import os
+import threading
+
+from prometheus_client import Counter
+
+from onyx.configs.chat_configs import CHAT_FILE_CACHE_MAX_IMAGE_MB
+from onyx.configs.chat_configs import CHAT_FILE_CACHE_MAX_SPILL_MB
+from onyx.configs.chat_configs import CHAT_FILE_CACHE_MAX_TEXT_MB
+from onyx.configs.chat_configs import CHAT_FILE_CACHE_SPILL_DIR
+from onyx.configs.chat_configs import ENABLE_CHAT_FILE_CACHE
+from onyx.file_store.models import ChatFileType
+from onyx.utils.logger import setup_logger
+from onyx.utils.ttl_lru_cache import TTLLRUCache
+
+logger = setup_logger()
+
+TEXT_TIER = "text"
+IMAGE_TIER = "image"
+
+# when the spill directory is over its size limit, evict down to this fraction of the
+# limit so that we don't evict on every single write
+_EVICTION_TARGET_RATIO = 0.9
+
+_CACHE_REQUESTS = Counter(
+    "onyx_chat_file_cache_requests_total",
+    "Lookups of the chat file content cache",
+    ["tier", "result"],
+)
+
+
+def get_cache_tier(file_type: ChatFileType) -> str:
+    return IMAGE_TIER if file_type == ChatFileType.IMAGE else TEXT_TIER
+
+
+class _DiskSpill:
+    """Contents evicted from memory, one file per entry. Least recently read files are
+    deleted once the directory is over its size limit. Safe to share between the
+    processes of a host."""
+
+    def __init__(self, spill_dir: str, max_size_bytes: int) -> None:
+        os.makedirs(spill_dir, exist_ok=True)
+        self.spill_dir = spill_dir
+        self.max_size_bytes = max_size_bytes
+        self._lock = threading.Lock()
+        # Running estimate of the directory size, corrected whenever it crosses the limit
+        self._approx_size_bytes = sum(size for _, _, size in self._list_files())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(
+            self.spill_dir, hashlib.sha256(key.encode("utf-8")).hexdigest()
+        )
+
+    def _list_files(self) -> list[tuple[float, str, int]]:
+        files: list[tuple[float, str, int]] = []
+        with os.scandir(self.spill_dir) as entries:
+            for entry in entries:
+                # skip the temporary files of writes in progress
+                if not entry.is_file() or entry.name.endswith(".tmp"):
+                    continue
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.path, stat.st_size))
+        return files
+
+    def get(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+        except FileNotFoundError:
+            return None
+
+        # keep track of usage for LRU eviction
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # evicted by another process in the meantime
+            pass
+        return content
+
+    def set(self, key: str, content: bytes) -> None:
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._approx_size_bytes += len(content)
+            if self._approx_size_bytes > self.max_size_bytes:
+                self._evict_if_needed()
+
+    def _evict_if_needed(self) -> None:
+        files = sorted(self._list_files())
+        size = sum(file_size for _, _, file_size in files)
+        target = int(self.max_size_bytes * _EVICTION_TARGET_RATIO)
+        if size > self.max_size_bytes:
+            for _, path, file_size in files:
+                if size <= target:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    # already evicted by another process
+                    pass
+                size -= file_size
+        self._approx_size_bytes = size
+
+
+class ChatFileContentCache:
+    """Size bounded cache of chat file contents. The text of text files (including the
+    text extracted from documents) and image bytes are kept in separate tiers, so a few
+    large images can't push the text attached to the history out of memory. Disk spill
+    failures are treated as misses, they must never fail a chat message."""
+
+    def __init__(
+        self,
+        max_text_bytes: int,
+        max_image_bytes: int,
+        spill_dir: str | None = None,
+        max_spill_bytes: int = 0,
+    ) -> None:
+        self._tiers: dict[str, TTLLRUCache[str, bytes]] = {
+            TEXT_TIER: TTLLRUCache(max_size=max_text_bytes, size_fn=len),
+            IMAGE_TIER: TTLLRUCache(max_size=max_image_bytes, size_fn=len),
+        }
+        self._spill = (
+            _DiskSpill(spill_dir, max_spill_bytes)
+            if spill_dir and max_spill_bytes > 0
+            else None
+        )
+
+    @staticmethod
+    def _key(tenant_id: str | None, file_id: str, tier: str) -> str:
+        return f"{tenant_id}:{tier}:{file_id}"
+
+    def get(
+        self, file_id: str, file_type: ChatFileType, *, tenant_id: str | None
+    ) -> bytes | None:
+        tier = get_cache_tier(file_type)
+        key = self._key(tenant_id, file_id, tier)
+        content = self._tiers[tier].get(key)
+        if content is None and self._spill is not None:
+            try:
+                content = self._spill.get(key)
+            except Exception:
+                logger.exception("Failed to read from the chat file cache spill")
+            if content is not None:
+                self._store(tier, key, content)
+
+        _CACHE_REQUESTS.labels(tier, "miss" if content is None else "hit").inc()
+        return content
+
+    def set(
+        self,
+        file_id: str,
+        file_type: ChatFileType,
+        content: bytes,
+        *,
+        tenant_id: str | None,
+    ) -> None:
+        tier = get_cache_tier(file_type)
+        self._store(tier, self._key(tenant_id, file_id, tier), content)
+
+    def _store(self, tier: str, key: str, content: bytes) -> None:
+        evicted = self._tiers[tier].set(key, content)
+        if self._spill is None:
+            return
+
+        for evicted_key, evicted_content in evicted:
+            try:
+                self._spill.set(evicted_key, evicted_content)
+            except Exception:
+                logger.exception("Failed to spill to the chat file cache")
+
+    def clear(self) -> None:
+        for tier in self._tiers.values():
+            tier.clear()
+
+
+_CHAT_FILE_CACHE: ChatFileContentCache | None = None
+_CHAT_FILE_CACHE_LOCK = threading.Lock()
+
+
+def get_chat_file_cache() -> ChatFileContentCache | None:
+    global _CHAT_FILE_CACHE
+
+    if not ENABLE_CHAT_FILE_CACHE:
+        return None
+
+    # chat files are loaded in parallel, only one thread may build the cache
+    with _CHAT_FILE_CACHE_LOCK:
+        if _CHAT_FILE_CACHE is None:
+            _CHAT_FILE_CACHE = ChatFileContentCache(
+                max_text_bytes=CHAT_FILE_CACHE_MAX_TEXT_MB * 1024 * 1024,
+                max_image_bytes=CHAT_FILE_CACHE_MAX_IMAGE_MB * 1024 * 1024,
+                spill_dir=CHAT_FILE_CACHE_SPILL_DIR,
+                max_spill_bytes=CHAT_FILE_CACHE_MAX_SPILL_MB * 1024 * 1024,
+            )
+    return _CHAT_FILE_CACHE
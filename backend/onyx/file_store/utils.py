@@ -8,45 +8,101 @@ import requests
 from sqlalchemy.orm import Session
 
 from onyx.configs.constants import FileOrigin
+from onyx.configs.constants import MessageType
 from onyx.db.engine import get_session_with_tenant
 from onyx.db.models import ChatMessage
+from onyx.file_store.chat_file_cache import get_chat_file_cache
 from onyx.file_store.file_store import get_default_file_store
+from onyx.file_store.models import ChatFileType
 from onyx.file_store.models import FileDescriptor
 from onyx.file_store.models import InMemoryChatFile
 from onyx.utils.b64 import get_image_type
 from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+from shared_configs.contextvars import CURRENT_TENANT_ID_CONTEXTVAR
 
 
 def load_chat_file(
-    file_descriptor: FileDescriptor, db_session: Session
+    file_descriptor: FileDescriptor, db_session: Session, tenant_id: str | None
 ) -> InMemoryChatFile:
-    file_io = get_default_file_store(db_session).read_file(
-        file_descriptor["id"], mode="b"
+    file_id = file_descriptor["id"]
+    file_type = file_descriptor["type"]
+
+    chat_file_cache = get_chat_file_cache()
+    content = (
+        chat_file_cache.get(file_id, file_type, tenant_id=tenant_id)
+        if chat_file_cache is not None
+        else None
     )
+    if content is None:
+        file_io = get_default_file_store(db_session).read_file(file_id, mode="b")
+        content = file_io.read()
+        if chat_file_cache is not None:
+            chat_file_cache.set(file_id, file_type, content, tenant_id=tenant_id)
+
     return InMemoryChatFile(
-        file_id=file_descriptor["id"],
-        content=file_io.read(),
-        file_type=file_descriptor["type"],
+        file_id=file_id,
+        content=content,
+        file_type=file_type,
         filename=file_descriptor.get("name"),
     )
 
 
+def get_prompt_history_file_descriptors(
+    chat_messages: list[ChatMessage],
+    max_history_tokens: int | None = None,
+) -> list[FileDescriptor]:
+    """The files of the chat history that can make it into the prompt. Messages without
+    tokens are left out of the history and the oldest messages are dropped once the
+    history is over the LLM input budget, so their files are never needed. Of the
+    remaining files, images are only sent for user messages and documents only through
+    their extracted text, which is a separate plain text file."""
+    files_per_message: list[list[FileDescriptor]] = []
+    history_tokens = 0
+    for chat_message in reversed(chat_messages):
+        if chat_message.token_count == 0:
+            continue
+
+        history_tokens += chat_message.token_count
+        if max_history_tokens is not None and history_tokens > max_history_tokens:
+            break
+
+        files_per_message.append(
+            [
+                file
+                for file in chat_message.files or []
+                if file["type"] != ChatFileType.DOC
+                and (
+                    file["type"] != ChatFileType.IMAGE
+                    or chat_message.message_type == MessageType.USER
+                )
+            ]
+        )
+
+    return [file for files in reversed(files_per_message) for file in files]
+
+
 def load_all_chat_files(
     chat_messages: list[ChatMessage],
     file_descriptors: list[FileDescriptor],
     db_session: Session,
+    max_history_tokens: int | None = None,
 ) -> list[InMemoryChatFile]:
-    file_descriptors_for_history: list[FileDescriptor] = []
-    for chat_message in chat_messages:
-        if chat_message.files:
-            file_descriptors_for_history.extend(chat_message.files)
-
+    """Loads the files of the new message and the files of the history that can end up
+    in the prompt, see get_prompt_history_file_descriptors"""
+    files_to_load: dict[str, FileDescriptor] = {}
+    for file in file_descriptors + get_prompt_history_file_descriptors(
+        chat_messages, max_history_tokens
+    ):
+        files_to_load.setdefault(file["id"], file)
+
+    # the files are loaded in worker threads, which don't inherit the tenant contextvar
+    tenant_id = CURRENT_TENANT_ID_CONTEXTVAR.get()
     files = cast(
         list[InMemoryChatFile],
         run_functions_tuples_in_parallel(
             [
-                (load_chat_file, (file, db_session))
-                for file in file_descriptors + file_descriptors_for_history
+                (load_chat_file, (file, db_session, tenant_id))
+                for file in files_to_load.values()
             ]
         ),
     )
@@ -2,6 +2,7 @@ from abc import ABC
 from abc import abstractmethod
 
 from onyx.db.models import SearchSettings
+from onyx.embedding_cache.factory import get_embedding_cache
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
 from onyx.indexing.models import ChunkEmbedding
 from onyx.indexing.models import DocAwareChunk
@@ -61,6 +62,7 @@ class IndexingEmbedder(ABC):
             server_port=INDEXING_MODEL_SERVER_PORT,
             retrim_content=True,
             callback=callback,
+            embedding_cache=get_embedding_cache(),
         )
 
     @abstractmethod
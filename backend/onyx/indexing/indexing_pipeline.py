@@ -1,4 +1,5 @@
 import traceback
+from collections import defaultdict
 from collections.abc import Callable
 from functools import partial
 from http import HTTPStatus
@@ -11,6 +12,7 @@ from sqlalchemy.orm import Session
 
 from onyx.access.access import get_access_for_documents
 from onyx.access.models import DocumentAccess
+from onyx.configs.app_configs import DISABLE_DOCUMENT_CONTENT_HASH_SKIP
 from onyx.configs.app_configs import ENABLE_MULTIPASS_INDEXING
 from onyx.configs.app_configs import INDEXING_EXCEPTION_LIMIT
 from onyx.configs.app_configs import MAX_DOCUMENT_CHARS
@@ -20,11 +22,14 @@ from onyx.connectors.cross_connector_utils.miscellaneous_utils import (
 )
 from onyx.connectors.models import Document
 from onyx.connectors.models import IndexAttemptMetadata
+from onyx.db.document import fetch_chunk_counts_for_documents
 from onyx.db.document import get_documents_by_ids
 from onyx.db.document import prepare_to_modify_documents
+from onyx.db.document import update_docs_content_hash__no_commit
 from onyx.db.document import update_docs_last_modified__no_commit
 from onyx.db.document import update_docs_updated_at__no_commit
 from onyx.db.document import upsert_document_by_connector_credential_pair
+from onyx.db.document import upsert_document_chunk_counts__no_commit
 from onyx.db.document import upsert_documents
 from onyx.db.document_set import fetch_document_sets_for_documents
 from onyx.db.index_attempt import create_index_attempt_error
@@ -34,11 +39,13 @@ from onyx.db.tag import create_or_add_document_tag
 from onyx.db.tag import create_or_add_document_tag_list
 from onyx.document_index.interfaces import DocumentIndex
 from onyx.document_index.interfaces import DocumentMetadata
+from onyx.document_index.interfaces import VespaDocumentFields
 from onyx.indexing.chunker import Chunker
 from onyx.indexing.embedder import IndexingEmbedder
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
 from onyx.indexing.models import DocAwareChunk
 from onyx.indexing.models import DocMetadataAwareIndexChunk
+from onyx.indexing.models import IndexChunk
 from onyx.utils.logger import setup_logger
 from onyx.utils.timing import log_function_time
 from shared_configs.enums import EmbeddingProvider
@@ -47,8 +54,14 @@ logger = setup_logger()
 
 
 class DocumentBatchPrepareContext(BaseModel):
+    # docs that need to be (re)chunked, embedded and written to the index
     updatable_docs: list[Document]
     id_to_db_doc_map: dict[str, DBDocument]
+    # docs whose content has not changed since they were last indexed, only the
+    # access / document set / boost info needs to be refreshed in the index
+    content_unchanged_docs: list[Document] = []
+    # content hashes to record once the docs are successfully indexed
+    id_to_content_hash: dict[str, str] = {}
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
 
@@ -133,6 +146,82 @@ def get_doc_ids_to_update(
     return updatable_docs
 
 
+def split_docs_by_content_change(
+    documents: list[Document],
+    id_to_db_doc_map: dict[str, DBDocument],
+    id_to_content_hash: dict[str, str],
+) -> tuple[list[Document], list[Document]]:
+    """Splits the documents into those whose content changed since they were last
+    indexed and those whose content hash matches the one recorded in Postgres."""
+    changed_docs: list[Document] = []
+    unchanged_docs: list[Document] = []
+    for doc in documents:
+        db_doc = id_to_db_doc_map.get(doc.id)
+        if (
+            db_doc is not None
+            and db_doc.content_hash is not None
+            and db_doc.content_hash == id_to_content_hash.get(doc.id)
+        ):
+            unchanged_docs.append(doc)
+            continue
+        changed_docs.append(doc)
+
+    return changed_docs, unchanged_docs
+
+
+def handle_index_doc_batch_exception(
+    e: Exception,
+    *,
+    document_batch: list[Document],
+    index_attempt_metadata: IndexAttemptMetadata,
+    attempt_id: int | None,
+    db_session: Session,
+) -> None:
+    """Records a failed batch against the index attempt. Re-raises if the
+    attempt is not allowed to continue past the failure.
+
+    Must be called from within the `except` block handling `e`."""
+    if isinstance(e, httpx.HTTPStatusError):
+        if e.response.status_code == HTTPStatus.INSUFFICIENT_STORAGE:
+            logger.error(
+                "NOTE: HTTP Status 507 Insufficient Storage indicates "
+                "you need to allocate more memory or disk space to the "
+                "Vespa/index container."
+            )
+
+    if INDEXING_EXCEPTION_LIMIT == 0:
+        raise
+
+    trace = traceback.format_exc()
+    create_index_attempt_error(
+        attempt_id,
+        batch=index_attempt_metadata.batch_num,
+        docs=document_batch,
+        exception_msg=str(e),
+        exception_traceback=trace,
+        db_session=db_session,
+    )
+    logger.exception(
+        f"Indexing batch {index_attempt_metadata.batch_num} failed. msg='{e}' trace='{trace}'"
+    )
+
+    index_attempt_metadata.num_exceptions += 1
+    if index_attempt_metadata.num_exceptions == INDEXING_EXCEPTION_LIMIT:
+        logger.warning(
+            f"Maximum number of exceptions for this index attempt "
+            f"({INDEXING_EXCEPTION_LIMIT}) has been reached. "
+            f"The next exception will abort the indexing attempt."
+        )
+    elif index_attempt_metadata.num_exceptions > INDEXING_EXCEPTION_LIMIT:
+        logger.warning(
+            f"Maximum number of exceptions for this index attempt "
+            f"({INDEXING_EXCEPTION_LIMIT}) has been exceeded."
+        )
+        raise RuntimeError(
+            f"Maximum exception limit of {INDEXING_EXCEPTION_LIMIT} exceeded."
+        )
+
+
 def index_doc_batch_with_handler(
     *,
     chunker: Chunker,
@@ -143,6 +232,7 @@ def index_doc_batch_with_handler(
     attempt_id: int | None,
     db_session: Session,
     ignore_time_skip: bool = False,
+    ignore_content_hash_skip: bool = False,
     tenant_id: str | None = None,
 ) -> tuple[int, int]:
     r = (0, 0)
@@ -155,50 +245,17 @@ def index_doc_batch_with_handler(
             index_attempt_metadata=index_attempt_metadata,
             db_session=db_session,
             ignore_time_skip=ignore_time_skip,
+            ignore_content_hash_skip=ignore_content_hash_skip,
             tenant_id=tenant_id,
         )
     except Exception as e:
-        if isinstance(e, httpx.HTTPStatusError):
-            if e.response.status_code == HTTPStatus.INSUFFICIENT_STORAGE:
-                logger.error(
-                    "NOTE: HTTP Status 507 Insufficient Storage indicates "
-                    "you need to allocate more memory or disk space to the "
-                    "Vespa/index container."
-                )
-
-        if INDEXING_EXCEPTION_LIMIT == 0:
-            raise
-
-        trace = traceback.format_exc()
-        create_index_attempt_error(
-            attempt_id,
-            batch=index_attempt_metadata.batch_num,
-            docs=document_batch,
-            exception_msg=str(e),
-            exception_traceback=trace,
+        handle_index_doc_batch_exception(
+            e,
+            document_batch=document_batch,
+            index_attempt_metadata=index_attempt_metadata,
+            attempt_id=attempt_id,
             db_session=db_session,
         )
-        logger.exception(
-            f"Indexing batch {index_attempt_metadata.batch_num} failed. msg='{e}' trace='{trace}'"
-        )
-
-        index_attempt_metadata.num_exceptions += 1
-        if index_attempt_metadata.num_exceptions == INDEXING_EXCEPTION_LIMIT:
-            logger.warning(
-                f"Maximum number of exceptions for this index attempt "
-                f"({INDEXING_EXCEPTION_LIMIT}) has been reached. "
-                f"The next exception will abort the indexing attempt."
-            )
-        elif index_attempt_metadata.num_exceptions > INDEXING_EXCEPTION_LIMIT:
-            logger.warning(
-                f"Maximum number of exceptions for this index attempt "
-                f"({INDEXING_EXCEPTION_LIMIT}) has been exceeded."
-            )
-            raise RuntimeError(
-                f"Maximum exception limit of {INDEXING_EXCEPTION_LIMIT} exceeded."
-            )
-        else:
-            pass
 
     return r
 
@@ -208,9 +265,14 @@ def index_doc_batch_prepare(
     index_attempt_metadata: IndexAttemptMetadata,
     db_session: Session,
     ignore_time_skip: bool = False,
+    ignore_content_hash_skip: bool = False,
 ) -> DocumentBatchPrepareContext | None:
     """Sets up the documents in the relational DB (source of truth) for permissions, metadata, etc.
-    This preceeds indexing it into the actual document index."""
+    This preceeds indexing it into the actual document index.
+
+    `ignore_content_hash_skip` should be set when the target index is not the one the
+    stored content hashes refer to (e.g. a secondary index being built), in that case
+    every updatable doc is re-indexed and no new hashes are recorded."""
     # Create a trimmed list of docs that don't have a newer updated at
     # Shortcuts the time-consuming flow on connector index retries
     document_ids: list[str] = [document.id for document in documents]
@@ -252,8 +314,28 @@ def index_doc_batch_prepare(
         return None
 
     id_to_db_doc_map = {doc.id: doc for doc in db_docs}
+
+    id_to_content_hash: dict[str, str] = {}
+    content_unchanged_docs: list[Document] = []
+    if not ignore_content_hash_skip:
+        id_to_content_hash = {doc.id: doc.get_content_hash() for doc in updatable_docs}
+        if not DISABLE_DOCUMENT_CONTENT_HASH_SKIP:
+            updatable_docs, content_unchanged_docs = split_docs_by_content_change(
+                documents=updatable_docs,
+                id_to_db_doc_map=id_to_db_doc_map,
+                id_to_content_hash=id_to_content_hash,
+            )
+            if content_unchanged_docs:
+                logger.info(
+                    f"Skipping chunking and embedding for {len(content_unchanged_docs)} "
+                    f"docs with unchanged content"
+                )
+
     return DocumentBatchPrepareContext(
-        updatable_docs=updatable_docs, id_to_db_doc_map=id_to_db_doc_map
+        updatable_docs=updatable_docs,
+        id_to_db_doc_map=id_to_db_doc_map,
+        content_unchanged_docs=content_unchanged_docs,
+        id_to_content_hash=id_to_content_hash,
     )
 
 
@@ -313,6 +395,7 @@ def index_doc_batch(
     index_attempt_metadata: IndexAttemptMetadata,
     db_session: Session,
     ignore_time_skip: bool = False,
+    ignore_content_hash_skip: bool = False,
     tenant_id: str | None = None,
     filter_fnc: Callable[[list[Document]], list[Document]] = filter_documents,
 ) -> tuple[int, int]:
@@ -323,14 +406,6 @@ def index_doc_batch(
     Returns a tuple where the first element is the number of new docs and the
     second element is the number of chunks."""
 
-    no_access = DocumentAccess.build(
-        user_emails=[],
-        user_groups=[],
-        external_user_emails=[],
-        external_user_group_ids=[],
-        is_public=False,
-    )
-
     logger.debug("Filtering Documents")
     filtered_documents = filter_fnc(document_batch)
 
@@ -338,30 +413,66 @@ def index_doc_batch(
         documents=filtered_documents,
         index_attempt_metadata=index_attempt_metadata,
         ignore_time_skip=ignore_time_skip,
+        ignore_content_hash_skip=ignore_content_hash_skip,
         db_session=db_session,
     )
     if not ctx:
         return 0, 0
 
     logger.debug("Starting chunking")
-    chunks: list[DocAwareChunk] = chunker.chunk(ctx.updatable_docs)
+    chunks: list[DocAwareChunk] = (
+        chunker.chunk(ctx.updatable_docs) if ctx.updatable_docs else []
+    )
 
     logger.debug("Starting embedding")
     chunks_with_embeddings = embedder.embed_chunks(chunks) if chunks else []
 
+    return index_doc_batch_write(
+        ctx=ctx,
+        chunks_with_embeddings=chunks_with_embeddings,
+        document_index=document_index,
+        db_session=db_session,
+        tenant_id=tenant_id,
+    )
+
+
+def index_doc_batch_write(
+    *,
+    ctx: DocumentBatchPrepareContext,
+    chunks_with_embeddings: list[IndexChunk],
+    document_index: DocumentIndex,
+    db_session: Session,
+    tenant_id: str | None = None,
+) -> tuple[int, int]:
+    """Final step of indexing a batch: attaches access / document set / boost info
+    to the embedded chunks, writes them to the document index and records the
+    successfully indexed documents in Postgres.
+
+    Returns a tuple where the first element is the number of new docs and the
+    second element is the number of chunks."""
+    no_access = DocumentAccess.build(
+        user_emails=[],
+        user_groups=[],
+        external_user_emails=[],
+        external_user_group_ids=[],
+        is_public=False,
+    )
+
     updatable_ids = [doc.id for doc in ctx.updatable_docs]
+    content_unchanged_ids = [doc.id for doc in ctx.content_unchanged_docs]
+    all_ids = updatable_ids + content_unchanged_ids
 
     # Acquires a lock on the documents so that no other process can modify them
     # NOTE: don't need to acquire till here, since this is when the actual race condition
     # with Vespa can occur.
-    with prepare_to_modify_documents(db_session=db_session, document_ids=updatable_ids):
+    with prepare_to_modify_documents(db_session=db_session, document_ids=all_ids):
         document_id_to_access_info = get_access_for_documents(
-            document_ids=updatable_ids, db_session=db_session
+            document_ids=all_ids, db_session=db_session
         )
         document_id_to_document_set = {
             document_id: document_sets
             for document_id, document_sets in fetch_document_sets_for_documents(
-                document_ids=updatable_ids, db_session=db_session
+                document_ids=all_ids, db_session=db_session
             )
         }
 
@@ -395,13 +506,66 @@ def index_doc_batch(
         # A document will not be spread across different batches, so all the
         # documents with chunks in this set, are fully represented by the chunks
         # in this set
-        insertion_records = document_index.index(chunks=access_aware_chunks)
+        doc_id_to_previous_chunk_cnt = fetch_chunk_counts_for_documents(
+            document_ids=updatable_ids,
+            index_name=document_index.index_name,
+            db_session=db_session,
+        )
+        insertion_records = (
+            document_index.index(
+                chunks=access_aware_chunks,
+                doc_id_to_previous_chunk_cnt=doc_id_to_previous_chunk_cnt,
+            )
+            if access_aware_chunks
+            else set()
+        )
 
         successful_doc_ids = [record.document_id for record in insertion_records]
         successful_docs = [
             doc for doc in ctx.updatable_docs if doc.id in successful_doc_ids
         ]
 
+        # large chunks are derived from the regular ones, only the latter are counted
+        doc_id_to_new_chunk_cnt: dict[str, int] = defaultdict(int)
+        for chunk in chunks_with_embeddings:
+            if not chunk.large_chunk_reference_ids:
+                doc_id_to_new_chunk_cnt[chunk.source_document.id] += 1
+        upsert_document_chunk_counts__no_commit(
+            ids_to_chunk_count={
+                doc.id: doc_id_to_new_chunk_cnt[doc.id]
+                for doc in successful_docs
+                if doc.id in doc_id_to_new_chunk_cnt
+            },
+            index_name=document_index.index_name,
+            db_session=db_session,
+        )
+
+        # The chunks of unchanged docs are already in the index, just bring the
+        # permissions / document sets / boost and the source's update time up to date.
+        # On full re-syncs this is most of the batch, so it's a single batched update.
+        missing_doc_ids = document_index.update_many(
+            {
+                doc.id: VespaDocumentFields(
+                    access=document_id_to_access_info.get(doc.id, no_access),
+                    document_sets=set(document_id_to_document_set.get(doc.id, [])),
+                    boost=ctx.id_to_db_doc_map[doc.id].boost,
+                    doc_updated_at=doc.doc_updated_at,
+                )
+                for doc in ctx.content_unchanged_docs
+            }
+        )
+        ids_to_cleared_content_hash: dict[str, str | None] = {}
+        for doc in ctx.content_unchanged_docs:
+            if doc.id in missing_doc_ids:
+                # the doc is missing from the index even though its content was recorded
+                # as indexed, clear the hash so that it gets fully reindexed next time
+                logger.warning(
+                    f"Document with unchanged content not found in the index: {doc.to_short_descriptor()}"
+                )
+                ids_to_cleared_content_hash[doc.id] = None
+                continue
+            successful_docs.append(doc)
+
         last_modified_ids = []
         ids_to_new_updated_at = {}
         for doc in successful_docs:
@@ -420,6 +584,16 @@ def index_doc_batch(
             document_ids=last_modified_ids, db_session=db_session
         )
 
+        ids_to_content_hash: dict[str, str | None] = {
+            doc.id: ctx.id_to_content_hash[doc.id]
+            for doc in successful_docs
+            if doc.id in ctx.id_to_content_hash
+        }
+        ids_to_content_hash.update(ids_to_cleared_content_hash)
+        update_docs_content_hash__no_commit(
+            ids_to_content_hash=ids_to_content_hash, db_session=db_session
+        )
+
         db_session.commit()
 
     result = (
@@ -430,18 +604,13 @@ def index_doc_batch(
     return result
 
 
-def build_indexing_pipeline(
+def build_chunker(
     *,
     embedder: IndexingEmbedder,
-    document_index: DocumentIndex,
     db_session: Session,
-    chunker: Chunker | None = None,
-    ignore_time_skip: bool = False,
-    attempt_id: int | None = None,
-    tenant_id: str | None = None,
     callback: IndexingHeartbeatInterface | None = None,
-) -> IndexingPipelineProtocol:
-    """Builds a pipeline which takes in a list (batch) of docs and indexes them."""
+) -> Chunker:
+    """Builds the chunker matching the current search settings and embedding model."""
     search_settings = get_current_search_settings(db_session)
     multipass = (
         search_settings.multipass_indexing
@@ -462,7 +631,7 @@ def build_indexing_pipeline(
         embedder.provider_type != EmbeddingProvider.COHERE
     )
 
-    chunker = chunker or Chunker(
+    return Chunker(
         tokenizer=embedder.embedding_model.tokenizer,
         enable_multipass=multipass,
         enable_large_chunks=enable_large_chunks,
@@ -470,12 +639,31 @@ def build_indexing_pipeline(
         callback=callback,
     )
 
+
+def build_indexing_pipeline(
+    *,
+    embedder: IndexingEmbedder,
+    document_index: DocumentIndex,
+    db_session: Session,
+    chunker: Chunker | None = None,
+    ignore_time_skip: bool = False,
+    ignore_content_hash_skip: bool = False,
+    attempt_id: int | None = None,
+    tenant_id: str | None = None,
+    callback: IndexingHeartbeatInterface | None = None,
+) -> IndexingPipelineProtocol:
+    """Builds a pipeline which takes in a list (batch) of docs and indexes them."""
+    chunker = chunker or build_chunker(
+        embedder=embedder, db_session=db_session, callback=callback
+    )
+
     return partial(
         index_doc_batch_with_handler,
         chunker=chunker,
         embedder=embedder,
         document_index=document_index,
         ignore_time_skip=ignore_time_skip,
+        ignore_content_hash_skip=ignore_content_hash_skip,
         attempt_id=attempt_id,
         db_session=db_session,
         tenant_id=tenant_id,
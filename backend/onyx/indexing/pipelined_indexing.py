@@ -0,0 +1,440 @@
+import contextvars
+import queue
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Iterator
+from typing import Any
+
+from pydantic import BaseModel
+from pydantic import ConfigDict
+from sqlalchemy.orm import Session
+
+from onyx.connectors.models import Document
+from onyx.connectors.models import IndexAttemptMetadata
+from onyx.db.engine import get_session_with_tenant
+from onyx.document_index.interfaces import DocumentIndex
+from onyx.indexing.chunker import Chunker
+from onyx.indexing.embedder import IndexingEmbedder
+from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
+from onyx.indexing.indexing_pipeline import build_chunker
+from onyx.indexing.indexing_pipeline import DocumentBatchPrepareContext
+from onyx.indexing.indexing_pipeline import filter_documents
+from onyx.indexing.indexing_pipeline import handle_index_doc_batch_exception
+from onyx.indexing.indexing_pipeline import index_doc_batch_prepare
+from onyx.indexing.indexing_pipeline import index_doc_batch_write
+from onyx.indexing.models import DocAwareChunk
+from onyx.indexing.models import IndexChunk
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+# how often a blocked stage wakes up to check whether the pipeline is shutting down
+_QUEUE_POLL_INTERVAL = 0.5
+# how long to wait for the stage threads to exit when the pipeline is torn down.
+# The fetch thread may be stuck in a connector call, so we don't wait indefinitely.
+_STAGE_JOIN_TIMEOUT = 10.0
+
+
+class PipelineStageStats(BaseModel):
+    """Throughput counters for a single stage of the pipelined indexing flow.
+
+    busy_time is the time spent doing actual work, idle_time is the time spent
+    waiting on the upstream stage (starved) or the downstream stage (backpressure)."""
+
+    name: str
+    batches: int = 0
+    documents: int = 0
+    chunks: int = 0
+    busy_time: float = 0.0
+    idle_time: float = 0.0
+
+    @property
+    def docs_per_second(self) -> float:
+        return self.documents / self.busy_time if self.busy_time else 0.0
+
+    def to_log_str(self) -> str:
+        return (
+            f"{self.name}: batches={self.batches} docs={self.documents} "
+            f"chunks={self.chunks} busy={self.busy_time:.2f}s "
+            f"idle={self.idle_time:.2f}s docs/s={self.docs_per_second:.2f}"
+        )
+
+
+class _StagedBatch(BaseModel):
+    """A document batch as it moves through the pipeline. If any stage fails,
+    `error` is set and the remaining stages pass the batch through untouched so
+    that the failure is reported (in order) on the caller's thread."""
+
+    documents: list[Document]
+    ctx: DocumentBatchPrepareContext | None = None
+    chunks: list[DocAwareChunk] = []
+    embedded_chunks: list[IndexChunk] = []
+    error: Exception | None = None
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+
+class _StageFailure:
+    """Wraps an exception that took down a whole stage (e.g. the connector failed),
+    as opposed to a failure scoped to a single batch."""
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+class _EndOfStream:
+    pass
+
+
+_END_OF_STREAM = _EndOfStream()
+
+
+class PipelinedIndexingPipeline:
+    """Overlaps the stages of indexing across consecutive document batches:
+
+        fetch (connector) -> filter/prepare/chunk -> embed -> write (Vespa + Postgres)
+
+    Each of the first three stages runs on its own thread and hands batches to the
+    next stage through a bounded queue, so a slow stage applies backpressure instead
+    of letting batches pile up in memory. The write stage runs on the caller's thread
+    (with the caller's db session) so that the per-batch commit, progress reporting
+    and stop-signal checks of the indexing loop are unchanged.
+
+    Usage mirrors the sequential pipeline:
+
+        for doc_batch in pipeline.run(connector_runner.run()):
+            ...
+            new_docs, chunks = pipeline(
+                document_batch=doc_batch, index_attempt_metadata=index_attempt_md
+            )
+
+    Batches are yielded in source order and each yielded batch must be passed back
+    in before the next one is requested."""
+
+    def __init__(
+        self,
+        *,
+        chunker: Chunker,
+        embedder: IndexingEmbedder,
+        document_index: DocumentIndex,
+        db_session: Session,
+        index_attempt_metadata: IndexAttemptMetadata,
+        queue_size: int,
+        ignore_time_skip: bool = False,
+        ignore_content_hash_skip: bool = False,
+        attempt_id: int | None = None,
+        tenant_id: str | None = None,
+        callback: IndexingHeartbeatInterface | None = None,
+        filter_fnc: Callable[[list[Document]], list[Document]] = filter_documents,
+    ):
+        self.chunker = chunker
+        self.embedder = embedder
+        self.document_index = document_index
+        self.db_session = db_session
+        self.index_attempt_metadata = index_attempt_metadata
+        self.queue_size = max(queue_size, 1)
+        self.ignore_time_skip = ignore_time_skip
+        self.ignore_content_hash_skip = ignore_content_hash_skip
+        self.attempt_id = attempt_id
+        self.tenant_id = tenant_id
+        self.callback = callback
+        self.filter_fnc = filter_fnc
+
+        self.fetch_stats = PipelineStageStats(name="fetch")
+        self.chunk_stats = PipelineStageStats(name="chunk")
+        self.embed_stats = PipelineStageStats(name="embed")
+        self.write_stats = PipelineStageStats(name="write")
+
+        self._stop_event = threading.Event()
+        self._pending: deque[_StagedBatch] = deque()
+
+    @property
+    def stage_stats(self) -> list[PipelineStageStats]:
+        return [self.fetch_stats, self.chunk_stats, self.embed_stats, self.write_stats]
+
+    @staticmethod
+    def _put(
+        q: queue.Queue,
+        item: Any,
+        stats: PipelineStageStats,
+        stop_event: threading.Event,
+    ) -> bool:
+        """Blocking put that gives up if the run is shutting down.
+        Returns False if the item was not enqueued."""
+        start = time.monotonic()
+        try:
+            while not stop_event.is_set():
+                try:
+                    q.put(item, timeout=_QUEUE_POLL_INTERVAL)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            stats.idle_time += time.monotonic() - start
+
+    @staticmethod
+    def _get(
+        q: queue.Queue, stats: PipelineStageStats, stop_event: threading.Event
+    ) -> Any:
+        """Blocking get that returns the end of stream marker if the run is shutting
+        down."""
+        start = time.monotonic()
+        try:
+            while not stop_event.is_set():
+                try:
+                    return q.get(timeout=_QUEUE_POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+            return _END_OF_STREAM
+        finally:
+            stats.idle_time += time.monotonic() - start
+
+    def _run_stage(
+        self,
+        stage: Callable[..., None],
+        stats: PipelineStageStats,
+        stop_event: threading.Event,
+        out_q: queue.Queue,
+        *args: Any,
+    ) -> None:
+        try:
+            stage(stop_event, *args, out_q)
+        except Exception as e:
+            logger.exception(f"Pipelined indexing stage '{stats.name}' failed")
+            self._put(out_q, _StageFailure(e), stats, stop_event)
+
+    def _fetch_stage(
+        self,
+        stop_event: threading.Event,
+        doc_batches: Iterable[list[Document]],
+        out_q: queue.Queue,
+    ) -> None:
+        iterator = iter(doc_batches)
+        while not stop_event.is_set():
+            start = time.monotonic()
+            doc_batch = next(iterator, None)
+            if doc_batch is None:
+                break
+            self.fetch_stats.busy_time += time.monotonic() - start
+            self.fetch_stats.batches += 1
+            self.fetch_stats.documents += len(doc_batch)
+
+            if not self._put(
+                out_q, _StagedBatch(documents=doc_batch), self.fetch_stats, stop_event
+            ):
+                return
+
+        self._put(out_q, _END_OF_STREAM, self.fetch_stats, stop_event)
+
+    def _chunk_stage(
+        self, stop_event: threading.Event, in_q: queue.Queue, out_q: queue.Queue
+    ) -> None:
+        # Preparing the batch touches Postgres, so this stage needs its own session.
+        # Sessions use expire_on_commit=False so the loaded db docs in the prepare
+        # context remain readable from the write stage.
+        with get_session_with_tenant(self.tenant_id) as db_session:
+            while True:
+                item = self._get(in_q, self.chunk_stats, stop_event)
+                if isinstance(item, (_EndOfStream, _StageFailure)):
+                    self._put(out_q, item, self.chunk_stats, stop_event)
+                    return
+
+                start = time.monotonic()
+                try:
+                    item.ctx = index_doc_batch_prepare(
+                        documents=self.filter_fnc(item.documents),
+                        index_attempt_metadata=self.index_attempt_metadata,
+                        db_session=db_session,
+                        ignore_time_skip=self.ignore_time_skip,
+                        ignore_content_hash_skip=self.ignore_content_hash_skip,
+                    )
+                    if item.ctx and item.ctx.updatable_docs:
+                        item.chunks = self.chunker.chunk(item.ctx.updatable_docs)
+                except Exception as e:
+                    db_session.rollback()
+                    item.error = e
+                self.chunk_stats.busy_time += time.monotonic() - start
+                self.chunk_stats.batches += 1
+                self.chunk_stats.documents += (
+                    len(item.ctx.updatable_docs) if item.ctx else 0
+                )
+                self.chunk_stats.chunks += len(item.chunks)
+
+                if not self._put(out_q, item, self.chunk_stats, stop_event):
+                    return
+
+    def _embed_stage(
+        self, stop_event: threading.Event, in_q: queue.Queue, out_q: queue.Queue
+    ) -> None:
+        while True:
+            item = self._get(in_q, self.embed_stats, stop_event)
+            if isinstance(item, (_EndOfStream, _StageFailure)):
+                self._put(out_q, item, self.embed_stats, stop_event)
+                return
+
+            start = time.monotonic()
+            if item.error is None and item.chunks:
+                try:
+                    item.embedded_chunks = self.embedder.embed_chunks(item.chunks)
+                except Exception as e:
+                    item.error = e
+            self.embed_stats.busy_time += time.monotonic() - start
+            self.embed_stats.batches += 1
+            self.embed_stats.documents += (
+                len(item.ctx.updatable_docs) if item.ctx else 0
+            )
+            self.embed_stats.chunks += len(item.embedded_chunks)
+
+            if not self._put(out_q, item, self.embed_stats, stop_event):
+                return
+
+    def stop(self) -> None:
+        """Signals the background stages of the current run to shut down. Batches that
+        have not been written yet are dropped."""
+        self._stop_event.set()
+
+    def run(self, doc_batches: Iterable[list[Document]]) -> Iterator[list[Document]]:
+        """Starts the background stages and yields the document batches, in order,
+        once they are ready to be written."""
+        # Every run gets its own stop event and queues. A stage of a previous run that
+        # didn't shut down in time (e.g. stuck in a connector call) keeps seeing its own
+        # stop event set and can't feed batches into this run.
+        stop_event = threading.Event()
+        self._stop_event = stop_event
+        self._pending.clear()
+
+        fetched_q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        chunked_q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        embedded_q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+
+        stage_targets: list[
+            tuple[Callable[..., None], PipelineStageStats, queue.Queue, tuple]
+        ] = [
+            (self._fetch_stage, self.fetch_stats, fetched_q, (doc_batches,)),
+            (self._chunk_stage, self.chunk_stats, chunked_q, (fetched_q,)),
+            (self._embed_stage, self.embed_stats, embedded_q, (chunked_q,)),
+        ]
+        threads: list[threading.Thread] = []
+        for stage, stats, out_q, args in stage_targets:
+            # copy the context so that contextvars (e.g. the current tenant) carry over
+            ctx = contextvars.copy_context()
+            thread = threading.Thread(
+                target=ctx.run,
+                args=(self._run_stage, stage, stats, stop_event, out_q, *args),
+                name=f"pipelined-indexing-{stats.name}",
+                daemon=True,
+            )
+            thread.start()
+            threads.append(thread)
+
+        try:
+            while True:
+                item = self._get(embedded_q, self.write_stats, stop_event)
+                if isinstance(item, _EndOfStream):
+                    break
+                if isinstance(item, _StageFailure):
+                    raise item.error
+
+                self._pending.append(item)
+                yield item.documents
+                if self._pending:
+                    raise RuntimeError(
+                        "Pipelined indexing batch was yielded but never written"
+                    )
+        finally:
+            stop_event.set()
+            for thread in threads:
+                thread.join(timeout=_STAGE_JOIN_TIMEOUT)
+                if thread.is_alive():
+                    logger.warning(
+                        f"Pipelined indexing stage did not shut down in time: {thread.name}"
+                    )
+
+            logger.info(
+                "Pipelined indexing stage stats: "
+                + " | ".join(stats.to_log_str() for stats in self.stage_stats)
+            )
+
+    def __call__(
+        self,
+        document_batch: list[Document],
+        index_attempt_metadata: IndexAttemptMetadata,
+    ) -> tuple[int, int]:
+        """Write stage, runs on the caller's thread. Follows the same error handling
+        as `index_doc_batch_with_handler`."""
+        if not self._pending or self._pending[0].documents is not document_batch:
+            raise ValueError(
+                "Pipelined indexing can only write the batch most recently yielded by run()"
+            )
+        item = self._pending.popleft()
+
+        start = time.monotonic()
+        r = (0, 0)
+        try:
+            if item.error is not None:
+                raise item.error
+
+            if item.ctx:
+                r = index_doc_batch_write(
+                    ctx=item.ctx,
+                    chunks_with_embeddings=item.embedded_chunks,
+                    document_index=self.document_index,
+                    db_session=self.db_session,
+                    tenant_id=self.tenant_id,
+                )
+        except Exception as e:
+            handle_index_doc_batch_exception(
+                e,
+                document_batch=document_batch,
+                index_attempt_metadata=index_attempt_metadata,
+                attempt_id=self.attempt_id,
+                db_session=self.db_session,
+            )
+        finally:
+            self.write_stats.busy_time += time.monotonic() - start
+            self.write_stats.batches += 1
+            self.write_stats.documents += (
+                len(item.ctx.updatable_docs) if item.ctx else 0
+            )
+            self.write_stats.chunks += r[1]
+
+        return r
+
+
+def build_pipelined_indexing_pipeline(
+    *,
+    embedder: IndexingEmbedder,
+    document_index: DocumentIndex,
+    db_session: Session,
+    index_attempt_metadata: IndexAttemptMetadata,
+    queue_size: int,
+    chunker: Chunker | None = None,
+    ignore_time_skip: bool = False,
+    ignore_content_hash_skip: bool = False,
+    attempt_id: int | None = None,
+    tenant_id: str | None = None,
+    callback: IndexingHeartbeatInterface | None = None,
+) -> PipelinedIndexingPipeline:
+    """Builds a pipeline which overlaps fetching, chunking, embedding and writing of
+    consecutive document batches. See `PipelinedIndexingPipeline`."""
+    chunker = chunker or build_chunker(
+        embedder=embedder, db_session=db_session, callback=callback
+    )
+
+    return PipelinedIndexingPipeline(
+        chunker=chunker,
+        embedder=embedder,
+        document_index=document_index,
+        db_session=db_session,
+        index_attempt_metadata=index_attempt_metadata,
+        queue_size=queue_size,
+        ignore_time_skip=ignore_time_skip,
+        ignore_content_hash_skip=ignore_content_hash_skip,
+        attempt_id=attempt_id,
+        tenant_id=tenant_id,
+        callback=callback,
+    )
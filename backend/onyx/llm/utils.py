@@ -35,6 +35,7 @@ from onyx.configs.model_configs import GEN_AI_NUM_RESERVED_OUTPUT_TOKENS
 from onyx.file_store.models import ChatFileType
 from onyx.file_store.models import InMemoryChatFile
 from onyx.llm.interfaces import LLM
+from onyx.natural_language_processing.token_count_cache import count_encoded_tokens
 from onyx.prompts.constants import CODE_BLOCK_PAT
 from onyx.utils.b64 import get_image_type
 from onyx.utils.b64 import get_image_type_from_bytes
@@ -311,6 +312,16 @@ def check_message_tokens(
     return total_tokens
 
 
+_DEFAULT_ENCODING: tiktoken.Encoding | None = None
+
+
+def _get_default_encoding() -> tiktoken.Encoding:
+    global _DEFAULT_ENCODING
+    if _DEFAULT_ENCODING is None:
+        _DEFAULT_ENCODING = tiktoken.get_encoding("cl100k_base")
+    return _DEFAULT_ENCODING
+
+
 def check_number_of_tokens(
     text: str, encode_fn: Callable[[str], list] | None = None
 ) -> int:
@@ -320,9 +331,9 @@ def check_number_of_tokens(
     """
 
     if encode_fn is None:
-        encode_fn = tiktoken.get_encoding("cl100k_base").encode
+        encode_fn = _get_default_encoding().encode
 
-    return len(encode_fn(text))
+    return count_encoded_tokens(text, encode_fn)
 
 
 def test_llm(llm: LLM) -> str | None:
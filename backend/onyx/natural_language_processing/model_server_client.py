@@ -0,0 +1,108 @@
+"""Process-wide pooled HTTP clients for calls to the model server.
+
+Every model-server call goes through the same keep-alive connection pool instead of
+opening a new TCP connection per request, so query analysis, query embedding and
+reranking on the chat path no longer pay connection setup each time. Latency of every
+call is recorded per endpoint.
+"""
+import asyncio
+import os
+import threading
+import time
+import weakref
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from prometheus_client import Histogram
+from requests.adapters import HTTPAdapter
+
+from onyx.configs.model_configs import MODEL_SERVER_CLIENT_KEEPALIVE_EXPIRY_SECONDS
+from onyx.configs.model_configs import MODEL_SERVER_CLIENT_POOL_CONNECTIONS
+from onyx.configs.model_configs import MODEL_SERVER_CLIENT_POOL_MAXSIZE
+
+_MODEL_SERVER_REQUEST_LATENCY = Histogram(
+    "onyx_model_server_client_request_latency_seconds",
+    "Latency of requests to the model server as seen by the client",
+    ["endpoint", "status"],
+)
+
+_session: requests.Session | None = None
+_session_pid: int | None = None
+_session_lock = threading.Lock()
+
+# httpx async clients are bound to the event loop they were first used on
+_async_clients: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, httpx.AsyncClient
+] = weakref.WeakKeyDictionary()
+
+
+def get_model_server_session() -> requests.Session:
+    """Returns the shared session of this process. Pooled connections must not be
+    shared with forked children (e.g. celery workers), so a fork gets a new session."""
+    global _session, _session_pid
+
+    pid = os.getpid()
+    if _session is not None and _session_pid == pid:
+        return _session
+
+    with _session_lock:
+        if _session is None or _session_pid != pid:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=MODEL_SERVER_CLIENT_POOL_CONNECTIONS,
+                pool_maxsize=MODEL_SERVER_CLIENT_POOL_MAXSIZE,
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+            _session_pid = pid
+        return _session
+
+
+def get_async_model_server_client() -> httpx.AsyncClient:
+    """Returns the shared client of the running event loop, for async callers such as
+    FastAPI endpoints that must not block the loop on model server calls."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=MODEL_SERVER_CLIENT_POOL_MAXSIZE,
+                max_keepalive_connections=MODEL_SERVER_CLIENT_POOL_MAXSIZE,
+                keepalive_expiry=MODEL_SERVER_CLIENT_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            # same as requests, callers decide on retries / timeouts
+            timeout=None,
+        )
+        _async_clients[loop] = client
+    return client
+
+
+def _observe_latency(url: str, status: str, start: float) -> None:
+    _MODEL_SERVER_REQUEST_LATENCY.labels(urlsplit(url).path, status).observe(
+        time.monotonic() - start
+    )
+
+
+def post_to_model_server(url: str, **kwargs: Any) -> requests.Response:
+    start = time.monotonic()
+    try:
+        response = get_model_server_session().post(url, **kwargs)
+    except requests.RequestException:
+        _observe_latency(url, "error", start)
+        raise
+    _observe_latency(url, str(response.status_code), start)
+    return response
+
+
+async def async_post_to_model_server(url: str, **kwargs: Any) -> httpx.Response:
+    start = time.monotonic()
+    try:
+        response = await get_async_model_server_client().post(url, **kwargs)
+    except httpx.HTTPError:
+        _observe_latency(url, "error", start)
+        raise
+    _observe_latency(url, str(response.status_code), start)
+    return response
@@ -1,9 +1,15 @@
 import threading
 import time
 from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
 from functools import wraps
 from typing import Any
 
+import numpy as np
+import numpy.typing as npt
 import requests
 from httpx import HTTPError
 from requests import JSONDecodeError
@@ -16,18 +22,33 @@ from onyx.configs.model_configs import BATCH_SIZE_ENCODE_CHUNKS
 from onyx.configs.model_configs import (
     BATCH_SIZE_ENCODE_CHUNKS_FOR_API_EMBEDDING_SERVICES,
 )
+from onyx.configs.model_configs import CLOUD_EMBEDDING_REQUEST_CONCURRENCY
 from onyx.configs.model_configs import DOC_EMBEDDING_CONTEXT_SIZE
+from onyx.configs.model_configs import EMBEDDING_BATCH_TOKEN_BUDGET
+from onyx.configs.model_configs import EMBEDDING_REQUEST_CONCURRENCY_OVERRIDES
+from onyx.configs.model_configs import EMBEDDING_REQUESTS_PER_MINUTE
+from onyx.configs.model_configs import ENABLE_LENGTH_BUCKETED_EMBEDDING_BATCHES
 from onyx.db.models import SearchSettings
+from onyx.embedding_cache.interface import build_embedding_cache_key
+from onyx.embedding_cache.interface import EmbeddingCache
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
 from onyx.natural_language_processing.exceptions import (
     ModelServerRateLimitError,
 )
+from onyx.natural_language_processing.model_server_client import (
+    post_to_model_server,
+)
 from onyx.natural_language_processing.utils import get_tokenizer
 from onyx.natural_language_processing.utils import tokenizer_trim_content
 from onyx.utils.logger import setup_logger
+from shared_configs.configs import MODEL_SERVER_EMBEDDING_TRANSPORT
 from shared_configs.configs import MODEL_SERVER_HOST
 from shared_configs.configs import MODEL_SERVER_PORT
+from shared_configs.embedding_transport import build_embedding_accept_header
+from shared_configs.embedding_transport import decode_embeddings
+from shared_configs.embedding_transport import EMBEDDING_BINARY_MEDIA_TYPE
 from shared_configs.enums import EmbeddingProvider
+from shared_configs.enums import EmbeddingTransportFormat
 from shared_configs.enums import EmbedTextType
 from shared_configs.enums import RerankerProvider
 from shared_configs.model_server_models import ConnectorClassificationRequest
@@ -51,6 +72,49 @@ WARM_UP_STRINGS = [
 ]
 
 
+class _RequestRateLimiter:
+    """Spaces out request starts so that at most `requests_per_minute` are sent per
+    minute, shared by all threads of the process."""
+
+    def __init__(self, requests_per_minute: int) -> None:
+        self._interval = 60 / requests_per_minute
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+_RATE_LIMITERS: dict[str, _RequestRateLimiter] = {}
+_RATE_LIMITERS_LOCK = threading.Lock()
+
+
+def _get_embedding_provider_key(provider_type: EmbeddingProvider | None) -> str:
+    return provider_type.value if provider_type else "local"
+
+
+def _get_embedding_rate_limiter(provider_key: str) -> _RequestRateLimiter | None:
+    requests_per_minute = EMBEDDING_REQUESTS_PER_MINUTE.get(provider_key)
+    if not requests_per_minute:
+        return None
+
+    with _RATE_LIMITERS_LOCK:
+        if provider_key not in _RATE_LIMITERS:
+            _RATE_LIMITERS[provider_key] = _RequestRateLimiter(requests_per_minute)
+        return _RATE_LIMITERS[provider_key]
+
+
+def _get_embedding_request_concurrency(provider_key: str) -> int:
+    if provider_key in EMBEDDING_REQUEST_CONCURRENCY_OVERRIDES:
+        return max(EMBEDDING_REQUEST_CONCURRENCY_OVERRIDES[provider_key], 1)
+    return 1 if provider_key == "local" else max(CLOUD_EMBEDDING_REQUEST_CONCURRENCY, 1)
+
+
 def clean_model_name(model_str: str) -> str:
     return model_str.replace("/", "_").replace("-", "_").replace(".", "_")
 
@@ -85,6 +149,7 @@ class EmbeddingModel:
         callback: IndexingHeartbeatInterface | None = None,
         api_version: str | None = None,
         deployment_name: str | None = None,
+        embedding_cache: EmbeddingCache | None = None,
     ) -> None:
         self.api_key = api_key
         self.provider_type = provider_type
@@ -100,14 +165,24 @@ class EmbeddingModel:
             model_name=model_name, provider_type=provider_type
         )
         self.callback = callback
+        self.embedding_cache = embedding_cache
 
         model_server_url = build_model_server_url(server_host, server_port)
         self.embed_server_endpoint = f"{model_server_url}/encoder/bi-encoder-embed"
+        self._embed_accept_header = build_embedding_accept_header(
+            EmbeddingTransportFormat(MODEL_SERVER_EMBEDDING_TRANSPORT)
+        )
+
+    def _make_model_server_request(
+        self, embed_request: EmbedRequest
+    ) -> npt.NDArray[np.float32]:
+        """Returns the embeddings as a (count, dim) float32 array"""
 
-    def _make_model_server_request(self, embed_request: EmbedRequest) -> EmbedResponse:
         def _make_request() -> Response:
-            response = requests.post(
-                self.embed_server_endpoint, json=embed_request.model_dump()
+            response = post_to_model_server(
+                self.embed_server_endpoint,
+                json=embed_request.model_dump(),
+                headers={"Accept": self._embed_accept_header},
             )
             # signify that this is a rate limit error
             if response.status_code == 429:
@@ -133,7 +208,15 @@ class EmbeddingModel:
 
         try:
             response = final_make_request_func()
-            return EmbedResponse(**response.json())
+            if response.headers.get("Content-Type", "").startswith(
+                EMBEDDING_BINARY_MEDIA_TYPE
+            ):
+                return decode_embeddings(response.content).astype(
+                    np.float32, copy=False
+                )
+            return np.asarray(
+                EmbedResponse(**response.json()).embeddings, dtype=np.float32
+            )
         except requests.HTTPError as e:
             try:
                 error_detail = response.json().get("detail", str(e))
@@ -143,26 +226,59 @@ class EmbeddingModel:
         except requests.RequestException as e:
             raise HTTPError(f"Request failed: {str(e)}") from e
 
+    def _build_length_bucketed_batches(
+        self, texts: list[str], batch_size: int, max_seq_length: int
+    ) -> list[list[int]]:
+        """Groups the indices of the texts into batches of similar token length. Each
+        batch is filled while its padded size (num texts * longest text) stays within
+        the token budget, so batches of short texts hold more texts."""
+        token_budget = EMBEDDING_BATCH_TOKEN_BUDGET or batch_size * max_seq_length
+        lengths = [
+            min(len(self.tokenizer.encode(text)), max_seq_length) or 1 for text in texts
+        ]
+
+        batches: list[list[int]] = []
+        current_batch: list[int] = []
+        for ind in sorted(range(len(texts)), key=lambda i: lengths[i]):
+            # sorted ascending, so the new text is the longest of the batch
+            if current_batch and (len(current_batch) + 1) * lengths[ind] > token_budget:
+                batches.append(current_batch)
+                current_batch = []
+            current_batch.append(ind)
+        if current_batch:
+            batches.append(current_batch)
+        return batches
+
     def _batch_encode_texts(
         self,
         texts: list[str],
         text_type: EmbedTextType,
         batch_size: int,
         max_seq_length: int,
-    ) -> list[Embedding]:
-        text_batches = batch_list(texts, batch_size)
+    ) -> npt.NDArray[np.float32]:
+        """Returns the embeddings of the texts as a (len(texts), dim) float32 array"""
+        if ENABLE_LENGTH_BUCKETED_EMBEDDING_BATCHES and not self.provider_type:
+            index_batches = self._build_length_bucketed_batches(
+                texts, batch_size, max_seq_length
+            )
+        else:
+            index_batches = batch_list(list(range(len(texts))), batch_size)
+        text_batches = [[texts[ind] for ind in batch] for batch in index_batches]
 
-        logger.debug(
-            f"Encoding {len(texts)} texts in {len(text_batches)} batches for local model"
+        provider_key = _get_embedding_provider_key(self.provider_type)
+        concurrency = min(
+            _get_embedding_request_concurrency(provider_key), len(text_batches)
         )
+        rate_limiter = _get_embedding_rate_limiter(provider_key)
 
-        embeddings: list[Embedding] = []
-        for idx, text_batch in enumerate(text_batches, start=1):
-            if self.callback:
-                if self.callback.should_stop():
-                    raise RuntimeError("_batch_encode_texts detected stop signal")
+        logger.debug(
+            f"Encoding {len(texts)} texts in {len(text_batches)} batches "
+            f"with provider={provider_key} concurrency={concurrency}"
+        )
 
-            logger.debug(f"Encoding batch {idx} of {len(text_batches)}")
+        def _encode_batch(text_batch: list[str]) -> npt.NDArray[np.float32]:
+            if rate_limiter:
+                rate_limiter.acquire()
             embed_request = EmbedRequest(
                 model_name=self.model_name,
                 texts=text_batch,
@@ -177,13 +293,139 @@ class EmbeddingModel:
                 manual_passage_prefix=self.passage_prefix,
                 api_url=self.api_url,
             )
+            return self._make_model_server_request(embed_request)
+
+        # batches may complete / be ordered differently than the texts, they are put
+        # back in place once all are done
+        encoded_index_batches: list[list[int]] = []
+        encoded_batches: list[npt.NDArray[np.float32]] = []
+
+        def _in_text_order() -> npt.NDArray[np.float32]:
+            stacked = np.concatenate(encoded_batches)
+            embeddings = np.empty_like(stacked)
+            embeddings[np.concatenate(encoded_index_batches)] = stacked
+            return embeddings
+
+        if concurrency <= 1:
+            # nothing to overlap (e.g. a single query batch), so skip the thread pool
+            for idx, (index_batch, text_batch) in enumerate(
+                zip(index_batches, text_batches), start=1
+            ):
+                if self.callback:
+                    if self.callback.should_stop():
+                        raise RuntimeError("_batch_encode_texts detected stop signal")
+
+                logger.debug(f"Encoding batch {idx} of {len(text_batches)}")
+                encoded_batches.append(_encode_batch(text_batch))
+                encoded_index_batches.append(index_batch)
+
+                if self.callback:
+                    self.callback.progress("_batch_encode_texts", 1)
+
+            return _in_text_order()
+
+        batches = iter(enumerate(zip(index_batches, text_batches), start=1))
+        # Batches are submitted lazily so that at most `concurrency` are in flight and the
+        # stop signal is checked before sending each one. The heartbeat stays on this
+        # thread and is sent as each batch completes
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            in_flight: dict[Future[npt.NDArray[np.float32]], list[int]] = {}
+            batches_exhausted = False
+            try:
+                while True:
+                    while not batches_exhausted and len(in_flight) < concurrency:
+                        next_batch = next(batches, None)
+                        if next_batch is None:
+                            batches_exhausted = True
+                            break
+
+                        idx, (index_batch, text_batch) = next_batch
+                        if self.callback:
+                            if self.callback.should_stop():
+                                raise RuntimeError(
+                                    "_batch_encode_texts detected stop signal"
+                                )
+
+                        logger.debug(f"Encoding batch {idx} of {len(text_batches)}")
+                        in_flight[
+                            executor.submit(_encode_batch, text_batch)
+                        ] = index_batch
+
+                    if not in_flight:
+                        break
+
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        encoded_index_batches.append(in_flight.pop(future))
+                        encoded_batches.append(future.result())
+
+                        if self.callback:
+                            self.callback.progress("_batch_encode_texts", 1)
+            finally:
+                for future in in_flight:
+                    future.cancel()
+
+        return _in_text_order()
+
+    def _batch_encode_texts_with_cache(
+        self,
+        embedding_cache: EmbeddingCache,
+        texts: list[str],
+        text_type: EmbedTextType,
+        batch_size: int,
+        max_seq_length: int,
+    ) -> list[Embedding]:
+        """Only sends the texts that are not in the embedding cache to the model server.
+        Identical texts within the same call are also only embedded once."""
+        prefix = (
+            self.query_prefix
+            if text_type == EmbedTextType.QUERY
+            else self.passage_prefix
+        )
+        keys = [
+            build_embedding_cache_key(
+                text=text,
+                text_type=text_type,
+                model_name=self.model_name,
+                provider_type=self.provider_type,
+                normalize=self.normalize,
+                prefix=prefix,
+                max_seq_length=max_seq_length,
+                api_url=self.api_url,
+                deployment_name=self.deployment_name,
+                api_version=self.api_version,
+            )
+            for text in texts
+        ]
 
-            response = self._make_model_server_request(embed_request)
-            embeddings.extend(response.embeddings)
+        key_to_embedding = embedding_cache.get_many(list(set(keys)))
 
-            if self.callback:
-                self.callback.progress("_batch_encode_texts", 1)
-        return embeddings
+        # preserves order, so the texts are still batched in their original order
+        key_to_missing_text: dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in key_to_embedding:
+                key_to_missing_text[key] = text
+
+        logger.debug(
+            f"Embedding cache: {len(texts) - len(key_to_missing_text)} of {len(texts)} texts cached"
+        )
+
+        if key_to_missing_text:
+            new_embeddings = self._batch_encode_texts(
+                texts=list(key_to_missing_text.values()),
+                text_type=text_type,
+                batch_size=batch_size,
+                max_seq_length=max_seq_length,
+            )
+            # cached straight from the array, converted to lists only once
+            embedding_cache.set_many(
+                dict(zip(key_to_missing_text.keys(), new_embeddings))
+            )
+            key_to_embedding.update(
+                zip(key_to_missing_text.keys(), new_embeddings.tolist())
+            )
+
+        return [key_to_embedding[key] for key in keys]
 
     def encode(
         self,
@@ -219,12 +461,23 @@ class EmbeddingModel:
             else local_embedding_batch_size
         )
 
+        if self.embedding_cache:
+            return self._batch_encode_texts_with_cache(
+                embedding_cache=self.embedding_cache,
+                texts=texts,
+                text_type=text_type,
+                batch_size=batch_size,
+                max_seq_length=max_seq_length,
+            )
+
+        # the vectors stay a float32 array up to here, callers (index chunks, the
+        # document index) work with lists
         return self._batch_encode_texts(
             texts=texts,
             text_type=text_type,
             batch_size=batch_size,
             max_seq_length=max_seq_length,
-        )
+        ).tolist()
 
     @classmethod
     def from_db_model(
@@ -233,6 +486,7 @@ class EmbeddingModel:
         server_host: str,  # Changes depending on indexing or inference
         server_port: int,
         retrim_content: bool = False,
+        embedding_cache: EmbeddingCache | None = None,
     ) -> "EmbeddingModel":
         return cls(
             server_host=server_host,
@@ -247,6 +501,7 @@ class EmbeddingModel:
             retrim_content=retrim_content,
             api_version=search_settings.api_version,
             deployment_name=search_settings.deployment_name,
+            embedding_cache=embedding_cache,
         )
 
 
@@ -277,7 +532,7 @@ class RerankingModel:
             api_url=self.api_url,
         )
 
-        response = requests.post(
+        response = post_to_model_server(
             self.rerank_server_endpoint, json=rerank_request.model_dump()
         )
         response.raise_for_status()
@@ -310,7 +565,7 @@ class QueryAnalysisModel:
             semantic_percent_threshold=self.semantic_percent_threshold,
         )
 
-        response = requests.post(
+        response = post_to_model_server(
             self.intent_server_endpoint, json=intent_request.model_dump()
         )
         response.raise_for_status()
@@ -340,7 +595,7 @@ class ConnectorClassificationModel:
             available_connectors=available_connectors,
             query=query,
         )
-        response = requests.post(
+        response = post_to_model_server(
             self.connector_classification_endpoint,
             json=connector_classification_request.dict(),
         )
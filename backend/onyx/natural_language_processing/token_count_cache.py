@@ -0,0 +1,102 @@
+"""Token counts of texts that are counted over and over again, for example on every new
+message of a chat. Kept apart from the tokenizers so that counting doesn't require
+loading them."""
+import hashlib
+import weakref
+from collections.abc import Callable
+from typing import Any
+
+from prometheus_client import Counter
+
+from onyx.configs.model_configs import TOKEN_COUNT_CACHE_MAX_ENTRIES
+from onyx.utils.ttl_lru_cache import TTLLRUCache
+
+_TOKEN_COUNT_REQUESTS = Counter(
+    "onyx_token_count_cache_requests_total",
+    "Token counts requested from the token count cache, hits are encode calls avoided",
+    ["result"],
+)
+
+
+class TokenCountCache:
+    """In process LRU of token counts keyed by the encode function and a hash of the
+    text. The object an encode function is bound to (usually the tokenizer) is referenced
+    weakly, so an encoder that gets the id of a garbage collected one never sees its
+    counts."""
+
+    def __init__(self, max_entries: int) -> None:
+        # (encoder id, encode function name, text hash) -> (encoder, token count)
+        self._entries: TTLLRUCache[
+            tuple[int, str, bytes], tuple[weakref.ref[Any], int]
+        ] = TTLLRUCache(max_entries=max_entries)
+
+    @staticmethod
+    def _encoder(encode_fn: Callable[[str], list]) -> Any:
+        # bound methods are created on every attribute access, the object they are bound
+        # to is what stays the same
+        return getattr(encode_fn, "__self__", encode_fn)
+
+    @staticmethod
+    def _key(text: str, encode_fn: Callable[[str], list]) -> tuple[int, str, bytes]:
+        text_hash = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        return (
+            id(TokenCountCache._encoder(encode_fn)),
+            getattr(encode_fn, "__qualname__", type(encode_fn).__qualname__),
+            text_hash,
+        )
+
+    def get(self, text: str, encode_fn: Callable[[str], list]) -> int | None:
+        key = self._key(text, encode_fn)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        encoder_ref, token_count = entry
+        if encoder_ref() is not self._encoder(encode_fn):
+            self._entries.delete(key)
+            return None
+        return token_count
+
+    def set(
+        self, text: str, encode_fn: Callable[[str], list], token_count: int
+    ) -> None:
+        try:
+            encoder_ref = weakref.ref(self._encoder(encode_fn))
+        except TypeError:
+            # not every object can be referenced weakly, these are not cached
+            return
+
+        self._entries.set(self._key(text, encode_fn), (encoder_ref, token_count))
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+_TOKEN_COUNT_CACHE: TokenCountCache | None = None
+
+
+def get_token_count_cache() -> TokenCountCache | None:
+    global _TOKEN_COUNT_CACHE
+
+    if TOKEN_COUNT_CACHE_MAX_ENTRIES <= 0:
+        return None
+
+    if _TOKEN_COUNT_CACHE is None:
+        _TOKEN_COUNT_CACHE = TokenCountCache(TOKEN_COUNT_CACHE_MAX_ENTRIES)
+    return _TOKEN_COUNT_CACHE
+
+
+def count_encoded_tokens(text: str, encode_fn: Callable[[str], list]) -> int:
+    """len(encode_fn(text)), remembered for texts that are counted repeatedly"""
+    token_count_cache = get_token_count_cache()
+    if token_count_cache is None:
+        return len(encode_fn(text))
+
+    token_count = token_count_cache.get(text, encode_fn)
+    if token_count is not None:
+        _TOKEN_COUNT_REQUESTS.labels("hit").inc()
+        return token_count
+
+    _TOKEN_COUNT_REQUESTS.labels("miss").inc()
+    token_count = len(encode_fn(text))
+    token_count_cache.set(text, encode_fn, token_count)
+    return token_count
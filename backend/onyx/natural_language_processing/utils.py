@@ -8,6 +8,9 @@ from transformers import logging as transformer_logging  # type:ignore
 from onyx.configs.model_configs import DOC_EMBEDDING_CONTEXT_SIZE
 from onyx.configs.model_configs import DOCUMENT_ENCODER_MODEL
 from onyx.context.search.models import InferenceChunk
+from onyx.natural_language_processing.token_count_cache import (
+    count_encoded_tokens,
+)
 from onyx.utils.logger import setup_logger
 from shared_configs.enums import EmbeddingProvider
 
@@ -155,6 +158,11 @@ def get_tokenizer(
     return _check_tokenizer_cache(provider_type, model_name)
 
 
+def count_tokens(text: str, tokenizer: BaseTokenizer) -> int:
+    """len(tokenizer.encode(text)), remembered for texts that are counted repeatedly"""
+    return count_encoded_tokens(text, tokenizer.encode)
+
+
 def tokenizer_trim_content(
     content: str, desired_length: int, tokenizer: BaseTokenizer
 ) -> str:
@@ -42,3 +42,28 @@ Be sure to run through the 3 steps of evaluation:
 2. Useful Analysis
 3. Final Relevance Determination
 """.strip()
+
+AGENTIC_SEARCH_BATCH_SYSTEM_PROMPT = """
+You are an expert at evaluating the relevance of documents to a search query.
+Provided numbered documents and a search query, you determine for each document if it is \
+relevant to the user query.
+
+For every document, you provide:
+- "analysis": Summarize the contents of the document as it relates to the user query.
+BE ABSOLUTELY AS CONCISE AS POSSIBLE.
+If the document is not useful, briefly mention the what the document is about.
+Do NOT say whether this document is useful or not useful, ONLY provide the summary.
+If referring to the document, prefer using "this" document over "the" document.
+- "relevant": The final relevance determination, always true or false.
+"""
+
+AGENTIC_SEARCH_BATCH_USER_PROMPT = """
+{documents}
+
+Query:
+{query}
+
+Evaluate EVERY document above. Respond with ONLY a JSON list with one object per document \
+in the same order, like:
+[{{"document": 1, "analysis": "...", "relevant": true}}]
+""".strip()
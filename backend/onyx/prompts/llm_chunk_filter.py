@@ -28,6 +28,27 @@ Respond with EXACTLY AND ONLY: "{USEFUL_PAT}" or "{NONUSEFUL_PAT}"
 """.strip()
 
 
+SECTION_BATCH_FILTER_PROMPT = """
+Determine for each of the following numbered sections if it is USEFUL for answering the \
+user query.
+It is NOT enough for a section to be related to the query, \
+it must contain information that is USEFUL for answering the query.
+If a section contains ANY useful information, that is good enough, \
+it does not need to fully answer the every part of the user query.
+
+{sections}
+
+User Query:
+```
+{user_query}
+```
+
+Evaluate EVERY section above. Respond with ONLY a JSON list with one object per section in \
+the same order, like:
+[{{"document": 1, "relevant": true}}]
+""".strip()
+
+
 # Use the following for easy viewing of prompts
 if __name__ == "__main__":
     print(SECTION_FILTER_PROMPT)
@@ -1,13 +1,29 @@
 import re
+from collections.abc import Callable
+from typing import cast
 
 from onyx.chat.models import SectionRelevancePiece
+from onyx.configs.chat_configs import ENABLE_BATCHED_SECTION_EVALUATION
 from onyx.context.search.models import InferenceSection
 from onyx.llm.interfaces import LLM
 from onyx.llm.utils import dict_based_prompt_to_langchain_prompt
 from onyx.llm.utils import message_to_string
+from onyx.prompts.agentic_evaluation import AGENTIC_SEARCH_BATCH_SYSTEM_PROMPT
+from onyx.prompts.agentic_evaluation import AGENTIC_SEARCH_BATCH_USER_PROMPT
 from onyx.prompts.agentic_evaluation import AGENTIC_SEARCH_SYSTEM_PROMPT
 from onyx.prompts.agentic_evaluation import AGENTIC_SEARCH_USER_PROMPT
+from onyx.secondary_llm_flows.section_evaluation import build_section_batches
+from onyx.secondary_llm_flows.section_evaluation import (
+    build_section_evaluation_key,
+)
+from onyx.secondary_llm_flows.section_evaluation import format_batch_sections
+from onyx.secondary_llm_flows.section_evaluation import (
+    get_section_evaluation_cache,
+)
+from onyx.secondary_llm_flows.section_evaluation import parse_batch_verdicts
+from onyx.secondary_llm_flows.section_evaluation import SectionVerdict
 from onyx.utils.logger import setup_logger
+from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
 
 logger = setup_logger()
 
@@ -33,18 +49,19 @@ def _get_agent_eval_messages(
     return messages
 
 
+def _get_metadata_str(metadata: dict[str, str | list[str]]) -> str:
+    metadata_str = "\n\nMetadata:\n"
+    for key, value in metadata.items():
+        value_str = ", ".join(value) if isinstance(value, list) else value
+        metadata_str += f"{key} - {value_str}\n"
+
+    # Since there is now multiple sections, add this prefix for clarity
+    return metadata_str + "\nContent:"
+
+
 def evaluate_inference_section(
     document: InferenceSection, query: str, llm: LLM
 ) -> SectionRelevancePiece:
-    def _get_metadata_str(metadata: dict[str, str | list[str]]) -> str:
-        metadata_str = "\n\nMetadata:\n"
-        for key, value in metadata.items():
-            value_str = ", ".join(value) if isinstance(value, list) else value
-            metadata_str += f"{key} - {value_str}\n"
-
-        # Since there is now multiple sections, add this prefix for clarity
-        return metadata_str + "\nContent:"
-
     document_id = document.center_chunk.document_id
     semantic_id = document.center_chunk.semantic_identifier
     contents = document.combined_content
@@ -89,3 +106,140 @@ def evaluate_inference_section(
         relevant=relevant,
         content=analysis,
     )
+
+
+def _evaluate_section_batch(
+    sections: list[InferenceSection], query: str, llm: LLM
+) -> list[SectionVerdict] | None:
+    messages = [
+        {"role": "system", "content": AGENTIC_SEARCH_BATCH_SYSTEM_PROMPT},
+        {
+            "role": "user",
+            "content": AGENTIC_SEARCH_BATCH_USER_PROMPT.format(
+                documents=format_batch_sections(
+                    titles=[
+                        section.center_chunk.semantic_identifier for section in sections
+                    ],
+                    contents=[section.combined_content for section in sections],
+                    metadata_strs=[
+                        _get_metadata_str(section.center_chunk.metadata)
+                        if section.center_chunk.metadata
+                        else ""
+                        for section in sections
+                    ],
+                ),
+                query=query,
+            ),
+        },
+    ]
+    try:
+        model_output = message_to_string(
+            llm.invoke(dict_based_prompt_to_langchain_prompt(messages))
+        )
+    except Exception:
+        logger.exception("Batched agentic evaluation failed")
+        return None
+
+    verdicts = parse_batch_verdicts(model_output, len(sections))
+    if verdicts is None:
+        logger.warning(
+            "Could not parse the batched agentic evaluation, "
+            "evaluating the sections one by one"
+        )
+    return verdicts
+
+
+def _evaluate_sections_batched(
+    sections: list[InferenceSection], query: str, llm: LLM
+) -> list[SectionVerdict]:
+    batches = build_section_batches(
+        section_texts=[section.combined_content for section in sections], llm=llm
+    )
+    batch_results = run_functions_tuples_in_parallel(
+        [
+            (_evaluate_section_batch, ([sections[ind] for ind in batch], query, llm))
+            for batch in batches
+        ]
+    )
+
+    verdicts: list[SectionVerdict | None] = [None] * len(sections)
+    fallback_inds: list[int] = []
+    for batch, batch_verdicts in zip(batches, batch_results):
+        if batch_verdicts is None:
+            fallback_inds.extend(batch)
+            continue
+        for ind, verdict in zip(batch, batch_verdicts):
+            verdicts[ind] = verdict
+
+    if fallback_inds:
+        fallback_functions: list[tuple[Callable, tuple]] = [
+            (evaluate_inference_section, (sections[ind], query, llm))
+            for ind in fallback_inds
+        ]
+        for ind, piece in zip(
+            fallback_inds, run_functions_tuples_in_parallel(fallback_functions)
+        ):
+            verdicts[ind] = SectionVerdict(
+                relevant=piece.relevant, analysis=piece.content or ""
+            )
+
+    # every section got a verdict from either its batch or the fallback
+    return cast(list[SectionVerdict], verdicts)
+
+
+def evaluate_inference_sections(
+    sections: list[InferenceSection],
+    query: str,
+    llm: LLM,
+    batched: bool = ENABLE_BATCHED_SECTION_EVALUATION,
+) -> list[SectionRelevancePiece]:
+    """Agentic evaluation of all the sections, either with one LLM call per section or
+    with multiple sections per call. Sections already evaluated for the same query are
+    taken from the evaluation cache if it is enabled."""
+    evaluation_cache = get_section_evaluation_cache()
+    keys = [
+        build_section_evaluation_key(
+            "agentic",
+            llm,
+            query,
+            section.center_chunk.semantic_identifier,
+            section.combined_content,
+        )
+        for section in sections
+    ]
+    cached_verdicts = evaluation_cache.get_many(keys) if evaluation_cache else {}
+    missing_inds = [ind for ind, key in enumerate(keys) if key not in cached_verdicts]
+    missing_sections = [sections[ind] for ind in missing_inds]
+
+    if batched:
+        new_verdicts = _evaluate_sections_batched(missing_sections, query, llm)
+    else:
+        new_verdicts = [
+            SectionVerdict(relevant=piece.relevant, analysis=piece.content or "")
+            for piece in run_functions_tuples_in_parallel(
+                [
+                    (evaluate_inference_section, (section, query, llm))
+                    for section in missing_sections
+                ]
+            )
+        ]
+
+    new_entries = {
+        keys[ind]: verdict for ind, verdict in zip(missing_inds, new_verdicts)
+    }
+    if evaluation_cache is not None and new_entries:
+        # verdicts of failed evaluations are not cached, they'd stick around as False
+        evaluation_cache.set_many(
+            {key: verdict for key, verdict in new_entries.items() if verdict.analysis}
+        )
+    cached_verdicts.update(new_entries)
+
+    return [
+        SectionRelevancePiece(
+            document_id=section.center_chunk.document_id,
+            chunk_id=section.center_chunk.chunk_id,
+            relevant=cached_verdicts[key].relevant,
+            content=cached_verdicts[key].analysis,
+        )
+        for section, key in zip(sections, keys)
+    ]
@@ -1,17 +1,37 @@
 from collections.abc import Callable
 
 from onyx.configs.chat_configs import DISABLE_LLM_DOC_RELEVANCE
+from onyx.configs.chat_configs import ENABLE_BATCHED_SECTION_EVALUATION
 from onyx.llm.interfaces import LLM
 from onyx.llm.utils import dict_based_prompt_to_langchain_prompt
 from onyx.llm.utils import message_to_string
 from onyx.prompts.llm_chunk_filter import NONUSEFUL_PAT
+from onyx.prompts.llm_chunk_filter import SECTION_BATCH_FILTER_PROMPT
 from onyx.prompts.llm_chunk_filter import SECTION_FILTER_PROMPT
+from onyx.secondary_llm_flows.section_evaluation import build_section_batches
+from onyx.secondary_llm_flows.section_evaluation import (
+    build_section_evaluation_key,
+)
+from onyx.secondary_llm_flows.section_evaluation import format_batch_sections
+from onyx.secondary_llm_flows.section_evaluation import (
+    get_section_evaluation_cache,
+)
+from onyx.secondary_llm_flows.section_evaluation import parse_batch_verdicts
+from onyx.secondary_llm_flows.section_evaluation import SectionVerdict
 from onyx.utils.logger import setup_logger
 from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
 
 logger = setup_logger()
 
 
+def _get_metadata_str(metadata: dict[str, str | list[str]]) -> str:
+    metadata_str = "\nMetadata:\n"
+    for key, value in metadata.items():
+        value_str = ", ".join(value) if isinstance(value, list) else value
+        metadata_str += f"{key} - {value_str}\n"
+    return metadata_str
+
+
 def llm_eval_section(
     query: str,
     section_content: str,
@@ -19,13 +39,6 @@ def llm_eval_section(
     title: str,
     metadata: dict[str, str | list[str]],
 ) -> bool:
-    def _get_metadata_str(metadata: dict[str, str | list[str]]) -> str:
-        metadata_str = "\nMetadata:\n"
-        for key, value in metadata.items():
-            value_str = ", ".join(value) if isinstance(value, list) else value
-            metadata_str += f"{key} - {value_str}\n"
-        return metadata_str
-
     def _get_usefulness_messages() -> list[dict[str, str]]:
         metadata_str = _get_metadata_str(metadata) if metadata else ""
         messages = [
@@ -56,6 +69,97 @@ def llm_eval_section(
     return _extract_usefulness(model_output)
 
 
+def _llm_eval_section_batch(
+    query: str,
+    section_contents: list[str],
+    llm: LLM,
+    titles: list[str],
+    metadata_list: list[dict[str, str | list[str]]],
+) -> list[SectionVerdict] | None:
+    messages = [
+        {
+            "role": "user",
+            "content": SECTION_BATCH_FILTER_PROMPT.format(
+                sections=format_batch_sections(
+                    titles=titles,
+                    contents=section_contents,
+                    metadata_strs=[
+                        _get_metadata_str(metadata) if metadata else ""
+                        for metadata in metadata_list
+                    ],
+                ),
+                user_query=query,
+            ),
+        },
+    ]
+    try:
+        model_output = message_to_string(
+            llm.invoke(dict_based_prompt_to_langchain_prompt(messages))
+        )
+    except Exception:
+        logger.exception("Batched LLM usefulness eval failed")
+        return None
+
+    verdicts = parse_batch_verdicts(model_output, len(section_contents))
+    if verdicts is None:
+        logger.warning(
+            "Could not parse the batched LLM usefulness eval, "
+            "evaluating the sections one by one"
+        )
+    return verdicts
+
+
+def _llm_batched_eval_sections(
+    query: str,
+    section_contents: list[str],
+    llm: LLM,
+    titles: list[str],
+    metadata_list: list[dict[str, str | list[str]]],
+) -> list[bool | None]:
+    """Evaluates multiple sections per LLM call, the sections of a batch whose output
+    can't be parsed are evaluated one by one. None for sections whose eval failed."""
+    batches = build_section_batches(section_texts=section_contents, llm=llm)
+    batch_results = run_functions_tuples_in_parallel(
+        [
+            (
+                _llm_eval_section_batch,
+                (
+                    query,
+                    [section_contents[ind] for ind in batch],
+                    llm,
+                    [titles[ind] for ind in batch],
+                    [metadata_list[ind] for ind in batch],
+                ),
+            )
+            for batch in batches
+        ]
+    )
+
+    results: list[bool | None] = [None] * len(section_contents)
+    fallback_inds: list[int] = []
+    for batch, verdicts in zip(batches, batch_results):
+        if verdicts is None:
+            fallback_inds.extend(batch)
+            continue
+        for ind, verdict in zip(batch, verdicts):
+            results[ind] = verdict.relevant
+
+    fallback_functions: list[tuple[Callable, tuple]] = [
+        (
+            llm_eval_section,
+            (query, section_contents[ind], llm, titles[ind], metadata_list[ind]),
+        )
+        for ind in fallback_inds
+    ]
+    for ind, relevant in zip(
+        fallback_inds,
+        run_functions_tuples_in_parallel(fallback_functions, allow_failures=True),
+    ):
+        results[ind] = relevant
+
+    return results
+
+
 def llm_batch_eval_sections(
     query: str,
     section_contents: list[str],
@@ -63,6 +167,7 @@ def llm_batch_eval_sections(
     titles: list[str],
     metadata_list: list[dict[str, str | list[str]]],
     use_threads: bool = True,
+    batched: bool = ENABLE_BATCHED_SECTION_EVALUATION,
 ) -> list[bool]:
     if DISABLE_LLM_DOC_RELEVANCE:
         raise RuntimeError(
@@ -70,6 +175,53 @@ def llm_batch_eval_sections(
             "this should have been caught upstream."
         )
 
+    evaluation_cache = get_section_evaluation_cache()
+    keys = [
+        build_section_evaluation_key("basic", llm, query, title, section_content)
+        for section_content, title in zip(section_contents, titles)
+    ]
+    cached_verdicts = evaluation_cache.get_many(keys) if evaluation_cache else {}
+    missing_inds = [ind for ind, key in enumerate(keys) if key not in cached_verdicts]
+
+    missing_args = (
+        query,
+        [section_contents[ind] for ind in missing_inds],
+        llm,
+        [titles[ind] for ind in missing_inds],
+        [metadata_list[ind] for ind in missing_inds],
+    )
+    new_results: list[bool | None] = (
+        _llm_batched_eval_sections(*missing_args)
+        if batched
+        else _llm_eval_sections(*missing_args, use_threads=use_threads)
+    )
+
+    new_entries = {
+        keys[ind]: SectionVerdict(relevant=relevant, analysis="")
+        for ind, relevant in zip(missing_inds, new_results)
+        # failed evals are not cached
+        if relevant is not None
+    }
+    if evaluation_cache is not None and new_entries:
+        evaluation_cache.set_many(new_entries)
+    cached_verdicts.update(new_entries)
+
+    # In case of failure/timeout, don't throw out the section
+    return [
+        cached_verdicts[key].relevant if key in cached_verdicts else True
+        for key in keys
+    ]
+
+
+def _llm_eval_sections(
+    query: str,
+    section_contents: list[str],
+    llm: LLM,
+    titles: list[str],
+    metadata_list: list[dict[str, str | list[str]]],
+    use_threads: bool = True,
+) -> list[bool | None]:
+    """One LLM call per section. None for sections whose eval failed."""
     if use_threads:
         functions_with_args: list[tuple[Callable, tuple]] = [
             (llm_eval_section, (query, section_content, llm, title, metadata))
@@ -81,13 +233,10 @@ def llm_batch_eval_sections(
         logger.debug(
             "Running LLM usefulness eval in parallel (following logging may be out of order)"
         )
-        parallel_results = run_functions_tuples_in_parallel(
+        return run_functions_tuples_in_parallel(
             functions_with_args, allow_failures=True
         )
 
-        # In case of failure/timeout, don't throw out the section
-        return [True if item is None else item for item in parallel_results]
-
     else:
         return [
             llm_eval_section(query, section_content, llm, title, metadata)
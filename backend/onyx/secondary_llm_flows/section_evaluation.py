@@ -0,0 +1,131 @@
+"""Shared pieces of the batched LLM section evaluation: packing sections into batches,
+parsing the per-section verdicts and caching verdicts per
+(LLM, query, section content)."""
+import hashlib
+import json
+from typing import NamedTuple
+
+from onyx.configs.chat_configs import ENABLE_SECTION_EVALUATION_CACHE
+from onyx.configs.chat_configs import SECTION_EVALUATION_BATCH_MAX_SECTIONS
+from onyx.configs.chat_configs import SECTION_EVALUATION_BATCH_MAX_TOKENS
+from onyx.configs.chat_configs import SECTION_EVALUATION_CACHE_MAX_ENTRIES
+from onyx.configs.chat_configs import SECTION_EVALUATION_CACHE_TTL_SECONDS
+from onyx.llm.interfaces import LLM
+from onyx.natural_language_processing.utils import get_tokenizer
+from onyx.utils.ttl_lru_cache import TTLLRUCache
+
+
+class SectionVerdict(NamedTuple):
+    relevant: bool
+    analysis: str
+
+
+def build_section_evaluation_key(
+    evaluation_kind: str, llm: LLM, query: str, title: str, content: str
+) -> str:
+    """Verdicts depend on the LLM, so its provider and model are part of the key"""
+    content_hash = hashlib.sha256(f"{title}\n{content}".encode("utf-8")).hexdigest()
+    query_material = json.dumps(
+        [llm.config.model_provider, llm.config.model_name, query]
+    )
+    query_hash = hashlib.sha256(query_material.encode("utf-8")).hexdigest()
+    return f"{evaluation_kind}:{query_hash}:{content_hash}"
+
+
+# process local, section evaluation key -> verdict
+_SECTION_EVALUATION_CACHE: TTLLRUCache[str, SectionVerdict] | None = None
+
+
+def get_section_evaluation_cache() -> TTLLRUCache[str, SectionVerdict] | None:
+    global _SECTION_EVALUATION_CACHE
+
+    if not ENABLE_SECTION_EVALUATION_CACHE:
+        return None
+
+    if _SECTION_EVALUATION_CACHE is None:
+        _SECTION_EVALUATION_CACHE = TTLLRUCache(
+            max_entries=SECTION_EVALUATION_CACHE_MAX_ENTRIES,
+            ttl_seconds=SECTION_EVALUATION_CACHE_TTL_SECONDS,
+        )
+    return _SECTION_EVALUATION_CACHE
+
+
+def build_section_batches(
+    section_texts: list[str],
+    llm: LLM,
+    max_sections: int = SECTION_EVALUATION_BATCH_MAX_SECTIONS,
+    max_tokens: int = SECTION_EVALUATION_BATCH_MAX_TOKENS,
+) -> list[list[int]]:
+    """Groups the section indices in order into batches under the section and token
+    limits. A section over the token limit by itself gets a batch of its own."""
+    llm_tokenizer = get_tokenizer(
+        provider_type=llm.config.model_provider,
+        model_name=llm.config.model_name,
+    )
+
+    batches: list[list[int]] = []
+    batch: list[int] = []
+    batch_tokens = 0
+    for ind, text in enumerate(section_texts):
+        num_tokens = len(llm_tokenizer.encode(text))
+        if batch and (
+            len(batch) >= max_sections or batch_tokens + num_tokens > max_tokens
+        ):
+            batches.append(batch)
+            batch = []
+            batch_tokens = 0
+        batch.append(ind)
+        batch_tokens += num_tokens
+
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def format_batch_sections(
+    titles: list[str], contents: list[str], metadata_strs: list[str]
+) -> str:
+    formatted_sections = []
+    for ind, (title, content, metadata_str) in enumerate(
+        zip(titles, contents, metadata_strs), start=1
+    ):
+        title = title.replace("\n", " ")
+        formatted_sections.append(
+            f"Document {ind}: {title}{metadata_str}\n```\n{content}\n```"
+        )
+    return "\n\n".join(formatted_sections)
+
+
+def parse_batch_verdicts(
+    model_output: str, num_sections: int
+) -> list[SectionVerdict] | None:
+    """Parses the JSON verdict list of a batched evaluation. Returns None if the output
+    doesn't hold exactly one verdict per section, the caller then evaluates the sections
+    one by one instead of guessing."""
+    start = model_output.find("[")
+    end = model_output.rfind("]")
+    if start == -1 or end == -1:
+        return None
+
+    try:
+        parsed = json.loads(model_output[start : end + 1], strict=False)
+    except json.JSONDecodeError:
+        return None
+
+    if not isinstance(parsed, list) or len(parsed) != num_sections:
+        return None
+
+    verdicts: dict[int, SectionVerdict] = {}
+    for ind, item in enumerate(parsed, start=1):
+        if not isinstance(item, dict) or not isinstance(item.get("relevant"), bool):
+            return None
+        document_num = item.get("document", ind)
+        if not isinstance(document_num, int) or not 1 <= document_num <= num_sections:
+            return None
+        verdicts[document_num] = SectionVerdict(
+            relevant=item["relevant"], analysis=str(item.get("analysis") or "")
+        )
+
+    if len(verdicts) != num_sections:
+        return None
+    return [verdicts[ind] for ind in range(1, num_sections + 1)]
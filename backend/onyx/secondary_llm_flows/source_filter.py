@@ -67,11 +67,15 @@ def _sample_documents_using_custom_connector_classifier(
 
 
 def extract_source_filter(
-    query: str, llm: LLM, db_session: Session
+    query: str,
+    llm: LLM,
+    db_session: Session,
+    valid_sources: list[DocumentSource] | None = None,
 ) -> list[DocumentSource] | None:
     """Returns a list of valid sources for search or None if no specific sources were detected"""
 
-    valid_sources = fetch_unique_document_sources(db_session)
+    if valid_sources is None:
+        valid_sources = fetch_unique_document_sources(db_session)
     if not valid_sources:
         return None
 
@@ -136,6 +136,7 @@ def upsert_ingestion_doc(
             embedder=new_index_embedding_model,
             document_index=sec_doc_index,
             ignore_time_skip=True,
+            ignore_content_hash_skip=True,
             db_session=db_session,
             tenant_id=tenant_id,
         )
@@ -98,6 +98,9 @@ class CreateChatMessageRequest(ChunkContext):
     # allows the caller to specify the exact search query they want to use
     # will disable Query Rewording if specified
     query_override: str | None = None
+    # if False, the answer is built on the retrieval ordered results as soon as they are
+    # there, reranking and the LLM relevance filter are skipped for this message
+    wait_for_rerank: bool = True
 
     # enables additional handling to ensure that we regenerate with a given user message ID
     regenerate: bool | None = None
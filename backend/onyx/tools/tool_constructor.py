@@ -111,6 +111,7 @@ class SearchToolConfig(BaseModel):
     latest_query_files: list[InMemoryChatFile] | None = None
     # Use with care, should only be used for OnyxBot in channels with multiple users
     bypass_acl: bool = False
+    wait_for_rerank: bool = True
 
 
 class InternetSearchToolConfig(BaseModel):
@@ -176,6 +177,7 @@ def construct_tools(
                     ),
                     rerank_settings=search_tool_config.rerank_settings,
                     bypass_acl=search_tool_config.bypass_acl,
+                    wait_for_rerank=search_tool_config.wait_for_rerank,
                 )
                 tool_dict[db_tool_model.id] = [search_tool]
 
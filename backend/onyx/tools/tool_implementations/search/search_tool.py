@@ -22,6 +22,7 @@ from onyx.chat.prune_and_merge import prune_and_merge_sections
 from onyx.chat.prune_and_merge import prune_sections
 from onyx.configs.chat_configs import CONTEXT_CHUNKS_ABOVE
 from onyx.configs.chat_configs import CONTEXT_CHUNKS_BELOW
+from onyx.configs.chat_configs import ENABLE_PROGRESSIVE_SEARCH_RESULTS
 from onyx.configs.model_configs import GEN_AI_MODEL_FALLBACK_MAX_TOKENS
 from onyx.context.search.enums import LLMEvaluationType
 from onyx.context.search.enums import QueryFlow
@@ -69,6 +70,9 @@ class SearchResponseSummary(BaseModel):
     predicted_search: SearchType | None
     final_filters: IndexFilters
     recency_bias_multiplier: float
+    # retrieval ordered results sent before reranking is done, a non provisional summary
+    # with the final order follows
+    provisional: bool = False
 
 
 SEARCH_TOOL_DESCRIPTION = """
@@ -108,6 +112,9 @@ class SearchTool(Tool):
         full_doc: bool = False,
         bypass_acl: bool = False,
         rerank_settings: RerankingDetails | None = None,
+        progressive_results: bool = ENABLE_PROGRESSIVE_SEARCH_RESULTS,
+        # if False, the retrieval order is final and reranking is skipped
+        wait_for_rerank: bool = True,
     ) -> None:
         self.user = user
         self.persona = persona
@@ -126,6 +133,9 @@ class SearchTool(Tool):
         # Only used via API
         self.rerank_settings = rerank_settings
 
+        self.progressive_results = progressive_results
+        self.wait_for_rerank = wait_for_rerank
+
         self.chunks_above = (
             chunks_above
             if chunks_above is not None
@@ -318,18 +328,73 @@ class SearchTool(Tool):
             prompt_config=self.prompt_config,
         )
 
-        yield ToolResponse(
+        if not self.wait_for_rerank:
+            # the answer is built from whatever this tool yields, so not waiting for the
+            # reranker means answering on the retrieval order and skipping the reranking
+            sections = search_pipeline.provisional_context_sections
+            yield self._build_summary_response(
+                query=query, search_pipeline=search_pipeline, top_sections=sections
+            )
+            yield from self._build_context_responses(
+                query=query,
+                sections=sections,
+                section_relevance=None,
+                section_relevance_list=None,
+            )
+            return
+
+        if self.progressive_results and search_pipeline.will_rerank:
+            # show the retrieval results right away, the reranker can take a while. The
+            # final summary below is kept whole as its sections carry the reranked scores
+            # the search docs are saved with, only their new order is sent to the client
+            yield self._build_summary_response(
+                query=query,
+                search_pipeline=search_pipeline,
+                top_sections=search_pipeline.provisional_context_sections,
+                provisional=True,
+            )
+
+        yield self._build_summary_response(
+            query=query,
+            search_pipeline=search_pipeline,
+            top_sections=search_pipeline.final_context_sections,
+        )
+        yield from self._build_context_responses(
+            query=query,
+            sections=search_pipeline.final_context_sections,
+            section_relevance=search_pipeline.section_relevance,
+            section_relevance_list=search_pipeline.section_relevance_list,
+            content_sections=search_pipeline.reranked_sections,
+        )
+
+    def _build_summary_response(
+        self,
+        query: str,
+        search_pipeline: SearchPipeline,
+        top_sections: list[InferenceSection],
+        provisional: bool = False,
+    ) -> ToolResponse:
+        return ToolResponse(
             id=SEARCH_RESPONSE_SUMMARY_ID,
             response=SearchResponseSummary(
                 rephrased_query=query,
-                top_sections=search_pipeline.final_context_sections,
+                top_sections=top_sections,
                 predicted_flow=search_pipeline.predicted_flow,
                 predicted_search=search_pipeline.predicted_search_type,
                 final_filters=search_pipeline.search_query.filters,
                 recency_bias_multiplier=search_pipeline.search_query.recency_bias_multiplier,
+                provisional=provisional,
             ),
         )
 
+    def _build_context_responses(
+        self,
+        query: str,
+        sections: list[InferenceSection],
+        section_relevance: list[SectionRelevancePiece] | None,
+        section_relevance_list: list[bool] | None,
+        content_sections: list[InferenceSection] | None = None,
+    ) -> Generator[ToolResponse, None, None]:
         yield ToolResponse(
             id=SEARCH_DOC_CONTENT_ID,
             response=OnyxContexts(
@@ -340,19 +405,21 @@ class SearchTool(Tool):
                         semantic_identifier=section.center_chunk.semantic_identifier,
                         blurb=section.center_chunk.blurb,
                     )
-                    for section in search_pipeline.reranked_sections
+                    for section in (
+                        content_sections if content_sections is not None else sections
+                    )
                 ]
             ),
         )
 
         yield ToolResponse(
             id=SECTION_RELEVANCE_LIST_ID,
-            response=search_pipeline.section_relevance,
+            response=section_relevance,
         )
 
         pruned_sections = prune_sections(
-            sections=search_pipeline.final_context_sections,
-            section_relevance_list=search_pipeline.section_relevance_list,
+            sections=sections,
+            section_relevance_list=section_relevance_list,
             prompt_config=self.prompt_config,
             llm_config=self.llm.config,
             question=query,
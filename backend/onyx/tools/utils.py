@@ -7,6 +7,7 @@ from onyx.db.connector import check_connectors_exist
 from onyx.db.document import check_docs_exist
 from onyx.db.models import LLMProvider
 from onyx.natural_language_processing.utils import BaseTokenizer
+from onyx.natural_language_processing.utils import count_tokens
 from onyx.tools.tool import Tool
 
 
@@ -27,7 +28,7 @@ def explicit_tool_calling_supported(model_provider: str, model_name: str) -> boo
 
 
 def compute_tool_tokens(tool: Tool, llm_tokenizer: BaseTokenizer) -> int:
-    return len(llm_tokenizer.encode(json.dumps(tool.tool_definition())))
+    return count_tokens(json.dumps(tool.tool_definition()), llm_tokenizer)
 
 
 def compute_all_tool_tokens(tools: list[Tool], llm_tokenizer: BaseTokenizer) -> int:
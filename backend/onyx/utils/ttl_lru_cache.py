@@ -0,0 +1,116 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from collections.abc import Hashable
+from collections.abc import Iterable
+from typing import Generic
+from typing import TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLLRUCache(Generic[K, V]):
+    """Thread safe, process local LRU cache. Once there are more than max_entries, or
+    the sizes of the values (as measured by size_fn) add up to more than max_size, the
+    least recently used entries are evicted. With a ttl_seconds, entries also expire that
+    long after they were set."""
+
+    def __init__(
+        self,
+        max_entries: int | None = None,
+        ttl_seconds: float | None = None,
+        max_size: int | None = None,
+        size_fn: Callable[[V], int] | None = None,
+    ) -> None:
+        if max_size is not None and size_fn is None:
+            raise ValueError("max_size requires a size_fn")
+
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.size_fn = size_fn
+        self.size = 0
+        # key -> (expires_at, value), least recently used first
+        self._entries: OrderedDict[K, tuple[float | None, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _pop_locked(self, key: K) -> V | None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        if self.size_fn is not None:
+            self.size -= self.size_fn(entry[1])
+        return entry[1]
+
+    def _is_full_locked(self) -> bool:
+        return (self.max_entries is not None and len(self) > self.max_entries) or (
+            self.max_size is not None and self.size > self.max_size
+        )
+
+    def _get_locked(self, key: K, now: float) -> V | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= now:
+            self._pop_locked(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            return self._get_locked(key, time.monotonic())
+
+    def get_many(self, keys: Iterable[K]) -> dict[K, V]:
+        found: dict[K, V] = {}
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                value = self._get_locked(key, now)
+                if value is not None:
+                    found[key] = value
+        return found
+
+    def set(self, key: K, value: V) -> list[tuple[K, V]]:
+        return self.set_many({key: value})
+
+    def set_many(self, entries: dict[K, V]) -> list[tuple[K, V]]:
+        """Returns the entries evicted to make room, values larger than max_size on
+        their own are returned right away"""
+        expires_at = (
+            time.monotonic() + self.ttl_seconds
+            if self.ttl_seconds is not None
+            else None
+        )
+        evicted: list[tuple[K, V]] = []
+        with self._lock:
+            for key, value in entries.items():
+                self._pop_locked(key)
+                if self.size_fn is not None:
+                    value_size = self.size_fn(value)
+                    if self.max_size is not None and value_size > self.max_size:
+                        evicted.append((key, value))
+                        continue
+                    self.size += value_size
+                self._entries[key] = (expires_at, value)
+            while self._is_full_locked():
+                evicted_key, (_, evicted_value) = self._entries.popitem(last=False)
+                if self.size_fn is not None:
+                    self.size -= self.size_fn(evicted_value)
+                evicted.append((evicted_key, evicted_value))
+        return evicted
+
+    def delete(self, key: K) -> None:
+        with self._lock:
+            self._pop_locked(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
@@ -0,0 +1,150 @@
+"""
+Measures what building the chat history costs a new message as the chat session grows.
+
+Seeds chat sessions of increasing length into Postgres, every turn with regenerated
+(abandoned) answers next to the kept one, as happens for power users. Then it times the
+mainline CTE used by create_chat_chain against loading the whole session and walking the
+latest_child_message pointers in Python, which is what create_chat_chain used to do.
+The CTE only reads the kept path, so its time per message in the history stays flat no
+matter how many answers were regenerated, while the full load grows with every branch.
+
+launch postgres (with migrations applied), then:
+python -m scripts.chat_chain_benchmark [--turns 10 50 100 200 400] [--regenerations 2]
+"""
+import argparse
+import statistics
+import time
+from collections.abc import Callable
+from uuid import UUID
+
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from onyx.chat.chat_utils import create_chat_chain
+from onyx.configs.constants import MessageType
+from onyx.db.chat import create_chat_session
+from onyx.db.chat import create_new_chat_message
+from onyx.db.chat import get_chat_messages_by_session
+from onyx.db.chat import get_or_create_root_message
+from onyx.db.engine import get_session_context_manager
+from onyx.db.models import ChatMessage
+from onyx.db.models import ChatSession
+
+
+def _full_session_chain(chat_session_id: UUID, db_session: Session) -> int:
+    all_chat_messages = get_chat_messages_by_session(
+        chat_session_id=chat_session_id,
+        user_id=None,
+        db_session=db_session,
+        skip_permission_check=True,
+        prefetch_tool_calls=True,
+    )
+    id_to_msg = {msg.id: msg for msg in all_chat_messages}
+    chain_length = 0
+    current_message: ChatMessage | None = all_chat_messages[0]
+    while current_message is not None and current_message.latest_child_message:
+        current_message = id_to_msg.get(current_message.latest_child_message)
+        chain_length += 1
+    return chain_length
+
+
+def _mainline_chain(chat_session_id: UUID, db_session: Session) -> int:
+    _, history_msgs = create_chat_chain(chat_session_id, db_session)
+    return len(history_msgs) + 1
+
+
+def _seed_session(db_session: Session, turns: int, regenerations: int) -> UUID:
+    chat_session = create_chat_session(
+        db_session=db_session,
+        description="chat chain benchmark",
+        user_id=None,
+        persona_id=None,
+    )
+    parent_message = get_or_create_root_message(chat_session.id, db_session)
+    for turn in range(turns):
+        user_message = create_new_chat_message(
+            chat_session_id=chat_session.id,
+            parent_message=parent_message,
+            message=f"question {turn} " * 20,
+            prompt_id=None,
+            token_count=40,
+            message_type=MessageType.USER,
+            db_session=db_session,
+            commit=False,
+        )
+        # the last answer created is the latest child, the others are abandoned
+        for answer in range(regenerations + 1):
+            parent_message = create_new_chat_message(
+                chat_session_id=chat_session.id,
+                parent_message=user_message,
+                message=f"answer {turn}.{answer} " * 200,
+                prompt_id=None,
+                token_count=600,
+                message_type=MessageType.ASSISTANT,
+                db_session=db_session,
+                commit=False,
+            )
+    db_session.commit()
+    return chat_session.id
+
+
+def _time_ms(
+    func: Callable[[UUID, Session], int], chat_session_id: UUID, iterations: int
+) -> float:
+    timings = []
+    for _ in range(iterations):
+        # a new session per call, as every new message is its own request
+        with get_session_context_manager() as db_session:
+            start = time.perf_counter()
+            func(chat_session_id, db_session)
+            timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, nargs="+", default=[10, 50, 100, 200, 400])
+    parser.add_argument("--regenerations", type=int, default=2)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    chat_session_ids: list[UUID] = []
+    try:
+        print(
+            f"{'turns':>6} {'messages':>9} {'mainline ms':>12} "
+            f"{'full session ms':>16} {'mainline us / turn':>19}"
+        )
+        for turns in args.turns:
+            with get_session_context_manager() as db_session:
+                chat_session_id = _seed_session(db_session, turns, args.regenerations)
+            chat_session_ids.append(chat_session_id)
+
+            with get_session_context_manager() as db_session:
+                mainline_length = _mainline_chain(chat_session_id, db_session)
+                if mainline_length != _full_session_chain(chat_session_id, db_session):
+                    raise RuntimeError("Mainline differs from the full session walk")
+
+            mainline_ms = _time_ms(_mainline_chain, chat_session_id, args.iterations)
+            full_session_ms = _time_ms(
+                _full_session_chain, chat_session_id, args.iterations
+            )
+            total_messages = 1 + turns * (args.regenerations + 2)
+            print(
+                f"{turns:>6} {total_messages:>9} {mainline_ms:>12.2f} "
+                f"{full_session_ms:>16.2f} {mainline_ms * 1000 / turns:>19.1f}"
+            )
+    finally:
+        with get_session_context_manager() as db_session:
+            db_session.execute(
+                delete(ChatMessage).where(
+                    ChatMessage.chat_session_id.in_(chat_session_ids)
+                )
+            )
+            db_session.execute(
+                delete(ChatSession).where(ChatSession.id.in_(chat_session_ids))
+            )
+            db_session.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Micro-benchmark of the streaming citation processor over synthetic LLM answers.
+
+Answers mix prose, citations ([n] and [[n]], split over tokens like LLMs stream them)
+and code blocks. The time per token should stay flat as the answers get longer. For
+reference, it also times rescanning the whole answer for code fences on every token,
+which is what the processor used to do.
+
+python -m scripts.citation_processing_benchmark [--tokens 1000 2000 4000 8000]
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime
+
+from onyx.chat.models import LlmDoc
+from onyx.chat.stream_processing.citation_processing import CitationProcessor
+from onyx.chat.stream_processing.citation_processing import in_code_block
+from onyx.chat.stream_processing.utils import DocumentIdOrderMapping
+from onyx.configs.constants import DocumentSource
+
+NUM_DOCS = 15
+WORDS = ["the ", "answer ", "is ", "based ", "on ", "several ", "documents", ". "]
+
+
+def _context_docs() -> list[LlmDoc]:
+    return [
+        LlmDoc(
+            document_id=f"doc_{ind}",
+            content="Document content",
+            blurb=f"Document #{ind}",
+            semantic_identifier=f"Doc {ind}",
+            source_type=DocumentSource.WEB,
+            metadata={},
+            updated_at=datetime.now(),
+            link=f"https://{ind}.com" if ind % 2 == 0 else None,
+            source_links=None,
+            match_highlights=[],
+        )
+        for ind in range(NUM_DOCS)
+    ]
+
+
+def _synthetic_answer(num_tokens: int, rng: random.Random) -> list[str]:
+    tokens: list[str] = []
+    while len(tokens) < num_tokens:
+        roll = rng.random()
+        if roll < 0.05:
+            citation = rng.randint(1, NUM_DOCS)
+            tokens.extend(
+                ["[", str(citation), "]"]
+                if rng.random() < 0.8
+                else ["[[", str(citation), "]]"]
+            )
+        elif roll < 0.06:
+            tokens.extend(
+                [
+                    "```",
+                    "python",
+                    "\n",
+                    "x = [1]",
+                    "\n",
+                    "print(x)",
+                    "\n",
+                    "```",
+                    "\n\n",
+                ]
+            )
+        else:
+            tokens.append(rng.choice(WORDS))
+    return tokens[:num_tokens]
+
+
+def _process(tokens: list[str], context_docs: list[LlmDoc]) -> float:
+    doc_order = {doc.document_id: ind + 1 for ind, doc in enumerate(context_docs)}
+    processor = CitationProcessor(
+        context_docs=context_docs,
+        doc_id_to_rank_map=DocumentIdOrderMapping(order_mapping=doc_order),
+        display_doc_order_dict=doc_order,
+    )
+    start = time.perf_counter()
+    for token in tokens:
+        for _ in processor.process_token(token):
+            pass
+    for _ in processor.process_token(None):
+        pass
+    return time.perf_counter() - start
+
+
+def _rescan(tokens: list[str]) -> float:
+    llm_out = ""
+    start = time.perf_counter()
+    for token in tokens:
+        llm_out += token
+        in_code_block(llm_out)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--tokens", type=int, nargs="+", default=[1000, 2000, 4000, 8000]
+    )
+    parser.add_argument("--answers", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    context_docs = _context_docs()
+    print(f"{'tokens':>7} {'processor us / token':>21} {'full rescan us / token':>23}")
+    for num_tokens in args.tokens:
+        answers = [_synthetic_answer(num_tokens, rng) for _ in range(args.answers)]
+        processor_us = statistics.median(
+            _process(tokens, context_docs) for tokens in answers
+        )
+        rescan_us = statistics.median(_rescan(tokens) for tokens in answers)
+        print(
+            f"{num_tokens:>7} {processor_us * 1e6 / num_tokens:>21.2f} "
+            f"{rescan_us * 1e6 / num_tokens:>23.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
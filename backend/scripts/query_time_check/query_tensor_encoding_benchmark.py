@@ -0,0 +1,120 @@
+"""
+Compares the query embedding encodings of VESPA_QUERY_TENSOR_FORMAT: payload size,
+client side encoding time and the cost of parsing the value back into floats (as a
+proxy for the work the Vespa container does per query).
+
+With --vespa, also sends hybrid queries with each encoding to the running Vespa and
+reports the server side search time (needs a seeded index, see seed_dummy_docs.py).
+
+python -m scripts.query_time_check.query_tensor_encoding_benchmark [--dim 768] [--vespa]
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from collections.abc import Callable
+
+import numpy
+
+from onyx.configs.model_configs import DOC_EMBEDDING_DIM
+from onyx.document_index.vespa.shared_utils.vespa_request_builders import (
+    encode_query_tensor,
+)
+from shared_configs.model_server_models import Embedding
+
+FORMATS = ["list", "float32", "hex"]
+
+
+def _parse(encoded: str) -> numpy.ndarray:
+    if encoded.startswith("tensor<"):
+        return numpy.frombuffer(
+            bytes.fromhex(encoded.split(":", 1)[1]), dtype=">f4"
+        ).astype(numpy.float32)
+    return numpy.asarray(json.loads(encoded), dtype=numpy.float32)
+
+
+def _time_us(func: Callable[[], object], iterations: int) -> float:
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1_000_000
+
+
+def benchmark_encodings(dim: int, iterations: int) -> None:
+    embedding: Embedding = [random.uniform(-1, 1) for _ in range(dim)]
+
+    print(f"Query embedding of {dim} dims, median of {iterations} iterations")
+    print(f"{'format':<10}{'bytes':>10}{'encode us':>12}{'parse us':>12}")
+    for tensor_format in FORMATS:
+        encoded = encode_query_tensor(embedding, tensor_format=tensor_format)
+        encode_us = _time_us(
+            lambda: encode_query_tensor(embedding, tensor_format=tensor_format),
+            iterations,
+        )
+        parse_us = _time_us(lambda: _parse(encoded), iterations)
+        print(
+            f"{tensor_format:<10}{len(encoded):>10}{encode_us:>12.1f}{parse_us:>12.1f}"
+        )
+
+
+def benchmark_vespa(dim: int, number_of_queries: int) -> None:
+    from onyx.db.engine import get_session_context_manager
+    from onyx.db.search_settings import get_current_search_settings
+    from onyx.document_index.vespa.read_client import VESPA_SEARCH_ENDPOINT_LABEL
+    from onyx.document_index.vespa.read_client import vespa_read_request
+    from onyx.document_index.vespa_constants import SEARCH_ENDPOINT
+    from onyx.document_index.vespa_constants import YQL_BASE
+
+    with get_session_context_manager() as db_session:
+        index_name = get_current_search_settings(db_session).index_name
+
+    yql = (
+        YQL_BASE.format(index_name=index_name)
+        + "({targetHits: 100}nearestNeighbor(embeddings, query_embedding))"
+    )
+    embeddings = [
+        [random.uniform(-1, 1) for _ in range(dim)] for _ in range(number_of_queries)
+    ]
+
+    print(f"\nVespa search time over {number_of_queries} queries")
+    for tensor_format in FORMATS:
+        search_times = []
+        for embedding in embeddings:
+            response = vespa_read_request(
+                "POST",
+                SEARCH_ENDPOINT,
+                VESPA_SEARCH_ENDPOINT_LABEL,
+                json={
+                    "yql": yql,
+                    "hits": 10,
+                    "ranking.profile": f"hybrid_search{dim}",
+                    "input.query(query_embedding)": encode_query_tensor(
+                        embedding, tensor_format=tensor_format
+                    ),
+                    "input.query(decay_factor)": "0.5",
+                    "input.query(alpha)": 0.5,
+                    "input.query(title_content_ratio)": 0.1,
+                    "presentation.timing": True,
+                },
+            )
+            search_times.append(response.json()["timing"]["querytime"])
+        print(
+            f"{tensor_format:<10}mean querytime: "
+            f"{statistics.mean(search_times) * 1000:.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dim", type=int, default=DOC_EMBEDDING_DIM)
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--vespa", action="store_true")
+    parser.add_argument("--number-of-queries", type=int, default=200)
+    args = parser.parse_args()
+
+    benchmark_encodings(args.dim, args.iterations)
+    if args.vespa:
+        benchmark_vespa(args.dim, args.number_of_queries)
@@ -20,6 +20,13 @@ INDEXING_MODEL_SERVER_PORT = int(
     os.environ.get("INDEXING_MODEL_SERVER_PORT") or MODEL_SERVER_PORT
 )
 
+# Format the model server returns embeddings in. The binary formats ("float32", lossless, or
+# "float16", half the size) avoid encoding every float as JSON text, "json" always uses the
+# JSON response. Model servers that don't support the binary format respond with JSON.
+MODEL_SERVER_EMBEDDING_TRANSPORT = (
+    os.environ.get("MODEL_SERVER_EMBEDDING_TRANSPORT") or "float32"
+).lower()
+
 # Onyx custom Deep Learning Models
 CONNECTOR_CLASSIFIER_MODEL_REPO = "Danswer/filter-extraction-model"
 CONNECTOR_CLASSIFIER_MODEL_TAG = "1.0.0"
@@ -50,6 +57,20 @@ DISABLE_RERANK_FOR_STREAMING = (
 # model. If torch finds more threads on its own, this value is not used.
 MIN_THREADS_ML_MODELS = int(os.environ.get("MIN_THREADS_ML_MODELS") or 1)
 
+# Coalesce concurrent local embedding / reranking requests for the same model into a single
+# forward pass. Requests wait up to MODEL_SERVER_BATCH_WINDOW_MS for others to join and
+# batches are capped by number of texts and (estimated) tokens.
+ENABLE_MODEL_SERVER_BATCHING = (
+    os.environ.get("ENABLE_MODEL_SERVER_BATCHING", "").lower() == "true"
+)
+MODEL_SERVER_BATCH_WINDOW_MS = float(
+    os.environ.get("MODEL_SERVER_BATCH_WINDOW_MS") or 5
+)
+MODEL_SERVER_MAX_BATCH_SIZE = int(os.environ.get("MODEL_SERVER_MAX_BATCH_SIZE") or 128)
+MODEL_SERVER_MAX_BATCH_TOKENS = int(
+    os.environ.get("MODEL_SERVER_MAX_BATCH_TOKENS") or 32768
+)
+
 # Model server that has indexing only set will throw exception if used for reranking
 # or intent classification
 INDEXING_ONLY = os.environ.get("INDEXING_ONLY", "").lower() == "true"
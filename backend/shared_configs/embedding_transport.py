@@ -0,0 +1,96 @@
+"""Compact binary encoding of embedding vectors for the model server responses.
+
+Layout (all little-endian):
+    header: magic (4 bytes) | version (u8) | dtype (u8) | reserved (u16) | count (u32) | dim (u32)
+    body:   count * dim float32 or float16 values, row major
+
+The client asks for it via the Accept header, servers that don't know about it just
+return the regular JSON response.
+"""
+import struct
+
+import numpy as np
+import numpy.typing as npt
+
+from shared_configs.enums import EmbeddingTransportFormat
+
+EMBEDDING_BINARY_MEDIA_TYPE = "application/x-onyx-embeddings"
+
+_MAGIC = b"OEMB"
+_VERSION = 1
+_HEADER = struct.Struct("<4sBBHII")
+_FORMAT_TO_CODE = {
+    EmbeddingTransportFormat.FLOAT32: 0,
+    EmbeddingTransportFormat.FLOAT16: 1,
+}
+_CODE_TO_DTYPE: dict[int, np.dtype] = {0: np.dtype("<f4"), 1: np.dtype("<f2")}
+
+
+def build_embedding_accept_header(transport_format: EmbeddingTransportFormat) -> str:
+    if transport_format == EmbeddingTransportFormat.JSON:
+        return "application/json"
+    return (
+        f"{EMBEDDING_BINARY_MEDIA_TYPE};dtype={transport_format.value}, "
+        "application/json;q=0.5"
+    )
+
+
+def parse_accepted_embedding_format(
+    accept_header: str | None,
+) -> EmbeddingTransportFormat | None:
+    """Returns the binary format requested by the client, None if it only accepts JSON"""
+    if not accept_header:
+        return None
+
+    for media_range in accept_header.split(","):
+        media_type, *params = [part.strip() for part in media_range.split(";")]
+        if media_type != EMBEDDING_BINARY_MEDIA_TYPE:
+            continue
+
+        transport_format = EmbeddingTransportFormat.FLOAT32
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "dtype":
+                try:
+                    transport_format = EmbeddingTransportFormat(value.strip())
+                except ValueError:
+                    return None
+        if transport_format == EmbeddingTransportFormat.JSON:
+            return None
+        return transport_format
+    return None
+
+
+def encode_embeddings(
+    embeddings: npt.ArrayLike, transport_format: EmbeddingTransportFormat
+) -> bytes:
+    code = _FORMAT_TO_CODE[transport_format]
+    # no copy if the embeddings already are a contiguous array of the right type
+    array = np.ascontiguousarray(embeddings, dtype=_CODE_TO_DTYPE[code])
+    if array.ndim != 2:
+        raise ValueError(f"Expected a 2D array of embeddings, got shape {array.shape}")
+
+    count, dim = array.shape
+    return _HEADER.pack(_MAGIC, _VERSION, code, 0, count, dim) + array.tobytes()
+
+
+def decode_embeddings(buffer: bytes) -> npt.NDArray[np.float32]:
+    """Decodes the embeddings into a (count, dim) float32 array. float32 payloads are
+    not copied, the array is a read only view on the response buffer."""
+    if len(buffer) < _HEADER.size:
+        raise ValueError("Embedding payload is too short")
+
+    magic, version, code, _, count, dim = _HEADER.unpack_from(buffer)
+    if magic != _MAGIC or version != _VERSION or code not in _CODE_TO_DTYPE:
+        raise ValueError(
+            f"Unsupported embedding payload: magic={magic!r} version={version} dtype={code}"
+        )
+
+    dtype = _CODE_TO_DTYPE[code]
+    if len(buffer) != _HEADER.size + count * dim * dtype.itemsize:
+        raise ValueError("Embedding payload size does not match its header")
+
+    array = np.frombuffer(
+        buffer, dtype=dtype, count=count * dim, offset=_HEADER.size
+    ).reshape(count, dim)
+    return array if dtype == np.float32 else array.astype(np.float32)
@@ -18,3 +18,9 @@ class RerankerProvider(str, Enum):
 class EmbedTextType(str, Enum):
     QUERY = "query"
     PASSAGE = "passage"
+
+
+class EmbeddingTransportFormat(str, Enum):
+    JSON = "json"
+    FLOAT32 = "float32"
+    FLOAT16 = "float16"
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from model_server.batching import BatchPriority
+from model_server.batching import MicroBatcher
+
+
+def _make_batcher(
+    calls: list[list[str]], max_batch_size: int = 64, max_batch_tokens: int = 1024
+) -> MicroBatcher[str, str]:
+    def _process(inputs: list[str]) -> list[str]:
+        calls.append(list(inputs))
+        return [f"out_{item}" for item in inputs]
+
+    return MicroBatcher(
+        name="test-model",
+        process_batch=_process,
+        count_tokens=len,
+        max_batch_size=max_batch_size,
+        max_batch_tokens=max_batch_tokens,
+        batch_window_seconds=0.02,
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_a_forward_pass() -> None:
+    calls: list[list[str]] = []
+    batcher = _make_batcher(calls)
+
+    results = await asyncio.gather(
+        batcher.submit(["a", "b"]),
+        batcher.submit(["c"]),
+        batcher.submit(["d", "e", "f"]),
+    )
+
+    assert len(calls) == 1
+    assert [list(result) for result in results] == [
+        ["out_a", "out_b"],
+        ["out_c"],
+        ["out_d", "out_e", "out_f"],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_batches_respect_limits_and_priority() -> None:
+    calls: list[list[str]] = []
+    batcher = _make_batcher(calls, max_batch_size=3)
+
+    await asyncio.gather(
+        batcher.submit(["p1", "p2"], priority=BatchPriority.LOW),
+        batcher.submit(["q1"], priority=BatchPriority.HIGH),
+        batcher.submit(["q2", "q3"], priority=BatchPriority.HIGH),
+    )
+
+    # query traffic goes first, whole requests are never split across batches
+    assert calls == [["q1", "q2", "q3"], ["p1", "p2"]]
+
+
+@pytest.mark.asyncio
+async def test_forward_pass_failure_is_raised_to_every_request() -> None:
+    def _process(inputs: list[str]) -> list[str]:
+        raise ValueError("out of memory")
+
+    batcher: MicroBatcher[str, str] = MicroBatcher(
+        name="test-model",
+        process_batch=_process,
+        count_tokens=len,
+        max_batch_size=64,
+        max_batch_tokens=1024,
+        batch_window_seconds=0.02,
+    )
+
+    results = await asyncio.gather(
+        batcher.submit(["a"]), batcher.submit(["b"]), return_exceptions=True
+    )
+    assert all(isinstance(result, ValueError) for result in results)
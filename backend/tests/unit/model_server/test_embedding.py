@@ -7,7 +7,9 @@ from unittest.mock import AsyncMock
 from unittest.mock import MagicMock
 from unittest.mock import patch
 
+import numpy as np
 import pytest
+from fastapi import Response
 from httpx import AsyncClient
 from litellm.exceptions import RateLimitError
 
@@ -15,7 +17,12 @@ from model_server.encoders import CloudEmbedding
 from model_server.encoders import embed_text
 from model_server.encoders import local_rerank
 from model_server.encoders import process_embed_request
+from shared_configs.embedding_transport import build_embedding_accept_header
+from shared_configs.embedding_transport import decode_embeddings
+from shared_configs.embedding_transport import EMBEDDING_BINARY_MEDIA_TYPE
+from shared_configs.embedding_transport import encode_embeddings
 from shared_configs.enums import EmbeddingProvider
+from shared_configs.enums import EmbeddingTransportFormat
 from shared_configs.enums import EmbedTextType
 from shared_configs.model_server_models import EmbedRequest
 
@@ -196,3 +203,50 @@ async def test_concurrent_embeddings() -> None:
         # However, the developer may still introduce unnecessary blocking above the mock and this test will
         # still pass as long as it's less than (7 - 5) / 5 seconds
         assert end_time - start_time < 7
+
+
+def test_binary_embedding_transport_round_trip() -> None:
+    embeddings = np.random.rand(3, 8).astype(np.float32)
+
+    decoded = decode_embeddings(
+        encode_embeddings(embeddings, EmbeddingTransportFormat.FLOAT32)
+    )
+    assert decoded.dtype == np.float32
+    assert np.array_equal(decoded, embeddings)
+
+    decoded_half = decode_embeddings(
+        encode_embeddings(embeddings.tolist(), EmbeddingTransportFormat.FLOAT16)
+    )
+    assert decoded_half.dtype == np.float32
+    assert np.allclose(decoded_half, embeddings, atol=1e-3)
+
+    with pytest.raises(ValueError):
+        decode_embeddings(b"not an embedding payload")
+
+
+@pytest.mark.asyncio
+async def test_embed_request_binary_response_negotiation() -> None:
+    embed_request = EmbedRequest(
+        texts=["test1", "test2"],
+        model_name="fake-local-model",
+        max_context_length=512,
+        normalize_embeddings=True,
+        text_type=EmbedTextType.QUERY,
+    )
+    vectors = np.array([[0.1, 0.2], [0.3, 0.4]], dtype=np.float32)
+
+    with patch("model_server.encoders.get_embedding_model") as mock_get_model:
+        mock_get_model.return_value.encode.return_value = vectors
+
+        binary_response = await process_embed_request(
+            embed_request,
+            accept=build_embedding_accept_header(EmbeddingTransportFormat.FLOAT32),
+        )
+        assert isinstance(binary_response, Response)
+        assert binary_response.media_type == EMBEDDING_BINARY_MEDIA_TYPE
+        assert np.array_equal(decode_embeddings(binary_response.body), vectors)
+
+        # older clients don't send the header and keep getting JSON
+        json_response = await process_embed_request(embed_request)
+        assert not isinstance(json_response, Response)
+        assert json_response.embeddings == vectors.tolist()
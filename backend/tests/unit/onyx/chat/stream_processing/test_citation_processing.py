@@ -6,6 +6,8 @@ from onyx.chat.models import CitationInfo
 from onyx.chat.models import LlmDoc
 from onyx.chat.models import OnyxAnswerPiece
 from onyx.chat.stream_processing.citation_processing import CitationProcessor
+from onyx.chat.stream_processing.citation_processing import CodeFenceTracker
+from onyx.chat.stream_processing.citation_processing import in_code_block
 from onyx.chat.stream_processing.utils import DocumentIdOrderMapping
 from onyx.configs.constants import DocumentSource
 
@@ -415,3 +417,21 @@ def test_citation_extraction(
     ] == expected_citations, (
         f"Test '{test_name}' failed: Citations do not match expected output."
     )
+
+
+@pytest.mark.parametrize(
+    "tokens",
+    [
+        ["```", "python\n", "x = [1]\n", "```", "\n"],
+        # fences split over tokens
+        ["text `", "`", "`\ncode\n``", "`` after"],
+        ["````", "`", "``", "`", "a", "```` b"],
+    ],
+)
+def test_code_fence_tracker_matches_full_rescan(tokens: list[str]) -> None:
+    tracker = CodeFenceTracker()
+    llm_out = ""
+    for token in tokens:
+        tracker.update(token)
+        llm_out += token
+        assert tracker.in_code_block == in_code_block(llm_out)
@@ -0,0 +1,53 @@
+from unittest.mock import MagicMock
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from onyx.chat.chat_utils import create_chat_chain
+from onyx.db.chat import get_chat_message_mainline
+
+
+def _message(
+    message_id: int, parent: int | None, latest_child: int | None
+) -> MagicMock:
+    message = MagicMock()
+    message.id = message_id
+    message.parent_message = parent
+    message.latest_child_message = latest_child
+    return message
+
+
+def test_mainline_is_resolved_in_one_recursive_query() -> None:
+    db_session = MagicMock()
+    get_chat_message_mainline(
+        chat_session_id=uuid4(), db_session=db_session, stop_at_message_id=5
+    )
+
+    assert db_session.scalars.call_count == 1
+    sql = str(
+        db_session.scalars.call_args.args[0].compile(dialect=postgresql.dialect())
+    )
+    assert "WITH RECURSIVE mainline" in sql
+    assert "mainline.id != " in sql
+
+
+def test_chat_chain_from_mainline() -> None:
+    chain = [_message(1, None, 2), _message(2, 1, 4), _message(4, 2, None)]
+    with patch("onyx.chat.chat_utils.get_chat_message_mainline", return_value=chain):
+        final_msg, history_msgs = create_chat_chain(uuid4(), MagicMock())
+
+    assert final_msg is chain[2]
+    assert history_msgs == [chain[1]]
+
+
+def test_chat_chain_with_missing_child_is_invalid() -> None:
+    # the latest child of the last message is not in the session
+    chain = [_message(1, None, 2), _message(2, 1, 3)]
+    with patch("onyx.chat.chat_utils.get_chat_message_mainline", return_value=chain):
+        with pytest.raises(RuntimeError):
+            create_chat_chain(uuid4(), MagicMock())
+
+        final_msg, _ = create_chat_chain(uuid4(), MagicMock(), stop_at_message_id=2)
+        assert final_msg is chain[1]
@@ -0,0 +1,83 @@
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from onyx.chat.models import SearchDocsReorderResponse
+from onyx.chat.process_message import _build_provisional_qa_docs_response
+from onyx.chat.process_message import gather_stream_for_slack
+from onyx.configs.constants import DocumentSource
+from onyx.context.search.models import SearchDoc
+from onyx.tools.models import ToolResponse
+from onyx.tools.tool_implementations.search.search_tool import (
+    SEARCH_RESPONSE_SUMMARY_ID,
+)
+
+_MODULE = "onyx.chat.process_message"
+
+
+def _search_doc(document_id: str, score: float) -> SearchDoc:
+    return SearchDoc(
+        document_id=document_id,
+        chunk_ind=0,
+        semantic_identifier=document_id,
+        blurb="",
+        source_type=DocumentSource.WEB,
+        boost=0,
+        hidden=False,
+        metadata={},
+        score=score,
+        match_highlights=[],
+    )
+
+
+def _provisional_summary_packet() -> ToolResponse:
+    summary = MagicMock(provisional=True, rephrased_query="query")
+    summary.final_filters.source_type = None
+    summary.final_filters.time_cutoff = None
+    summary.recency_bias_multiplier = 1.0
+    summary.predicted_flow = None
+    summary.predicted_search = None
+    return ToolResponse(id=SEARCH_RESPONSE_SUMMARY_ID, response=summary)
+
+
+def test_provisional_docs_are_sent_without_saving() -> None:
+    with patch(
+        f"{_MODULE}.chunks_or_sections_to_search_docs",
+        return_value=[_search_doc("first", 0.9), _search_doc("second", 0.5)],
+    ), patch(f"{_MODULE}.create_db_search_doc") as create_db_search_doc:
+        qa_docs_response = _build_provisional_qa_docs_response(
+            packet=_provisional_summary_packet()
+        )
+
+    # a stream that ends before the reranked summary must not leave rows behind
+    create_db_search_doc.assert_not_called()
+    assert qa_docs_response.provisional
+    assert [
+        (doc.document_id, doc.db_doc_id) for doc in qa_docs_response.top_documents
+    ] == [("first", 0), ("second", 0)]
+
+
+def test_reorder_applies_the_reranked_order_and_saved_ids() -> None:
+    with patch(
+        f"{_MODULE}.chunks_or_sections_to_search_docs",
+        return_value=[_search_doc("first", 0.9), _search_doc("second", 0.5)],
+    ):
+        provisional_docs = _build_provisional_qa_docs_response(
+            packet=_provisional_summary_packet()
+        )
+
+    response = gather_stream_for_slack(
+        iter(
+            [
+                provisional_docs,
+                SearchDocsReorderResponse(
+                    reordered_document_ids=["second", "first"], db_doc_ids=[12, 11]
+                ),
+            ]
+        )
+    )
+
+    assert response.docs is not None
+    assert not response.docs.provisional
+    assert [
+        (doc.document_id, doc.db_doc_id) for doc in response.docs.top_documents
+    ] == [("second", 12), ("first", 11)]
@@ -1,9 +1,15 @@
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
 import pytest
 
+from onyx.chat.prune_and_merge import _apply_pruning
 from onyx.chat.prune_and_merge import _merge_sections
 from onyx.configs.constants import DocumentSource
 from onyx.context.search.models import InferenceChunk
 from onyx.context.search.models import InferenceSection
+from onyx.natural_language_processing.token_count_cache import TokenCountCache
+from onyx.natural_language_processing.utils import BaseTokenizer
 
 
 # This large test accounts for all of the following:
@@ -228,3 +234,60 @@ def test_merge_minimal_sections(
     merged_sections = _merge_sections(sections)
     assert merged_sections[0].combined_content == expected_content
     assert merged_sections[0].center_chunk == expected_center_chunk
+
+
+class _WordTokenizer(BaseTokenizer):
+    def __init__(self) -> None:
+        self.encode_calls = 0
+
+    def encode(self, string: str) -> list[int]:
+        self.encode_calls += 1
+        return [len(word) for word in string.split()]
+
+    def tokenize(self, string: str) -> list[str]:
+        return string.split()
+
+    def decode(self, tokens: list[int]) -> str:
+        return " ".join("x" * token for token in tokens)
+
+
+def test_pruning_trims_a_copy_of_the_final_section() -> None:
+    tokenizer = _WordTokenizer()
+    sections = [
+        InferenceSection(
+            center_chunk=chunk, chunks=[chunk], combined_content="aa " * 40
+        )
+        for chunk in [DOC_1_TOP_CHUNK, DOC_1_MID_CHUNK]
+    ]
+
+    with patch(
+        "onyx.chat.prune_and_merge.get_tokenizer", return_value=tokenizer
+    ), patch(
+        "onyx.natural_language_processing.token_count_cache.get_token_count_cache",
+        return_value=TokenCountCache(max_entries=100),
+    ):
+        pruned_sections = _apply_pruning(
+            sections=sections,
+            section_relevance_list=None,
+            token_limit=80,
+            is_manually_selected_docs=False,
+            use_sections=True,
+            using_tool_message=False,
+            llm_config=MagicMock(),
+        )
+        assert tokenizer.encode_calls == 3
+        _apply_pruning(
+            sections=sections,
+            section_relevance_list=None,
+            token_limit=80,
+            is_manually_selected_docs=False,
+            use_sections=True,
+            using_tool_message=False,
+            llm_config=MagicMock(),
+        )
+        # the section token counts are remembered, only the final content is encoded
+        assert tokenizer.encode_calls == 4
+
+    assert pruned_sections[0] is sections[0]
+    assert sections[1].combined_content == "aa " * 40
+    assert len(pruned_sections[1].combined_content.split()) < 40
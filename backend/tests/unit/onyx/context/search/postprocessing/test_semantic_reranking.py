@@ -0,0 +1,124 @@
+from collections.abc import Generator
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+
+from onyx.configs.constants import DocumentSource
+from onyx.context.search.enums import LLMEvaluationType
+from onyx.context.search.enums import SearchType
+from onyx.context.search.models import IndexFilters
+from onyx.context.search.models import InferenceChunk
+from onyx.context.search.models import RerankingDetails
+from onyx.context.search.models import SearchQuery
+from onyx.context.search.postprocessing.postprocessing import semantic_reranking
+from onyx.utils.ttl_lru_cache import TTLLRUCache
+
+_MODULE = "onyx.context.search.postprocessing.postprocessing"
+
+
+def _search_query(query: str, num_rerank: int) -> SearchQuery:
+    return SearchQuery(
+        query=query,
+        processed_keywords=query.split(),
+        search_type=SearchType.SEMANTIC,
+        evaluation_type=LLMEvaluationType.SKIP,
+        filters=IndexFilters(access_control_list=None),
+        chunks_above=0,
+        chunks_below=0,
+        rerank_settings=RerankingDetails(
+            rerank_model_name="test-reranker",
+            rerank_api_url=None,
+            rerank_provider_type=None,
+            num_rerank=num_rerank,
+        ),
+        hybrid_alpha=0.5,
+        recency_bias_multiplier=1.0,
+        max_llm_filter_sections=0,
+    )
+
+
+def _chunk(document_id: str, content: str) -> InferenceChunk:
+    return InferenceChunk(
+        chunk_id=0,
+        document_id=document_id,
+        semantic_identifier=document_id,
+        title=None,
+        blurb="",
+        content=content,
+        source_links=None,
+        section_continuation=False,
+        source_type=DocumentSource.WEB,
+        boost=0,
+        recency_bias=1.0,
+        score=None,
+        hidden=False,
+        metadata={},
+        match_highlights=[],
+        updated_at=None,
+    )
+
+
+@pytest.fixture
+def cross_encoder() -> Generator[MagicMock, None, None]:
+    # the reranker scores a passage by the number in its content
+    def _predict(query: str, passages: list[str]) -> list[float]:
+        return [float(passage.split("\n")[-1]) for passage in passages]
+
+    with patch(f"{_MODULE}.RerankingModel") as reranking_model:
+        reranking_model.return_value.predict.side_effect = _predict
+        yield reranking_model.return_value.predict
+
+
+def test_cached_scores_are_not_predicted_again(cross_encoder: MagicMock) -> None:
+    score_cache: TTLLRUCache[str, float] = TTLLRUCache(max_entries=100, ttl_seconds=60)
+    query = _search_query("query", num_rerank=3)
+
+    with patch(f"{_MODULE}.get_rerank_score_cache", return_value=score_cache):
+        semantic_reranking(query, [_chunk("a", "0.1"), _chunk("b", "0.2")])
+        ranked_chunks, _ = semantic_reranking(
+            query, [_chunk("a", "0.1"), _chunk("b", "0.2"), _chunk("c", "0.3")]
+        )
+
+    assert [chunk.document_id for chunk in ranked_chunks] == ["c", "b", "a"]
+    assert [call.kwargs["passages"] for call in cross_encoder.call_args_list] == [
+        ["a\n0.1", "b\n0.2"],
+        ["c\n0.3"],
+    ]
+
+
+def test_changed_content_is_scored_again(cross_encoder: MagicMock) -> None:
+    score_cache: TTLLRUCache[str, float] = TTLLRUCache(max_entries=100, ttl_seconds=60)
+    query = _search_query("query", num_rerank=1)
+
+    with patch(f"{_MODULE}.get_rerank_score_cache", return_value=score_cache):
+        semantic_reranking(query, [_chunk("a", "0.1")])
+        semantic_reranking(query, [_chunk("a", "0.5")])
+
+    assert cross_encoder.call_count == 2
+
+
+def test_adaptive_reranking_stops_once_top_k_is_stable(
+    cross_encoder: MagicMock,
+) -> None:
+    chunks = [
+        _chunk("a", "0.9"),
+        _chunk("b", "0.8"),
+        _chunk("c", "0.1"),
+        _chunk("d", "0.2"),
+        _chunk("e", "0.7"),
+        _chunk("f", "0.3"),
+    ]
+
+    with patch(f"{_MODULE}.get_rerank_score_cache", return_value=None):
+        ranked_chunks, ranked_indices = semantic_reranking(
+            _search_query("query", num_rerank=6),
+            chunks,
+            adaptive_tier_size=2,
+            adaptive_top_k=2,
+        )
+
+    # the second tier doesn't change the top 2, the last tier is never scored
+    assert cross_encoder.call_count == 2
+    assert [chunk.document_id for chunk in ranked_chunks] == ["a", "b", "d", "c"]
+    assert ranked_indices == [0, 1, 3, 2]
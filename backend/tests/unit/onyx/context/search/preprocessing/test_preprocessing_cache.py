@@ -0,0 +1,140 @@
+from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from datetime import timezone
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+
+from onyx.configs.constants import DocumentSource
+from onyx.context.search.preprocessing.preprocessing import (
+    cached_extract_source_filter,
+)
+from onyx.context.search.preprocessing.preprocessing import cached_extract_time_filter
+from onyx.context.search.preprocessing.preprocessing_cache import (
+    QueryPreprocessingCache,
+)
+
+_MODULE = "onyx.context.search.preprocessing.preprocessing"
+_CACHE_MODULE = "onyx.context.search.preprocessing.preprocessing_cache"
+
+
+@pytest.fixture
+def preprocessing_cache() -> Generator[QueryPreprocessingCache, None, None]:
+    preprocessing_cache = QueryPreprocessingCache(
+        max_entries=100, ttl_seconds=60, use_redis=False
+    )
+    with patch(
+        f"{_CACHE_MODULE}.get_query_preprocessing_cache",
+        return_value=preprocessing_cache,
+    ):
+        yield preprocessing_cache
+
+
+def _llm(model_name: str = "gpt-4o") -> MagicMock:
+    llm = MagicMock()
+    llm.config.model_provider = "openai"
+    llm.config.model_name = model_name
+    return llm
+
+
+def test_time_filter_is_reused_for_the_normalized_query(
+    preprocessing_cache: QueryPreprocessingCache,
+) -> None:
+    cutoff = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    with patch(
+        f"{_MODULE}.extract_time_filter", return_value=(cutoff, False)
+    ) as extract_time_filter:
+        first = cached_extract_time_filter(
+            "What changed  since 2024?", _llm(), "tenant_a"
+        )
+        second = cached_extract_time_filter(
+            "what changed since 2024? ", _llm(), "tenant_a"
+        )
+        # a different model may extract a different filter
+        cached_extract_time_filter(
+            "what changed since 2024?", _llm("gpt-4o-mini"), "tenant_a"
+        )
+
+    assert first == second == (cutoff, False)
+    assert extract_time_filter.call_count == 2
+
+
+def test_source_filter_is_keyed_on_the_available_sources(
+    preprocessing_cache: QueryPreprocessingCache,
+) -> None:
+    db_session = MagicMock()
+    with patch(
+        f"{_MODULE}.extract_source_filter", return_value=[DocumentSource.SLACK]
+    ) as extract_source_filter, patch(
+        f"{_MODULE}.fetch_unique_document_sources",
+        side_effect=[
+            [DocumentSource.SLACK, DocumentSource.WEB],
+            [DocumentSource.WEB, DocumentSource.SLACK],
+            [DocumentSource.SLACK],
+        ],
+    ):
+        results = [
+            cached_extract_source_filter(
+                "slack messages about billing", _llm(), db_session, "tenant_a"
+            )
+            for _ in range(3)
+        ]
+
+    assert results == [[DocumentSource.SLACK]] * 3
+    assert extract_source_filter.call_count == 2
+
+
+def test_redis_failures_are_misses() -> None:
+    preprocessing_cache = QueryPreprocessingCache(
+        max_entries=100, ttl_seconds=60, use_redis=True
+    )
+    with patch(
+        f"{_CACHE_MODULE}.get_redis_client", side_effect=ConnectionError("down")
+    ):
+        assert preprocessing_cache.get("key", "tenant_a") is None
+        preprocessing_cache.set("key", "value", "tenant_a")
+        # still served from the in process cache
+        assert preprocessing_cache.get("key", "tenant_a") == "value"
+
+
+def test_results_are_not_shared_across_tenants() -> None:
+    preprocessing_cache = QueryPreprocessingCache(
+        max_entries=100, ttl_seconds=60, use_redis=True
+    )
+    redis_clients = {"tenant_a": MagicMock(), "tenant_b": MagicMock()}
+    for redis_client in redis_clients.values():
+        redis_client.get.return_value = None
+
+    def _run_in_worker_thread(tenant_id: str) -> list[DocumentSource] | None:
+        # like run_functions_in_parallel, the worker doesn't see the request's tenant
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(
+                cached_extract_source_filter,
+                "slack messages about billing",
+                _llm(),
+                MagicMock(),
+                tenant_id,
+            ).result()
+
+    with patch(
+        f"{_CACHE_MODULE}.get_query_preprocessing_cache",
+        return_value=preprocessing_cache,
+    ), patch(
+        f"{_CACHE_MODULE}.get_redis_client",
+        side_effect=lambda tenant_id: redis_clients[tenant_id],
+    ), patch(
+        f"{_MODULE}.fetch_unique_document_sources",
+        return_value=[DocumentSource.SLACK, DocumentSource.WEB],
+    ), patch(
+        f"{_MODULE}.extract_source_filter",
+        side_effect=[[DocumentSource.SLACK], [DocumentSource.WEB]],
+    ) as extract_source_filter:
+        assert _run_in_worker_thread("tenant_a") == [DocumentSource.SLACK]
+        assert _run_in_worker_thread("tenant_b") == [DocumentSource.WEB]
+        assert _run_in_worker_thread("tenant_a") == [DocumentSource.SLACK]
+
+    assert extract_source_filter.call_count == 2
+    assert redis_clients["tenant_a"].set.call_count == 1
+    assert redis_clients["tenant_b"].set.call_count == 1
@@ -0,0 +1,149 @@
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from onyx.configs.constants import DocumentSource
+from onyx.context.search.enums import LLMEvaluationType
+from onyx.context.search.enums import SearchType
+from onyx.context.search.models import IndexFilters
+from onyx.context.search.models import InferenceChunkUncleaned
+from onyx.context.search.models import SearchQuery
+from onyx.context.search.retrieval.search_runner import ContextChunks
+from onyx.context.search.retrieval.search_runner import doc_index_retrieval
+from onyx.context.search.retrieval.search_runner import retrieve_chunks
+from onyx.document_index.interfaces import VespaChunkRequest
+
+_MODULE = "onyx.context.search.retrieval.search_runner"
+
+
+def _search_query(
+    query: str, chunks_above: int = 0, chunks_below: int = 0
+) -> SearchQuery:
+    return SearchQuery(
+        query=query,
+        processed_keywords=query.split(),
+        search_type=SearchType.SEMANTIC,
+        evaluation_type=LLMEvaluationType.SKIP,
+        filters=IndexFilters(access_control_list=None),
+        chunks_above=chunks_above,
+        chunks_below=chunks_below,
+        rerank_settings=None,
+        hybrid_alpha=0.5,
+        recency_bias_multiplier=1.0,
+        max_llm_filter_sections=0,
+    )
+
+
+def _chunk(
+    document_id: str,
+    chunk_id: int,
+    score: float | None = None,
+    large_chunk_reference_ids: list[int] | None = None,
+) -> InferenceChunkUncleaned:
+    return InferenceChunkUncleaned(
+        chunk_id=chunk_id,
+        document_id=document_id,
+        semantic_identifier=document_id,
+        title=None,
+        blurb="",
+        content=f"{document_id}_{chunk_id}",
+        source_links={0: ""},
+        section_continuation=False,
+        source_type=DocumentSource.WEB,
+        boost=0,
+        recency_bias=1.0,
+        score=score,
+        hidden=False,
+        metadata={},
+        match_highlights=[],
+        updated_at=None,
+        large_chunk_reference_ids=large_chunk_reference_ids or [],
+        metadata_suffix=None,
+    )
+
+
+def test_context_is_fetched_with_large_chunk_references() -> None:
+    document_index = MagicMock()
+    document_index.hybrid_retrieval.return_value = [
+        _chunk("large", 0, score=0.9, large_chunk_reference_ids=[0, 1, 2, 3]),
+        _chunk("normal", 5, score=0.5),
+    ]
+    document_index.id_based_retrieval.return_value = [
+        _chunk("large", chunk_id) for chunk_id in range(5)
+    ]
+
+    context_chunks = ContextChunks()
+    chunks = doc_index_retrieval(
+        query=_search_query("query", chunks_above=1, chunks_below=1),
+        document_index=document_index,
+        db_session=MagicMock(),
+        query_embedding=[0.0],
+        context_chunks=context_chunks,
+    )
+
+    # the references are fetched along with their surrounding chunks, the context of
+    # the normal chunks is left to the section expansion
+    document_index.id_based_retrieval.assert_called_once()
+    assert document_index.id_based_retrieval.call_args.kwargs["chunk_requests"] == [
+        VespaChunkRequest(document_id="large", min_chunk_ind=0, max_chunk_ind=4),
+    ]
+
+    assert [(chunk.document_id, chunk.chunk_id, chunk.score) for chunk in chunks] == [
+        ("large", 0, 0.9),
+        ("large", 1, 0.9),
+        ("large", 2, 0.9),
+        ("large", 3, 0.9),
+        ("normal", 5, 0.5),
+    ]
+    assert context_chunks.covers("large", 0, 4)
+    assert not context_chunks.covers("normal", 4, 6)
+    assert [chunk.chunk_id for chunk in context_chunks.get_chunks("large", 3, 5)] == [
+        3,
+        4,
+    ]
+
+
+def test_normal_chunks_need_no_follow_up_request() -> None:
+    document_index = MagicMock()
+    document_index.hybrid_retrieval.return_value = [_chunk("normal", 5, score=0.5)]
+
+    doc_index_retrieval(
+        query=_search_query("query", chunks_above=1, chunks_below=1),
+        document_index=document_index,
+        db_session=MagicMock(),
+        query_embedding=[0.0],
+        context_chunks=ContextChunks(),
+    )
+
+    document_index.id_based_retrieval.assert_not_called()
+
+
+def test_multilingual_rephrases_are_embedded_in_one_request() -> None:
+    document_index = MagicMock()
+    document_index.hybrid_retrieval.return_value = []
+
+    with patch(
+        f"{_MODULE}.get_multilingual_expansion", return_value=["English", "German"]
+    ), patch(
+        f"{_MODULE}.multilingual_query_expansion",
+        return_value=["what is onyx", "was ist onyx"],
+    ), patch(
+        f"{_MODULE}.embed_queries",
+        side_effect=lambda queries, db_session: [[float(len(q))] for q in queries],
+    ) as mock_embed_queries:
+        retrieve_chunks(
+            query=_search_query("what is onyx?"),
+            document_index=document_index,
+            db_session=MagicMock(),
+        )
+
+    mock_embed_queries.assert_called_once()
+    embedded_queries = mock_embed_queries.call_args.args[0]
+    # "what is onyx?" only differs from "what is onyx" by punctuation
+    assert len(embedded_queries) == 2
+
+    # every rephrase is searched with its own embedding
+    searched = {
+        call.kwargs["query"]: call.kwargs["query_embedding"]
+        for call in document_index.hybrid_retrieval.call_args_list
+    }
+    assert searched == {query: [float(len(query))] for query in embedded_queries}
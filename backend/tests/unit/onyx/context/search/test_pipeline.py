@@ -0,0 +1,94 @@
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from onyx.context.search.models import InferenceChunkUncleaned
+from onyx.context.search.pipeline import SearchPipeline
+from onyx.document_index.interfaces import VespaChunkRequest
+from tests.unit.onyx.context.search.retrieval.test_search_runner import _chunk
+from tests.unit.onyx.context.search.retrieval.test_search_runner import (
+    _search_query,
+)
+
+_RUNNER_MODULE = "onyx.context.search.retrieval.search_runner"
+
+
+def _fetch_chunks(
+    chunk_requests: list[VespaChunkRequest], **kwargs: object
+) -> list[InferenceChunkUncleaned]:
+    return [
+        _chunk(request.document_id, chunk_id)
+        for request in chunk_requests
+        for chunk_id in range(
+            request.min_chunk_ind or 0, (request.max_chunk_ind or 0) + 1
+        )
+    ]
+
+
+def test_sections_take_one_fetch_for_all_rephrases() -> None:
+    hits_per_rephrase: dict[str, list[InferenceChunkUncleaned]] = {
+        "first rephrase": [
+            _chunk("doc_1", 2, score=0.9),
+            _chunk("doc_2", 5, score=0.8),
+        ],
+        "second rephrase": [
+            _chunk("doc_1", 3, score=0.7),
+            _chunk("doc_3", 0, score=0.6, large_chunk_reference_ids=[0, 1, 2, 3]),
+        ],
+        "original query": [],
+    }
+    document_index = MagicMock()
+    document_index.hybrid_retrieval.side_effect = lambda query, **kwargs: [
+        hit.model_copy() for hit in hits_per_rephrase[query]
+    ]
+    document_index.id_based_retrieval.side_effect = _fetch_chunks
+
+    with patch("onyx.context.search.pipeline.get_search_config") as mock_config:
+        mock_config.return_value.document_index = document_index
+        pipeline = SearchPipeline(
+            search_request=MagicMock(),
+            user=None,
+            llm=MagicMock(),
+            fast_llm=MagicMock(),
+            db_session=MagicMock(),
+        )
+    pipeline._search_query = _search_query(
+        "original query", chunks_above=1, chunks_below=1
+    )
+
+    with patch(
+        f"{_RUNNER_MODULE}.get_multilingual_expansion", return_value=["English"]
+    ), patch(
+        f"{_RUNNER_MODULE}.multilingual_query_expansion",
+        return_value=["first rephrase", "second rephrase"],
+    ), patch(
+        f"{_RUNNER_MODULE}.embed_queries",
+        side_effect=lambda queries, db_session: [[0.0] for _ in queries],
+    ):
+        sections = pipeline._get_sections()
+
+    assert document_index.hybrid_retrieval.call_count == 3
+    # one fetch for the large chunk references (with their context) of the second
+    # rephrase and a single one for the context of all other hits of all rephrases
+    assert document_index.id_based_retrieval.call_count == 2
+    reference_fetch, context_fetch = document_index.id_based_retrieval.call_args_list
+    assert reference_fetch.kwargs["chunk_requests"] == [
+        VespaChunkRequest(document_id="doc_3", min_chunk_ind=0, max_chunk_ind=4)
+    ]
+    assert sorted(
+        context_fetch.kwargs["chunk_requests"], key=lambda r: r.document_id
+    ) == [
+        VespaChunkRequest(document_id="doc_1", min_chunk_ind=1, max_chunk_ind=4),
+        VespaChunkRequest(document_id="doc_2", min_chunk_ind=4, max_chunk_ind=6),
+    ]
+    assert [
+        (section.center_chunk.document_id, section.center_chunk.chunk_id)
+        for section in sections
+    ] == [
+        ("doc_1", 2),
+        ("doc_2", 5),
+        ("doc_1", 3),
+        ("doc_3", 0),
+        ("doc_3", 1),
+        ("doc_3", 2),
+        ("doc_3", 3),
+    ]
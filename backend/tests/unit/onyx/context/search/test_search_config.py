@@ -0,0 +1,39 @@
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from onyx.context.search.search_config import get_search_config
+
+_MODULE = "onyx.context.search.search_config"
+
+
+def _db_session() -> MagicMock:
+    db_session = MagicMock()
+    db_session.info = {}
+    return db_session
+
+
+def test_search_config_is_resolved_once_per_session() -> None:
+    with patch(
+        f"{_MODULE}.get_current_search_settings"
+    ) as get_current_search_settings, patch(
+        f"{_MODULE}.EmbeddingModel"
+    ) as embedding_model, patch(
+        f"{_MODULE}.get_default_document_index"
+    ), patch(
+        f"{_MODULE}.get_query_embedding_cache"
+    ) as get_query_embedding_cache:
+        db_session = _db_session()
+        first = get_search_config(db_session)
+        second = get_search_config(db_session)
+        assert first is second
+        assert get_current_search_settings.call_count == 1
+        assert embedding_model.from_db_model.call_count == 1
+        # the query embedding cache is attached when the shared model is built
+        assert (
+            embedding_model.from_db_model.call_args.kwargs["embedding_cache"]
+            is get_query_embedding_cache.return_value
+        )
+
+        # a new request resolves the current settings again
+        assert get_search_config(_db_session()) is not first
+        assert get_current_search_settings.call_count == 2
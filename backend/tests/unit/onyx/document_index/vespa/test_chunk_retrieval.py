@@ -0,0 +1,34 @@
+import threading
+from unittest.mock import patch
+
+from onyx.context.search.models import IndexFilters
+from onyx.context.search.models import InferenceChunkUncleaned
+from onyx.document_index.interfaces import VespaChunkRequest
+from onyx.document_index.vespa import chunk_retrieval
+from onyx.document_index.vespa.chunk_retrieval import batch_search_api_retrieval
+
+
+def test_split_batch_queries_are_sent_in_parallel() -> None:
+    chunk_requests = [
+        VespaChunkRequest(document_id=f"doc_{ind}", min_chunk_ind=0, max_chunk_ind=1)
+        for ind in range(25)
+    ]
+    # 25 requests are split into 3 queries of at most MAX_OR_CONDITIONS requests, the
+    # barrier only lets them through if all 3 are in flight at the same time
+    all_in_flight = threading.Barrier(3, timeout=5)
+    queried_yqls: list[str] = []
+
+    def _fake_query_vespa(params: dict) -> list[InferenceChunkUncleaned]:
+        queried_yqls.append(params["yql"])
+        all_in_flight.wait()
+        return []
+
+    with patch.object(chunk_retrieval, "query_vespa", side_effect=_fake_query_vespa):
+        batch_search_api_retrieval(
+            index_name="test_index",
+            chunk_requests=chunk_requests,
+            filters=IndexFilters(access_control_list=None),
+        )
+
+    assert len(queried_yqls) == 3
+    assert sum(yql.count("document_id contains") for yql in queried_yqls) == 25
@@ -0,0 +1,108 @@
+import threading
+from unittest.mock import patch
+
+import httpx
+
+from onyx.document_index.vespa.feed import AdaptiveConcurrencyLimiter
+from onyx.document_index.vespa.feed import VespaFeedClient
+from onyx.document_index.vespa.feed import VespaFeedOperation
+
+
+def _operations(num: int) -> list[VespaFeedOperation]:
+    return [
+        VespaFeedOperation(
+            method="POST",
+            url=f"http://vespa/document/v1/default/index/docid/chunk_{i}",
+            document_id=f"doc_{i}",
+            body={"fields": {"chunk_id": i}},
+        )
+        for i in range(num)
+    ]
+
+
+def test_feed_returns_one_result_per_operation_in_order() -> None:
+    def _handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"id": str(request.url)})
+
+    http_client = httpx.Client(transport=httpx.MockTransport(_handler))
+    feed_client = VespaFeedClient(max_concurrency=8, http_clients=[http_client])
+
+    operations = _operations(50)
+    results = feed_client.feed(iter(operations))
+
+    assert [result.operation for result in results] == operations
+    assert all(result.ok and result.status_code == 200 for result in results)
+
+
+def test_feed_retries_throttled_operations_and_reports_failures() -> None:
+    attempts: dict[str, int] = {}
+    lock = threading.Lock()
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        chunk = request.url.path.rsplit("/", 1)[-1]
+        with lock:
+            attempts[chunk] = attempts.get(chunk, 0) + 1
+            num_attempts = attempts[chunk]
+        if chunk == "chunk_3":
+            return httpx.Response(400, text="bad field")
+        if chunk == "chunk_5" and num_attempts < 3:
+            return httpx.Response(429, text="too many requests")
+        return httpx.Response(200)
+
+    http_client = httpx.Client(transport=httpx.MockTransport(_handler))
+    feed_client = VespaFeedClient(
+        max_concurrency=4, max_retries=3, http_clients=[http_client]
+    )
+
+    with patch("onyx.document_index.vespa.feed._RETRY_BASE_DELAY_SECONDS", 0):
+        results = feed_client.feed(_operations(8))
+
+    failed = [result for result in results if not result.ok]
+    assert [result.operation.document_id for result in failed] == ["doc_3"]
+    assert failed[0].status_code == 400
+    assert failed[0].error == "bad field"
+    # client errors are not retried, throttling is
+    assert attempts["chunk_3"] == 1
+    assert attempts["chunk_5"] == 3
+    assert results[5].ok
+
+
+def test_adaptive_concurrency_limiter_backs_off_and_recovers() -> None:
+    limiter = AdaptiveConcurrencyLimiter(max_concurrency=8)
+    assert limiter.limit == 8
+
+    limiter.on_throttle()
+    limiter.on_throttle()
+    assert limiter.limit == 2
+
+    # additive increase: one step per `limit` successes
+    for _ in range(2):
+        limiter.on_success()
+    assert limiter.limit == 3
+    for _ in range(3):
+        limiter.on_success()
+    assert limiter.limit == 4
+
+
+def test_feed_reuses_a_pool_sized_to_the_operations() -> None:
+    threads: set[str] = set()
+    lock = threading.Lock()
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        with lock:
+            threads.add(threading.current_thread().name)
+        return httpx.Response(200)
+
+    http_client = httpx.Client(transport=httpx.MockTransport(_handler))
+    with VespaFeedClient(max_concurrency=8, http_clients=[http_client]) as feed_client:
+        assert feed_client.feed([]) == []
+
+        # a single operation only takes a single worker
+        assert feed_client.feed(_operations(1))[0].ok
+        assert len(threads) == 1
+
+        for _ in range(5):
+            assert all(result.ok for result in feed_client.feed(_operations(20)))
+        # the same workers serve every call
+        assert len(threads) <= 8
+        assert all(thread.startswith("vespa_feed") for thread in threads)
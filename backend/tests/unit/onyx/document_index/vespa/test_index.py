@@ -0,0 +1,80 @@
+from datetime import datetime
+from datetime import timezone
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from onyx.document_index.interfaces import VespaDocumentFields
+from onyx.document_index.vespa.index import VespaIndex
+from onyx.document_index.vespa_constants import BOOST
+from onyx.document_index.vespa_constants import DOC_UPDATED_AT
+
+
+def test_update_single_assigns_doc_updated_at() -> None:
+    # an unchanged document whose source reports a newer update time only gets a
+    # partial update, the time filters and recency decay must still see the new time
+    doc_updated_at = datetime(2024, 5, 1, tzinfo=timezone.utc)
+    http_client = MagicMock()
+    http_client.put.return_value.json.return_value = {"documentCount": 3}
+
+    with patch(
+        "onyx.document_index.vespa.index.get_vespa_http_client"
+    ) as get_vespa_http_client:
+        get_vespa_http_client.return_value.__enter__.return_value = http_client
+        index = VespaIndex(index_name="danswer_chunk", secondary_index_name=None)
+        chunks_updated = index.update_single(
+            "doc", fields=VespaDocumentFields(boost=1.0, doc_updated_at=doc_updated_at)
+        )
+
+    assert chunks_updated == 3
+    assert http_client.put.call_args.kwargs["json"] == {
+        "fields": {
+            BOOST: {"assign": 1.0},
+            DOC_UPDATED_AT: {"assign": int(doc_updated_at.timestamp())},
+        }
+    }
+
+
+def test_update_many_batches_updates_and_reports_missing_documents() -> None:
+    doc_updated_at = datetime(2024, 5, 1, tzinfo=timezone.utc)
+    chunk_ids = {
+        ("doc_a", "danswer_chunk"): ["a_0", "a_1"],
+        ("doc_b", "danswer_chunk"): [],
+        ("doc_a", "danswer_chunk_new"): ["a_new_0"],
+        ("doc_b", "danswer_chunk_new"): [],
+    }
+
+    with patch(
+        "onyx.document_index.vespa.index.get_all_vespa_ids_for_document_id",
+        side_effect=lambda document_id, index_name, **kwargs: chunk_ids[
+            (document_id, index_name)
+        ],
+    ), patch.object(VespaIndex, "_apply_updates_batched") as apply_updates_batched:
+        index = VespaIndex(
+            index_name="danswer_chunk", secondary_index_name="danswer_chunk_new"
+        )
+        missing_doc_ids = index.update_many(
+            {
+                "doc_a": VespaDocumentFields(boost=1.0, doc_updated_at=doc_updated_at),
+                "doc_b": VespaDocumentFields(boost=2.0),
+            }
+        )
+
+    assert missing_doc_ids == {"doc_b"}
+    # one batched update for the chunks of all documents in both indices
+    apply_updates_batched.assert_called_once()
+    updates = apply_updates_batched.call_args.args[0]
+    assert sorted(update.url.rsplit("/", 2)[-1] for update in updates) == [
+        "a_0",
+        "a_1",
+        "a_new_0",
+    ]
+    assert all(
+        update.update_request
+        == {
+            "fields": {
+                BOOST: {"assign": 1.0},
+                DOC_UPDATED_AT: {"assign": int(doc_updated_at.timestamp())},
+            }
+        }
+        for update in updates
+    )
@@ -0,0 +1,65 @@
+from typing import cast
+from unittest.mock import Mock
+
+from onyx.document_index.document_index_utils import get_uuid_from_chunk_info
+from onyx.document_index.vespa.indexing_utils import get_stale_vespa_chunk_ids
+from onyx.indexing.models import DocMetadataAwareIndexChunk
+
+
+def _chunk(
+    doc_id: str, chunk_id: int, large_chunk_reference_ids: list[int] | None = None
+) -> DocMetadataAwareIndexChunk:
+    chunk = Mock()
+    chunk.source_document.id = doc_id
+    chunk.chunk_id = chunk_id
+    chunk.large_chunk_reference_ids = large_chunk_reference_ids or []
+    return cast(DocMetadataAwareIndexChunk, chunk)
+
+
+def _chunk_uuid(
+    doc_id: str, chunk_id: int, large_chunk_reference_ids: list[int] | None = None
+) -> str:
+    return str(
+        get_uuid_from_chunk_info(
+            document_id=doc_id,
+            chunk_id=chunk_id,
+            large_chunk_reference_ids=large_chunk_reference_ids,
+        )
+    )
+
+
+def test_stale_chunk_ids_only_cover_shrinkage() -> None:
+    chunks = [_chunk("shrunk", i) for i in range(3)] + [
+        _chunk("grown", i) for i in range(5)
+    ]
+
+    stale = get_stale_vespa_chunk_ids(
+        chunks, doc_id_to_previous_chunk_cnt={"shrunk": 5, "grown": 2}
+    )
+
+    # the trailing regular chunks plus the large chunk that may have existed for the
+    # previous 5 chunks (chunks 0-3 and chunk 4 alone does not make a large chunk)
+    assert set(stale["shrunk"]) == {
+        _chunk_uuid("shrunk", 3),
+        _chunk_uuid("shrunk", 4),
+        _chunk_uuid("shrunk", 0, [0, 1, 2, 3]),
+    }
+    # all regular chunks of the grown document are overwritten
+    assert stale["grown"] == [_chunk_uuid("grown", 0, [0, 1])]
+
+
+def test_stale_chunk_ids_keep_rewritten_large_chunks() -> None:
+    chunks = [_chunk("doc", i) for i in range(4)] + [_chunk("doc", 0, [0, 1, 2, 3])]
+
+    stale = get_stale_vespa_chunk_ids(chunks, doc_id_to_previous_chunk_cnt={"doc": 6})
+
+    assert set(stale["doc"]) == {
+        _chunk_uuid("doc", 4),
+        _chunk_uuid("doc", 5),
+        _chunk_uuid("doc", 1, [4, 5]),
+    }
+
+
+def test_stale_chunk_ids_skip_documents_of_unknown_size() -> None:
+    chunks = [_chunk("doc", i) for i in range(2)]
+    assert get_stale_vespa_chunk_ids(chunks, doc_id_to_previous_chunk_cnt={}) == {}
@@ -0,0 +1,148 @@
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from unittest.mock import patch
+
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+
+from onyx.document_index.vespa import read_client
+from onyx.document_index.vespa.indexing_utils import _does_document_exist
+from onyx.document_index.vespa.read_client import get_vespa_read_client
+from onyx.document_index.vespa.read_client import VESPA_DOCUMENT_ENDPOINT_LABEL
+from onyx.document_index.vespa.read_client import vespa_read_request
+from onyx.document_index.vespa.read_client import VESPA_SEARCH_ENDPOINT_LABEL
+
+
+def _mock_client_factory(
+    transport: httpx.MockTransport, created: list[httpx.Client]
+) -> Callable[..., httpx.Client]:
+    def _create(**kwargs: Any) -> httpx.Client:
+        client = httpx.Client(transport=transport)
+        created.append(client)
+        return client
+
+    return _create
+
+
+def test_read_client_is_reused_after_transport_errors() -> None:
+    fail_next = [False]
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        if fail_next[0]:
+            fail_next[0] = False
+            raise httpx.ConnectError("connection reset", request=request)
+        return httpx.Response(200, json={"root": {}})
+
+    created: list[httpx.Client] = []
+    with patch.object(read_client, "_client", None), patch.object(
+        read_client,
+        "get_vespa_http_client",
+        side_effect=_mock_client_factory(httpx.MockTransport(_handler), created),
+    ):
+        for _ in range(3):
+            vespa_read_request(
+                "POST", "http://vespa/search/", VESPA_SEARCH_ENDPOINT_LABEL, json={}
+            )
+        assert len(created) == 1
+        assert get_vespa_read_client() is created[0]
+
+        fail_next[0] = True
+        with pytest.raises(httpx.ConnectError):
+            vespa_read_request(
+                "POST", "http://vespa/search/", VESPA_SEARCH_ENDPOINT_LABEL, json={}
+            )
+        assert not created[0].is_closed
+
+        vespa_read_request(
+            "POST", "http://vespa/search/", VESPA_SEARCH_ENDPOINT_LABEL, json={}
+        )
+        assert len(created) == 1
+
+
+def test_timeout_does_not_break_requests_in_flight_on_the_shared_client() -> None:
+    slow_started = threading.Event()
+    release_slow = threading.Event()
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/slow/"):
+            slow_started.set()
+            release_slow.wait(timeout=10)
+            return httpx.Response(200, json={"root": {}})
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    created: list[httpx.Client] = []
+    with patch.object(read_client, "_client", None), patch.object(
+        read_client,
+        "get_vespa_http_client",
+        side_effect=_mock_client_factory(httpx.MockTransport(_handler), created),
+    ), ThreadPoolExecutor(max_workers=1) as executor:
+        in_flight = executor.submit(
+            vespa_read_request,
+            "POST",
+            "http://vespa/slow/",
+            VESPA_SEARCH_ENDPOINT_LABEL,
+            json={},
+        )
+        assert slow_started.wait(timeout=10)
+
+        with pytest.raises(httpx.ReadTimeout):
+            vespa_read_request(
+                "POST", "http://vespa/search/", VESPA_SEARCH_ENDPOINT_LABEL, json={}
+            )
+
+        release_slow.set()
+        assert in_flight.result(timeout=10).status_code == 200
+        assert len(created) == 1
+        assert not created[0].is_closed
+        assert get_vespa_read_client() is created[0]
+
+
+def test_read_request_raises_for_error_status() -> None:
+    def _handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(400, text="bad yql")
+
+    created: list[httpx.Client] = []
+    with patch.object(read_client, "_client", None), patch.object(
+        read_client,
+        "get_vespa_http_client",
+        side_effect=_mock_client_factory(httpx.MockTransport(_handler), created),
+    ):
+        with pytest.raises(httpx.HTTPStatusError):
+            vespa_read_request(
+                "POST", "http://vespa/search/", VESPA_SEARCH_ENDPOINT_LABEL, json={}
+            )
+        # the connection itself is fine, no need to rebuild the pool
+        assert not created[0].is_closed
+
+
+def test_document_existence_checks_are_timed_as_document_reads() -> None:
+    def _count(status: str) -> float:
+        return (
+            REGISTRY.get_sample_value(
+                "onyx_vespa_read_request_latency_seconds_count",
+                {"endpoint": VESPA_DOCUMENT_ENDPOINT_LABEL, "status": status},
+            )
+            or 0
+        )
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/missing"):
+            return httpx.Response(404)
+        return httpx.Response(200, json={"fields": {}})
+
+    before_found, before_missing = _count("200"), _count("404")
+    created: list[httpx.Client] = []
+    with patch.object(read_client, "_client", None), patch.object(
+        read_client,
+        "get_vespa_http_client",
+        side_effect=_mock_client_factory(httpx.MockTransport(_handler), created),
+    ):
+        assert _does_document_exist("found", "danswer_chunk")
+        assert not _does_document_exist("missing", "danswer_chunk")
+
+    assert len(created) == 1
+    assert _count("200") == before_found + 1
+    assert _count("404") == before_missing + 1
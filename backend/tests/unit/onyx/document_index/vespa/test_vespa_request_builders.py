@@ -0,0 +1,53 @@
+import json
+import struct
+
+import numpy
+
+from onyx.document_index.vespa.shared_utils.vespa_request_builders import (
+    build_vespa_query_params,
+)
+from onyx.document_index.vespa.shared_utils.vespa_request_builders import (
+    encode_query_tensor,
+)
+
+
+def test_float32_query_tensor_round_trips_exactly() -> None:
+    embedding = numpy.random.default_rng(0).uniform(-1, 1, 768).tolist()
+
+    encoded = encode_query_tensor(embedding, tensor_format="float32")
+
+    decoded = numpy.asarray(json.loads(encoded), dtype=numpy.float32)
+    assert numpy.array_equal(decoded, numpy.asarray(embedding, dtype=numpy.float32))
+    assert len(encoded) < len(encode_query_tensor(embedding, tensor_format="list"))
+
+
+def test_hex_query_tensor_is_big_endian_float32() -> None:
+    encoded = encode_query_tensor([1.0, -0.5], tensor_format="hex")
+
+    assert (
+        encoded
+        == "tensor<float>(x[2]):"
+        + (struct.pack(">f", 1.0) + struct.pack(">f", -0.5)).hex().upper()
+    )
+
+
+def test_query_params_only_include_given_fields() -> None:
+    assert build_vespa_query_params(yql="select * from x", hits=10) == {
+        "yql": "select * from x",
+        "hits": 10,
+    }
+
+    params = build_vespa_query_params(
+        yql="select * from x",
+        hits=10,
+        query="hello",
+        offset=0,
+        ranking_profile="hybrid_search2",
+        query_embedding=[0.5, 0.25],
+        inputs={"alpha": 0.5},
+        timeout="3s",
+    )
+    assert params["input.query(alpha)"] == 0.5
+    assert params["ranking.profile"] == "hybrid_search2"
+    assert params["offset"] == 0
+    assert "input.query(query_embedding)" in params
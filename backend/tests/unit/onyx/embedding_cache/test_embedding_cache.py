@@ -0,0 +1,120 @@
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import numpy as np
+import numpy.typing as npt
+from sqlalchemy.dialects import postgresql
+
+from onyx.db.embedding_cache import upsert_embedding_cache_entries
+from onyx.embedding_cache.disk_store import DiskEmbeddingCache
+from onyx.embedding_cache.interface import build_embedding_cache_key
+from onyx.natural_language_processing.search_nlp_models import EmbeddingModel
+from shared_configs.enums import EmbedTextType
+
+
+def _key(text: str, **overrides: object) -> str:
+    kwargs: dict = dict(
+        text=text,
+        text_type=EmbedTextType.PASSAGE,
+        model_name="test-model",
+        provider_type=None,
+        normalize=True,
+        prefix=None,
+        max_seq_length=512,
+    )
+    kwargs.update(overrides)
+    return build_embedding_cache_key(**kwargs)
+
+
+def test_cache_key_depends_on_model_settings() -> None:
+    base = _key("hello")
+    assert base == _key("hello")
+    assert base != _key("hello!")
+    assert base != _key("hello", model_name="other-model")
+    assert base != _key("hello", normalize=False)
+    assert base != _key("hello", prefix="search_document: ")
+    assert base != _key("hello", text_type=EmbedTextType.QUERY)
+    assert base != _key("hello", api_version="2024-02-01")
+
+
+def test_query_key_ignores_whitespace_differences() -> None:
+    query_key = _key("hello  world", text_type=EmbedTextType.QUERY)
+    assert query_key == _key(" hello world\n", text_type=EmbedTextType.QUERY)
+    assert _key("hello  world") != _key("hello world")
+
+
+def test_disk_cache_round_trip_and_metrics(tmp_path: Path) -> None:
+    cache = DiskEmbeddingCache(cache_dir=str(tmp_path), max_size_bytes=1024 * 1024)
+    cache.set_many({"a": [0.5, 1.0, -2.0], "b": [0.25, 0.0, 3.0]})
+
+    found = cache.get_many(["a", "b", "c"])
+    assert found == {"a": [0.5, 1.0, -2.0], "b": [0.25, 0.0, 3.0]}
+    assert cache.hits == 2
+    assert cache.misses == 1
+
+    # persisted across instances
+    reopened = DiskEmbeddingCache(cache_dir=str(tmp_path), max_size_bytes=1024 * 1024)
+    assert reopened.get_many(["a"]) == {"a": [0.5, 1.0, -2.0]}
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    # each entry is 4 floats * 4 bytes = 16 bytes, room for 4 entries (evicting down
+    # to 90% of the limit when a 5th one comes in)
+    cache = DiskEmbeddingCache(cache_dir=str(tmp_path), max_size_bytes=72)
+    for i in range(4):
+        cache.set_many({f"key_{i}": [float(i)] * 4})
+        time.sleep(0.01)
+    # touch key_0 so that key_1 is now the least recently used
+    cache.get_many(["key_0"])
+    time.sleep(0.01)
+    cache.set_many({"key_4": [4.0] * 4})
+
+    found = cache.get_many([f"key_{i}" for i in range(5)])
+    assert set(found.keys()) == {"key_0", "key_2", "key_3", "key_4"}
+
+
+def test_embedding_model_only_embeds_cache_misses(tmp_path: Path) -> None:
+    cache = DiskEmbeddingCache(cache_dir=str(tmp_path), max_size_bytes=1024 * 1024)
+
+    with patch("onyx.natural_language_processing.search_nlp_models.get_tokenizer"):
+        model = EmbeddingModel(
+            server_host="localhost",
+            server_port=9000,
+            model_name="test-model",
+            normalize=True,
+            query_prefix=None,
+            passage_prefix=None,
+            api_key=None,
+            api_url=None,
+            provider_type=None,
+            embedding_cache=cache,
+        )
+
+    sent_texts: list[list[str]] = []
+
+    def _fake_batch_encode(
+        texts: list[str], **kwargs: object
+    ) -> npt.NDArray[np.float32]:
+        sent_texts.append(texts)
+        return np.array([[len(text)] for text in texts], dtype=np.float32)
+
+    with patch.object(model, "_batch_encode_texts", side_effect=_fake_batch_encode):
+        first = model.encode(["aa", "bbb", "aa"], text_type=EmbedTextType.PASSAGE)
+        second = model.encode(["bbb", "cccc"], text_type=EmbedTextType.PASSAGE)
+
+    assert first == [[2.0], [3.0], [2.0]]
+    assert second == [[3.0], [4.0]]
+    # duplicates are only embedded once and cached texts are never re-sent
+    assert sent_texts == [["aa", "bbb"], ["cccc"]]
+
+
+def test_pg_upsert_writes_rows_in_key_order() -> None:
+    db_session = MagicMock()
+
+    upsert_embedding_cache_entries({"c": b"3", "a": b"1", "b": b"2"}, db_session)
+
+    (statement,) = [call.args[0] for call in db_session.execute.call_args_list]
+    params = statement.compile(dialect=postgresql.dialect()).params
+    assert [params[f"key_m{ind}"] for ind in range(3)] == ["a", "b", "c"]
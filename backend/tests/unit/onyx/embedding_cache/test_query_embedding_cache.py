@@ -0,0 +1,61 @@
+from unittest.mock import patch
+
+from onyx.embedding_cache import factory
+from onyx.embedding_cache.factory import get_query_embedding_cache
+from onyx.embedding_cache.interface import EmbeddingCache
+from onyx.embedding_cache.memory_store import InMemoryEmbeddingCache
+from onyx.embedding_cache.tiered_store import TieredEmbeddingCache
+from onyx.utils.ttl_lru_cache import TTLLRUCache
+
+
+def test_memory_cache_evicts_least_recently_used_and_expired() -> None:
+    cache = InMemoryEmbeddingCache(max_entries=2, ttl_seconds=60)
+    cache.set_many({"a": [1.0], "b": [2.0]})
+    # touch "a" so that "b" is the least recently used entry
+    assert cache.get_many(["a"]) == {"a": [1.0]}
+    cache.set_many({"c": [3.0]})
+
+    assert cache.get_many(["a", "b", "c"]) == {"a": [1.0], "c": [3.0]}
+    assert (cache.hits, cache.misses) == (3, 1)
+
+    with patch("onyx.utils.ttl_lru_cache.time.monotonic") as mock_time:
+        mock_time.return_value = float("inf")
+        assert cache.get_many(["a", "c"]) == {}
+
+
+def test_tiered_cache_backfills_faster_tiers() -> None:
+    memory = InMemoryEmbeddingCache(max_entries=10, ttl_seconds=60)
+    shared = InMemoryEmbeddingCache(max_entries=10, ttl_seconds=60)
+    shared.set_many({"a": [1.0]})
+    cache = TieredEmbeddingCache([memory, shared])
+
+    assert cache.get_many(["a", "b"]) == {"a": [1.0]}
+    assert memory.get_many(["a"]) == {"a": [1.0]}
+
+    cache.set_many({"b": [2.0]})
+    assert shared.get_many(["b"]) == {"b": [2.0]}
+
+
+def test_query_caches_are_kept_per_index() -> None:
+    caches: TTLLRUCache[str, EmbeddingCache] = TTLLRUCache(max_entries=2)
+    with patch.object(factory, "ENABLE_QUERY_EMBEDDING_CACHE", True), patch.object(
+        factory, "_QUERY_EMBEDDING_CACHES", caches
+    ):
+        cache = get_query_embedding_cache("index_a")
+        assert cache is not None
+        cache.set_many({"a": [1.0]})
+        assert get_query_embedding_cache("index_a") is cache
+
+        # alternating between the indices of different tenants keeps both caches
+        other_cache = get_query_embedding_cache("index_b")
+        assert other_cache is not None and other_cache is not cache
+        assert other_cache.get_many(["a"]) == {}
+        assert get_query_embedding_cache("index_a") is cache
+
+        # the least recently searched index is dropped
+        get_query_embedding_cache("index_c")
+        assert get_query_embedding_cache("index_a") is cache
+        assert get_query_embedding_cache("index_b") is not other_cache
+
+    with patch.object(factory, "ENABLE_QUERY_EMBEDDING_CACHE", False):
+        assert get_query_embedding_cache("index_a") is None
@@ -0,0 +1,123 @@
+from pathlib import Path
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from onyx.configs.constants import MessageType
+from onyx.db.models import ChatMessage
+from onyx.file_store.chat_file_cache import ChatFileContentCache
+from onyx.file_store.models import ChatFileType
+from onyx.file_store.models import FileDescriptor
+from onyx.file_store.utils import get_prompt_history_file_descriptors
+from onyx.file_store.utils import load_all_chat_files
+from shared_configs.contextvars import CURRENT_TENANT_ID_CONTEXTVAR
+
+_MODULE = "onyx.file_store.utils"
+
+
+def _file(file_id: str, file_type: ChatFileType) -> FileDescriptor:
+    return {"id": file_id, "type": file_type, "name": None}
+
+
+def _message(
+    message_type: MessageType, token_count: int, files: list[FileDescriptor]
+) -> ChatMessage:
+    return ChatMessage(message_type=message_type, token_count=token_count, files=files)
+
+
+def test_text_and_images_have_separate_budgets() -> None:
+    chat_file_cache = ChatFileContentCache(max_text_bytes=10, max_image_bytes=10)
+    chat_file_cache.set("doc", ChatFileType.PLAIN_TEXT, b"12345", tenant_id="tenant")
+    chat_file_cache.set("img1", ChatFileType.IMAGE, b"123456", tenant_id="tenant")
+    chat_file_cache.set("img2", ChatFileType.IMAGE, b"123456", tenant_id="tenant")
+
+    assert (
+        chat_file_cache.get("doc", ChatFileType.PLAIN_TEXT, tenant_id="tenant")
+        == b"12345"
+    )
+    assert chat_file_cache.get("img1", ChatFileType.IMAGE, tenant_id="tenant") is None
+    assert (
+        chat_file_cache.get("img2", ChatFileType.IMAGE, tenant_id="tenant") == b"123456"
+    )
+
+
+def test_evicted_files_spill_to_disk(tmp_path: Path) -> None:
+    chat_file_cache = ChatFileContentCache(
+        max_text_bytes=10,
+        max_image_bytes=10,
+        spill_dir=str(tmp_path),
+        max_spill_bytes=1024,
+    )
+    chat_file_cache.set("a", ChatFileType.CSV, b"1234567", tenant_id="tenant")
+    chat_file_cache.set("b", ChatFileType.CSV, b"1234567", tenant_id="tenant")
+    # larger than the memory budget
+    chat_file_cache.set("c", ChatFileType.CSV, b"x" * 20, tenant_id="tenant")
+
+    assert chat_file_cache.get("a", ChatFileType.CSV, tenant_id="tenant") == b"1234567"
+    assert chat_file_cache.get("c", ChatFileType.CSV, tenant_id="tenant") == b"x" * 20
+
+
+def test_only_history_files_that_can_enter_the_prompt_are_loaded() -> None:
+    history = [
+        # dropped, the history is over the token budget
+        _message(MessageType.USER, 600, [_file("old", ChatFileType.PLAIN_TEXT)]),
+        _message(MessageType.USER, 300, [_file("image", ChatFileType.IMAGE)]),
+        # images of assistant messages are not sent to the LLM
+        _message(MessageType.ASSISTANT, 300, [_file("generated", ChatFileType.IMAGE)]),
+        # messages without tokens are not part of the history
+        _message(MessageType.USER, 0, [_file("empty", ChatFileType.PLAIN_TEXT)]),
+        _message(MessageType.USER, 100, [_file("csv", ChatFileType.CSV)]),
+    ]
+    assert [
+        file["id"]
+        for file in get_prompt_history_file_descriptors(
+            history, max_history_tokens=1000
+        )
+    ] == ["image", "csv"]
+
+    file_store = MagicMock()
+    file_store.read_file.return_value.read.return_value = b"content"
+    with patch(f"{_MODULE}.get_default_file_store", return_value=file_store), patch(
+        f"{_MODULE}.get_chat_file_cache", return_value=None
+    ):
+        files = load_all_chat_files(
+            history,
+            [_file("new", ChatFileType.PLAIN_TEXT)],
+            MagicMock(),
+            max_history_tokens=1000,
+        )
+
+    assert [file.file_id for file in files] == ["new", "image", "csv"]
+    assert file_store.read_file.call_count == 3
+
+
+def test_files_are_cached_per_tenant_of_the_request() -> None:
+    chat_file_cache = ChatFileContentCache(max_text_bytes=1024, max_image_bytes=1024)
+    file_store = MagicMock()
+    file_store.read_file.return_value.read.return_value = b"content"
+
+    def _load_as(tenant_id: str) -> None:
+        # set on the request thread only, the files are loaded in worker threads
+        token = CURRENT_TENANT_ID_CONTEXTVAR.set(tenant_id)
+        try:
+            load_all_chat_files(
+                [], [_file("shared_id", ChatFileType.PLAIN_TEXT)], MagicMock()
+            )
+        finally:
+            CURRENT_TENANT_ID_CONTEXTVAR.reset(token)
+
+    with patch(f"{_MODULE}.get_default_file_store", return_value=file_store), patch(
+        f"{_MODULE}.get_chat_file_cache", return_value=chat_file_cache
+    ):
+        _load_as("tenant_a")
+        _load_as("tenant_b")
+        _load_as("tenant_a")
+
+    # one read per tenant, the second load of tenant_a is served from the cache
+    assert file_store.read_file.call_count == 2
+    for tenant_id in ["tenant_a", "tenant_b"]:
+        assert (
+            chat_file_cache.get(
+                "shared_id", ChatFileType.PLAIN_TEXT, tenant_id=tenant_id
+            )
+            == b"content"
+        )
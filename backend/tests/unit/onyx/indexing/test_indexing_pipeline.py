@@ -1,10 +1,14 @@
+from datetime import datetime
+from datetime import timezone
 from typing import List
 
 from onyx.configs.app_configs import MAX_DOCUMENT_CHARS
 from onyx.connectors.models import Document
 from onyx.connectors.models import DocumentSource
 from onyx.connectors.models import Section
+from onyx.db.models import Document as DBDocument
 from onyx.indexing.indexing_pipeline import filter_documents
+from onyx.indexing.indexing_pipeline import split_docs_by_content_change
 
 
 def create_test_document(
@@ -118,3 +122,52 @@ def test_filter_documents_multiple_documents() -> None:
 def test_filter_documents_empty_batch() -> None:
     result = filter_documents([])
     assert len(result) == 0
+
+
+def test_content_hash_ignores_updated_at() -> None:
+    doc = create_test_document()
+    same_doc = create_test_document()
+    same_doc.doc_updated_at = datetime.now(timezone.utc)
+    assert doc.get_content_hash() == same_doc.get_content_hash()
+
+
+def test_content_hash_changes_with_content() -> None:
+    doc = create_test_document()
+    assert (
+        doc.get_content_hash()
+        != create_test_document(title="Other Title").get_content_hash()
+    )
+    assert (
+        doc.get_content_hash()
+        != create_test_document(
+            sections=[Section(text="Test content", link="other_link")]
+        ).get_content_hash()
+    )
+    doc_with_metadata = create_test_document()
+    doc_with_metadata.metadata = {"tag": "value"}
+    assert doc.get_content_hash() != doc_with_metadata.get_content_hash()
+
+
+def test_split_docs_by_content_change() -> None:
+    unchanged = create_test_document(doc_id="unchanged")
+    changed = create_test_document(doc_id="changed")
+    new = create_test_document(doc_id="new")
+    never_hashed = create_test_document(doc_id="never_hashed")
+    docs = [unchanged, changed, new, never_hashed]
+
+    id_to_content_hash = {doc.id: doc.get_content_hash() for doc in docs}
+    id_to_db_doc_map = {
+        "unchanged": DBDocument(
+            id="unchanged", content_hash=id_to_content_hash["unchanged"]
+        ),
+        "changed": DBDocument(id="changed", content_hash="stale_hash"),
+        "never_hashed": DBDocument(id="never_hashed", content_hash=None),
+    }
+
+    changed_docs, unchanged_docs = split_docs_by_content_change(
+        documents=docs,
+        id_to_db_doc_map=id_to_db_doc_map,
+        id_to_content_hash=id_to_content_hash,
+    )
+    assert [doc.id for doc in changed_docs] == ["changed", "new", "never_hashed"]
+    assert [doc.id for doc in unchanged_docs] == ["unchanged"]
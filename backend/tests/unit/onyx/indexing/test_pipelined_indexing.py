@@ -0,0 +1,199 @@
+import contextlib
+import threading
+from collections.abc import Generator
+from collections.abc import Iterator
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import Mock
+from unittest.mock import patch
+
+import pytest
+
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.models import Document
+from onyx.connectors.models import IndexAttemptMetadata
+from onyx.connectors.models import Section
+from onyx.indexing.indexing_pipeline import DocumentBatchPrepareContext
+from onyx.indexing.pipelined_indexing import PipelinedIndexingPipeline
+
+
+def _make_doc(doc_id: str) -> Document:
+    return Document(
+        id=doc_id,
+        source=DocumentSource.FILE,
+        semantic_identifier=doc_id,
+        metadata={},
+        sections=[Section(text=f"content of {doc_id}", link=None)],
+    )
+
+
+def _doc_batches(num_batches: int, batch_size: int = 2) -> list[list[Document]]:
+    return [
+        [_make_doc(f"doc_{b}_{i}") for i in range(batch_size)]
+        for b in range(num_batches)
+    ]
+
+
+@pytest.fixture
+def patched_stages() -> Generator[dict[str, Mock], None, None]:
+    def _prepare(
+        documents: list[Document], **kwargs: Any
+    ) -> DocumentBatchPrepareContext:
+        return DocumentBatchPrepareContext(
+            updatable_docs=documents, id_to_db_doc_map={}
+        )
+
+    def _write(
+        ctx: DocumentBatchPrepareContext, chunks_with_embeddings: list, **kwargs: Any
+    ) -> tuple[int, int]:
+        return len(ctx.updatable_docs), len(chunks_with_embeddings)
+
+    @contextlib.contextmanager
+    def _session(tenant_id: str | None) -> Iterator[MagicMock]:
+        yield MagicMock()
+
+    with patch(
+        "onyx.indexing.pipelined_indexing.index_doc_batch_prepare",
+        side_effect=_prepare,
+    ) as prepare, patch(
+        "onyx.indexing.pipelined_indexing.index_doc_batch_write",
+        side_effect=_write,
+    ) as write, patch(
+        "onyx.indexing.pipelined_indexing.get_session_with_tenant",
+        side_effect=_session,
+    ):
+        yield {"prepare": prepare, "write": write}
+
+
+def _build_pipeline(chunker: Mock, embedder: Mock) -> PipelinedIndexingPipeline:
+    return PipelinedIndexingPipeline(
+        chunker=chunker,
+        embedder=embedder,
+        document_index=Mock(),
+        db_session=MagicMock(),
+        index_attempt_metadata=IndexAttemptMetadata(connector_id=1, credential_id=1),
+        queue_size=1,
+    )
+
+
+def test_pipelined_indexing_preserves_order_and_counts(
+    patched_stages: dict[str, Mock]
+) -> None:
+    chunker = Mock()
+    chunker.chunk.side_effect = lambda docs: [f"chunk_{doc.id}" for doc in docs]
+    embedder = Mock()
+    embedder.embed_chunks.side_effect = lambda chunks: [f"emb_{c}" for c in chunks]
+
+    pipeline = _build_pipeline(chunker, embedder)
+    index_attempt_md = IndexAttemptMetadata(connector_id=1, credential_id=1)
+    source_batches = _doc_batches(5)
+
+    seen_ids: list[list[str]] = []
+    results: list[tuple[int, int]] = []
+    for doc_batch in pipeline.run(iter(source_batches)):
+        seen_ids.append([doc.id for doc in doc_batch])
+        results.append(
+            pipeline(document_batch=doc_batch, index_attempt_metadata=index_attempt_md)
+        )
+
+    assert seen_ids == [[doc.id for doc in batch] for batch in source_batches]
+    assert results == [(2, 2)] * 5
+    assert pipeline.fetch_stats.batches == 5
+    assert pipeline.embed_stats.chunks == 10
+    assert pipeline.write_stats.documents == 10
+
+
+def test_pipelined_indexing_batch_failure_is_reported_on_write(
+    patched_stages: dict[str, Mock]
+) -> None:
+    def _embed(chunks: list[str]) -> list[str]:
+        if any("doc_1_" in c for c in chunks):
+            raise ValueError("model server unavailable")
+        return chunks
+
+    chunker = Mock()
+    chunker.chunk.side_effect = lambda docs: [f"chunk_{doc.id}" for doc in docs]
+    embedder = Mock()
+    embedder.embed_chunks.side_effect = _embed
+
+    pipeline = _build_pipeline(chunker, embedder)
+    index_attempt_md = IndexAttemptMetadata(connector_id=1, credential_id=1)
+
+    written = 0
+    with patch(
+        "onyx.indexing.pipelined_indexing.handle_index_doc_batch_exception"
+    ) as handler:
+        for doc_batch in pipeline.run(iter(_doc_batches(3))):
+            written += pipeline(
+                document_batch=doc_batch, index_attempt_metadata=index_attempt_md
+            )[0]
+
+    # the failing batch is handed to the regular exception handling, the rest still go through
+    assert handler.call_count == 1
+    assert isinstance(handler.call_args.args[0], ValueError)
+    assert written == 4
+
+
+def test_pipelined_indexing_source_failure_raises() -> None:
+    def _failing_source() -> Iterator[list[Document]]:
+        yield [_make_doc("doc_0")]
+        raise RuntimeError("connector blew up")
+
+    chunker = Mock()
+    chunker.chunk.return_value = []
+    pipeline = _build_pipeline(chunker, Mock())
+
+    with patch(
+        "onyx.indexing.pipelined_indexing.get_session_with_tenant",
+        side_effect=lambda tenant_id: contextlib.nullcontext(MagicMock()),
+    ), patch(
+        "onyx.indexing.pipelined_indexing.index_doc_batch_prepare", return_value=None
+    ):
+        with pytest.raises(RuntimeError, match="connector blew up"):
+            for doc_batch in pipeline.run(_failing_source()):
+                pipeline(
+                    document_batch=doc_batch,
+                    index_attempt_metadata=IndexAttemptMetadata(
+                        connector_id=1, credential_id=1
+                    ),
+                )
+
+
+def test_pipelined_indexing_stale_stage_does_not_resume_in_next_run(
+    patched_stages: dict[str, Mock]
+) -> None:
+    release_stale_source = threading.Event()
+    stale_fetch_threads: list[threading.Thread] = []
+
+    def _stuck_source() -> Iterator[list[Document]]:
+        yield [_make_doc("stale_0")]
+        # e.g. a connector call that hangs past the shutdown of the run
+        stale_fetch_threads.append(threading.current_thread())
+        release_stale_source.wait(timeout=10)
+        while True:
+            yield [_make_doc("stale")]
+
+    chunker = Mock()
+    chunker.chunk.return_value = []
+    pipeline = _build_pipeline(chunker, Mock())
+    index_attempt_md = IndexAttemptMetadata(connector_id=1, credential_id=1)
+
+    with patch("onyx.indexing.pipelined_indexing._STAGE_JOIN_TIMEOUT", 0.1):
+        with pytest.raises(RuntimeError, match="write failed"):
+            for doc_batch in pipeline.run(_stuck_source()):
+                pipeline(
+                    document_batch=doc_batch, index_attempt_metadata=index_attempt_md
+                )
+                raise RuntimeError("write failed")
+        assert stale_fetch_threads and stale_fetch_threads[0].is_alive()
+
+        seen_ids: list[str] = []
+        for doc_batch in pipeline.run(iter(_doc_batches(2))):
+            release_stale_source.set()
+            # the stage of the previous run still sees its stop event and exits
+            stale_fetch_threads[0].join(timeout=5)
+            assert not stale_fetch_threads[0].is_alive()
+            seen_ids.extend(doc.id for doc in doc_batch)
+            pipeline(document_batch=doc_batch, index_attempt_metadata=index_attempt_md)
+
+    assert seen_ids == ["doc_0_0", "doc_0_1", "doc_1_0", "doc_1_1"]
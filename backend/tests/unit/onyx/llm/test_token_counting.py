@@ -0,0 +1,33 @@
+from unittest.mock import patch
+
+from langchain_core.messages import HumanMessage
+
+from onyx.llm.utils import check_message_tokens
+from onyx.natural_language_processing.token_count_cache import TokenCountCache
+
+
+class _WordEncoder:
+    def __init__(self) -> None:
+        self.encode_calls = 0
+
+    def encode(self, text: str) -> list[str]:
+        self.encode_calls += 1
+        return text.split()
+
+
+def test_message_tokens_are_encoded_once_per_encoder() -> None:
+    message = HumanMessage(content="how many tokens are in this message")
+
+    with patch(
+        "onyx.natural_language_processing.token_count_cache.get_token_count_cache",
+        return_value=TokenCountCache(max_entries=100),
+    ):
+        encoder = _WordEncoder()
+        assert check_message_tokens(message, encoder.encode) == 7
+        assert check_message_tokens(message, encoder.encode) == 7
+        assert encoder.encode_calls == 1
+
+        # counts are never shared between encoders
+        other_encoder = _WordEncoder()
+        assert check_message_tokens(message, other_encoder.encode) == 7
+        assert other_encoder.encode_calls == 1
@@ -0,0 +1,97 @@
+import asyncio
+from unittest.mock import Mock
+from unittest.mock import patch
+
+import httpx
+from prometheus_client import REGISTRY
+
+from onyx.natural_language_processing import model_server_client
+from onyx.natural_language_processing.model_server_client import (
+    async_post_to_model_server,
+)
+from onyx.natural_language_processing.model_server_client import (
+    get_async_model_server_client,
+)
+from onyx.natural_language_processing.model_server_client import (
+    get_model_server_session,
+)
+from onyx.natural_language_processing.model_server_client import (
+    post_to_model_server,
+)
+
+
+def test_session_is_shared_and_rebuilt_after_fork() -> None:
+    session = get_model_server_session()
+    assert get_model_server_session() is session
+
+    with patch.object(model_server_client.os, "getpid", return_value=-1):
+        forked_session = get_model_server_session()
+        assert forked_session is not session
+        assert get_model_server_session() is forked_session
+
+
+def test_async_client_is_shared_within_an_event_loop() -> None:
+    async def _get_clients() -> tuple:
+        return get_async_model_server_client(), get_async_model_server_client()
+
+    first, second = asyncio.run(_get_clients())
+    assert first is second
+    # a client can't be reused on a different event loop
+    assert asyncio.run(_get_clients())[0] is not first
+
+
+def test_request_latency_is_recorded_per_endpoint() -> None:
+    def _count(status: str) -> float:
+        return (
+            REGISTRY.get_sample_value(
+                "onyx_model_server_client_request_latency_seconds_count",
+                {"endpoint": "/encoder/cross-encoder-scores", "status": status},
+            )
+            or 0
+        )
+
+    before = _count("200")
+    session = Mock()
+    session.post.return_value.status_code = 200
+    with patch.object(
+        model_server_client, "get_model_server_session", return_value=session
+    ):
+        post_to_model_server(
+            "http://localhost:9000/encoder/cross-encoder-scores", json={}
+        )
+
+    assert _count("200") == before + 1
+
+
+def test_async_request_goes_through_the_shared_client() -> None:
+    def _count(status: str) -> float:
+        return (
+            REGISTRY.get_sample_value(
+                "onyx_model_server_client_request_latency_seconds_count",
+                {"endpoint": "/encoder/bi-encoder-embed", "status": status},
+            )
+            or 0
+        )
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"embeddings": [[0.1]]})
+
+    async def _post_twice() -> list[httpx.AsyncClient]:
+        clients = []
+        for _ in range(2):
+            response = await async_post_to_model_server(
+                "http://localhost:9000/encoder/bi-encoder-embed", json={}
+            )
+            assert response.json() == {"embeddings": [[0.1]]}
+            clients.append(get_async_model_server_client())
+        return clients
+
+    before = _count("200")
+    mock_client = httpx.AsyncClient(transport=httpx.MockTransport(_handler))
+    with patch.object(
+        model_server_client.httpx, "AsyncClient", return_value=mock_client
+    ):
+        first, second = asyncio.run(_post_twice())
+
+    assert first is second is mock_client
+    assert _count("200") == before + 2
@@ -0,0 +1,194 @@
+import threading
+import time
+from unittest.mock import Mock
+from unittest.mock import patch
+
+import numpy as np
+import numpy.typing as npt
+import pytest
+from requests import Response
+
+from onyx.natural_language_processing.search_nlp_models import EmbeddingModel
+from shared_configs.embedding_transport import EMBEDDING_BINARY_MEDIA_TYPE
+from shared_configs.embedding_transport import encode_embeddings
+from shared_configs.enums import EmbeddingProvider
+from shared_configs.enums import EmbeddingTransportFormat
+from shared_configs.enums import EmbedTextType
+from shared_configs.model_server_models import EmbedRequest
+
+
+def _build_model(provider_type: EmbeddingProvider | None = None) -> EmbeddingModel:
+    with patch(
+        "onyx.natural_language_processing.search_nlp_models.get_tokenizer"
+    ) as mock_get_tokenizer:
+        # one token per word
+        mock_get_tokenizer.return_value.encode.side_effect = lambda text: text.split()
+        return EmbeddingModel(
+            server_host="localhost",
+            server_port=9000,
+            model_name="test-model",
+            normalize=True,
+            query_prefix=None,
+            passage_prefix=None,
+            api_key=None,
+            api_url=None,
+            provider_type=provider_type,
+        )
+
+
+def test_length_bucketed_batches_restore_original_order() -> None:
+    model = _build_model()
+    texts = ["w " * 8, "w", "w " * 30, "w w", "w " * 9, "w"]
+
+    sent_batches: list[list[str]] = []
+
+    def _fake_request(embed_request: EmbedRequest) -> npt.NDArray[np.float32]:
+        sent_batches.append(embed_request.texts)
+        return np.array(
+            [[len(text.split())] for text in embed_request.texts], dtype=np.float32
+        )
+
+    with patch(
+        "onyx.natural_language_processing.search_nlp_models.ENABLE_LENGTH_BUCKETED_EMBEDDING_BATCHES",
+        True,
+    ), patch(
+        "onyx.natural_language_processing.search_nlp_models.EMBEDDING_BATCH_TOKEN_BUDGET",
+        32,
+    ), patch.object(
+        model, "_make_model_server_request", side_effect=_fake_request
+    ):
+        embeddings = model.encode(
+            texts, text_type=EmbedTextType.PASSAGE, local_embedding_batch_size=2
+        )
+
+    assert embeddings == [[8.0], [1.0], [30.0], [2.0], [9.0], [1.0]]
+    # short texts share a batch instead of being padded to the long ones, the budget
+    # of 32 padded tokens is respected except for the single overly long text
+    assert [[len(text.split()) for text in batch] for batch in sent_batches] == [
+        [1, 1, 2, 8],
+        [9],
+        [30],
+    ]
+
+
+def test_cloud_batches_are_sent_concurrently_and_reassembled_in_order() -> None:
+    model = _build_model(provider_type=EmbeddingProvider.OPENAI)
+    model.callback = Mock()
+    model.callback.should_stop.return_value = False
+    texts = [f"text {i}" for i in range(10)]
+
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+
+    def _fake_request(embed_request: EmbedRequest) -> npt.NDArray[np.float32]:
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        # later batches finish first
+        time.sleep(0.01 * (10 - int(embed_request.texts[0].split()[1])))
+        with lock:
+            in_flight -= 1
+        return np.array(
+            [[int(text.split()[1])] for text in embed_request.texts], dtype=np.float32
+        )
+
+    with patch(
+        "onyx.natural_language_processing.search_nlp_models.CLOUD_EMBEDDING_REQUEST_CONCURRENCY",
+        3,
+    ), patch.object(model, "_make_model_server_request", side_effect=_fake_request):
+        embeddings = model.encode(
+            texts, text_type=EmbedTextType.PASSAGE, api_embedding_batch_size=2
+        )
+
+    assert embeddings == [[float(i)] for i in range(10)]
+    assert 1 < max_in_flight <= 3
+    # one heartbeat per completed batch
+    assert model.callback.progress.call_count == 5
+
+
+def test_batch_dispatch_stops_on_stop_signal() -> None:
+    model = _build_model(provider_type=EmbeddingProvider.OPENAI)
+    model.callback = Mock()
+    model.callback.should_stop.side_effect = [False, False, True]
+
+    with patch(
+        "onyx.natural_language_processing.search_nlp_models.CLOUD_EMBEDDING_REQUEST_CONCURRENCY",
+        1,
+    ), patch.object(
+        model,
+        "_make_model_server_request",
+        side_effect=lambda embed_request: np.zeros(
+            (len(embed_request.texts), 1), dtype=np.float32
+        ),
+    ) as mock_request, pytest.raises(
+        RuntimeError, match="stop signal"
+    ):
+        model.encode(
+            [f"text {i}" for i in range(10)],
+            text_type=EmbedTextType.PASSAGE,
+            api_embedding_batch_size=2,
+        )
+
+    assert mock_request.call_count == 2
+
+
+def test_single_batch_is_encoded_without_a_thread_pool() -> None:
+    model = _build_model(provider_type=EmbeddingProvider.OPENAI)
+
+    with patch(
+        "onyx.natural_language_processing.search_nlp_models.ThreadPoolExecutor"
+    ) as mock_executor, patch.object(
+        model,
+        "_make_model_server_request",
+        side_effect=lambda embed_request: np.ones(
+            (len(embed_request.texts), 1), dtype=np.float32
+        ),
+    ):
+        embeddings = model.encode(["query"], text_type=EmbedTextType.QUERY)
+
+    assert embeddings == [[1.0]]
+    mock_executor.assert_not_called()
+
+
+def test_binary_response_stays_an_array_until_returned() -> None:
+    model = _build_model()
+    vectors = np.array([[0.5, -1.0], [0.25, 2.0], [1.5, 0.0]], dtype=np.float32)
+
+    def _fake_post(url: str, **kwargs: object) -> Response:
+        texts = kwargs["json"]["texts"]  # type: ignore[index]
+        response = Response()
+        response.status_code = 200
+        response.headers["Content-Type"] = EMBEDDING_BINARY_MEDIA_TYPE
+        response._content = encode_embeddings(
+            vectors[[int(text) for text in texts]], EmbeddingTransportFormat.FLOAT32
+        )
+        return response
+
+    with patch(
+        "onyx.natural_language_processing.search_nlp_models.post_to_model_server",
+        side_effect=_fake_post,
+    ):
+        batch = model._make_model_server_request(
+            EmbedRequest(
+                model_name="test-model",
+                texts=["0", "2"],
+                max_context_length=512,
+                normalize_embeddings=True,
+                api_key=None,
+                provider_type=None,
+                text_type=EmbedTextType.PASSAGE,
+                manual_query_prefix=None,
+                manual_passage_prefix=None,
+            )
+        )
+        embeddings = model.encode(
+            ["0", "1", "2"],
+            text_type=EmbedTextType.PASSAGE,
+            local_embedding_batch_size=2,
+        )
+
+    assert isinstance(batch, np.ndarray) and batch.dtype == np.float32
+    assert np.array_equal(batch, vectors[[0, 2]])
+    assert embeddings == vectors.tolist()
@@ -0,0 +1,155 @@
+import json
+from collections.abc import Generator
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from onyx.configs.constants import DocumentSource
+from onyx.context.search.models import InferenceChunk
+from onyx.context.search.models import InferenceSection
+from onyx.secondary_llm_flows.agentic_evaluation import evaluate_inference_sections
+from onyx.secondary_llm_flows.section_evaluation import parse_batch_verdicts
+from onyx.secondary_llm_flows.section_evaluation import SectionVerdict
+from onyx.utils.ttl_lru_cache import TTLLRUCache
+
+_MODULE = "onyx.secondary_llm_flows.agentic_evaluation"
+
+
+def _section(document_id: str) -> InferenceSection:
+    chunk = InferenceChunk(
+        chunk_id=0,
+        document_id=document_id,
+        semantic_identifier=document_id,
+        title=None,
+        blurb="",
+        content=f"content of {document_id}",
+        source_links=None,
+        section_continuation=False,
+        source_type=DocumentSource.WEB,
+        boost=0,
+        recency_bias=1.0,
+        score=None,
+        hidden=False,
+        metadata={},
+        match_highlights=[],
+        updated_at=None,
+    )
+    return InferenceSection(
+        center_chunk=chunk, chunks=[chunk], combined_content=chunk.content
+    )
+
+
+def _batch_output(*relevant: bool) -> AIMessage:
+    return AIMessage(
+        content=json.dumps(
+            [
+                {"document": ind, "analysis": f"analysis {ind}", "relevant": value}
+                for ind, value in enumerate(relevant, start=1)
+            ]
+        )
+    )
+
+
+@pytest.fixture
+def llm() -> Generator[MagicMock, None, None]:
+    tokenizer = MagicMock()
+    tokenizer.encode.side_effect = lambda text: text.split()
+    with patch(
+        "onyx.secondary_llm_flows.section_evaluation.get_tokenizer",
+        return_value=tokenizer,
+    ):
+        llm = MagicMock()
+        llm.config.model_provider = "openai"
+        llm.config.model_name = "gpt-4o"
+        yield llm
+
+
+def test_parse_batch_verdicts() -> None:
+    output = (
+        "Here you go:\n"
+        '[{"document": 2, "relevant": false}, '
+        '{"document": 1, "analysis": "about cats", "relevant": true}]'
+    )
+    assert parse_batch_verdicts(output, 2) == [
+        SectionVerdict(relevant=True, analysis="about cats"),
+        SectionVerdict(relevant=False, analysis=""),
+    ]
+    # a verdict is missing or malformed
+    assert parse_batch_verdicts(output, 3) is None
+    assert parse_batch_verdicts('[{"document": 1, "relevant": "yes"}]', 1) is None
+    assert parse_batch_verdicts("True", 1) is None
+
+
+def test_sections_are_evaluated_in_one_call(llm: MagicMock) -> None:
+    llm.invoke.return_value = _batch_output(True, False, True)
+
+    with patch(f"{_MODULE}.get_section_evaluation_cache", return_value=None):
+        pieces = evaluate_inference_sections(
+            [_section("a"), _section("b"), _section("c")], "query", llm, batched=True
+        )
+
+    assert llm.invoke.call_count == 1
+    assert [(piece.document_id, piece.relevant) for piece in pieces] == [
+        ("a", True),
+        ("b", False),
+        ("c", True),
+    ]
+    assert pieces[1].content == "analysis 2"
+
+
+def test_unparsable_batch_falls_back_to_single_calls(llm: MagicMock) -> None:
+    single_output = AIMessage(
+        content="1. Chain of Thought:\n...\n\n2. Useful Analysis:\nsingle\n\n"
+        "3. Final Relevance Determination:\nTrue"
+    )
+    llm.invoke.side_effect = [AIMessage(content="True, False"), single_output]
+
+    with patch(f"{_MODULE}.get_section_evaluation_cache", return_value=None):
+        pieces = evaluate_inference_sections(
+            [_section("a")], "query", llm, batched=True
+        )
+
+    assert llm.invoke.call_count == 2
+    assert pieces[0].relevant
+    assert pieces[0].content == "single"
+
+
+def test_cached_verdicts_are_reused(llm: MagicMock) -> None:
+    evaluation_cache: TTLLRUCache[str, SectionVerdict] = TTLLRUCache(
+        max_entries=100, ttl_seconds=60
+    )
+    llm.invoke.side_effect = [_batch_output(True), _batch_output(False)]
+
+    with patch(
+        f"{_MODULE}.get_section_evaluation_cache", return_value=evaluation_cache
+    ):
+        evaluate_inference_sections([_section("a")], "query", llm, batched=True)
+        pieces = evaluate_inference_sections(
+            [_section("a"), _section("b")], "query", llm, batched=True
+        )
+
+    assert llm.invoke.call_count == 2
+    # only the new section was sent to the LLM the second time
+    assert "content of a" not in str(llm.invoke.call_args)
+    assert [piece.relevant for piece in pieces] == [True, False]
+
+
+def test_cached_verdicts_are_not_shared_across_llms(llm: MagicMock) -> None:
+    evaluation_cache: TTLLRUCache[str, SectionVerdict] = TTLLRUCache(
+        max_entries=100, ttl_seconds=60
+    )
+    llm.invoke.side_effect = [_batch_output(True), _batch_output(False)]
+
+    with patch(
+        f"{_MODULE}.get_section_evaluation_cache", return_value=evaluation_cache
+    ):
+        evaluate_inference_sections([_section("a")], "query", llm, batched=True)
+        llm.config.model_name = "gpt-4o-mini"
+        pieces = evaluate_inference_sections(
+            [_section("a")], "query", llm, batched=True
+        )
+
+    assert llm.invoke.call_count == 2
+    assert [piece.relevant for piece in pieces] == [False]
@@ -0,0 +1,121 @@
+from collections.abc import Generator
+from typing import Any
+from typing import cast
+from unittest.mock import MagicMock
+from unittest.mock import Mock
+from unittest.mock import patch
+
+import pytest
+
+from onyx.chat.models import AnswerStyleConfig
+from onyx.chat.models import CitationConfig
+from onyx.chat.models import DocumentPruningConfig
+from onyx.chat.models import PromptConfig
+from onyx.context.search.enums import LLMEvaluationType
+from onyx.tools.models import ToolResponse
+from onyx.tools.tool_implementations.search.search_tool import (
+    FINAL_CONTEXT_DOCUMENTS_ID,
+)
+from onyx.tools.tool_implementations.search.search_tool import (
+    SEARCH_RESPONSE_SUMMARY_ID,
+)
+from onyx.tools.tool_implementations.search.search_tool import SearchTool
+
+_MODULE = "onyx.tools.tool_implementations.search.search_tool"
+
+_FIRST = Mock(name="first_retrieved")
+_SECOND = Mock(name="second_retrieved")
+
+
+@pytest.fixture
+def search_pipeline() -> Generator[MagicMock, None, None]:
+    pipeline = MagicMock()
+    pipeline.will_rerank = True
+    pipeline.provisional_context_sections = [_FIRST, _SECOND]
+    pipeline.final_context_sections = [_SECOND, _FIRST]
+    pipeline.reranked_sections = [_SECOND, _FIRST]
+
+    def _summary(**kwargs: Any) -> Mock:
+        return Mock(**kwargs)
+
+    with patch(f"{_MODULE}.SearchPipeline", return_value=pipeline), patch(
+        f"{_MODULE}.SearchRequest"
+    ), patch(f"{_MODULE}.SearchResponseSummary", side_effect=_summary), patch(
+        f"{_MODULE}.OnyxContexts"
+    ), patch(
+        f"{_MODULE}.OnyxContext"
+    ), patch(
+        f"{_MODULE}.prune_sections", side_effect=lambda sections, **_: sections
+    ), patch(
+        f"{_MODULE}.llm_doc_from_inference_section", side_effect=lambda section: section
+    ), patch(
+        f"{_MODULE}.compute_max_llm_input_tokens", return_value=100_000
+    ):
+        yield pipeline
+
+
+def _run_search_tool(
+    progressive_results: bool, wait_for_rerank: bool
+) -> list[ToolResponse]:
+    persona = Mock(chunks_above=None, chunks_below=None)
+    search_tool = SearchTool(
+        db_session=Mock(),
+        user=None,
+        persona=persona,
+        retrieval_options=None,
+        prompt_config=cast(PromptConfig, Mock()),
+        llm=Mock(),
+        fast_llm=Mock(),
+        pruning_config=DocumentPruningConfig(),
+        answer_style_config=AnswerStyleConfig(citation_config=CitationConfig()),
+        evaluation_type=LLMEvaluationType.SKIP,
+        progressive_results=progressive_results,
+        wait_for_rerank=wait_for_rerank,
+    )
+    return list(search_tool.run(query="query"))
+
+
+def _summaries(responses: list[ToolResponse]) -> list[tuple[list, bool]]:
+    return [
+        (response.response.top_sections, response.response.provisional)
+        for response in responses
+        if response.id == SEARCH_RESPONSE_SUMMARY_ID
+    ]
+
+
+def _final_docs(responses: list[ToolResponse]) -> list:
+    return next(
+        response.response
+        for response in responses
+        if response.id == FINAL_CONTEXT_DOCUMENTS_ID
+    )
+
+
+def test_provisional_results_precede_reranked_results(
+    search_pipeline: MagicMock,
+) -> None:
+    responses = _run_search_tool(progressive_results=True, wait_for_rerank=True)
+
+    assert _summaries(responses) == [
+        ([_FIRST, _SECOND], True),
+        ([_SECOND, _FIRST], False),
+    ]
+    assert _final_docs(responses) == [_SECOND, _FIRST]
+
+
+def test_answer_without_waiting_for_rerank(search_pipeline: MagicMock) -> None:
+    responses = _run_search_tool(progressive_results=True, wait_for_rerank=False)
+
+    # the retrieval order is final, there is no reranked summary to wait for
+    assert _summaries(responses) == [([_FIRST, _SECOND], False)]
+    assert _final_docs(responses) == [_FIRST, _SECOND]
+
+
+def test_no_provisional_results_without_reranking(
+    search_pipeline: MagicMock,
+) -> None:
+    search_pipeline.will_rerank = False
+
+    responses = _run_search_tool(progressive_results=True, wait_for_rerank=True)
+
+    assert _summaries(responses) == [([_SECOND, _FIRST], False)]
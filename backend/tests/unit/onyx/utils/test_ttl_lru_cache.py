@@ -0,0 +1,44 @@
+from unittest.mock import patch
+
+from onyx.utils.ttl_lru_cache import TTLLRUCache
+
+
+def test_evicts_least_recently_used_entries() -> None:
+    cache: TTLLRUCache[str, int] = TTLLRUCache(max_entries=2)
+    cache.set_many({"a": 1, "b": 2})
+    # touch "a" so that "b" is the least recently used entry
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get_many(["a", "b", "c"]) == {"a": 1, "c": 3}
+    assert len(cache) == 2
+
+    cache.delete("a")
+    assert cache.get("a") is None
+
+
+def test_entries_expire_after_the_ttl() -> None:
+    cache: TTLLRUCache[str, int] = TTLLRUCache(max_entries=10, ttl_seconds=60)
+    with patch("onyx.utils.ttl_lru_cache.time.monotonic", return_value=0.0):
+        cache.set("a", 1)
+
+    with patch("onyx.utils.ttl_lru_cache.time.monotonic", return_value=59.0):
+        assert cache.get("a") == 1
+    with patch("onyx.utils.ttl_lru_cache.time.monotonic", return_value=60.0):
+        assert cache.get_many(["a"]) == {}
+    assert len(cache) == 0
+
+
+def test_size_bound_evicts_and_returns_least_recently_used_entries() -> None:
+    cache: TTLLRUCache[str, bytes] = TTLLRUCache(max_size=10, size_fn=len)
+    assert cache.set_many({"a": b"1234", "b": b"1234"}) == []
+    # replacing a value only counts its new size
+    assert cache.set("a", b"123") == []
+    assert cache.size == 7
+
+    assert cache.set("c", b"1234") == [("b", b"1234")]
+    # larger than the whole budget, never stored
+    assert cache.set("d", b"x" * 11) == [("d", b"x" * 11)]
+
+    assert cache.get_many(["a", "b", "c", "d"]) == {"a": b"123", "c": b"1234"}
+    assert cache.size == 7
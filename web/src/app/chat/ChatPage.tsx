@@ -71,6 +71,7 @@ import {
   AnswerPiecePacket,
   OnyxDocument,
   DocumentInfoPacket,
+  DocumentReorderPacket,
   StreamStopInfo,
   StreamStopReason,
 } from "@/lib/search/interfaces";
@@ -1351,6 +1352,16 @@ export function ChatPage({
                 // we have to use -1)
                 setSelectedMessageForDocDisplay(user_message_id);
               }
+            } else if (Object.hasOwn(packet, "reordered_document_ids")) {
+              const { reordered_document_ids, db_doc_ids } =
+                packet as DocumentReorderPacket;
+              const documentsById = new Map(
+                documents.map((doc) => [doc.document_id, doc])
+              );
+              documents = reordered_document_ids.flatMap((documentId, ind) => {
+                const doc = documentsById.get(documentId);
+                return doc ? [{ ...doc, db_doc_id: db_doc_ids[ind] }] : [];
+              });
             } else if (Object.hasOwn(packet, "tool_name")) {
               // Will only ever be one tool call per message
               toolCall = {
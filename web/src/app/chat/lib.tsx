@@ -3,6 +3,7 @@ import {
   OnyxDocument,
   Filters,
   DocumentInfoPacket,
+  DocumentReorderPacket,
   StreamStopInfo,
 } from "@/lib/search/interfaces";
 import { handleSSEStream } from "@/lib/search/streamingUtils";
@@ -104,6 +105,7 @@ export type PacketType =
   | BackendMessage
   | AnswerPiecePacket
   | DocumentInfoPacket
+  | DocumentReorderPacket
   | DocumentsResponse
   | FileChatDisplay
   | StreamingError
@@ -82,6 +82,12 @@ export interface DocumentInfoPacket {
   favor_recent: boolean;
 }
 
+// follows a provisional DocumentInfoPacket once the documents are reranked
+export interface DocumentReorderPacket {
+  reordered_document_ids: string[];
+  db_doc_ids: number[];
+}
+
 export interface DocumentRelevance {
   relevant: boolean;
   content: string;